@@ -0,0 +1,118 @@
+"""
+Chargement des services SOAP en mémoire pour les benchmarks.
+
+Chaque service est écrit pour tourner depuis son propre dossier
+(`python main.py` dans le conteneur) : on ajoute ce dossier au sys.path
+et on charge son main.py sous un nom de module unique.
+"""
+import importlib.util
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+SERVICE_DIRS = {
+    "solvency": "solvency_service",
+    "ie": "ie_service",
+    "credit_scoring": "business_services/credit_scoring_service",
+    "decision": "business_services/decision_solvability_service",
+    "debt_ratio": "business_services/ratio_endettement_service",
+    "explain": "business_services/explain_service",
+    "property_evaluation": "business_services/property_evaluation_service",
+    "approval": "business_services/approbation_service",
+}
+
+SERVICE_PORTS = {
+    "solvency": 8000,
+    "ie": 8001,
+    "credit_scoring": 8002,
+    "decision": 8003,
+    "debt_ratio": 8004,
+    "explain": 8005,
+    "property_evaluation": 8006,
+    "approval": 8007,
+}
+
+_ENVELOPE = """<?xml version="1.0" encoding="utf-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="{tns}">
+   <soapenv:Body>
+      {body}
+   </soapenv:Body>
+</soapenv:Envelope>"""
+
+SAMPLE_TEXT = (
+    "Je souhaite emprunter 250000 euros sur 20 ans pour acheter une maison "
+    "neuve avec jardin à Paris."
+)
+
+# Requête représentative de chaque service : (tns, corps du message)
+SAMPLE_REQUESTS = {
+    "solvency": ("urn:solvency.verification.service:v1",
+                 "<tns:VerifySolvency><tns:clientId>client-001</tns:clientId>"
+                 f"<tns:demandeTexte>{SAMPLE_TEXT}</tns:demandeTexte></tns:VerifySolvency>"),
+    "ie": ("urn:ie.service:v7",
+           f"<tns:extractInformation><tns:text>{SAMPLE_TEXT}</tns:text></tns:extractInformation>"),
+    "credit_scoring": ("urn:creditscore.service:v1",
+                       "<tns:ComputeCreditScore><tns:debt>5000.0</tns:debt>"
+                       "<tns:latePayments>2</tns:latePayments>"
+                       "<tns:hasBankruptcy>false</tns:hasBankruptcy></tns:ComputeCreditScore>"),
+    "decision": ("urn:solvency.decision:v1",
+                 "<tns:MakeDecision><tns:creditScore>800</tns:creditScore>"
+                 "<tns:monthlyIncome>4000</tns:monthlyIncome>"
+                 "<tns:monthlyDebtPayments>2500</tns:monthlyDebtPayments></tns:MakeDecision>"),
+    "debt_ratio": ("urn:debtratio.service:v1",
+                   "<tns:ComputeDebtRatio><tns:monthlyIncome>4000</tns:monthlyIncome>"
+                   "<tns:monthlyDebtPayments>2500</tns:monthlyDebtPayments></tns:ComputeDebtRatio>"),
+    "explain": ("urn:explain.service:v1",
+                "<tns:Explain><tns:score>800</tns:score><tns:monthlyIncome>4000</tns:monthlyIncome>"
+                "<tns:monthlyExpenses>2500</tns:monthlyExpenses><tns:debt>5000</tns:debt>"
+                "<tns:latePayments>2</tns:latePayments>"
+                "<tns:hasBankruptcy>false</tns:hasBankruptcy></tns:Explain>"),
+    "property_evaluation": ("urn:property.evaluation:v1",
+                            "<tns:EvaluateProperty><tns:data><tns:amount>250000</tns:amount>"
+                            "<tns:duration_years>20</tns:duration_years>"
+                            "<tns:property_type>Maison</tns:property_type>"
+                            "<tns:property_description>maison neuve avec jardin</tns:property_description>"
+                            "<tns:location>Paris</tns:location></tns:data></tns:EvaluateProperty>"),
+    "approval": ("urn:approval.decision:v1",
+                 "<tns:MakeApprovalDecision><tns:amount>250000</tns:amount>"
+                 "<tns:duration>20</tns:duration><tns:solvency>solvent</tns:solvency>"
+                 "<tns:prop_value>618750</tns:prop_value>"
+                 "<tns:prop_ok>true</tns:prop_ok></tns:MakeApprovalDecision>"),
+}
+
+_LOADED = {}
+
+
+def soap_envelope(tns, body):
+    return _ENVELOPE.format(tns=tns, body=body)
+
+
+def sample_envelope(name):
+    tns, body = SAMPLE_REQUESTS[name]
+    return soap_envelope(tns, body).encode("utf-8")
+
+
+def service_dir(name):
+    return os.path.join(ROOT_DIR, SERVICE_DIRS[name])
+
+
+def load_service(name):
+    """Importe le main.py d'un service et retourne le module."""
+    if name in _LOADED:
+        return _LOADED[name]
+    directory = service_dir(name)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(f"{name}_service_main", os.path.join(directory, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _LOADED[name] = module
+    return module
+
+
+def soap_application(module):
+    """L'objet Application spyne d'un service (nommé `app` ou `application`)."""
+    return getattr(module, "application", None) or module.app
@@ -0,0 +1,114 @@
+"""
+Contrôle d'admission de l'orchestrateur sous surcharge : latence (p50/p99)
+des vérifications admises et taux de rejet, avec et sans admission.
+
+Les services métier sont simulés par une ressource partagée de capacité
+fixe : au-delà de `--capacity` vérifications simultanées, chaque appel
+ralentit proportionnellement (partage du temps de traitement).
+
+    python benchmarks/bench_admission.py [--clients 64] [--duration 5]
+"""
+import argparse
+import logging
+import sys
+import threading
+import time
+
+from _services import service_dir
+
+sys.path.insert(0, service_dir("solvency"))
+
+from spyne import Fault  # noqa: E402
+
+from admission import AdaptiveLimiter, AdmissionController  # noqa: E402
+
+
+class Downstream:
+    def __init__(self, capacity, service_time):
+        self.capacity = capacity
+        self.service_time = service_time
+        self.inflight = 0
+        self._lock = threading.Lock()
+
+    def call(self):
+        with self._lock:
+            self.inflight += 1
+            load = self.inflight
+        try:
+            time.sleep(self.service_time * max(1.0, load / self.capacity))
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+
+def run(clients, duration, downstream, controller=None):
+    latencies, rejected = [], [0]
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def client(i):
+        while time.monotonic() < stop:
+            start = time.monotonic()
+            try:
+                if controller is None:
+                    downstream.call()
+                else:
+                    with controller.admit(f"client-{i}"):
+                        downstream.call()
+            except Fault:
+                with lock:
+                    rejected[0] += 1
+                time.sleep(0.01)  # le client réessaie un peu plus tard
+                continue
+            with lock:
+                latencies.append(time.monotonic() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    return latencies, rejected[0]
+
+
+def report(label, latencies, rejected, duration):
+    if not latencies:
+        print(f"{label:<16} aucune requête admise, {rejected} rejets")
+        return
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"{label:<16} {len(latencies) / duration:8.1f} req/s   p50 {p50 * 1000:8.1f} ms   "
+          f"p99 {p99 * 1000:8.1f} ms   rejets {rejected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--service-time", type=float, default=0.05)
+    parser.add_argument("--queue", type=int, default=16)
+    parser.add_argument("--queue-timeout", type=float, default=0.2)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{args.clients} clients, capacité {args.capacity}, "
+          f"temps de service {args.service_time * 1000:.0f} ms")
+    downstream = Downstream(args.capacity, args.service_time)
+    latencies, rejected = run(args.clients, args.duration, downstream)
+    report("sans admission", latencies, rejected, args.duration)
+
+    controller = AdmissionController(
+        AdaptiveLimiter(initial=args.capacity, max_limit=args.clients,
+                        target_latency=2 * args.service_time),
+        max_queue=args.queue,
+        queue_timeout=args.queue_timeout,
+    )
+    latencies, rejected = run(args.clients, args.duration, downstream, controller)
+    report("avec admission", latencies, rejected, args.duration)
+    print(f"limite finale {controller.limiter.current}, {controller.stats()['timeouts']} attentes expirées")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Journal d'audit des décisions : débit d'écriture et latence ajoutée à chaque
+requête, écriture synchrone (write + fsync par décision) contre file +
+validation groupée, sans attente (async) ou en attendant le fsync du lot.
+
+    python benchmarks/bench_audit.py [--records 2000] [--threads 1 8 32]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from _services import service_dir
+
+sys.path.insert(0, service_dir("solvency"))
+
+from audit import AuditLog  # noqa: E402
+
+
+def decision(i):
+    """Enregistrement de taille réaliste (~1 Ko) : entrées, extraction, score, rapport."""
+    return {
+        "clientId": f"client-{i % 5000:05d}",
+        "demandeTexte": "Je souhaite emprunter 200000 euros sur 20 ans pour une maison neuve avec jardin à Paris.",
+        "responseProfile": "full",
+        "inputs": {"identity": {"name": "John Doe", "address": "123 Main St"},
+                   "financials": {"MonthlyIncome": 4000.0, "Expenses": 3000.0},
+                   "credit": {"debt": 5000.0, "late": 2, "hasBankruptcy": False}},
+        "extraction": {"amount": 200000.0, "duration_years": 20, "property_type": "Maison",
+                       "property_description": "maison neuve avec jardin", "location": "Paris"},
+        "propertyEvaluation": {"estimatedValue": 618750.0, "legalCompliance": True, "canProceed": True,
+                               "evaluationReport": "Type maison : +20%; Localisation : x1.5; Conforme légalement"},
+        "source": "services", "creditScore": 800, "solvencyStatus": "solvent",
+        "approval": {"approved": True, "interestRate": 3.47, "maxLoanAmount": 556875.0,
+                     "decisionReport": "LTV: 32.3%; Score de risque prédictif: 0.120; APPROUVÉ : Conditions optimales"},
+        "sections": ["clientIdentity", "financials", "creditHistory", "propertyEvaluation", "creditScore",
+                     "solvencyStatus", "approvalResponse", "explanations"],
+    }
+
+
+class DirectWriter:
+    """Référence : chaque requête écrit et synchronise sa ligne elle-même."""
+
+    def __init__(self, directory):
+        self._file = open(os.path.join(directory, "direct.jsonl"), "ab")
+        self._lock = threading.Lock()
+
+    def record(self, entry):
+        entry.setdefault("ts", time.time())
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def run(record, records, threads):
+    """`records` appels répartis sur `threads` requêtes concurrentes : latences par appel."""
+    latencies = [[] for _ in range(threads)]
+
+    def worker(k):
+        out = latencies[k]
+        for i in range(k, records, threads):
+            entry = decision(i)
+            start = time.perf_counter()
+            record(entry)
+            out.append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=worker, args=(k,)) for k in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sorted(x for chunk in latencies for x in chunk)
+
+
+def pct(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--dir", help="répertoire des segments (défaut : temporaire ; choisir le disque réel)")
+    args = parser.parse_args()
+
+    print(f"{'mode':<22} {'requêtes':>8} {'décisions/s':>12} {'p50 (ms)':>9} {'p99 (ms)':>9} {'lot moyen':>10}")
+    for threads in args.threads:
+        for mode in ("direct", "groupé, async", "groupé, attente"):
+            directory = tempfile.mkdtemp(prefix="bench-audit-", dir=args.dir)
+            if mode == "direct":
+                writer = DirectWriter(directory)
+                record = writer.record
+            else:
+                writer = AuditLog(directory, queue_size=max(args.records, 10000))
+                wait = mode == "groupé, attente"
+                record = lambda entry, writer=writer, wait=wait: writer.record(entry, wait=wait)  # noqa: E731
+            start = time.perf_counter()
+            latencies = run(record, args.records, threads)
+            batch = "-"
+            if mode != "direct":
+                writer.flush()  # débit mesuré jusqu'à la dernière décision sur disque
+                batch = f"{writer.stats()['avg_batch']:.1f}"
+            elapsed = time.perf_counter() - start
+            writer.close()
+            print(f"{mode:<22} {threads:>8} {args.records / elapsed:>12.0f} {pct(latencies, 0.5):>9.3f} "
+                  f"{pct(latencies, 0.99):>9.3f} {batch:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Traitement hors ligne du portefeuille (solvency_service/batch.py) : débit
+(clients/s) et mémoire maximale sur un export synthétique, selon le nombre
+de processus.
+
+    python benchmarks/bench_batch.py [--clients 200000] [--workers 1 2 4]
+"""
+import argparse
+import csv
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from _services import service_dir
+
+sys.path.insert(0, service_dir("solvency"))
+
+import batch  # noqa: E402
+
+
+def write_portfolio(path, n, seed=42):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["clientId", "name", "MonthlyIncome", "Expenses", "debt", "late", "hasBankruptcy"])
+        for i in range(n):
+            income = rng.uniform(1500, 9000)
+            writer.writerow([f"client-{i:07d}", f"Client {i}", f"{income:.2f}",
+                             f"{income * rng.uniform(0.3, 1.1):.2f}", f"{rng.uniform(0, 20000):.2f}",
+                             rng.choice([0, 0, 0, 1, 2, 5]), rng.random() < 0.03])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "clients.csv")
+        write_portfolio(source, args.clients)
+        print(f"{args.clients} clients, paquets de {args.chunk_size}, {os.cpu_count()} cœur(s)")
+        for workers in args.workers:
+            out = os.path.join(tmp, f"out-{workers}.csv")
+            start = time.perf_counter()
+            batch.run(batch.clients_from_file(source), out, args.chunk_size, workers)
+            elapsed = time.perf_counter() - start
+            rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                      resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+            print(f"{workers:>3} processus  {args.clients / elapsed:>10.0f} clients/s   "
+                  f"RSS max {rss / 1024:.0f} Mo")
+
+
+if __name__ == "__main__":
+    main()
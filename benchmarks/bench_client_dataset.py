@@ -0,0 +1,127 @@
+"""
+Jeu de données clients projeté (mmap) contre dictionnaires par processus :
+mémoire anonyme (propre à chaque worker) et projetée (partagée) après
+chargement, total pour N workers, et temps de recherche par client.
+
+    python benchmarks/bench_client_dataset.py [--clients 200000] [--workers 4]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from _services import service_dir
+
+sys.path.insert(0, service_dir("solvency"))
+
+from data.columnar import ClientDataset, build_dataset  # noqa: E402
+
+
+def client_id(i):
+    return f"client-{i:07d}"
+
+
+def synthetic_rows(n, seed=42):
+    rng = random.Random(seed)
+    for i in range(n):
+        income = round(rng.uniform(1500, 9000), 2)
+        yield {"clientId": client_id(i), "name": f"Client {i}", "address": f"{i} rue du Test, Paris",
+               "MonthlyIncome": income, "Expenses": round(income * rng.uniform(0.3, 1.1), 2),
+               "debt": round(rng.uniform(0, 20000), 2), "late": rng.choice([0, 0, 1, 2]),
+               "hasBankruptcy": rng.random() < 0.03}
+
+
+def memory_mb():
+    """Mémoire résidente (Linux) : (anonyme, propre au processus ; projetée
+    depuis des fichiers, partageable via le cache de pages) en Mo."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    anonymous = fields.get("Anonymous", 0)
+    return anonymous / 1024, (fields.get("Rss", 0) - anonymous) / 1024
+
+
+def child(mode, export, dataset_path, clients, lookups):
+    """Un « worker » : chargement, parcours de tous les clients, recherches."""
+    base_private, base_shared = memory_mb()
+    start = time.perf_counter()
+    if mode == "dict":
+        identities, financials, credit = {}, {}, {}
+        with open(export, encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                key = row["clientId"]
+                identities[key] = {"name": row["name"], "address": row["address"]}
+                financials[key] = {"MonthlyIncome": row["MonthlyIncome"], "Expenses": row["Expenses"]}
+                credit[key] = {"debt": row["debt"], "late": row["late"], "hasBankruptcy": row["hasBankruptcy"]}
+
+        def lookup(key):
+            return identities.get(key), financials.get(key), credit.get(key)
+    else:
+        dataset = ClientDataset(dataset_path)
+
+        def lookup(key):
+            return dataset.identity(key), dataset.financials(key), dataset.credit(key)
+    load = time.perf_counter() - start
+
+    for i in range(clients):  # toutes les pages touchées au moins une fois
+        lookup(client_id(i))
+    private, shared = memory_mb()
+
+    rng = random.Random(7)
+    sample = [client_id(rng.randrange(clients)) for _ in range(lookups)]
+    start = time.perf_counter()
+    for key in sample:
+        lookup(key)
+    per_lookup = (time.perf_counter() - start) / lookups
+    print(json.dumps({"load_s": load, "private_mb": private - base_private, "shared_mb": shared - base_shared,
+                      "lookup_us": per_lookup * 1e6}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--child", choices=["dict", "mmap"], help=argparse.SUPPRESS)
+    parser.add_argument("--export", help=argparse.SUPPRESS)
+    parser.add_argument("--dataset", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.export, args.dataset, args.clients, args.lookups)
+
+    workdir = tempfile.mkdtemp(prefix="bench-dataset-")
+    export = os.path.join(workdir, "clients.jsonl")
+    dataset_path = os.path.join(workdir, "clients.cds")
+    with open(export, "w", encoding="utf-8") as f:
+        for row in synthetic_rows(args.clients):
+            f.write(json.dumps(row) + "\n")
+    start = time.perf_counter()
+    build_dataset(synthetic_rows(args.clients), dataset_path)
+    print(f"{args.clients} clients : construction {time.perf_counter() - start:.2f} s, "
+          f"fichier {os.path.getsize(dataset_path) / 1e6:.1f} Mo (export JSONL {os.path.getsize(export) / 1e6:.1f} Mo)")
+
+    print(f"{'mode':>6} {'chargement (s)':>15} {'privé (Mo)':>11} {'fichier (Mo)':>13} "
+          f"{'µs/recherche':>13} {f'{args.workers} workers (Mo)':>17}")
+    for mode in ("dict", "mmap"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--export", export, "--dataset", dataset_path,
+             "--clients", str(args.clients), "--lookups", str(args.lookups)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        # pages du fichier projeté partagées via le cache de pages : comptées une seule fois
+        total = args.workers * r["private_mb"] + r["shared_mb"]
+        print(f"{mode:>6} {r['load_s']:>15.2f} {r['private_mb']:>11.1f} {r['shared_mb']:>13.1f} "
+              f"{r['lookup_us']:>13.2f} {total:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Octets transmis et coût CPU de la compression des réponses SOAP.
+
+Sérialise une SolvencyResponse représentative (textes d'évaluation,
+de décision et d'explication), la répète N fois pour simuler des
+réponses de lots, puis la fait passer par CompressionMiddleware.
+
+    python benchmarks/bench_compression.py [--iterations 200]
+"""
+import argparse
+import io
+import logging
+import time
+import zlib
+
+from _services import load_service
+
+from lxml import etree
+from spyne.util.xml import get_object_as_xml
+
+from common.compression import CompressionMiddleware
+
+BATCH_SIZES = (1, 10, 100, 1000)
+ENCODINGS = ("identity", "gzip", "deflate")
+
+
+def sample_response():
+    m = load_service("solvency")
+    response = m.SolvencyResponse(
+        clientIdentity=m.ClientIdentity(name="John Doe", address="123 Main St"),
+        financials=m.Financials(MonthlyIncome=4000.0, Expenses=2500.0),
+        creditHistory=m.CreditHistory(debt=5000.0, late=2, hasBankruptcy=False),
+        creditScore=400,
+        solvencyStatus="not_solvent",
+        explanations=m.Explanations(
+            creditScoreExplanation="Score faible (400.00). Risque de non-remboursement élevé.",
+            incomeVsExpensesExplanation=(
+                "Les revenus mensuels (4000.00 €) dépassent largement les dépenses (2500.00 €). "
+                "Bonne capacité de remboursement."),
+            creditHistoryExplanation="2 paiement(s) en retard.",
+        ),
+        propertyEvaluation=m.PropertyEvaluationResponse(
+            estimatedValue=618750.0, legalCompliance=True, canProceed=True,
+            evaluationReport=("Type maison : +20%; Localisation : x1.5; État excellent : +10%; "
+                              "Valeur estimée : 618,750.00 €; Conforme légalement; ✅ Évaluation favorable"),
+        ),
+        approvalResponse=m.ApprovalResponse(
+            approved=False, interestRate=0.0, maxLoanAmount=0.0,
+            decisionReport="REFUS: Client non solvable",
+        ),
+    )
+    return etree.tostring(get_object_as_xml(response, m.SolvencyResponse))
+
+
+def envelope(body_item, count):
+    body = body_item * count
+    return (b'<?xml version="1.0" encoding="utf-8"?>'
+            b'<soap11env:Envelope xmlns:soap11env="http://schemas.xmlsoap.org/soap/envelope/">'
+            b"<soap11env:Body>" + body + b"</soap11env:Body></soap11env:Envelope>")
+
+
+def make_app(payload, block_length=8 * 1024):
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/xml; charset=utf-8"),
+                                  ("Content-Length", str(len(payload)))])
+        return [payload[i:i + block_length] for i in range(0, len(payload), block_length)]
+    return app
+
+
+def run(middleware, encoding):
+    environ = {"REQUEST_METHOD": "POST", "wsgi.input": io.BytesIO(b"")}
+    if encoding != "identity":
+        environ["HTTP_ACCEPT_ENCODING"] = encoding
+    return b"".join(middleware(environ, lambda status, headers, exc_info=None: None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    item = sample_response()
+    print(f"{'réponses':>9} {'encodage':>9} {'octets':>10} {'ratio':>7} {'compr. µs':>11} {'décompr. µs':>12}")
+    for count in BATCH_SIZES:
+        payload = envelope(item, count)
+        middleware = CompressionMiddleware(make_app(payload))
+        iterations = max(5, args.iterations // count)
+        for encoding in ENCODINGS:
+            body = run(middleware, encoding)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                run(middleware, encoding)
+            server_us = (time.perf_counter() - start) / iterations * 1e6
+
+            client_us = 0.0
+            if encoding != "identity":
+                wbits = 31 if encoding == "gzip" else 15
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    zlib.decompress(body, wbits)
+                client_us = (time.perf_counter() - start) / iterations * 1e6
+
+            print(f"{count:>9} {encoding:>9} {len(body):>10} {len(body) / len(payload):>7.2%} "
+                  f"{server_us:>11.1f} {client_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
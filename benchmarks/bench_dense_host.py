@@ -0,0 +1,130 @@
+"""
+Déploiement dense : un processus par service (comme docker-compose.yml)
+contre un seul hôte multi-services (dense_host, common/host.py). Temps
+jusqu'à ce que tout soit prêt (/ready), CPU consommé au démarrage, mémoire
+totale (RSS, et PSS qui ne compte qu'une part des pages partagées) et
+latence d'un VerifySolvency de bout en bout.
+
+    python benchmarks/bench_dense_host.py [--runs 3] [--requests 20] [--services ...]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from _services import ROOT_DIR, SERVICE_DIRS, sample_envelope, service_dir
+from bench_startup import free_port, rss_kb, service_env, wait_for
+
+# nom court des benchmarks -> nom du service (appels sortants, préfixe de l'hôte)
+SERVICE_NAMES = {
+    "solvency": "solvency_service",
+    "ie": "ie_service",
+    "credit_scoring": "credit_scoring_service",
+    "decision": "decision_solvability_service",
+    "debt_ratio": "ratio_endettement_service",
+    "explain": "explain_service",
+    "property_evaluation": "property_evaluation_service",
+    "approval": "approbation_service",
+}
+
+
+def pss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def common_env(tmp):
+    # WSDL généré en mémoire dans les deux modes (pas de fichier pré-calculé)
+    return service_env(IE_BACKEND="regex", SOLVENCY_JOBS_DB=os.path.join(tmp, "jobs.sqlite"),
+                       SOLVENCY_SNAPSHOT_DB="", SOLVENCY_AUDIT_DIR="", SOLVENCY_CLIENT_RATE="0",
+                       WSDL_CACHE_PATH=os.path.join(tmp, "absent.wsdl"))
+
+
+def start_separate(names, tmp):
+    """Un processus par service ; les appels sortants visent les ports locaux."""
+    ports = {name: free_port() for name in names}
+    endpoints = ";".join(f"{SERVICE_NAMES[n]}=http://127.0.0.1:{p}/" for n, p in ports.items())
+    procs = [subprocess.Popen([sys.executable, "main.py"], cwd=service_dir(name),
+                              env=dict(common_env(tmp), PORT=str(port), SOAP_ENDPOINTS=endpoints),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+             for name, port in ports.items()]
+    ready = [f"http://127.0.0.1:{port}/ready" for port in ports.values()]
+    return procs, ready, {name: f"http://127.0.0.1:{port}/" for name, port in ports.items()}
+
+
+def start_host(names, tmp):
+    port = free_port()
+    env = dict(common_env(tmp), PORT=str(port), HOST_SERVICES=",".join(SERVICE_NAMES[n] for n in names))
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=os.path.join(ROOT_DIR, "dense_host"), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}/"
+    return [proc], [base + "ready"], {name: f"{base}{SERVICE_NAMES[name]}/" for name in names}
+
+
+def measure(start_fn, names, requests):
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        procs, ready, urls = start_fn(names, tmp)
+        try:
+            t_ready = max(wait_for(urllib.request.Request(url), start, timeout=60) for url in ready)
+            cpu = sum(cpu_seconds(p.pid) for p in procs)
+            rss = sum(rss_kb(p.pid) or 0 for p in procs)
+            pss = sum(pss_kb(p.pid) or 0 for p in procs)
+            latency = None
+            if "solvency" in urls:
+                request = urllib.request.Request(urls["solvency"], data=sample_envelope("solvency"),
+                                                 headers={"Content-Type": "text/xml; charset=utf-8"})
+                times = []
+                for _ in range(requests):
+                    t0 = time.perf_counter()
+                    with urllib.request.urlopen(request, timeout=30) as resp:
+                        resp.read()
+                    times.append(time.perf_counter() - t0)
+                latency = statistics.median(times) * 1000
+            return {"ready": t_ready, "cpu": cpu, "rss": rss, "pss": pss, "latency": latency,
+                    "processes": len(procs)}
+        finally:
+            for p in procs:
+                p.terminate()
+            for p in procs:
+                p.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--services", nargs="+", default=list(SERVICE_DIRS), choices=list(SERVICE_DIRS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'déploiement':<26} {'processus':>9} {'prêt (ms)':>10} {'CPU (s)':>8} {'RSS (Mo)':>9} "
+          f"{'PSS (Mo)':>9} {'VerifySolvency (ms)':>20}")
+    for label, start_fn in (("un processus par service", start_separate), ("hôte multi-services", start_host)):
+        runs = [measure(start_fn, args.services, args.requests) for _ in range(args.runs)]
+
+        def med(key):
+            return statistics.median(r[key] for r in runs)
+
+        latency = f"{med('latency'):.1f}" if runs[0]["latency"] is not None else "-"
+        print(f"{label:<26} {runs[0]['processes']:>9} {med('ready') * 1000:>10.0f} {med('cpu'):>8.2f} "
+              f"{med('rss') / 1024:>9.1f} {med('pss') / 1024:>9.1f} {latency:>20}")
+
+
+if __name__ == "__main__":
+    main()
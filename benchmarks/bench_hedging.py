@@ -0,0 +1,72 @@
+"""
+Routage entre réplicas (common/discovery.py) : latence p50/p99 d'un service
+à deux réplicas dont l'un subit des ralentissements ponctuels, avec et
+sans hedging au-delà du p95.
+
+Le transport HTTP est simulé : chaque appel dort le temps de service tiré
+pour le réplica visé.
+
+    python benchmarks/bench_hedging.py [--requests 2000] [--slow-ratio 0.05]
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import _services  # noqa: F401  (ajoute la racine du dépôt au sys.path)
+
+from common import discovery  # noqa: E402
+from common.discovery import ServiceRegistry  # noqa: E402
+
+
+class SimulatedReplicas:
+    def __init__(self, base, slow, slow_ratio, seed=42):
+        self.base = base
+        self.slow = slow
+        self.slow_ratio = slow_ratio
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def post_soap(self, url, envelope, timeout=10):
+        with self._lock:
+            stalled = url.startswith("http://b") and self._rng.random() < self.slow_ratio
+        time.sleep(self.slow if stalled else self.base * (0.8 + 0.4 * self._rng.random()))
+        return None
+
+
+def run(registry, requests, concurrency):
+    def one(_):
+        start = time.perf_counter()
+        registry.post("svc", "<x/>")
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = sorted(pool.map(one, range(requests)))
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base", type=float, default=0.005)
+    parser.add_argument("--slow", type=float, default=0.2)
+    parser.add_argument("--slow-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    for hedge in (False, True):
+        replicas = SimulatedReplicas(args.base, args.slow, args.slow_ratio)
+        discovery.post_soap = replicas.post_soap
+        registry = ServiceRegistry({"svc": "http://a/"}, endpoints={"svc": ["http://a/", "http://b/"]},
+                                   hedge=hedge, health_interval=0)
+        p50, p99 = run(registry, args.requests, args.concurrency)
+        label = "avec hedging" if hedge else "sans hedging"
+        print(f"{label:<14} p50 {p50 * 1000:7.1f} ms   p99 {p99 * 1000:7.1f} ms   "
+              f"requêtes doublées {registry.pool('svc').hedged}")
+
+
+if __name__ == "__main__":
+    main()
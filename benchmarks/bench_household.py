@@ -0,0 +1,107 @@
+"""
+Demande commune : N VerifySolvency (une chaîne complète par co-emprunteur)
+contre un VerifyHouseholdSolvency (extraction et évaluation du bien une
+fois, N scores en parallèle). Latence et appels sortants par demande.
+
+Le transport HTTP est simulé : chaque appel dort la latence du service visé.
+
+    python benchmarks/bench_household.py [--borrowers 2 3 4] [--requests 20] [--ie-ms 30]
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from _services import load_service
+
+# service -> (namespace, élément englobant, champs)
+RESPONSES = {
+    "ie_service": ("urn:ie.service:v7", "extractInformationResponse",
+                   {"amount": "200000", "duration_years": "20", "property_type": "Maison",
+                    "property_description": "maison", "location": "Paris"}),
+    "property_evaluation_service": ("urn:property.evaluation:v1", "EvaluatePropertyResponse",
+                                    {"estimatedValue": "400000", "legalCompliance": "true",
+                                     "evaluationReport": "ok", "canProceed": "true"}),
+    "credit_scoring_service": ("urn:creditscore.service:v1", "ComputeCreditScoreResponse", {"score": "800"}),
+    "decision_solvability_service": ("urn:solvency.decision:v1", "MakeDecisionResponse",
+                                     {"solvencyStatus": "solvent"}),
+    "explain_service": ("urn:explain.service:v1", "ExplainResponse",
+                        {"creditScoreExplanation": "ok", "incomeVsExpensesExplanation": "ok",
+                         "creditHistoryExplanation": "ok"}),
+    "approbation_service": ("urn:approval.decision:v1", "MakeApprovalDecisionResult",
+                            {"approved": "true", "interestRate": "3.5", "maxLoanAmount": "250000",
+                             "decisionReport": "ok"}),
+}
+
+
+class SimulatedServices:
+    def __init__(self, latencies):
+        self.latencies = latencies
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._bodies = {}
+        for service, (tns, wrapper, fields) in RESPONSES.items():
+            body = "".join(f"<tns:{k}>{v}</tns:{k}>" for k, v in fields.items())
+            self._bodies[service] = (
+                f'<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="{tns}">'
+                f"<soapenv:Body><tns:{wrapper}>{body}</tns:{wrapper}></soapenv:Body></soapenv:Envelope>"
+            ).encode("utf-8")
+
+    def post_soap(self, url, envelope, timeout=10):
+        service = url.split("//")[1].split(":")[0]
+        with self._lock:
+            self.calls[service] += 1
+        time.sleep(self.latencies[service])
+        return type("Response", (), {"status_code": 200, "content": self._bodies[service]})()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--borrowers", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--ie-ms", type=float, default=30.0, help="latence d'IE_Service (extraction spaCy)")
+    parser.add_argument("--service-ms", type=float, default=5.0, help="latence des autres services")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    os.environ.setdefault("SOLVENCY_SNAPSHOT_DB", "")
+    os.environ.setdefault("SOLVENCY_AUDIT_DIR", "")
+    os.environ.setdefault("SOLVENCY_CLIENT_RATE", "0")  # mêmes clients à chaque demande
+
+    from common import discovery
+
+    solvency = load_service("solvency")
+    from data.client_directory_data import ClientData
+    from data.credit_data import CreditData
+    from data.finance_data import FinancialData
+
+    for i in range(max(args.borrowers)):  # co-emprunteurs synthétiques
+        client_id = f"bench-{i:03d}"
+        ClientData.clients[client_id] = {"name": f"Emprunteur {i}", "address": f"{i} rue du Banc"}
+        FinancialData.financials[client_id] = {"MonthlyIncome": 3000.0 + 500 * i, "Expenses": 1500.0 + 200 * i}
+        CreditData.credit_history[client_id] = {"debt": 1000.0 * i, "late": i % 3, "hasBankruptcy": False}
+    latencies = {service: args.service_ms / 1000 for service in RESPONSES}
+    latencies["ie_service"] = args.ie_ms / 1000
+    text = "Je souhaite emprunter 200000 euros sur 20 ans pour une maison à Paris."
+    service = solvency.SolvencyService
+
+    print(f"{'mode':<26} {'co-emprunteurs':>14} {'ms/demande':>11} {'appels/demande':>15}")
+    for n in args.borrowers:
+        ids = [f"bench-{i:03d}" for i in range(n)]
+        for label, run in (
+            ("N x VerifySolvency", lambda: [service.VerifySolvency(None, c, text, "full") for c in ids]),
+            ("VerifyHouseholdSolvency", lambda: service.VerifyHouseholdSolvency(None, ids, text)),
+        ):
+            simulated = SimulatedServices(latencies)
+            discovery.post_soap = simulated.post_soap
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                run()
+            elapsed = (time.perf_counter() - start) / args.requests
+            calls = sum(simulated.calls.values()) / args.requests
+            print(f"{label:<26} {n:>14} {elapsed * 1000:>11.1f} {calls:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Comparaison des backends d'extraction de l'IE_Service (regex / spaCy) :
+débit (docs/s) et exactitude par champ sur un échantillon annoté.
+
+    python benchmarks/bench_ie_backends.py [--repeat 20] [--threshold 0.5]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from _services import service_dir
+
+sys.path.insert(0, service_dir("ie"))
+
+from backends import KEY_FIELDS, RegexBackend, SpacyBackend, load_model  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "ie_labelled.jsonl")
+
+
+def load_samples(path=DATA_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def same(field, predicted, expected):
+    if predicted is None:
+        return False
+    if field == "amount":
+        return abs(float(predicted) - float(expected)) < 0.01
+    if field in ("location", "property_type"):
+        return str(predicted).strip().lower() == str(expected).strip().lower()
+    return predicted == expected
+
+
+def accuracy(backend, samples):
+    results = backend.extract_batch([s["text"] for s in samples])
+    return {
+        field: sum(same(field, r[field], s[field]) for r, s in zip(results, samples)) / len(samples)
+        for field in KEY_FIELDS
+    }
+
+
+def throughput(backend, texts, repeat):
+    batch = texts * repeat
+    start = time.perf_counter()
+    backend.extract_batch(batch)
+    return len(batch) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--model", default="fr_core_news_md")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    samples = load_samples()
+    texts = [s["text"] for s in samples]
+    backends = [RegexBackend()]
+    try:
+        start = time.perf_counter()
+        load_model(args.model)
+        print(f"Chargement du modèle {args.model} : {time.perf_counter() - start:.2f} s")
+        backends.append(SpacyBackend(model=args.model, threshold=args.threshold))
+    except (ImportError, OSError) as e:
+        print(f"spaCy indisponible ({e}) : seul le backend regex est mesuré")
+
+    header = "".join(f"{f:>16}" for f in KEY_FIELDS)
+    print(f"{'backend':<8}{'docs/s':>10}{header}")
+    for backend in backends:
+        backend.extract_batch(texts)
+        acc = accuracy(backend, samples)
+        rate = throughput(backend, texts, args.repeat)
+        print(f"{backend.name:<8}{rate:>10.0f}" + "".join(f"{acc[f]:>16.0%}" for f in KEY_FIELDS))
+
+
+if __name__ == "__main__":
+    main()
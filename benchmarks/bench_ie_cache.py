@@ -0,0 +1,82 @@
+"""
+Cache d'extraction de l'IE_Service : taux de succès et latence économisée
+sur un flux de demandes répétées / templatisées (tirage de Zipf sur les
+textes annotés, avec variations d'espaces absorbées par clean_text).
+
+    python benchmarks/bench_ie_cache.py [--requests 5000] [--backend regex|spacy]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+from _services import service_dir
+
+sys.path.insert(0, service_dir("ie"))
+
+from backends import RegexBackend, SpacyBackend  # noqa: E402
+from cache import CachedBackend, ExtractionCache  # noqa: E402
+from bench_ie_backends import load_samples  # noqa: E402
+
+
+def workload(texts, n, seed=42):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(texts))]
+    stream = []
+    for text in rng.choices(texts, weights=weights, k=n):
+        # même demande, saisie différemment (retours à la ligne, espaces)
+        if rng.random() < 0.3:
+            text = "  " + text.replace(" ", "\n ", 1) + "  "
+        stream.append(text)
+    return stream
+
+
+def run(backend, stream):
+    latencies = []
+    for text in stream:
+        start = time.perf_counter()
+        backend.extract(text)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return sum(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--backend", choices=("regex", "spacy"), default="regex")
+    parser.add_argument("--size", type=int, default=10000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    base = RegexBackend() if args.backend == "regex" else SpacyBackend()
+    texts = [s["text"] for s in load_samples()]
+    stream = workload(texts, args.requests)
+    base.extract_batch(texts[:2])
+
+    total, p50, p99 = run(base, stream)
+    print(f"sans cache        total {total * 1000:9.1f} ms   p50 {p50 * 1e6:8.1f} µs   p99 {p99 * 1e6:8.1f} µs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ie_cache.sqlite")
+        cached = CachedBackend(base, ExtractionCache(args.size, path))
+        total, p50, p99 = run(cached, stream)
+        stats = cached.cache.stats()
+        print(f"cache mémoire     total {total * 1000:9.1f} ms   p50 {p50 * 1e6:8.1f} µs   p99 {p99 * 1e6:8.1f} µs")
+        print(f"  succès {stats['hit_ratio']:.1%}  ({stats['hits_memory']} mémoire / {stats['misses']} échecs), "
+              f"extraction économisée {stats['saved_ms']:.1f} ms")
+
+        # Nouveau worker : mémoire vide, niveau disque déjà rempli
+        warm = CachedBackend(base, ExtractionCache(args.size, path))
+        total, p50, p99 = run(warm, stream)
+        stats = warm.cache.stats()
+        print(f"nouveau worker    total {total * 1000:9.1f} ms   p50 {p50 * 1e6:8.1f} µs   p99 {p99 * 1e6:8.1f} µs")
+        print(f"  succès {stats['hit_ratio']:.1%}  ({stats['hits_memory']} mémoire / {stats['hits_disk']} disque / "
+              f"{stats['misses']} échecs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Recalcul incrémental des instantanés de risque : débit (clients/s) du
+recalcul des seuls clients modifiés, lus dans le journal des modifications,
+comparé à une reconstruction complète du portefeuille.
+
+    python benchmarks/bench_incremental.py [--clients 100000] [--updates 1000 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from _services import service_dir
+
+sys.path.insert(0, service_dir("solvency"))
+
+from batch import clients_from_data  # noqa: E402
+from data.changes import ChangeFeed, change_log  # noqa: E402
+from data.client_directory_data import ClientData  # noqa: E402
+from data.credit_data import CreditData  # noqa: E402
+from data.finance_data import FinancialData  # noqa: E402
+from snapshot import SnapshotStore  # noqa: E402
+
+
+def load_portfolio(n, rng):
+    """Portefeuille synthétique chargé directement en mémoire (sans journal)."""
+    for i in range(n):
+        client_id = f"client-{i:07d}"
+        income = rng.uniform(1500, 9000)
+        ClientData.clients[client_id] = {"name": f"Client {i}", "address": ""}
+        FinancialData.financials[client_id] = {"MonthlyIncome": income, "Expenses": income * rng.uniform(0.3, 1.1)}
+        CreditData.credit_history[client_id] = {"debt": rng.uniform(0, 20000), "late": rng.choice([0, 0, 1, 2]),
+                                                "hasBankruptcy": rng.random() < 0.03}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100000)
+    parser.add_argument("--updates", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    workdir = tempfile.mkdtemp(prefix="bench-incremental-")
+    os.environ["SOLVENCY_CHANGELOG_DB"] = os.path.join(workdir, "changes.sqlite")
+    load_portfolio(args.clients, rng)
+    ids = sorted(ClientData.clients)
+
+    store = SnapshotStore(os.path.join(workdir, "snapshot.sqlite"))
+    start = time.perf_counter()
+    store.build(clients_from_data())
+    full = time.perf_counter() - start
+    print(f"Reconstruction complète : {len(ids)} clients en {full:.2f} s ({len(ids) / full:.0f} clients/s)")
+
+    log = change_log()
+    feed = ChangeFeed(log, "bench")
+    feed.poll(lambda ids, changes: None)
+    print(f"{'modifs':>8} {'journal/s':>10} {'recalcul (s)':>13} {'clients/s':>10} {'vs complet':>11}")
+    for count in args.updates:
+        start = time.perf_counter()
+        for _ in range(count):
+            CreditData.update_credit_history(rng.choice(ids), late=rng.choice([0, 1, 2, 3]))
+        logged = time.perf_counter() - start
+
+        recomputed = []
+        start = time.perf_counter()
+        feed.poll(lambda ids, changes: recomputed.append(store.apply_changes(ids, changes)))
+        elapsed = time.perf_counter() - start
+        total = sum(recomputed)
+        print(f"{count:>8} {count / logged:>10.0f} {elapsed:>13.3f} {total / elapsed:>10.0f} {full / elapsed:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Textes de requête adversariaux : temps d'extraction au pire cas, texte entier
+(IE_SCAN_WINDOW=0) contre fenêtres bornées, derrière le cache d'extraction
+(échec puis succès) et avec le backend spaCy (texte entier contre
+IE_SCAN_MAX_CHARS), et coût du refus en amont de spyne (SOAP_MAX_TEXT_CHARS)
+comparé au traitement complet d'une requête IE.
+
+    python benchmarks/bench_input_limits.py [--sizes 10000 100000 1000000] [--repeat 3] [--spacy-model blank]
+"""
+import argparse
+import io
+import logging
+import re
+import sys
+import time
+
+from _services import SAMPLE_TEXT, load_service, soap_envelope, service_dir
+
+sys.path.insert(0, service_dir("ie"))
+
+from backends import _MODELS, RegexBackend, SpacyBackend  # noqa: E402
+from cache import CachedBackend, ExtractionCache  # noqa: E402
+from common.limits import RequestLimitMiddleware  # noqa: E402
+from utils import clean_text  # noqa: E402
+
+# Motif d'origine (sans ancrage en tête de suite de chiffres) : quadratique
+LEGACY_AMOUNT = re.compile(r"(\d+(?:[.,]\d+)?)\s*(€|euros?)", re.IGNORECASE)
+
+
+def adversarial(size):
+    """Textes de `size` caractères : (nom, texte)."""
+    return [
+        ("chiffres", "1" * size),
+        ("'à ' répété", ("à " * (size // 2 + 1))[:size]),
+        ("nombres sans unité", ("12345 " * (size // 6 + 1))[:size]),
+        ("blancs", " " * size),
+        ("champs en tête", SAMPLE_TEXT + (" bla" * (size // 4 + 1))[:size]),
+        ("champs en fin", ("bla " * (size // 4 + 1))[:size] + SAMPLE_TEXT),
+    ]
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def call(app, body):
+    environ = {"REQUEST_METHOD": "POST", "PATH_INFO": "/", "QUERY_STRING": "", "CONTENT_TYPE": "text/xml",
+               "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body), "SERVER_NAME": "bench",
+               "SERVER_PORT": "80", "wsgi.url_scheme": "http"}
+    status = []
+    b"".join(app(environ, lambda s, h, e=None: status.append(s)))
+    return status[0]
+
+
+def spacy_pair(model):
+    """(texte entier, IE_SCAN_MAX_CHARS) pour le backend spaCy, ou None."""
+    if not model:
+        return None
+    try:
+        import spacy
+    except ImportError:
+        print("\nspaCy absent : backend spaCy non mesuré")
+        return None
+    if model == "blank":
+        model = "blank-fr-bench"
+        _MODELS[model] = spacy.blank("fr")
+    # nlp.max_length relevé : sans borne, spaCy refuserait les textes les plus longs
+    nlp = _MODELS.get(model) or spacy.load(model)
+    nlp.max_length = 10 ** 8
+    _MODELS[model] = nlp
+    return SpacyBackend(model=model, max_chars=0), SpacyBackend(model=model)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=10000,
+                        help="taille maximale mesurée avec le motif d'origine (quadratique)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--spacy-model", default="blank",
+                        help="modèle spaCy ('blank' : tokenizer français seul, sans téléchargement ; '' : ignoré)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    full, bounded = RegexBackend(window=0), RegexBackend()
+
+    print(f"{'texte':<20} {'taille':>9} {'origine (ms)':>13} {'entier (ms)':>12} {'borné (ms)':>11}")
+    for size in args.sizes:
+        for name, text in adversarial(size):
+            legacy = "-"
+            if size <= args.legacy_max:
+                legacy = f"{best(lambda: LEGACY_AMOUNT.search(clean_text(text)), args.repeat):.1f}"
+            print(f"{name:<20} {size:>9} {legacy:>13} {best(lambda: full.extract(text), args.repeat):>12.1f} "
+                  f"{best(lambda: bounded.extract(text), args.repeat):>11.1f}")
+
+    cached = CachedBackend(bounded, ExtractionCache(max_entries=1000))
+    print(f"\n{'texte (cache)':<20} {'taille':>9} {'échec (ms)':>11} {'succès (ms)':>12}")
+    for size in args.sizes:
+        for name, text in adversarial(size):
+            miss = best(lambda: CachedBackend(bounded, ExtractionCache(max_entries=10)).extract(text), args.repeat)
+            cached.extract(text)
+            print(f"{name:<20} {size:>9} {miss:>11.1f} {best(lambda: cached.extract(text), args.repeat):>12.2f}")
+
+    spacy_backends = spacy_pair(args.spacy_model)
+    if spacy_backends:
+        full_spacy, bounded_spacy = spacy_backends
+        print(f"\n{'texte (spaCy)':<20} {'taille':>9} {'entier (ms)':>12} {'borné (ms)':>11}")
+        for size in args.sizes:
+            for name, text in adversarial(size):
+                print(f"{name:<20} {size:>9} {best(lambda: full_spacy.extract(text), args.repeat):>12.1f} "
+                      f"{best(lambda: bounded_spacy.extract(text), args.repeat):>11.1f}")
+
+    ie = load_service("ie")
+    tns = "urn:ie.service:v7"
+    print(f"\n{'requête IE (en mémoire)':<34} {'taille':>9} {'statut':>22} {'ms':>9}")
+    for size in args.sizes:
+        body = soap_envelope(tns, f"<tns:extractInformation><tns:text>{'bla ' * (size // 4)}</tns:text>"
+                                  "</tns:extractInformation>").encode("utf-8")
+        limited = ie.wsgi_app.app  # sous le middleware /health, /ready
+        unlimited = limited.app if isinstance(limited, RequestLimitMiddleware) else limited
+        for label, app in (("sans limite", unlimited),
+                           ("SOAP_MAX_TEXT_CHARS=10000", RequestLimitMiddleware(unlimited, 0, 10000))):
+            status = call(app, body)
+            print(f"{label:<34} {size:>9} {status:>22} {best(lambda: call(app, body), args.repeat):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
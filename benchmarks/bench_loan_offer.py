@@ -0,0 +1,69 @@
+"""
+Optimiseur d'offre de prêt : temps par appel (ms) et combinaisons évaluées
+par seconde, grille NumPy contre une boucle Python appliquant les mêmes
+règles combinaison par combinaison.
+
+    python benchmarks/bench_loan_offer.py [--step 1000 500 100] [--repeat 50]
+"""
+import argparse
+import math
+import time
+
+import _services  # noqa: F401  (racine du dépôt dans sys.path)
+from common.offers import default_grid, optimize_offers
+from common.rules import (
+    LTV_MAX, LTV_OPTIMAL, MAX_DURATION_YEARS, MIN_DURATION_YEARS, MIN_VALUE_MARGIN, OPTIMAL_MAX_DURATION_YEARS,
+    RATE_CONDITIONAL, RATE_OPTIMAL, RISK_MAX, RISK_OPTIMAL_MAX, debt_ratio, solvency_decision,
+)
+
+PROFILE = dict(credit_score=820, monthly_income=5200.0, monthly_expenses=9000.0, property_value=450000.0)
+
+
+def scalar_feasible(amount, years, credit_score, monthly_income, monthly_expenses, property_value):
+    """Une combinaison, règle par règle (ce que ferait une chaîne de services)."""
+    if not (MIN_DURATION_YEARS <= years <= MAX_DURATION_YEARS and property_value >= amount * MIN_VALUE_MARGIN):
+        return False
+    ltv = amount / property_value
+    if ltv > LTV_MAX:
+        return False
+    share = RISK_OPTIMAL_MAX / RISK_MAX
+    if ltv <= LTV_OPTIMAL and years <= OPTIMAL_MAX_DURATION_YEARS:
+        rate = (share * (RATE_OPTIMAL[0] + RATE_OPTIMAL[1] * ltv + RATE_OPTIMAL[2] * RISK_OPTIMAL_MAX / 2)
+                + (1 - share) * (RATE_CONDITIONAL[0] + RATE_CONDITIONAL[1] * ltv
+                                 + RATE_CONDITIONAL[2] * (RISK_OPTIMAL_MAX + RISK_MAX) / 2))
+    else:
+        rate = RATE_CONDITIONAL[0] + RATE_CONDITIONAL[1] * ltv + RATE_CONDITIONAL[2] * RISK_MAX / 2
+    r, n = rate / 1200.0, years * 12
+    payment = amount * r / (1 - math.pow(1 + r, -n))
+    ratio = debt_ratio(monthly_income, monthly_expenses) + payment / monthly_income * 100
+    return solvency_decision(credit_score, ratio) == "solvent"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--step", type=float, nargs="+", default=[1000.0, 500.0, 100.0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    optimize_offers(**PROFILE)  # import de numpy hors mesure
+    print(f"{'pas (€)':>8} {'cellules':>9} {'numpy (ms)':>11} {'cellules/s':>12} {'boucle (ms)':>12} {'gain':>6}")
+    for step in args.step:
+        amounts, durations = default_grid(PROFILE["property_value"], step)
+        cells = amounts.size * durations.size
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            result = optimize_offers(**PROFILE, amounts=amounts, durations=durations)
+        vectorized = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        feasible = sum(scalar_feasible(a, int(d), **PROFILE) for a in amounts.tolist() for d in durations.tolist())
+        loop = time.perf_counter() - start
+
+        assert feasible == result["feasibleCount"], (feasible, result["feasibleCount"])
+        print(f"{step:>8.0f} {cells:>9} {vectorized * 1000:>11.2f} {cells / vectorized:>12.0f} "
+              f"{loop * 1000:>12.1f} {loop / vectorized:>5.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Micro-batching des appels sortants (common/microbatch.py) : débit des étapes
+CreditScore et Explain de l'orchestrateur selon la concurrence, en appels
+unitaires puis regroupés (ComputeCreditScoreBatch / ExplainBatch).
+
+Les deux services tournent dans des processus séparés (HTTP réel).
+
+    python benchmarks/bench_microbatch.py [--calls 2000] [--concurrency 1 16 64] [--window-ms 2]
+"""
+import argparse
+import logging
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _services import load_service, service_dir
+from bench_startup import free_port, service_env, wait_for
+
+from common.discovery import ServiceRegistry
+from common.microbatch import MicroBatcher
+
+FINANCIAL = {"MonthlyIncome": 4000.0, "Expenses": 2500.0}
+
+
+def start(name):
+    port = free_port()
+    env = service_env(PORT=str(port), SERVICE_PROFILE_SAMPLING="0")
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=service_dir(name), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/"
+    wait_for(url + "?wsdl", time.perf_counter())
+    return proc, url
+
+
+def run(step, items, concurrency):
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(step, items))
+    elapsed = time.perf_counter() - begin
+    if any(r is None for r in results):
+        raise RuntimeError("appel en échec")
+    return len(items) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-items", type=int, default=32)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    procs = []
+    try:
+        (scoring, scoring_url), (explain, explain_url) = start("credit_scoring"), start("explain")
+        procs = [scoring, explain]
+        solvency = load_service("solvency")
+        solvency.registry = ServiceRegistry(
+            {"credit_scoring_service": scoring_url, "explain_service": explain_url}, endpoints={})
+        credits = [{"debt": float(i % 20000), "late": i % 4, "hasBankruptcy": i % 31 == 0} for i in range(args.calls)]
+        steps = {
+            "CreditScore": lambda c: solvency.credit_score_step(c),
+            "Explain": lambda c: solvency.explain_step(750, FINANCIAL, c),
+        }
+        batchers = {
+            "CreditScore": ("credit_score_batcher", solvency.send_credit_score_batch),
+            "Explain": ("explain_batcher", solvency.send_explain_batch),
+        }
+
+        print(f"{'opération':<12} {'concurrence':>11} {'unitaire/s':>11} {'lots/s':>9} {'gain':>6} {'taille moy.':>11}")
+        for op, step in steps.items():
+            attr, send = batchers[op]
+            for concurrency in args.concurrency:
+                setattr(solvency, attr, None)
+                single = run(step, credits, concurrency)
+                batcher = MicroBatcher(op, send, window=args.window_ms / 1000.0, max_items=args.max_items)
+                setattr(solvency, attr, batcher)
+                batched = run(step, credits, concurrency)
+                setattr(solvency, attr, None)
+                print(f"{op:<12} {concurrency:>11} {single:>11.0f} {batched:>9.0f} {batched / single:>5.1f}x "
+                      f"{batcher.stats()['avg_size']:>11.1f}")
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Cache des réponses sérialisées de l'orchestrateur : temps de sérialisation
+de la SolvencyResponse évité par succès, latence d'une requête complète
+(services simulés), d'un succès de cache et d'une réponse 304.
+
+    python benchmarks/bench_response_cache.py [--requests 300]
+"""
+import argparse
+import io
+import logging
+import os
+import time
+
+from _services import load_service, soap_envelope
+
+# réponses simulées des services appelés (nom d'hôte -> namespace, élément, champs)
+CANNED = {
+    "ie_service": ("urn:ie.service:v7", "extractInformationResponse",
+                   {"amount": "200000", "duration_years": "20", "property_type": "Maison",
+                    "property_description": "maison neuve avec jardin", "location": "Paris"}),
+    "property_evaluation_service": ("urn:property.evaluation:v1", "EvaluatePropertyResponse",
+                                    {"estimatedValue": "618750", "legalCompliance": "true",
+                                     "evaluationReport": "Type maison : +20%; Localisation : x1.5; "
+                                                         "Valeur estimée : 618,750.00 €; Conforme légalement",
+                                     "canProceed": "true"}),
+    "credit_scoring_service": ("urn:creditscore.service:v1", "ComputeCreditScoreResponse", {"score": "800"}),
+    "decision_solvability_service": ("urn:solvency.decision:v1", "MakeDecisionResponse",
+                                     {"solvencyStatus": "solvent"}),
+    "explain_service": ("urn:explain.service:v1", "ExplainResponse",
+                        {"creditScoreExplanation": "Excellent score (800.00). Risque de défaut très faible.",
+                         "incomeVsExpensesExplanation": "Les revenus (3000.00 €) couvrent juste les dépenses.",
+                         "creditHistoryExplanation": "Aucun incident majeur dans l’historique de crédit."}),
+    "approbation_service": ("urn:approval.decision:v1", "MakeApprovalDecisionResult",
+                            {"approved": "true", "interestRate": "3.47", "maxLoanAmount": "556875",
+                             "decisionReport": "LTV: 32.3%; Score de risque prédictif: 0.120; "
+                                               "APPROUVÉ : Conditions optimales"}),
+}
+
+
+class CannedResponse:
+    status_code = 200
+
+    def __init__(self, service):
+        tns, wrapper, fields = CANNED[service]
+        body = "".join(f"<tns:{k}>{v}</tns:{k}>" for k, v in fields.items())
+        self.content = soap_envelope(tns, f"<tns:{wrapper}>{body}</tns:{wrapper}>").encode("utf-8")
+
+
+def fake_post_soap(url, envelope, timeout=10):
+    return CannedResponse(url.split("//")[1].split(":")[0])
+
+
+def request(client_id, text):
+    return soap_envelope(
+        "urn:solvency.verification.service:v1",
+        f"<tns:VerifySolvency><tns:clientId>{client_id}</tns:clientId>"
+        f"<tns:demandeTexte>{text}</tns:demandeTexte></tns:VerifySolvency>",
+    ).encode("utf-8")
+
+
+def call(wsgi_app, body, if_none_match=None):
+    environ = {"REQUEST_METHOD": "POST", "PATH_INFO": "/", "QUERY_STRING": "", "CONTENT_TYPE": "text/xml",
+               "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body), "SERVER_NAME": "bench",
+               "SERVER_PORT": "80", "wsgi.url_scheme": "http"}
+    if if_none_match:
+        environ["HTTP_IF_NONE_MATCH"] = if_none_match
+    headers = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        headers.update(response_headers)
+
+    b"".join(wsgi_app(environ, start_response))
+    return headers
+
+
+def timed(fn, count):
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SOAP_RESPONSE_CACHE_TTL", "300")
+    os.environ.setdefault("SOLVENCY_SNAPSHOT_DB", "")
+    os.environ.setdefault("SOLVENCY_CHANGELOG_DB", "")
+    os.environ.setdefault("SOLVENCY_CLIENT_RATE", "0")  # pas de limite par client pendant la mesure
+    logging.disable(logging.INFO)
+    solvency = load_service("solvency")
+    import common.discovery
+    common.discovery.post_soap = fake_post_soap
+    app, cache = solvency.wsgi_app, solvency.response_cache
+
+    # requêtes toutes différentes : chaque appel est un échec de cache
+    miss = timed(lambda i: call(app, request("client-002", f"maison à Paris n°{i}")), args.requests)
+    hot = request("client-002", "maison à Paris n°0")
+    etag = call(app, hot)["ETag"]
+    hit = timed(lambda i: call(app, hot), args.requests)
+    not_modified = timed(lambda i: call(app, hot, if_none_match=etag), args.requests)
+
+    stats = cache.stats()
+    print(f"{'':<28} {'ms/requête':>11}")
+    print(f"{'échec (chaîne + sérialisation)':<28} {miss * 1000:>11.3f}")
+    print(f"{'succès (octets en cache)':<28} {hit * 1000:>11.3f}")
+    print(f"{'304 (If-None-Match)':<28} {not_modified * 1000:>11.3f}")
+    print(f"sérialisation moyenne évitée par succès : {stats['avg_serialize_ms']:.3f} ms "
+          f"({stats['hits']} succès, {stats['saved_ms']:.1f} ms économisées au total)")
+    print(f"réponse en cache : {stats['bytes'] / max(stats['entries'], 1):.0f} octets en moyenne")
+
+
+if __name__ == "__main__":
+    main()
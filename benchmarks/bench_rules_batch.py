@@ -0,0 +1,110 @@
+"""
+ExplainBatch / ComputeDebtRatioBatch : éléments par seconde des règles
+(appel par élément contre gabarits précompilés / calcul vectoriel) et des
+services SOAP en mémoire (N appels unitaires contre un lot de N éléments).
+
+    python benchmarks/bench_rules_batch.py [--items 20000] [--clients 2000] [--batch 1 32 256]
+"""
+import argparse
+import io
+import logging
+import random
+import time
+
+from _services import load_service, soap_envelope
+
+from common.rules import credit_score, debt_ratio, debt_ratio_batch, explain, explain_batch
+
+
+def synthetic_rows(n, clients, seed=42):
+    """`n` demandes tirées d'un portefeuille de `clients` profils : un même
+    client revient avec les mêmes revenus, dépenses, dette et score."""
+    rng = random.Random(seed)
+    profiles = []
+    for _ in range(clients):
+        income = round(rng.uniform(1500, 9000), 2)
+        debt, late, bankrupt = round(rng.uniform(0, 20000), 2), rng.choice([0, 0, 1, 2]), rng.random() < 0.03
+        profiles.append((int(credit_score(debt, late, bankrupt)), income, round(income * rng.uniform(0.3, 1.1), 2),
+                         debt, late, bankrupt))
+    return [rng.choice(profiles) for _ in range(n)]
+
+
+def rate(fn, items):
+    start = time.perf_counter()
+    fn()
+    return items / (time.perf_counter() - start)
+
+
+def call(wsgi_app, body):
+    environ = {"REQUEST_METHOD": "POST", "PATH_INFO": "/", "QUERY_STRING": "", "CONTENT_TYPE": "text/xml",
+               "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body), "SERVER_NAME": "bench",
+               "SERVER_PORT": "80", "wsgi.url_scheme": "http"}
+    status = []
+    b"".join(wsgi_app(environ, lambda s, h, e=None: status.append(s)))
+    if not status[0].startswith("200"):
+        raise RuntimeError(status[0])
+
+
+def explain_fields(row):
+    score, income, expenses, debt, late, bankrupt = row
+    return (f"<tns:score>{score}</tns:score><tns:monthlyIncome>{income}</tns:monthlyIncome>"
+            f"<tns:monthlyExpenses>{expenses}</tns:monthlyExpenses><tns:debt>{debt}</tns:debt>"
+            f"<tns:latePayments>{late}</tns:latePayments><tns:hasBankruptcy>{str(bankrupt).lower()}</tns:hasBankruptcy>")
+
+
+def ratio_fields(row):
+    return f"<tns:monthlyIncome>{row[1]}</tns:monthlyIncome><tns:monthlyDebtPayments>{row[2]}</tns:monthlyDebtPayments>"
+
+
+def envelopes(rows, batch, tns, single, batch_op, item, fields):
+    """Corps SOAP : un par élément (batch = 1) ou un par lot de `batch` éléments."""
+    if batch == 1:
+        return [soap_envelope(tns, f"<tns:{single}>{fields(r)}</tns:{single}>").encode("utf-8") for r in rows]
+    bodies = []
+    for k in range(0, len(rows), batch):
+        inner = "".join(f"<tns:{item}>{fields(r)}</tns:{item}>" for r in rows[k:k + batch])
+        bodies.append(soap_envelope(tns, f"<tns:{batch_op}><tns:items>{inner}</tns:items></tns:{batch_op}>")
+                      .encode("utf-8"))
+    return bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--soap-items", type=int, default=2000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 32, 256])
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    rows = synthetic_rows(args.items, args.clients)
+    incomes, payments = [r[1] for r in rows], [r[2] for r in rows]
+    debt_ratio_batch([1.0], [1.0])  # import de numpy hors mesure
+
+    print(f"{'règles (fonctions)':<34} {'éléments/s':>12}")
+    for label, fn in (
+        ("explain, un appel par élément", lambda: [explain(*r) for r in rows]),
+        ("explain_batch, caches vides", lambda: explain_batch(rows)),
+        ("explain_batch, régime établi", lambda: explain_batch(rows)),
+        ("debt_ratio, un appel par élément", lambda: [debt_ratio(i, p) for i, p in zip(incomes, payments)]),
+        ("debt_ratio_batch (numpy)", lambda: debt_ratio_batch(incomes, payments)),
+    ):
+        print(f"{label:<34} {rate(fn, len(rows)):>12.0f}")
+    assert explain_batch(rows) == [explain(*r) for r in rows]
+    assert debt_ratio_batch(incomes, payments) == [debt_ratio(i, p) for i, p in zip(incomes, payments)]
+
+    soap_rows = rows[:args.soap_items]
+    services = (
+        ("Explain", load_service("explain").wsgi_app, "urn:explain.service:v1",
+         "Explain", "ExplainBatch", "ExplainInput", explain_fields),
+        ("DebtRatio", load_service("debt_ratio").wsgi_app, "urn:debtratio.service:v1",
+         "ComputeDebtRatio", "ComputeDebtRatioBatch", "DebtRatioInput", ratio_fields),
+    )
+    print(f"\n{'service SOAP (en mémoire)':<34} {'lot':>5} {'éléments/s':>12}")
+    for name, app, tns, single, batch_op, item, fields in services:
+        for batch in args.batch:
+            bodies = envelopes(soap_rows, batch, tns, single, batch_op, item, fields)
+            print(f"{name:<34} {batch:>5} {rate(lambda: [call(app, b) for b in bodies], len(soap_rows)):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Montée en charge multi-processus (common/launcher.py) : débit de
+l'IE_Service sur des textes volumineux (extraction CPU) selon le nombre de
+workers (SERVICE_WORKERS), et métriques agrégées sur /metrics.
+
+    python benchmarks/bench_scaling.py [--workers 1 2 4] [--requests 200]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from _services import SAMPLE_TEXT, service_dir
+from bench_startup import free_port, service_env, wait_for
+
+ENVELOPE = """<?xml version="1.0" encoding="utf-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="urn:ie.service:v7">
+   <soapenv:Body><tns:extractInformation><tns:text>{text}</tns:text></tns:extractInformation></soapenv:Body>
+</soapenv:Envelope>"""
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "text/xml; charset=utf-8"})
+    with urllib.request.urlopen(request, timeout=120) as resp:
+        resp.read()
+
+
+def measure(workers, requests, concurrency, repeat):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/"
+    # textes tous différents : pas de cache d'extraction
+    bodies = [ENVELOPE.format(text=f"Demande {i}. " + SAMPLE_TEXT * repeat).encode("utf-8")
+              for i in range(requests)]
+    env = service_env(PORT=str(port), SERVICE_WORKERS=str(workers), IE_BACKEND="regex", IE_CACHE_SIZE="0")
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=service_dir("ie"), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(urllib.request.Request(base + "?wsdl"), time.perf_counter(), timeout=60)
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(lambda b: post(base, b), bodies[:concurrency]))  # chauffe
+            start = time.perf_counter()
+            list(pool.map(lambda b: post(base, b), bodies))
+            elapsed = time.perf_counter() - start
+        time.sleep(1.5)  # chaque worker publie ses compteurs au plus une fois par seconde
+        with urllib.request.urlopen(base + "metrics", timeout=10) as resp:
+            metrics = json.load(resp)
+        return requests / elapsed, metrics
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=200, help="taille du texte (répétitions)")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cœur(s) ; textes de {len(SAMPLE_TEXT) * args.repeat / 1000:.0f} ko")
+    print(f"{'workers':>8}{'req/s':>10}{'accélération':>14}  requêtes par worker (/metrics)")
+    baseline = None
+    for workers in args.workers:
+        rate, metrics = measure(workers, args.requests, args.concurrency, args.repeat)
+        baseline = baseline or rate
+        per_worker = ", ".join(str(w["requests"]) for w in metrics["per_worker"])
+        print(f"{workers:>8}{rate:>10.1f}{rate / baseline:>13.2f}x  {per_worker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Temps de démarrage de chaque service : délai entre le lancement du
+processus et la première requête réussie (WSDL puis appel SOAP), et
+mémoire résidente une fois la première requête servie.
+
+Le WSDL est pré-calculé comme au build de l'image (`--no-wsdl-cache`
+pour comparer avec la génération au premier `?wsdl`).
+
+    python benchmarks/bench_startup.py [--runs 3] [--no-wsdl-cache]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from _services import ROOT_DIR, SERVICE_DIRS, sample_envelope, service_dir
+
+# L'orchestrateur dépend de toute la chaîne : on ne mesure que son WSDL.
+WSDL_ONLY = {"solvency"}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def wait_for(request, start, timeout=30.0):
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(request, timeout=2) as resp:
+                if resp.status == 200:
+                    resp.read()
+                    return time.perf_counter() - start
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.005)
+    raise TimeoutError(request.full_url)
+
+
+def precompute_wsdl(name, directory):
+    path = os.path.join(directory, f"{name}.wsdl")
+    attr = "application" if name in ("credit_scoring", "debt_ratio") else "app"
+    subprocess.run([sys.executable, "-m", "common.wsdl", f"main:{attr}", path],
+                   cwd=service_dir(name), env=service_env(), check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return path
+
+
+def service_env(**extra):
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR, PYTHONDONTWRITEBYTECODE="1")
+    env.update(extra)
+    return env
+
+
+def measure(name, wsdl_path):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/"
+    env = service_env(PORT=str(port), WSDL_CACHE_PATH=wsdl_path)
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=service_dir(name), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        t_wsdl = wait_for(urllib.request.Request(base + "?wsdl"), start)
+        t_call = None
+        if name not in WSDL_ONLY:
+            request = urllib.request.Request(base, data=sample_envelope(name),
+                                             headers={"Content-Type": "text/xml; charset=utf-8"})
+            t_call = wait_for(request, start)
+        return t_wsdl, t_call, rss_kb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--no-wsdl-cache", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'service':<22}{'1er WSDL (ms)':>15}{'1er appel (ms)':>16}{'RSS (Mo)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in SERVICE_DIRS:
+            wsdl_path = os.path.join(tmp, "absent.wsdl") if args.no_wsdl_cache else precompute_wsdl(name, tmp)
+            runs = [measure(name, wsdl_path) for _ in range(args.runs)]
+            t_wsdl = statistics.median(r[0] for r in runs) * 1000
+            calls = [r[1] for r in runs if r[1] is not None]
+            t_call = f"{statistics.median(calls) * 1000:.0f}" if calls else "-"
+            rss = runs[-1][2]
+            rss = f"{rss / 1024:.1f}" if rss else "?"
+            print(f"{name:<22}{t_wsdl:>15.0f}{t_call:>16}{rss:>10}")
+
+
+if __name__ == "__main__":
+    main()
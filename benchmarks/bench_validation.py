@@ -0,0 +1,72 @@
+"""
+Coût de la validation des messages entrants, par service et par niveau.
+
+Mesure uniquement la phase d'entrée spyne (parsing, découpage de
+l'enveloppe, validation, désérialisation) pour isoler le coût de la
+validation de la logique métier et des appels réseau.
+
+    python benchmarks/bench_validation.py [--iterations 2000]
+"""
+import argparse
+import logging
+import time
+
+from _services import SERVICE_DIRS, load_service, sample_envelope, soap_application
+
+from spyne import Application, MethodContext
+from spyne.protocol.soap import Soap11
+from spyne.server import ServerBase
+
+from common.validation import VALIDATION_MODES, soap_in_protocol
+
+
+def decode_once(server, payload):
+    ctx = MethodContext(server, MethodContext.SERVER)
+    ctx.in_string = [payload]
+    ctx, = server.generate_contexts(ctx)
+    server.get_in_object(ctx)
+    if ctx.in_error is not None:
+        raise ctx.in_error
+    return ctx
+
+
+def bench_service(name, iterations, rounds=5):
+    """Temps moyen (µs) par message pour chaque niveau, meilleur de `rounds`
+    passes entrelacées pour limiter le bruit."""
+    module = load_service(name)
+    base = soap_application(module)
+    payload = sample_envelope(name)
+    servers = {}
+    for mode in VALIDATION_MODES:
+        app = Application(list(base.services), tns=base.tns, name=base.name,
+                          in_protocol=soap_in_protocol(mode), out_protocol=Soap11())
+        servers[mode] = ServerBase(app)
+        for _ in range(50):
+            decode_once(servers[mode], payload)
+
+    results = {mode: float("inf") for mode in servers}
+    for _ in range(rounds):
+        for mode, server in servers.items():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                decode_once(server, payload)
+            elapsed = (time.perf_counter() - start) / iterations * 1e6
+            results[mode] = min(results[mode], elapsed)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'service':<22}{'full (µs)':>12}{'soft (µs)':>12}{'off (µs)':>12}{'coût XSD':>12}")
+    for name in SERVICE_DIRS:
+        r = bench_service(name, args.iterations)
+        print(f"{name:<22}{r['full']:>12.1f}{r['soft']:>12.1f}{r['off']:>12.1f}"
+              f"{r['full'] - r['off']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
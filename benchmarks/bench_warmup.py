@@ -0,0 +1,90 @@
+"""
+Première requête d'un processus neuf : à froid (servie dès le démarrage)
+contre après le préchauffage de /ready (SERVICE_WARMUP), et régime établi
+(médiane des requêtes suivantes). Chaque mesure tourne dans un processus
+Python neuf, comme un worker qui vient de démarrer.
+
+    python benchmarks/bench_warmup.py [--services ie explain ...] [--requests 50]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from _services import SAMPLE_REQUESTS, load_service, sample_envelope
+
+
+def call(app, body):
+    environ = {"REQUEST_METHOD": "POST", "PATH_INFO": "/", "QUERY_STRING": "", "CONTENT_TYPE": "text/xml",
+               "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body), "SERVER_NAME": "bench",
+               "SERVER_PORT": "80", "wsgi.url_scheme": "http"}
+    status = []
+    start = time.perf_counter()
+    b"".join(app(environ, lambda s, h, e=None: status.append(s)))
+    elapsed = (time.perf_counter() - start) * 1000
+    assert status[0].startswith("200"), status[0]
+    return elapsed
+
+
+def child(name, warm, requests):
+    """Mesure dans ce processus : import, préchauffage éventuel, requêtes."""
+    logging.disable(logging.CRITICAL)
+    os.environ.update({"SOLVENCY_SNAPSHOT_DB": "", "SOLVENCY_AUDIT_DIR": "", "SOLVENCY_CLIENT_RATE": "0"})
+    start = time.perf_counter()
+    module = load_service(name)
+    import_ms = (time.perf_counter() - start) * 1000
+    if name == "solvency":
+        module.registry.warm_up = lambda timeout=2: {}  # pas de services en aval ici
+    warmup_ms = 0.0
+    if warm:
+        start = time.perf_counter()
+        module.wsgi_app.readiness.warm_up()
+        warmup_ms = (time.perf_counter() - start) * 1000
+    # Solvency : OptimizeLoanOffer (sans appel en aval), comme son préchauffage,
+    # mais pour un vrai client (grille évaluée) plutôt que le client fictif
+    if name == "solvency":
+        body = module.WARMUP_REQUESTS[0].replace(module.WARMUP_CLIENT_ID.encode(), b"client-001")
+    else:
+        body = sample_envelope(name)
+    times = [call(module.wsgi_app, body) for _ in range(requests)]
+    print(json.dumps({"import": import_ms, "warmup": warmup_ms, "first": times[0],
+                      "steady": statistics.median(times[1:])}))
+
+
+def measure(name, warm, requests):
+    output = subprocess.run([sys.executable, __file__, "--child", name] + (["--warm"] if warm else []) +
+                            ["--requests", str(requests)], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--services", nargs="+", default=list(SAMPLE_REQUESTS))
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=3, help="processus neufs par mesure (médiane)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.warm, args.requests)
+
+    print(f"{'service':<20} {'import (ms)':>12} {'1re à froid':>12} {'préchauffage':>13} "
+          f"{'1re préchauffée':>16} {'régime (ms)':>12}")
+    for name in args.services:
+        cold = [measure(name, False, args.requests) for _ in range(args.runs)]
+        warm = [measure(name, True, args.requests) for _ in range(args.runs)]
+
+        def med(runs, key):
+            return statistics.median(r[key] for r in runs)
+
+        print(f"{name:<20} {med(cold, 'import'):>12.1f} {med(cold, 'first'):>12.2f} {med(warm, 'warmup'):>13.1f} "
+              f"{med(warm, 'first'):>16.2f} {med(cold, 'steady'):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Rejeu de requêtes capturées (SOAP_CAPTURE_FILE) contre l'orchestrateur :
+non-régression fonctionnelle et comparaison de performance entre deux builds.
+
+    python benchmarks/replay.py synth --output capture.jsonl --count 500 --rate 20
+    python benchmarks/replay.py run capture.jsonl --url http://localhost:8000/ --output golden.jsonl
+    python benchmarks/replay.py run capture.jsonl --url http://localhost:8000/ --output candidate.jsonl --speed 4
+    python benchmarks/replay.py compare golden.jsonl candidate.jsonl
+
+`run` respecte les écarts d'origine entre requêtes, divisés par `--speed`
+(`--speed 0` : au plus vite). `compare` confronte les sorties fonctionnelles
+requête par requête (les champs non déterministes sont ignorés) puis met
+les latences des deux exécutions côte à côte ; le code de sortie est 1 en
+cas de différence fonctionnelle ou de p99 dégradé au-delà de la tolérance.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from _services import SAMPLE_TEXT, soap_envelope
+
+from common.soap_client import get_session
+
+# Approbation : score de risque aléatoire ; identifiant de travail : uuid
+DEFAULT_IGNORE = ("approvalResponse", "explanationJobId")
+SOLVENCY_TNS = "urn:solvency.verification.service:v1"
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl(path, entries):
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+# -------------------------------------------------------
+# 🧪 Capture synthétique (en l'absence de trafic enregistré)
+# -------------------------------------------------------
+def synth(count, rate, clients, profiles, seed=42):
+    """Arrivées de Poisson à `rate` requêtes/s, au format de common/capture.py."""
+    rng = random.Random(seed)
+    ts = time.time()
+    entries = []
+    for _ in range(count):
+        ts += rng.expovariate(rate)
+        amount = rng.choice([150000, 250000, 400000, 600000])
+        text = SAMPLE_TEXT.replace("250000", str(amount))
+        profile = rng.choice(profiles)
+        body = (f"<tns:VerifySolvency><tns:clientId>{rng.choice(clients)}</tns:clientId>"
+                f"<tns:demandeTexte>{text}</tns:demandeTexte>"
+                f"<tns:responseProfile>{profile}</tns:responseProfile></tns:VerifySolvency>")
+        entries.append({"ts": ts, "path": "/", "soapAction": "VerifySolvency",
+                        "contentType": "text/xml; charset=utf-8",
+                        "body": soap_envelope(SOLVENCY_TNS, body)})
+    return entries
+
+
+# -------------------------------------------------------
+# ▶️ Rejeu
+# -------------------------------------------------------
+def send(url, entry, timeout):
+    headers = {"Content-Type": entry.get("contentType") or "text/xml; charset=utf-8"}
+    if entry.get("soapAction"):
+        headers["SOAPAction"] = entry["soapAction"]
+    start = time.perf_counter()
+    try:
+        resp = get_session().post(url.rstrip("/") + entry.get("path", "/"), data=entry["body"].encode("utf-8"),
+                                  headers=headers, timeout=timeout)
+        return {"status": resp.status_code, "latency": time.perf_counter() - start,
+                "body": resp.content.decode("utf-8", errors="replace"), "error": None}
+    except Exception as e:
+        return {"status": None, "latency": time.perf_counter() - start, "body": "", "error": str(e)}
+
+
+def replay(entries, url, speed=1.0, concurrency=64, timeout=30):
+    """
+    Envoie les requêtes à leur instant d'origine (divisé par `speed`) ;
+    `lag` mesure le retard d'envoi quand le client ne suit pas le rythme.
+    """
+    results = [None] * len(entries)
+    first = entries[0]["ts"] if entries else 0.0
+    t0 = time.perf_counter()
+
+    def one(index, due):
+        sent = time.perf_counter() - t0
+        result = send(url, entries[index], timeout)
+        result.update(index=index, offset=round(due, 6), lag=round(max(sent - due, 0.0), 6))
+        results[index] = result
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as pool:
+        for index, entry in enumerate(entries):
+            due = (entry["ts"] - first) / speed if speed > 0 else 0.0
+            delay = due - (time.perf_counter() - t0)
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(one, index, due)
+    return results, time.perf_counter() - t0
+
+
+# -------------------------------------------------------
+# 🔍 Comparaison fonctionnelle
+# -------------------------------------------------------
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def flatten(body):
+    """Feuilles du corps SOAP : {"VerifySolvencyResponse/.../creditScore": "850", ...}.
+    Les éléments répétés (tableaux) sont numérotés : `sections/string#2`."""
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return {"_raw": body.strip()}
+    soap_body = next((e for e in root.iter() if _local(e.tag) == "Body"), root)
+    leaves = {}
+
+    def walk(elem, prefix):
+        seen = {}
+        for child in elem:
+            name = _local(child.tag)
+            seen[name] = seen.get(name, 0) + 1
+            key = f"{prefix}/{name}" if prefix else name
+            if seen[name] > 1:
+                key += f"#{seen[name]}"
+            if len(child):
+                walk(child, key)
+            else:
+                leaves[key] = (child.text or "").strip()
+
+    walk(soap_body, "")
+    return leaves
+
+
+def functional_output(result, ignore=DEFAULT_IGNORE):
+    if result is None:
+        return {"_error": "non envoyée"}
+    if result["error"]:
+        return {"_error": result["error"]}
+    ignored = set(ignore)
+    return {k: v for k, v in flatten(result["body"]).items()
+            if not ignored.intersection(p.split("#")[0] for p in k.split("/"))}
+
+
+def diff_runs(golden, candidate, ignore=DEFAULT_IGNORE):
+    """Liste de (index, clé, valeur de référence, valeur candidate)."""
+    by_index = {r["index"]: r for r in candidate}
+    diffs = []
+    for ref in golden:
+        expected = functional_output(ref, ignore)
+        actual = functional_output(by_index.get(ref["index"]), ignore)
+        for key in sorted(set(expected) | set(actual)):
+            if expected.get(key) != actual.get(key):
+                diffs.append((ref["index"], key, expected.get(key), actual.get(key)))
+    return diffs
+
+
+# -------------------------------------------------------
+# 📊 Comparaison de performance
+# -------------------------------------------------------
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def latency_stats(results):
+    ok = [r["latency"] for r in results if r["error"] is None and r["status"] == 200]
+    span = max((r["offset"] + r["lag"] + r["latency"] for r in results), default=0.0)
+    return {
+        "requêtes": len(results),
+        "erreurs": sum(1 for r in results if r["error"] is not None or r["status"] != 200),
+        "débit (req/s)": len(results) / span if span else 0.0,
+        "moyenne (ms)": 1000 * sum(ok) / len(ok) if ok else 0.0,
+        "p50 (ms)": 1000 * percentile(ok, 0.50),
+        "p95 (ms)": 1000 * percentile(ok, 0.95),
+        "p99 (ms)": 1000 * percentile(ok, 0.99),
+        "max (ms)": 1000 * max(ok, default=0.0),
+        "retard envoi p99 (ms)": 1000 * percentile([r["lag"] for r in results], 0.99),
+    }
+
+
+def compare(golden, candidate, ignore=DEFAULT_IGNORE, p99_tolerance=0.10, max_diffs=20, out=sys.stdout):
+    """Affiche le rapport ; retourne True si aucune régression."""
+    diffs = diff_runs(golden, candidate, ignore)
+    print(f"Fonctionnel : {len(golden)} requêtes comparées, {len(diffs)} différence(s)", file=out)
+    for index, key, expected, actual in diffs[:max_diffs]:
+        print(f"  #{index} {key} : {expected!r} → {actual!r}", file=out)
+    if len(diffs) > max_diffs:
+        print(f"  … {len(diffs) - max_diffs} autre(s)", file=out)
+
+    ref, cand = latency_stats(golden), latency_stats(candidate)
+    print(f"\n{'':<24} {'référence':>11} {'candidat':>11} {'écart':>9}", file=out)
+    for key in ref:
+        delta = (cand[key] - ref[key]) / ref[key] * 100 if ref[key] else 0.0
+        print(f"{key:<24} {ref[key]:>11.1f} {cand[key]:>11.1f} {delta:>+8.1f}%", file=out)
+
+    p99_ok = cand["p99 (ms)"] <= ref["p99 (ms)"] * (1 + p99_tolerance)
+    if not p99_ok:
+        print(f"\n❌ p99 dégradé au-delà de {p99_tolerance:.0%}", file=out)
+    return not diffs and p99_ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("synth", help="capture synthétique de VerifySolvency")
+    p.add_argument("--output", required=True)
+    p.add_argument("--count", type=int, default=500)
+    p.add_argument("--rate", type=float, default=20.0, help="requêtes/s")
+    p.add_argument("--clients", nargs="+", default=["client-001", "client-002", "client-003"])
+    p.add_argument("--profiles", nargs="+", default=["full", "decisionOnly"])
+
+    p = sub.add_parser("run", help="rejoue une capture et enregistre réponses et latences")
+    p.add_argument("capture")
+    p.add_argument("--url", default="http://localhost:8000/")
+    p.add_argument("--output", required=True)
+    p.add_argument("--speed", type=float, default=1.0, help="accélération (0 : au plus vite)")
+    p.add_argument("--concurrency", type=int, default=64)
+    p.add_argument("--limit", type=int, default=None)
+    p.add_argument("--timeout", type=float, default=30.0)
+
+    p = sub.add_parser("compare", help="référence vs candidat")
+    p.add_argument("golden")
+    p.add_argument("candidate")
+    p.add_argument("--ignore", default=",".join(DEFAULT_IGNORE), help="éléments ignorés (séparés par des virgules)")
+    p.add_argument("--p99-tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == "synth":
+        write_jsonl(args.output, synth(args.count, args.rate, args.clients, args.profiles))
+    elif args.command == "run":
+        entries = read_jsonl(args.capture)[:args.limit]
+        results, elapsed = replay(entries, args.url, args.speed, args.concurrency, args.timeout)
+        write_jsonl(args.output, results)
+        stats = latency_stats(results)
+        print(f"{len(results)} requêtes en {elapsed:.1f} s, {stats['erreurs']} erreur(s), "
+              f"p50 {stats['p50 (ms)']:.1f} ms, p99 {stats['p99 (ms)']:.1f} ms → {args.output}")
+    else:
+        ignore = tuple(x for x in args.ignore.split(",") if x)
+        return 0 if compare(read_jsonl(args.golden), read_jsonl(args.candidate), ignore, args.p99_tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
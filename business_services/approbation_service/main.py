@@ -1,12 +1,20 @@
 from spyne import Application, rpc, ServiceBase, Unicode, Float, Integer, Boolean, ComplexModel
 from spyne.protocol.soap import Soap11
-from spyne.server.wsgi import WsgiApplication
+from common.compression import CompressionMiddleware
+from common.readiness import readiness_from_env, soap_self_calls, warmup_envelope
+from common.rules import (
+    LTV_MAX, LTV_OPTIMAL, OPTIMAL_MAX_DURATION_YEARS, RATE_CONDITIONAL, RATE_OPTIMAL, RISK_MAX, RISK_OPTIMAL_MAX
+)
+from common.validation import ValidationRouter, soap_in_protocol, validation_mode
+from common.wsdl import PrecomputedWsdlMiddleware
 import logging
+import os
 import random
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class ApprovalInput(ComplexModel):
+    __namespace__ = "urn:approval.decision:v1"
     clientId = Unicode
     requestedAmount = Float
     duration_years = Integer
@@ -18,6 +26,7 @@ class ApprovalRequest(ApprovalInput):
     pass
 
 class ApprovalResponse(ComplexModel):
+    __namespace__ = "urn:approval.decision:v1"
     approved = Boolean
     interestRate = Float
     maxLoanAmount = Float
@@ -58,14 +67,16 @@ class ApprovalService(ServiceBase):
         risk_score = random.uniform(0.0, 1.0)
         report.append(f"Score de risque prédictif: {risk_score:.3f}")
 
-        if ltv <= 0.8 and risk_score < 0.3 and duration <= 25:
+        if ltv <= LTV_OPTIMAL and risk_score < RISK_OPTIMAL_MAX and duration <= OPTIMAL_MAX_DURATION_YEARS:
             approved = True
-            interest_rate = 1.8 + (ltv * 2) + (risk_score * 3)
+            base, ltv_coef, risk_coef = RATE_OPTIMAL
+            interest_rate = base + (ltv * ltv_coef) + (risk_score * risk_coef)
             max_loan = prop_value * 0.9
             report.append("APPROUVÉ : Conditions optimales")
-        elif ltv <= 0.9 and risk_score < 0.6:
+        elif ltv <= LTV_MAX and risk_score < RISK_MAX:
             approved = True
-            interest_rate = 2.5 + (ltv * 3) + (risk_score * 4)
+            base, ltv_coef, risk_coef = RATE_CONDITIONAL
+            interest_rate = base + (ltv * ltv_coef) + (risk_score * risk_coef)
             max_loan = prop_value * 0.8
             report.append("APPROUVÉ avec conditions")
         else:
@@ -90,14 +101,22 @@ class ApprovalService(ServiceBase):
 app = Application(
     [ApprovalService],
     tns="urn:approval.decision:v1",
-    in_protocol=Soap11(validator="lxml"),
+    in_protocol=soap_in_protocol(validation_mode("SOAP_VALIDATION", "full")),
     out_protocol=Soap11()
 )
 
-wsgi_app = WsgiApplication(app)
+wsgi_app = CompressionMiddleware(PrecomputedWsdlMiddleware(ValidationRouter(app), app))
+
+# 🌡️ Préchauffage avant /ready (SERVICE_WARMUP) : requêtes types en mémoire
+WARMUP_REQUESTS = [
+    warmup_envelope(app.tns, "<tns:MakeApprovalDecision><tns:amount>250000</tns:amount>"
+                             "<tns:duration>20</tns:duration><tns:solvency>solvent</tns:solvency>"
+                             "<tns:prop_value>618750</tns:prop_value><tns:prop_ok>true</tns:prop_ok>"
+                             "</tns:MakeApprovalDecision>"),
+]
+wsgi_app = readiness_from_env(wsgi_app, [("auto-appels SOAP", soap_self_calls(wsgi_app, WARMUP_REQUESTS))])
 
 if __name__ == "__main__":
-    from wsgiref.simple_server import make_server
+    from common.launcher import serve
     logging.info("Approval Service ready on http://0.0.0.0:8007/?wsdl")
-    server = make_server("0.0.0.0", 8007, wsgi_app)
-    server.serve_forever()
\ No newline at end of file
+    serve(wsgi_app, int(os.environ.get("PORT", 8007)), on_start=wsgi_app.readiness.start)
\ No newline at end of file
@@ -1,7 +1,7 @@
 # __init__.py pour le package credit_scoring_service
 
 # Import explicite des composants principaux du service
-from .main import CreditScoringService, CreditScoreResult
+from .main import CreditScoringService, CreditScoreResult, CreditScoreInput
 
 # Métadonnées du package
 __version__ = "2.0.0"
@@ -11,5 +11,6 @@ __description__ = "Service de calcul de score de crédit"
 # Export public (facilite l'import depuis l'extérieur)
 __all__ = [
     "CreditScoringService",
-    "CreditScoreResult"
+    "CreditScoreResult",
+    "CreditScoreInput"
 ]
\ No newline at end of file
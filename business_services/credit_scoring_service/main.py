@@ -1,28 +1,55 @@
 # credit_scoring_service.py
-from spyne import Application, rpc, ServiceBase, Float, ComplexModel
+from spyne import Application, rpc, ServiceBase, Float, ComplexModel, Array
 from spyne.protocol.soap import Soap11
-from spyne.server.wsgi import WsgiApplication
-from wsgiref.simple_server import make_server
+import os
 from spyne import Integer, Boolean
+from common.compression import CompressionMiddleware
+from common.launcher import serve
+from common.readiness import readiness_from_env, soap_self_calls, warmup_envelope
+from common.rules import credit_score
+from common.validation import ValidationRouter, soap_in_protocol, validation_mode
+from common.wsdl import PrecomputedWsdlMiddleware
 
 
 class CreditScoreResult(ComplexModel):
+    __namespace__ = "urn:creditscore.service:v1"
     score = Float
 
+class CreditScoreInput(ComplexModel):
+    __namespace__ = "urn:creditscore.service:v1"
+    debt = Float
+    latePayments = Integer
+    hasBankruptcy = Boolean
+
 class CreditScoringService(ServiceBase):
     @rpc(Float, Integer, Boolean, _returns=CreditScoreResult)
     def ComputeCreditScore(ctx, debt, latePayments, hasBankruptcy):
-        score = 1000 - 0.1*debt - 50*latePayments - (200 if hasBankruptcy else 0)
-        return CreditScoreResult(score=score)
+        return CreditScoreResult(score=credit_score(debt, latePayments, hasBankruptcy))
+
+    # Lot regroupé par les appelants (common/microbatch.py) : résultats dans l'ordre des entrées
+    @rpc(Array(CreditScoreInput), _returns=Array(CreditScoreResult))
+    def ComputeCreditScoreBatch(ctx, items):
+        return [CreditScoreResult(score=credit_score(i.debt, i.latePayments, i.hasBankruptcy)) for i in items or []]
 
 application = Application([CreditScoringService],
                           tns='urn:creditscore.service:v1',
-                          in_protocol=Soap11(validator='lxml'),
+                          in_protocol=soap_in_protocol(validation_mode("SOAP_VALIDATION", "full")),
                           out_protocol=Soap11())
 
-wsgi_app = WsgiApplication(application)
+wsgi_app = CompressionMiddleware(PrecomputedWsdlMiddleware(ValidationRouter(application), application))
+
+# 🌡️ Préchauffage avant /ready (SERVICE_WARMUP) : requêtes types en mémoire
+WARMUP_REQUESTS = [
+    warmup_envelope(application.tns, "<tns:ComputeCreditScore><tns:debt>5000.0</tns:debt>"
+                                     "<tns:latePayments>2</tns:latePayments>"
+                                     "<tns:hasBankruptcy>false</tns:hasBankruptcy></tns:ComputeCreditScore>"),
+    warmup_envelope(application.tns, "<tns:ComputeCreditScoreBatch><tns:items><tns:CreditScoreInput>"
+                                     "<tns:debt>5000.0</tns:debt><tns:latePayments>2</tns:latePayments>"
+                                     "<tns:hasBankruptcy>false</tns:hasBankruptcy></tns:CreditScoreInput></tns:items>"
+                                     "</tns:ComputeCreditScoreBatch>"),
+]
+wsgi_app = readiness_from_env(wsgi_app, [("auto-appels SOAP", soap_self_calls(wsgi_app, WARMUP_REQUESTS))])
 
 if __name__ == "__main__":
-    server = make_server("0.0.0.0", 8002, wsgi_app)
     print("CreditScoringService running at http://credit_scoring_service:8002/?wsdl")
-    server.serve_forever()
+    serve(wsgi_app, int(os.environ.get("PORT", 8002)), on_start=wsgi_app.readiness.start)
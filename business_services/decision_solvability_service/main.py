@@ -1,9 +1,15 @@
 from spyne import Application, rpc, ServiceBase, Unicode, Float, ComplexModel
 from spyne.protocol.soap import Soap11
-from spyne.server.wsgi import WsgiApplication
+from common.compression import CompressionMiddleware
+from common.discovery import ServiceRegistry
+from common.microbatch import batcher_from_env
+from common.readiness import downstream_step, readiness_from_env, soap_self_calls, warmup_envelope
+from common.rules import solvency_decision
+from common.validation import ValidationRouter, soap_in_protocol, validation_mode
+from common.wsdl import PrecomputedWsdlMiddleware
 import xml.etree.ElementTree as ET
 import logging
-import requests
+import os
 # -------------------------------
 # 🔹 Configuration des logs
 # -------------------------------
@@ -13,8 +19,39 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 # 🧱 Modèles SOAP
 # -------------------------------
 class DecisionResponse(ComplexModel):
+    __namespace__ = "urn:solvency.decision:v1"
     solvencyStatus = Unicode
 
+# -------------------------------
+# 🧭 Service appelé (réplicas via SOAP_ENDPOINTS)
+# -------------------------------
+registry = ServiceRegistry({"ratio_endettement_service": "http://ratio_endettement_service:8004/"})
+
+
+def send_debt_ratio_batch(items):
+    """Lot ComputeDebtRatioBatch : [(revenu, remboursements), …] → [ratio, …]."""
+    inputs = "".join(
+        f"<urn:DebtRatioInput><urn:monthlyIncome>{income}</urn:monthlyIncome>"
+        f"<urn:monthlyDebtPayments>{payments}</urn:monthlyDebtPayments></urn:DebtRatioInput>"
+        for income, payments in items
+    )
+    soap_request = f"""
+            <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+                              xmlns:urn="urn:debtratio.service:v1">
+               <soapenv:Body>
+                  <urn:ComputeDebtRatioBatch><urn:items>{inputs}</urn:items></urn:ComputeDebtRatioBatch>
+               </soapenv:Body>
+            </soapenv:Envelope>
+            """
+    resp = registry.post("ratio_endettement_service", soap_request)
+    root = ET.fromstring(resp.content)
+    ns = {"tns": "urn:debtratio.service:v1"}
+    return [float(r.text or 0.0) for r in root.iterfind(".//tns:DebtRatioResult/tns:debtRatio", ns)]
+
+
+# appels concurrents regroupés si SOAP_BATCH_WINDOW_MS > 0
+debt_ratio_batcher = batcher_from_env("ComputeDebtRatio", send_debt_ratio_batch)
+
 # -------------------------------
 # 🧠 Service SOAP de Décision
 # -------------------------------
@@ -30,39 +67,31 @@ class DecisionService(ServiceBase):
 # --- 4️⃣ Appel du service DebtRatio
         debtRatio = 0.0
         try:
-          
-            soap_request = f"""
-            <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                              xmlns:urn="urn:debtratio.service:v1">
-               <soapenv:Body>
-                  <urn:ComputeDebtRatio>
-                     <urn:monthlyIncome>{monthlyIncome}</urn:monthlyIncome>
-                     <urn:monthlyDebtPayments>{monthlyDebtPayments}</urn:monthlyDebtPayments>
-                  </urn:ComputeDebtRatio>
-               </soapenv:Body>
-            </soapenv:Envelope>
-            """
-            resp = requests.post(
-                "http://ratio_endettement_service:8004/",
-                data=soap_request.encode("utf-8"),
-                headers={"Content-Type": "text/xml;charset=UTF-8"},
-                timeout=10
-            )
-            root = ET.fromstring(resp.content)
-            ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:debtratio.service:v1"}
-            debtRatio = float(root.find(".//tns:debtRatio", ns).text or 0.0)
+            if debt_ratio_batcher is not None:
+                debtRatio = debt_ratio_batcher.call((monthlyIncome, monthlyDebtPayments), timeout=10)
+            else:
+                soap_request = f"""
+                <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+                                  xmlns:urn="urn:debtratio.service:v1">
+                   <soapenv:Body>
+                      <urn:ComputeDebtRatio>
+                         <urn:monthlyIncome>{monthlyIncome}</urn:monthlyIncome>
+                         <urn:monthlyDebtPayments>{monthlyDebtPayments}</urn:monthlyDebtPayments>
+                      </urn:ComputeDebtRatio>
+                   </soapenv:Body>
+                </soapenv:Envelope>
+                """
+                resp = registry.post("ratio_endettement_service", soap_request)
+                root = ET.fromstring(resp.content)
+                ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:debtratio.service:v1"}
+                debtRatio = float(root.find(".//tns:debtRatio", ns).text or 0.0)
         except Exception as e:
             logging.error(f"Erreur DebtRatioService: {e}")
 
         logging.info(f"ration={debtRatio}")
         # Décision finale
-        if creditScore >= 700 and debtRatio <= 40:
-            status = "solvent"
-        else:
-            status = "not_solvent"
-
         return DecisionResponse(
-            solvencyStatus=status,
+            solvencyStatus=solvency_decision(creditScore, debtRatio),
         )
 
 # -------------------------------
@@ -71,17 +100,27 @@ class DecisionService(ServiceBase):
 app = Application(
     [DecisionService],
     tns="urn:solvency.decision:v1",
-    in_protocol=Soap11(validator="lxml"),
+    in_protocol=soap_in_protocol(validation_mode("SOAP_VALIDATION", "full")),
     out_protocol=Soap11(),
 )
 
-wsgi_app = WsgiApplication(app)
+wsgi_app = CompressionMiddleware(PrecomputedWsdlMiddleware(ValidationRouter(app), app))
+
+# 🌡️ Préchauffage avant /ready (SERVICE_WARMUP) : requêtes types en mémoire
+WARMUP_REQUESTS = [
+    warmup_envelope(app.tns, "<tns:MakeDecision><tns:creditScore>800</tns:creditScore>"
+                             "<tns:monthlyIncome>4000</tns:monthlyIncome>"
+                             "<tns:monthlyDebtPayments>2500</tns:monthlyDebtPayments></tns:MakeDecision>"),
+]
+wsgi_app = readiness_from_env(wsgi_app, [
+    ("services en aval", downstream_step(registry)),
+    ("auto-appels SOAP", soap_self_calls(wsgi_app, WARMUP_REQUESTS)),
+])
 
 # -------------------------------
 # 🚀 Lancement du serveur
 # -------------------------------
 if __name__ == "__main__":
-    from wsgiref.simple_server import make_server
+    from common.launcher import serve
     logging.info("🚀 Decision Service prêt sur http://0.0.0.0:8003/?wsdl")
-    server = make_server("0.0.0.0", 8003, wsgi_app)
-    server.serve_forever()
+    serve(wsgi_app, int(os.environ.get("PORT", 8003)), on_start=wsgi_app.readiness.start)
@@ -1,7 +1,12 @@
-from spyne import Application, rpc, ServiceBase, Float, Integer, Boolean, Unicode, ComplexModel
+from spyne import Application, rpc, ServiceBase, Float, Integer, Boolean, Unicode, ComplexModel, Array, Fault
 from spyne.protocol.soap import Soap11
-from spyne.server.wsgi import WsgiApplication
+from common.compression import CompressionMiddleware
+from common.readiness import readiness_from_env, soap_self_calls, warmup_envelope
+from common.rules import explain, explain_batch
+from common.validation import ValidationRouter, soap_in_protocol, validation_mode
+from common.wsdl import PrecomputedWsdlMiddleware
 import logging
+import os
 
 # -------------------------------------------------------
 # 🔹 Configuration des logs
@@ -19,6 +24,18 @@ class ExplanationResponse(ComplexModel):
     incomeVsExpensesExplanation = Unicode
     creditHistoryExplanation = Unicode
 
+
+class ExplainInput(ComplexModel):
+    """Une demande d’explication dans un lot (ExplainBatch)."""
+    __namespace__ = "urn:explain.service:v1"
+
+    score = Float
+    monthlyIncome = Float
+    monthlyExpenses = Float
+    debt = Float
+    latePayments = Integer
+    hasBankruptcy = Boolean
+
 # -------------------------------------------------------
 # 🧠 Service SOAP principal : ExplainService
 # -------------------------------------------------------
@@ -41,44 +58,9 @@ class ExplainService(ServiceBase):
     def Explain(ctx, score, monthlyIncome, monthlyExpenses, debt, latePayments, hasBankruptcy):
         logging.info("🧩 Analyse en cours dans ExplainService...")
 
-        # --- 1️⃣ Analyse du score
-        if score >= 800:
-            score_exp = f"Excellent score ({score:.2f}). Risque de défaut très faible."
-        elif score >= 600:
-            score_exp = f"Score moyen ({score:.2f}). Profil modérément risqué."
-        else:
-            score_exp = f"Score faible ({score:.2f}). Risque de non-remboursement élevé."
-
-        # --- 2️⃣ Revenu vs Dépenses
-        disposable_income = monthlyIncome - monthlyExpenses
-        if disposable_income > 1000:
-            income_exp = (
-                f"Les revenus mensuels ({monthlyIncome:.2f} €) "
-                f"dépassent largement les dépenses ({monthlyExpenses:.2f} €). "
-                "Bonne capacité de remboursement."
-            )
-        elif disposable_income > 0:
-            income_exp = (
-                f"Les revenus ({monthlyIncome:.2f} €) couvrent juste les dépenses "
-                f"({monthlyExpenses:.2f} €). Marges financières limitées."
-            )
-        else:
-            income_exp = (
-                f"Les dépenses ({monthlyExpenses:.2f} €) dépassent les revenus ({monthlyIncome:.2f} €). "
-                "Risque financier important."
-            )
-
-        # --- 3️⃣ Historique de crédit
-        history_parts = []
-        if debt > 5000:
-            history_parts.append(f"Dette importante ({debt:.2f} €).")
-        if latePayments > 0:
-            history_parts.append(f"{latePayments} paiement(s) en retard.")
-        if hasBankruptcy:
-            history_parts.append("Antécédent de faillite enregistré.")
-        if not history_parts:
-            history_parts.append("Aucun incident majeur dans l’historique de crédit.")
-        credit_exp = " ".join(history_parts)
+        score_exp, income_exp, credit_exp = explain(
+            score, monthlyIncome, monthlyExpenses, debt, latePayments, hasBankruptcy
+        )
 
         logging.info("✅ Explication générée avec succès.")
 
@@ -89,23 +71,55 @@ class ExplainService(ServiceBase):
             creditHistoryExplanation=credit_exp
         )
 
+    # Lot regroupé par les appelants (common/microbatch.py) : résultats dans l'ordre des entrées,
+    # textes identiques à Explain (gabarits précompilés, common/rules.py)
+    @rpc(Array(ExplainInput), _returns=Array(ExplanationResponse))
+    def ExplainBatch(ctx, items):
+        items = items or []
+        logging.info(f"🧩 Lot de {len(items)} explication(s)")
+        rows = [(i.score, i.monthlyIncome, i.monthlyExpenses, i.debt, i.latePayments, i.hasBankruptcy)
+                for i in items]
+        if any(None in row for row in rows):
+            raise Fault("Client.InvalidArgument", "Chaque élément du lot doit renseigner tous les champs.")
+        return [
+            ExplanationResponse(
+                creditScoreExplanation=score_exp,
+                incomeVsExpensesExplanation=income_exp,
+                creditHistoryExplanation=credit_exp
+            )
+            for score_exp, income_exp, credit_exp in explain_batch(rows)
+        ]
+
 # -------------------------------------------------------
 # 🌐 Application SOAP
 # -------------------------------------------------------
 app = Application(
     [ExplainService],
     tns="urn:explain.service:v1",
-    in_protocol=Soap11(validator="lxml"),
+    in_protocol=soap_in_protocol(validation_mode("SOAP_VALIDATION", "full")),
     out_protocol=Soap11(),
 )
 
-wsgi_app = WsgiApplication(app)
+wsgi_app = CompressionMiddleware(PrecomputedWsdlMiddleware(ValidationRouter(app), app))
+
+# 🌡️ Préchauffage avant /ready (SERVICE_WARMUP) : requêtes types en mémoire
+WARMUP_REQUESTS = [
+    warmup_envelope(app.tns, "<tns:Explain><tns:score>800</tns:score><tns:monthlyIncome>4000</tns:monthlyIncome>"
+                             "<tns:monthlyExpenses>2500</tns:monthlyExpenses><tns:debt>5000</tns:debt>"
+                             "<tns:latePayments>2</tns:latePayments><tns:hasBankruptcy>false</tns:hasBankruptcy>"
+                             "</tns:Explain>"),
+    warmup_envelope(app.tns, "<tns:ExplainBatch><tns:items><tns:ExplainInput><tns:score>800</tns:score>"
+                             "<tns:monthlyIncome>4000</tns:monthlyIncome>"
+                             "<tns:monthlyExpenses>2500</tns:monthlyExpenses><tns:debt>5000</tns:debt>"
+                             "<tns:latePayments>2</tns:latePayments><tns:hasBankruptcy>false</tns:hasBankruptcy>"
+                             "</tns:ExplainInput></tns:items></tns:ExplainBatch>"),
+]
+wsgi_app = readiness_from_env(wsgi_app, [("auto-appels SOAP", soap_self_calls(wsgi_app, WARMUP_REQUESTS))])
 
 # -------------------------------------------------------
 # 🚀 Lancement du serveur
 # -------------------------------------------------------
 if __name__ == "__main__":
-    from wsgiref.simple_server import make_server
+    from common.launcher import serve
     logging.info("🚀 Explanation Service prêt sur http://0.0.0.0:8005/?wsdl")
-    server = make_server("0.0.0.0", 8005, wsgi_app)
-    server.serve_forever()
+    serve(wsgi_app, int(os.environ.get("PORT", 8005)), on_start=wsgi_app.readiness.start)
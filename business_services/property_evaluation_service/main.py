@@ -1,7 +1,12 @@
 from spyne import Application, rpc, ServiceBase, Unicode, Float, Integer, Boolean, ComplexModel
 from spyne.protocol.soap import Soap11
-from spyne.server.wsgi import WsgiApplication
+from common.compression import CompressionMiddleware
+from common.readiness import readiness_from_env, soap_self_calls, warmup_envelope
+from common.rules import MAX_DURATION_YEARS, MIN_DURATION_YEARS, MIN_VALUE_MARGIN
+from common.validation import ValidationRouter, soap_in_protocol, validation_mode
+from common.wsdl import PrecomputedWsdlMiddleware
 import logging
+import os
 
 # -------------------------------------------------------
 # 🔹 Configuration des logs
@@ -13,6 +18,7 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 # 🧱 Modèle d'entrée : identique à la sortie du IE_Service
 # -------------------------------------------------------
 class ExtractionResult(ComplexModel):
+    __namespace__ = "urn:property.evaluation:v1"
     amount = Float
     duration_years = Integer
     property_type = Unicode
@@ -23,6 +29,7 @@ class ExtractionResult(ComplexModel):
 # 🧾 Modèle de sortie du service PropertyEvaluation
 # -------------------------------------------------------
 class PropertyEvaluationResponse(ComplexModel):
+    __namespace__ = "urn:property.evaluation:v1"
     estimatedValue = Float
     legalCompliance = Boolean
     evaluationReport = Unicode
@@ -79,8 +86,8 @@ class PropertyEvaluationService(ServiceBase):
         report_parts.append("Conforme légalement" if legal_compliance else "Non-conformité détectée")
 
         # === 3️⃣ Décision d’évaluation ===
-        min_value = data.amount * 1.1
-        duration_ok = 10 <= data.duration_years <= 30
+        min_value = data.amount * MIN_VALUE_MARGIN
+        duration_ok = MIN_DURATION_YEARS <= data.duration_years <= MAX_DURATION_YEARS
         can_proceed = legal_compliance and (estimated_value >= min_value) and duration_ok
 
         if can_proceed:
@@ -109,18 +116,27 @@ class PropertyEvaluationService(ServiceBase):
 app = Application(
     [PropertyEvaluationService],
     tns="urn:property.evaluation:v1",
-    in_protocol=Soap11(validator="lxml"),
+    in_protocol=soap_in_protocol(validation_mode("SOAP_VALIDATION", "full")),
     out_protocol=Soap11(),
 )
 
-wsgi_app = WsgiApplication(app)
+wsgi_app = CompressionMiddleware(PrecomputedWsdlMiddleware(ValidationRouter(app), app))
+
+# 🌡️ Préchauffage avant /ready (SERVICE_WARMUP) : requêtes types en mémoire
+WARMUP_REQUESTS = [
+    warmup_envelope(app.tns, "<tns:EvaluateProperty><tns:data><tns:amount>250000</tns:amount>"
+                             "<tns:duration_years>20</tns:duration_years>"
+                             "<tns:property_type>Maison</tns:property_type>"
+                             "<tns:property_description>maison neuve avec jardin</tns:property_description>"
+                             "<tns:location>Paris</tns:location></tns:data></tns:EvaluateProperty>"),
+]
+wsgi_app = readiness_from_env(wsgi_app, [("auto-appels SOAP", soap_self_calls(wsgi_app, WARMUP_REQUESTS))])
 
 
 # -------------------------------------------------------
 # 🚀 Lancement du serveur
 # -------------------------------------------------------
 if __name__ == "__main__":
-    from wsgiref.simple_server import make_server
+    from common.launcher import serve
     logging.info("🚀 Property Evaluation Service prêt sur http://0.0.0.0:8006/?wsdl")
-    server = make_server("0.0.0.0", 8006, wsgi_app)
-    server.serve_forever()
+    serve(wsgi_app, int(os.environ.get("PORT", 8006)), on_start=wsgi_app.readiness.start)
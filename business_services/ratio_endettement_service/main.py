@@ -1,15 +1,26 @@
 # debt_ratio_service.py
-from spyne import Application, rpc, ServiceBase, Unicode, Float, ComplexModel
+from spyne import Application, rpc, ServiceBase, Unicode, Float, ComplexModel, Array, Fault
 from spyne.protocol.soap import Soap11
-from spyne.server.wsgi import WsgiApplication
-from wsgiref.simple_server import make_server
+from common.compression import CompressionMiddleware
+from common.readiness import readiness_from_env, soap_self_calls, warmup_envelope
+from common.validation import ValidationRouter, soap_in_protocol, validation_mode
+from common.wsdl import PrecomputedWsdlMiddleware
+from common.launcher import serve
+from common.rules import debt_ratio, debt_ratio_batch
+import os
 
 # ----------------------
 # Modèle de retour
 # ----------------------
 class DebtRatioResult(ComplexModel):
+    __namespace__ = "urn:debtratio.service:v1"
     debtRatio = Float  # Ratio en pourcentage
 
+class DebtRatioInput(ComplexModel):
+    __namespace__ = "urn:debtratio.service:v1"
+    monthlyIncome = Float
+    monthlyDebtPayments = Float
+
 # ----------------------
 # Service pour calculer le ratio d'endettement
 # ----------------------
@@ -17,26 +28,43 @@ class DebtRatioService(ServiceBase):
 
     @rpc(Float, Float, _returns=DebtRatioResult)
     def ComputeDebtRatio(ctx, monthlyIncome, monthlyDebtPayments):
-        if monthlyIncome <= 0:
-            ratio = 0.0  # éviter division par zéro
-        else:
-            ratio = ((monthlyDebtPayments/12.0) / monthlyIncome) * 100
-        return DebtRatioResult(debtRatio=ratio)
+        return DebtRatioResult(debtRatio=debt_ratio(monthlyIncome, monthlyDebtPayments))
+
+    # Lot regroupé par les appelants (common/microbatch.py) : résultats dans l'ordre des entrées,
+    # ratios calculés en vecteurs (mêmes valeurs que ComputeDebtRatio)
+    @rpc(Array(DebtRatioInput), _returns=Array(DebtRatioResult))
+    def ComputeDebtRatioBatch(ctx, items):
+        items = items or []
+        incomes = [i.monthlyIncome for i in items]
+        payments = [i.monthlyDebtPayments for i in items]
+        if None in incomes or None in payments:
+            raise Fault("Client.InvalidArgument", "Chaque élément du lot doit renseigner monthlyIncome et monthlyDebtPayments.")
+        return [DebtRatioResult(debtRatio=ratio) for ratio in debt_ratio_batch(incomes, payments)]
 
 # ----------------------
 # Définition du service SOAP
 # ----------------------
 application = Application([DebtRatioService],
                           tns='urn:debtratio.service:v1',
-                          in_protocol=Soap11(validator='lxml'),
+                          in_protocol=soap_in_protocol(validation_mode("SOAP_VALIDATION", "full")),
                           out_protocol=Soap11())
 
-wsgi_app = WsgiApplication(application)
+wsgi_app = CompressionMiddleware(PrecomputedWsdlMiddleware(ValidationRouter(application), application))
+
+# 🌡️ Préchauffage avant /ready (SERVICE_WARMUP) : requêtes types en mémoire
+WARMUP_REQUESTS = [
+    warmup_envelope(application.tns, "<tns:ComputeDebtRatio><tns:monthlyIncome>4000</tns:monthlyIncome>"
+                                     "<tns:monthlyDebtPayments>2500</tns:monthlyDebtPayments></tns:ComputeDebtRatio>"),
+    warmup_envelope(application.tns, "<tns:ComputeDebtRatioBatch><tns:items><tns:DebtRatioInput>"
+                                     "<tns:monthlyIncome>4000</tns:monthlyIncome>"
+                                     "<tns:monthlyDebtPayments>2500</tns:monthlyDebtPayments></tns:DebtRatioInput>"
+                                     "</tns:items></tns:ComputeDebtRatioBatch>"),
+]
+wsgi_app = readiness_from_env(wsgi_app, [("auto-appels SOAP", soap_self_calls(wsgi_app, WARMUP_REQUESTS))])
 
 # ----------------------
 # Serveur
 # ----------------------
 if __name__ == "__main__":
     print(f"DebtRatioService running at http://ratio_endettement_service:{8004}?wsdl")
-    server = make_server("0.0.0.0", 8004, wsgi_app)
-    server.serve_forever()
+    serve(wsgi_app, int(os.environ.get("PORT", 8004)), on_start=wsgi_app.readiness.start)
@@ -0,0 +1,4 @@
+# __init__.py pour le package common
+# Briques d'infrastructure partagées par tous les services SOAP
+# (validation, middlewares WSGI, ...). Chaque image Docker copie ce
+# dossier à côté du main.py du service.
@@ -0,0 +1,56 @@
+import io
+import json
+import os
+import threading
+import time
+
+# -------------------------------------------------------
+# 🎥 Capture des requêtes SOAP entrantes (pour rejeu)
+# -------------------------------------------------------
+# SOAP_CAPTURE_FILE=capture.jsonl : chaque POST reçu est ajouté au fichier,
+# une ligne JSON par requête :
+#   {"ts": 1700000000.123, "path": "/", "soapAction": "...",
+#    "contentType": "text/xml; charset=utf-8", "body": "<soapenv:Envelope ...>"}
+# `ts` est l'heure de réception : le rejeu (benchmarks/replay.py) respecte
+# les écarts entre requêtes, éventuellement accélérés.
+
+
+class CaptureMiddleware:
+    def __init__(self, app, path):
+        self.app = app
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "POST":
+            return self.app(environ, start_response)
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        body = environ["wsgi.input"].read(length) if length > 0 else b""
+        environ["wsgi.input"] = io.BytesIO(body)
+        self.record({
+            "ts": time.time(),
+            "path": environ.get("PATH_INFO", "/"),
+            "soapAction": environ.get("HTTP_SOAPACTION", ""),
+            "contentType": environ.get("CONTENT_TYPE", ""),
+            "body": body.decode("utf-8", errors="replace"),
+        })
+        return self.app(environ, start_response)
+
+    def record(self, entry):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        # une seule écriture O_APPEND par ligne : pas d'entrelacement entre workers
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+
+def capture_from_env(app):
+    """Enveloppe `app` si SOAP_CAPTURE_FILE est défini, sinon la retourne telle quelle."""
+    path = os.environ.get("SOAP_CAPTURE_FILE")
+    return CaptureMiddleware(app, path) if path else app
@@ -0,0 +1,144 @@
+import os
+import zlib
+
+# -------------------------------------------------------
+# 🔹 Paramètres de compression des réponses
+# -------------------------------------------------------
+# En dessous de ce seuil (octets), la réponse part telle quelle :
+# l'en-tête gzip et le coût CPU ne valent pas le gain.
+DEFAULT_MIN_SIZE = int(os.environ.get("SOAP_COMPRESS_MIN_SIZE", "1024"))
+DEFAULT_LEVEL = int(os.environ.get("SOAP_COMPRESS_LEVEL", "6"))
+
+COMPRESSIBLE_TYPES = ("text/", "application/xml", "application/soap+xml", "application/json")
+
+# wbits zlib : 31 = conteneur gzip, 15 = conteneur zlib ("deflate" HTTP)
+_WBITS = {"gzip": 31, "deflate": 15}
+
+
+def negotiate_encoding(accept_encoding):
+    """Choisit gzip ou deflate selon l'en-tête Accept-Encoding (q-values
+    comprises). Retourne None si aucun des deux n'est accepté."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in ("gzip", "deflate"):
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def add_vary(headers, value="Accept-Encoding"):
+    """Ajoute `value` à l'en-tête Vary (fusionné avec un Vary existant)."""
+    for i, (name, current) in enumerate(headers):
+        if name.lower() == "vary":
+            if value.lower() not in [v.strip().lower() for v in current.split(",")] and current.strip() != "*":
+                headers[i] = (name, f"{current}, {value}")
+            return headers
+    headers.append(("Vary", value))
+    return headers
+
+
+class CompressionMiddleware:
+    """
+    Compresse à la volée (gzip/deflate) les réponses dont la taille dépasse
+    `min_size`, sans attendre la fin de la réponse : une fois le seuil
+    atteint, les fragments produits par spyne sont compressés au fil de l'eau.
+
+    Toute réponse compressible (statut 2xx, type texte/XML/JSON) porte
+    `Vary: Accept-Encoding`, compressée ou non : un cache intermédiaire ne
+    doit pas resservir la version identité à un client gzip, ni l'inverse.
+    """
+
+    def __init__(self, app, min_size=DEFAULT_MIN_SIZE, level=DEFAULT_LEVEL):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate_encoding(environ.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None or environ.get("REQUEST_METHOD") == "HEAD":
+            def vary_start_response(status, headers, exc_info=None):
+                if self._compressible(status, headers):
+                    headers = add_vary(list(headers))
+                return start_response(status, headers, exc_info)
+
+            return self.app(environ, vary_start_response)
+
+        captured = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured["status"] = status
+            captured["headers"] = list(headers)
+            captured["exc_info"] = exc_info
+            return lambda data: captured.setdefault("written", []).append(data)
+
+        result = self.app(environ, capture_start_response)
+        return self._stream(result, captured, encoding, start_response)
+
+    def _compressible(self, status, headers):
+        if not status.startswith("2"):
+            return False
+        names = {name.lower(): value for name, value in headers}
+        if "content-encoding" in names:
+            return False
+        content_type = names.get("content-type", "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _stream(self, result, captured, encoding, start_response):
+        try:
+            chunks = iter(result)
+            buffered = list(captured.pop("written", []))
+            size = sum(len(c) for c in buffered)
+            exhausted = False
+            while size < self.min_size:
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    exhausted = True
+                    break
+                buffered.append(chunk)
+                size += len(chunk)
+
+            status, headers = captured["status"], captured["headers"]
+            if not self._compressible(status, headers):
+                start_response(status, headers, captured["exc_info"])
+                yield from buffered
+                yield from chunks
+                return
+            if exhausted:
+                start_response(status, add_vary(headers), captured["exc_info"])
+                yield from buffered
+                yield from chunks
+                return
+
+            headers = [(n, v) for n, v in headers if n.lower() != "content-length"]
+            headers.append(("Content-Encoding", encoding))
+            add_vary(headers)
+            start_response(status, headers, captured["exc_info"])
+
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS[encoding])
+            data = compressor.compress(b"".join(buffered))
+            if data:
+                yield data
+            for chunk in chunks:
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+            yield compressor.flush()
+        finally:
+            if hasattr(result, "close"):
+                result.close()
@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from common.soap_client import get_session, post_soap
+
+# -------------------------------------------------------
+# 🧭 Découverte des services et routage entre réplicas
+# -------------------------------------------------------
+# Endpoints par service, depuis l'environnement :
+#   SOAP_ENDPOINTS="ie_service=http://ie1:8001/,http://ie2:8001/;explain_service=http://explain:8005/"
+# ou depuis un fichier JSON (SOAP_ENDPOINTS_FILE) :
+#   {"ie_service": ["http://ie1:8001/", "http://ie2:8001/"]}
+# Un service absent de la configuration garde son URL par défaut.
+HEALTH_INTERVAL = float(os.environ.get("SOAP_HEALTH_INTERVAL", "10"))
+HEDGE_ENABLED = os.environ.get("SOAP_HEDGING", "1") == "1"
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+
+def parse_endpoints(spec):
+    """"svc=url1,url2;svc2=url3" → {"svc": ["url1", "url2"], "svc2": ["url3"]}"""
+    endpoints = {}
+    for entry in (spec or "").split(";"):
+        if "=" not in entry:
+            continue
+        name, urls = entry.split("=", 1)
+        endpoints[name.strip()] = [u.strip() for u in urls.split(",") if u.strip()]
+    return endpoints
+
+
+def load_endpoints():
+    endpoints = {}
+    path = os.environ.get("SOAP_ENDPOINTS_FILE")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            endpoints.update(json.load(f))
+    endpoints.update(parse_endpoints(os.environ.get("SOAP_ENDPOINTS")))
+    return endpoints
+
+
+class Endpoint:
+    def __init__(self, url):
+        self.url = url
+        self.outstanding = 0
+        self.healthy = True
+
+    def __repr__(self):
+        return f"Endpoint({self.url!r}, outstanding={self.outstanding}, healthy={self.healthy})"
+
+
+class ServicePool:
+    """
+    Réplicas d'un service. Chaque appel va au réplica sain qui a le moins
+    de requêtes en cours ; la latence observée (fenêtre glissante) donne le
+    p95 au-delà duquel une requête idempotente est doublée (hedging).
+    """
+
+    def __init__(self, name, urls):
+        self.name = name
+        self.endpoints = [Endpoint(u) for u in urls]
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.hedged = 0
+        self._lock = threading.Lock()
+
+    def choose(self, exclude=()):
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            healthy = [e for e in candidates if e.healthy] or candidates
+            if not healthy:
+                return None
+            endpoint = min(healthy, key=lambda e: e.outstanding)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint, latency=None, ok=True):
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.healthy = ok
+            if ok and latency is not None:
+                self.latencies.append(latency)
+
+    def hedge_delay(self):
+        """p95 de la latence récente, ou None tant que l'échantillon est trop petit."""
+        with self._lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95)]
+
+    def mark(self, endpoint, healthy):
+        with self._lock:
+            endpoint.healthy = healthy
+
+
+class ServiceRegistry:
+    """Point d'entrée des appels sortants : `registry.post("ie_service", enveloppe)`."""
+
+    def __init__(self, defaults, endpoints=None, hedge=HEDGE_ENABLED, health_interval=HEALTH_INTERVAL):
+        configured = endpoints if endpoints is not None else load_endpoints()
+        self.pools = {
+            name: ServicePool(name, configured.get(name) or [url])
+            for name, url in defaults.items()
+        }
+        self.hedge = hedge
+        self.health_interval = health_interval
+        self._executor = None
+        self._health_thread = None
+        self._lock = threading.Lock()
+        for pool in self.pools.values():
+            if len(pool.endpoints) > 1:
+                logging.info(f"🧭 {pool.name} : {len(pool.endpoints)} réplicas "
+                             f"({', '.join(e.url for e in pool.endpoints)})")
+
+    def pool(self, name):
+        return self.pools[name]
+
+    def post(self, name, envelope, idempotent=True, timeout=10):
+        """
+        Envoie l'enveloppe à un réplica du service. Un appel idempotent est
+        rejoué sur un autre réplica en cas d'erreur réseau, et doublé vers un
+        second réplica s'il dépasse le p95 observé. Les appels non idempotents
+        partent une seule fois.
+        """
+        pool = self.pools[name]
+        self._ensure_health_checks()
+        if not idempotent or len(pool.endpoints) < 2:
+            return self._send(pool, pool.choose(), envelope, timeout)
+
+        delay = pool.hedge_delay() if self.hedge else None
+        if delay is None:
+            return self._send_with_failover(pool, envelope, timeout)
+
+        first = pool.choose()
+        primary = self._submit(pool, first, envelope, timeout)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+        except Exception:
+            return self._send_with_failover(pool, envelope, timeout, exclude=(first,))
+
+        second = pool.choose(exclude=(first,))
+        if second is None:
+            return primary.result()
+        pool.hedged += 1
+        hedge = self._submit(pool, second, envelope, timeout)
+        done, pending = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+        # le premier terminé a échoué : on garde l'autre
+        return pending.pop().result() if pending else primary.result()
+
+    def _send(self, pool, endpoint, envelope, timeout):
+        start = time.perf_counter()
+        try:
+            resp = post_soap(endpoint.url, envelope, timeout=timeout)
+        except Exception:
+            pool.release(endpoint, ok=False)
+            raise
+        # une Fault SOAP (HTTP 500) reste une réponse : seul l'échec réseau compte
+        pool.release(endpoint, time.perf_counter() - start)
+        return resp
+
+    def _send_with_failover(self, pool, envelope, timeout, exclude=()):
+        tried = list(exclude)
+        while True:
+            endpoint = pool.choose(exclude=tried)
+            try:
+                return self._send(pool, endpoint, envelope, timeout)
+            except Exception as e:
+                tried.append(endpoint)
+                if len(tried) >= len(pool.endpoints):
+                    raise
+                logging.warning(f"⚠️ {pool.name} : {endpoint.url} en échec ({e}), essai d'un autre réplica")
+
+    def _submit(self, pool, endpoint, envelope, timeout):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="soap-hedge")
+        return self._executor.submit(self._send, pool, endpoint, envelope, timeout)
+
+    # -------------------------------------------------------
+    # 🩺 Vérifications de santé actives (services répliqués)
+    # -------------------------------------------------------
+    def _ensure_health_checks(self):
+        if self._health_thread is not None or self.health_interval <= 0:
+            return
+        with self._lock:
+            if self._health_thread is None and any(len(p.endpoints) > 1 for p in self.pools.values()):
+                self._health_thread = threading.Thread(target=self._health_loop, name="soap-health", daemon=True)
+                self._health_thread.start()
+
+    def _probe(self, pool, endpoint, timeout=2):
+        try:
+            ok = get_session().get(endpoint.url + "?wsdl", timeout=timeout).status_code == 200
+        except Exception:
+            ok = False
+        if ok != endpoint.healthy:
+            logging.warning(f"🩺 {pool.name} : {endpoint.url} {'rétabli' if ok else 'indisponible'}")
+        pool.mark(endpoint, ok)
+        return ok
+
+    def check_health(self):
+        for pool in self.pools.values():
+            if len(pool.endpoints) < 2:
+                continue
+            for endpoint in pool.endpoints:
+                self._probe(pool, endpoint)
+
+    def warm_up(self, timeout=2):
+        """Premier contact avec chaque réplica de chaque service (en parallèle,
+        au démarrage) : client HTTP chargé, noms résolus, WSDL du service en
+        aval servi une fois. Retourne {service: réplicas joignables}."""
+        targets = [(pool, endpoint) for pool in self.pools.values() for endpoint in pool.endpoints]
+        if not targets:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(len(targets), 16), thread_name_prefix="soap-warmup") as executor:
+            results = list(executor.map(lambda t: self._probe(*t, timeout=timeout), targets))
+        reachable = {name: 0 for name in self.pools}
+        for (pool, _), ok in zip(targets, results):
+            reachable[pool.name] += ok
+        return reachable
+
+    def _health_loop(self):
+        while True:
+            time.sleep(self.health_interval)
+            self.check_health()
+
+    def stats(self):
+        return {
+            name: {
+                "endpoints": [(e.url, e.outstanding, e.healthy) for e in pool.endpoints],
+                "p95": pool.hedge_delay(),
+                "hedged": pool.hedged,
+            }
+            for name, pool in self.pools.items()
+        }
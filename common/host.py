@@ -0,0 +1,148 @@
+import importlib.util
+import json
+import logging
+import os
+import sys
+
+from common.discovery import load_endpoints
+from common.wsdl import PrecomputedWsdlMiddleware
+
+# -------------------------------------------------------
+# 🏘️ Hôte multi-services (un seul processus)
+# -------------------------------------------------------
+# Pour les déploiements denses (edge, faible volume) : plusieurs services
+# montés sous un préfixe de chemin dans un seul processus, qui partage les
+# imports (spyne, lxml, numpy), le lanceur (SERVICE_WORKERS) et ses threads.
+#   http://hote:8000/credit_scoring_service/?wsdl
+#   http://hote:8000/ratio_endettement_service/
+# Chaque service garde son Application spyne, ses middlewares et son WSDL
+# (adresse = URL préfixée). Les appels entre services montés passent par la
+# boucle locale (SOAP_ENDPOINTS complété), sauf configuration explicite.
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# nom (celui des appels sortants) -> dossier du service
+SERVICES = {
+    "solvency_service": "solvency_service",
+    "ie_service": "ie_service",
+    "credit_scoring_service": "business_services/credit_scoring_service",
+    "decision_solvability_service": "business_services/decision_solvability_service",
+    "ratio_endettement_service": "business_services/ratio_endettement_service",
+    "explain_service": "business_services/explain_service",
+    "property_evaluation_service": "business_services/property_evaluation_service",
+    "approbation_service": "business_services/approbation_service",
+}
+
+
+def load_service(name):
+    """Importe le main.py du service sous un nom de module propre à l'hôte."""
+    directory = os.path.join(ROOT_DIR, SERVICES[name])
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(f"host_{name}", os.path.join(directory, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def loopback_endpoints(names, port):
+    """Complète SOAP_ENDPOINTS pour que les services montés s'appellent via
+    l'hôte (http://127.0.0.1:<port>/<service>/). Un service déjà configuré
+    (SOAP_ENDPOINTS, SOAP_ENDPOINTS_FILE) garde sa configuration."""
+    configured = load_endpoints()
+    extra = [f"{name}=http://127.0.0.1:{port}/{name}/" for name in names if name not in configured]
+    if extra:
+        os.environ["SOAP_ENDPOINTS"] = ";".join(filter(None, [os.environ.get("SOAP_ENDPOINTS")] + extra))
+
+
+def use_service_wsdl(app, directory):
+    """Le WSDL pré-calculé est lu dans le dossier du service (chaque service
+    a le sien, alors que WSDL_CACHE_PATH est relatif au dossier courant)."""
+    seen = set()
+    while app is not None and id(app) not in seen:
+        seen.add(id(app))
+        if isinstance(app, PrecomputedWsdlMiddleware) and not os.path.isabs(app.path):
+            app.path = os.path.join(directory, os.path.basename(app.path))
+        app = getattr(app, "app", None)
+
+
+class PrefixDispatcher:
+    """
+    Routage WSGI par premier segment de chemin : /<service>/... est servi par
+    le service, avec SCRIPT_NAME=/<service> (WSDL, /health et /ready du
+    service sous son préfixe). À la racine : /health, /ready (tous les
+    services prêts) et l'index des services montés.
+    """
+
+    def __init__(self, mounts):
+        self.mounts = dict(mounts)
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO") or "/"
+        name, _, rest = path.lstrip("/").partition("/")
+        app = self.mounts.get(name)
+        if app is not None:
+            environ["SCRIPT_NAME"] = environ.get("SCRIPT_NAME", "").rstrip("/") + "/" + name
+            environ["PATH_INFO"] = "/" + rest
+            return app(environ, start_response)
+
+        if environ.get("REQUEST_METHOD") in ("GET", "HEAD"):
+            if path == "/health":
+                return self._json(start_response, "200 OK", {"status": "alive", "pid": os.getpid()})
+            if path == "/ready":
+                status = self.readiness()
+                code = "200 OK" if status["status"] == "ready" else "503 Service Unavailable"
+                return self._json(start_response, code, status)
+            if path == "/":
+                return self._json(start_response, "200 OK", {"services": {n: f"/{n}/" for n in self.mounts}})
+        return self._json(start_response, "404 Not Found", {"error": f"aucun service monté sous {path}",
+                                                             "services": sorted(self.mounts)})
+
+    def readiness(self):
+        services = {}
+        for name, app in self.mounts.items():
+            readiness = getattr(app, "readiness", None)
+            services[name] = readiness.status() if readiness is not None else {"status": "ready"}
+        ready = all(s["status"] == "ready" for s in services.values())
+        return {"status": "ready" if ready else "warming", "pid": os.getpid(), "services": services}
+
+    @staticmethod
+    def _json(start_response, status, data):
+        body = json.dumps(data).encode("utf-8")
+        start_response(status, [("Content-Type", "application/json"), ("Content-Length", str(len(body))),
+                                ("Cache-Control", "no-store")])
+        return [body]
+
+
+def build_host(names, port):
+    """Charge et monte les services ; retourne (dispatcher, on_start, on_stop).
+    `on_start` démarre dans chaque worker ce que chaque service démarre seul
+    (`on_worker_start` s'il existe, sinon son préchauffage) ; `on_stop` appelle
+    les `on_worker_stop` des services à la sortie du worker."""
+    unknown = [name for name in names if name not in SERVICES]
+    if unknown:
+        raise ValueError(f"Service(s) inconnu(s) : {', '.join(unknown)} (connus : {', '.join(SERVICES)})")
+    loopback_endpoints(names, port)
+    modules = {}
+    for name in names:
+        modules[name] = load_service(name)
+        use_service_wsdl(modules[name].wsgi_app, os.path.join(ROOT_DIR, SERVICES[name]))
+    starters = [getattr(m, "on_worker_start", None) or m.wsgi_app.readiness.start for m in modules.values()]
+    stoppers = [m.on_worker_stop for m in modules.values() if hasattr(m, "on_worker_stop")]
+
+    def on_start():
+        for start in starters:
+            start()
+
+    def on_stop():
+        for stop in stoppers:
+            stop()
+
+    logging.info(f"🏘️ {len(modules)} service(s) montés : {', '.join(f'/{n}/' for n in modules)}")
+    return PrefixDispatcher({name: m.wsgi_app for name, m in modules.items()}), on_start, on_stop
+
+
+def host_from_env(port):
+    """HOST_SERVICES : services montés, séparés par des virgules (défaut : tous)."""
+    names = [n.strip() for n in os.environ.get("HOST_SERVICES", ",".join(SERVICES)).split(",") if n.strip()]
+    return build_host(names, port)
@@ -0,0 +1,356 @@
+import json
+import logging
+import os
+import resource
+import signal
+import socket
+import tempfile
+import threading
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from common.profiling import profiling_from_env
+
+# -------------------------------------------------------
+# 🚀 Lanceur multi-processus des services SOAP
+# -------------------------------------------------------
+# SERVICE_WORKERS=N      : N processus workers (pré-fork), sans état partagé
+# SERVICE_MAX_REQUESTS=N : un worker est remplacé après N requêtes
+# SERVICE_METRICS_DIR    : métriques par worker (agrégées sur GET /metrics)
+# SERVICE_REUSEPORT=0    : socket unique partagé au lieu de SO_REUSEPORT
+# Profilage (common/profiling.py) : X-Profile par requête, GET /debug/sample
+# SIGHUP : redémarrage progressif des workers ; SIGTERM/SIGINT : arrêt propre.
+METRICS_PATH = "/metrics"
+REUSEPORT = hasattr(socket, "SO_REUSEPORT")
+
+
+class _ThreadedServer(ThreadingMixIn, WSGIServer):
+    # threads attendus à la fermeture : les requêtes en cours se terminent
+    daemon_threads = False
+    block_on_close = True
+
+
+# -------------------------------------------------------
+# 📊 Métriques par worker
+# -------------------------------------------------------
+class WorkerMetrics:
+    """Compteurs du worker courant, écrits dans `<dir>/worker-<pid>.json`
+    (au plus une fois par seconde) pour être agrégés par n'importe quel worker."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.pid = os.getpid()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._flushed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, status):
+        with self._lock:
+            self.requests += 1
+            self.busy_seconds += seconds
+            if status.startswith("5"):
+                self.errors += 1
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        if time.monotonic() - self._flushed >= 1.0:
+            self.flush()
+
+    def snapshot(self):
+        return {
+            "pid": self.pid,
+            "started": self.started,
+            "requests": self.requests,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 6),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+
+    def flush(self):
+        with self._lock:
+            self._flushed = time.monotonic()
+            data = self.snapshot()
+        path = os.path.join(self.directory, f"worker-{self.pid}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def aggregate_metrics(directory):
+    """Totaux depuis le démarrage (workers recyclés compris) et détail des workers actifs."""
+    workers = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("worker-") and name.endswith(".json"):
+            try:
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    workers.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    live = [w for w in workers if _alive(w["pid"])]
+    return {
+        "workers": len(live),
+        "recycled": len(workers) - len(live),
+        "requests": sum(w["requests"] for w in workers),
+        "errors": sum(w["errors"] for w in workers),
+        "busy_seconds": round(sum(w["busy_seconds"] for w in workers), 6),
+        "per_worker": live,
+    }
+
+
+class MetricsMiddleware:
+    """Compte les requêtes du worker et sert l'agrégat sur GET /metrics."""
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") == "GET" and environ.get("PATH_INFO") == METRICS_PATH:
+            self.metrics.flush()
+            body = json.dumps(aggregate_metrics(self.metrics.directory), indent=2).encode("utf-8")
+            start_response("200 OK", [("Content-Type", "application/json"),
+                                      ("Content-Length", str(len(body)))])
+            return [body]
+
+        start = time.perf_counter()
+        captured = {}
+
+        def counting_start_response(status, headers, exc_info=None):
+            captured["status"] = status
+            return start_response(status, headers, exc_info)
+
+        try:
+            result = self.app(environ, counting_start_response)
+        except Exception:
+            self.metrics.record(time.perf_counter() - start, "500")
+            raise
+        return _RecordedResponse(result, lambda: self.metrics.record(
+            time.perf_counter() - start, captured.get("status", "500")))
+
+
+class _RecordedResponse:
+    """Corps de réponse dont la fin (close, appelé par le serveur après
+    l'envoi) enregistre la requête : le statut n'est connu qu'une fois le
+    corps parcouru (CompressionMiddleware appelle start_response à ce
+    moment-là) et la durée inclut l'envoi du corps."""
+
+    def __init__(self, result, on_close):
+        self.result = result
+        self.on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        return iter(self.result)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if hasattr(self.result, "close"):
+                self.result.close()
+        finally:
+            self.on_close()
+
+
+# -------------------------------------------------------
+# 👷 Worker
+# -------------------------------------------------------
+def _listening_socket(host, port, reuseport):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuseport:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    return sock
+
+
+def _make_server(app, sock, threaded):
+    server_class = _ThreadedServer if threaded else WSGIServer
+    server = server_class(sock.getsockname(), WSGIRequestHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    # équivalent de server_bind() pour un socket déjà ouvert
+    server.server_address = sock.getsockname()
+    server.server_name = socket.getfqdn(server.server_address[0])
+    server.server_port = server.server_address[1]
+    server.setup_environ()
+    server.set_app(app)
+    server.timeout = 0.5
+    return server
+
+
+def run_worker(app, sock, threaded=False, max_requests=0, metrics_dir=None, on_start=None, on_stop=None):
+    """Boucle d'un worker : sert jusqu'à SIGTERM ou `max_requests` requêtes.
+    `on_stop` est appelé à la sortie, requêtes en cours terminées (le worker
+    d'un Launcher sort par os._exit : les handlers atexit ne tournent pas)."""
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+
+    metrics = WorkerMetrics(metrics_dir or tempfile.mkdtemp(prefix="soap-metrics-"))
+    metrics.flush()
+    if on_start is not None:
+        on_start()
+
+    server = _make_server(MetricsMiddleware(profiling_from_env(app), metrics), sock, threaded)
+    try:
+        while not stopping.is_set() and not (max_requests and metrics.requests >= max_requests):
+            server.handle_request()
+            metrics.flush_if_due()
+    finally:
+        server.server_close()
+        if on_stop is not None:
+            try:
+                on_stop()
+            except Exception:
+                logging.exception("Erreur à l'arrêt du worker")
+        metrics.flush()
+    if max_requests and metrics.requests >= max_requests:
+        logging.info(f"♻️ Worker {os.getpid()} recyclé après {metrics.requests} requêtes")
+
+
+# -------------------------------------------------------
+# 🧑‍✈️ Maître pré-fork
+# -------------------------------------------------------
+class Launcher:
+    """
+    Processus maître : lance `workers` processus qui écoutent tous le même
+    port (SO_REUSEPORT : un socket par worker, réparti par le noyau ; sinon
+    socket ouvert par le maître et partagé). Un worker qui s'arrête (recyclage,
+    plantage) est remplacé.
+    """
+
+    def __init__(self, app, port, host="0.0.0.0", workers=2, threaded=False,
+                 max_requests=0, metrics_dir=None, on_start=None, reuseport=REUSEPORT, on_stop=None):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threaded = threaded
+        self.max_requests = max_requests
+        self.metrics_dir = metrics_dir or tempfile.mkdtemp(prefix=f"soap-metrics-{port}-")
+        self.on_start = on_start
+        self.on_stop = on_stop
+        self.reuseport = reuseport
+        self.children = set()
+        self._shared = None if reuseport else _listening_socket(host, port, False)
+        self._stopping = False
+        self._restart = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                sock = _listening_socket(self.host, self.port, True) if self.reuseport else self._shared
+                run_worker(self.app, sock, self.threaded, self.max_requests, self.metrics_dir, self.on_start,
+                           self.on_stop)
+            except Exception:
+                logging.exception("Erreur worker")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children.add(pid)
+        return pid
+
+    def stop(self, *_):
+        self._stopping = True
+
+    def restart(self, *_):
+        self._restart = True
+
+    def rolling_restart(self):
+        """Nouveaux workers d'abord, puis arrêt propre des anciens."""
+        old = set(self.children)
+        logging.info(f"🔄 Redémarrage progressif de {len(old)} worker(s)")
+        for _ in range(self.workers):
+            self.spawn()
+        for pid in old:
+            self._signal(pid, signal.SIGTERM)
+
+    def _signal(self, pid, sig):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            self.children.discard(pid)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.children.discard(pid)
+
+    def run(self):
+        for name in os.listdir(self.metrics_dir):
+            if name.startswith("worker-"):
+                os.remove(os.path.join(self.metrics_dir, name))
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGHUP, self.restart)
+        mode = "SO_REUSEPORT" if self.reuseport else "socket partagé"
+        logging.info(f"🧑‍✈️ Maître {os.getpid()} : {self.workers} worker(s) sur le port {self.port} ({mode}), "
+                     f"métriques sur {METRICS_PATH}")
+        for _ in range(self.workers):
+            self.spawn()
+
+        while not self._stopping:
+            time.sleep(0.2)
+            self._reap()
+            if self._restart:
+                self._restart = False
+                self.rolling_restart()
+            while not self._stopping and len(self.children) < self.workers:
+                self.spawn()
+
+        for pid in list(self.children):
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.time() + 30
+        while self.children and time.time() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.children):
+            self._signal(pid, signal.SIGKILL)
+        logging.info("🛑 Arrêt du maître")
+
+
+def serve(app, port, host="0.0.0.0", threaded=False, on_start=None, on_stop=None):
+    """
+    Point d'entrée des services (`python main.py`). Avec SERVICE_WORKERS=1
+    et sans recyclage, sert dans le processus courant comme auparavant.
+    """
+    workers = int(os.environ.get("SERVICE_WORKERS", "1"))
+    max_requests = int(os.environ.get("SERVICE_MAX_REQUESTS", "0"))
+    metrics_dir = os.environ.get("SERVICE_METRICS_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+
+    if workers <= 1 and not max_requests:
+        run_worker(app, _listening_socket(host, port, False), threaded, 0, metrics_dir, on_start, on_stop)
+        return
+
+    reuseport = REUSEPORT and os.environ.get("SERVICE_REUSEPORT", "1") == "1"
+    Launcher(app, port, host=host, workers=max(workers, 1), threaded=threaded,
+             max_requests=max_requests, metrics_dir=metrics_dir, on_start=on_start,
+             reuseport=reuseport, on_stop=on_stop).run()
@@ -0,0 +1,26 @@
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module importé seulement au premier accès à l'un de ses attributs.
+    Évite de payer au démarrage l'import de dépendances lourdes (requests,
+    numpy, spacy...) dont le service n'a pas besoin pour répondre."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,94 @@
+import io
+import os
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+# -------------------------------------------------------
+# 📏 Limites de taille des requêtes (avant spyne)
+# -------------------------------------------------------
+# Une requête dont le corps dépasse `max_body_bytes` est refusée sur son
+# seul Content-Length, sans lire le corps. Au-delà de `max_text_chars`
+# octets de corps, un parcours en flux (iterparse, entités non résolues)
+# vérifie qu'aucun texte d'élément ne dépasse `max_text_chars` caractères
+# avant que spyne ne construise quoi que ce soit. En dessous, aucun texte
+# ne peut dépasser la limite (au moins un octet par caractère) : pas de
+# coût supplémentaire pour les requêtes ordinaires. Un POST sans
+# Content-Length (411) ou avec un Content-Length invalide (400) est refusé :
+# sa taille ne pourrait pas être vérifiée avant lecture.
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+DEFAULT_MAX_TEXT_CHARS = 10000
+
+FAULT_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap11env:Envelope xmlns:soap11env="http://schemas.xmlsoap.org/soap/envelope/">'
+    '<soap11env:Body><soap11env:Fault>'
+    '<faultcode>soap11env:{code}</faultcode><faultstring>{message}</faultstring>'
+    '</soap11env:Fault></soap11env:Body></soap11env:Envelope>'
+)
+
+
+def oversized_text(body, max_chars):
+    """Nom local du premier élément dont le texte dépasse `max_chars`
+    caractères, ou None (XML invalide compris : spyne répondra)."""
+    try:
+        for _, elem in etree.iterparse(io.BytesIO(body), events=("end",), resolve_entities=False,
+                                       no_network=True, huge_tree=False):
+            for text in (elem.text, elem.tail):
+                if text is not None and len(text) > max_chars:
+                    return etree.QName(elem).localname
+            elem.clear(keep_tail=True)
+    except etree.XMLSyntaxError:
+        return None
+    return None
+
+
+class RequestLimitMiddleware:
+    def __init__(self, app, max_body_bytes=DEFAULT_MAX_BODY_BYTES, max_text_chars=DEFAULT_MAX_TEXT_CHARS):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.max_text_chars = max_text_chars
+        self.rejected = 0
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "POST":
+            return self.app(environ, start_response)
+        declared = (environ.get("CONTENT_LENGTH") or "").strip()
+        if not declared:
+            return self._reject(start_response, "Client.LengthRequired",
+                                "En-tête Content-Length requis.", "411 Length Required")
+        try:
+            length = int(declared)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return self._reject(start_response, "Client.InvalidContentLength",
+                                f"Content-Length invalide ({declared[:20]}).", "400 Bad Request")
+
+        if self.max_body_bytes and length > self.max_body_bytes:
+            return self._reject(start_response, "Client.RequestTooLarge",
+                                f"Corps de requête trop volumineux ({length} octets, maximum {self.max_body_bytes}).")
+        if self.max_text_chars and length > self.max_text_chars:
+            body = environ["wsgi.input"].read(length)
+            environ["wsgi.input"] = io.BytesIO(body)
+            field = oversized_text(body, self.max_text_chars)
+            if field is not None:
+                return self._reject(start_response, "Client.TextTooLong",
+                                    f"Texte trop long dans <{field}> (maximum {self.max_text_chars} caractères).")
+        return self.app(environ, start_response)
+
+    def _reject(self, start_response, code, message, status="413 Payload Too Large"):
+        self.rejected += 1
+        body = FAULT_TEMPLATE.format(code=code, message=escape(message)).encode("utf-8")
+        start_response(status, [("Content-Type", "text/xml; charset=utf-8"),
+                                                 ("Content-Length", str(len(body)))])
+        return [body]
+
+
+def limits_from_env(app):
+    """SOAP_MAX_BODY_BYTES et SOAP_MAX_TEXT_CHARS (0 : pas de limite)."""
+    max_body = int(os.environ.get("SOAP_MAX_BODY_BYTES", str(DEFAULT_MAX_BODY_BYTES)))
+    max_text = int(os.environ.get("SOAP_MAX_TEXT_CHARS", str(DEFAULT_MAX_TEXT_CHARS)))
+    if not max_body and not max_text:
+        return app
+    return RequestLimitMiddleware(app, max_body, max_text)
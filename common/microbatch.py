@@ -0,0 +1,111 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# -------------------------------------------------------
+# 📦 Micro-batching des appels sortants
+# -------------------------------------------------------
+# Les appels concurrents à une même opération sont regroupés pendant
+# SOAP_BATCH_WINDOW_MS millisecondes (ou jusqu'à SOAP_BATCH_MAX_ITEMS
+# éléments) puis envoyés en une seule requête vers l'opération *Batch du
+# service ; chaque appelant reçoit le résultat de son élément.
+# SOAP_BATCH_WINDOW_MS=0 (défaut) : pas de regroupement, un appel par élément.
+DEFAULT_WINDOW_MS = float(os.environ.get("SOAP_BATCH_WINDOW_MS", "0"))
+DEFAULT_MAX_ITEMS = int(os.environ.get("SOAP_BATCH_MAX_ITEMS", "32"))
+
+
+class MicroBatcher:
+    """
+    `send_batch(items)` reçoit la liste des éléments du lot et retourne la
+    liste des résultats dans le même ordre. Une exception est transmise à
+    tous les appelants du lot.
+
+    Le thread de regroupement démarre à la première soumission. Créé à
+    l'import, avant le fork des workers (common/launcher.py), le batcher
+    repart d'un état neuf dans chaque processus enfant : les threads du
+    parent n'y existent pas.
+    """
+
+    def __init__(self, name, send_batch, window=0.002, max_items=32, max_in_flight=8):
+        self.name = name
+        self.send_batch = send_batch
+        self.window = window
+        self.max_items = max(max_items, 1)
+        self.max_in_flight = max_in_flight
+        self.batches = 0
+        self.items = 0
+        self._reset()
+        ref = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: ref() is not None and ref()._reset())
+
+    def _reset(self):
+        """État propre au processus : file, verrou, threads (aucun démarré)."""
+        self._pending = []
+        self._deadline = None
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix=f"batch-{self.name}")
+        self._thread = None
+
+    def submit(self, item):
+        future = Future()
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=f"batcher-{self.name}", daemon=True)
+                self._thread.start()
+            self._pending.append((item, future))
+            if len(self._pending) == 1:
+                self._deadline = time.monotonic() + self.window
+            if len(self._pending) >= self.max_items or len(self._pending) == 1:
+                self._cond.notify()
+        return future
+
+    def call(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                while len(self._pending) < self.max_items:
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_items]
+                del self._pending[:self.max_items]
+                if self._pending:
+                    self._deadline = time.monotonic() + self.window
+            self._executor.submit(self._send, batch)
+
+    def _send(self, batch):
+        with self._cond:
+            self.batches += 1
+            self.items += len(batch)
+        try:
+            results = self.send_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"{self.name} : {len(results)} résultat(s) pour {len(batch)} élément(s)")
+        except Exception as e:
+            logging.error(f"Erreur lot {self.name} ({len(batch)} élément(s)) : {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self):
+        return {"batches": self.batches, "items": self.items,
+                "avg_size": self.items / self.batches if self.batches else 0.0}
+
+
+def batcher_from_env(name, send_batch, window_ms=None, max_items=None):
+    """Un MicroBatcher si SOAP_BATCH_WINDOW_MS > 0, sinon None (appels unitaires)."""
+    window_ms = DEFAULT_WINDOW_MS if window_ms is None else window_ms
+    if window_ms <= 0:
+        return None
+    return MicroBatcher(name, send_batch, window=window_ms / 1000.0,
+                        max_items=DEFAULT_MAX_ITEMS if max_items is None else max_items)
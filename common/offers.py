@@ -0,0 +1,161 @@
+from common.lazy import lazy_import
+from common.rules import (
+    LTV_MAX, LTV_OPTIMAL, MAX_DEBT_RATIO, MAX_DURATION_YEARS, MIN_CREDIT_SCORE, MIN_DURATION_YEARS,
+    MIN_VALUE_MARGIN, OPTIMAL_MAX_DURATION_YEARS, RATE_CONDITIONAL, RATE_OPTIMAL, RISK_MAX, RISK_OPTIMAL_MAX,
+)
+
+np = lazy_import("numpy")
+
+# -------------------------------------------------------
+# 🏦 Optimiseur d'offre de prêt (grille montant × durée vectorisée)
+# -------------------------------------------------------
+# Toutes les combinaisons de la grille sont évaluées d'un coup avec les
+# règles de common/rules.py :
+#   - évaluation du bien : durée dans [10, 30] ans, valeur ≥ montant × 1.1 ;
+#   - approbation : LTV ≤ 0.9 (conditions optimales si LTV ≤ 0.8 et ≤ 25 ans) ;
+#   - décision : score ≥ 700 et ratio d'endettement, mensualité comprise, ≤ 40 %.
+# Le score de risque de l'approbation est tiré au hasard (uniforme sur
+# [0, 1]) : une offre admissible est accordée avec une probabilité de
+# RISK_MAX, et le taux retenu est son espérance sachant l'accord.
+DEFAULT_AMOUNT_STEP = 1000.0
+# au-delà, le pas est élargi (multiple du pas demandé) : la grille reste
+# bornée à MAX_GRID_AMOUNTS × 21 cellules quelle que soit la valeur du bien
+MAX_GRID_AMOUNTS = 5000
+# valeur de bien (et montant demandé) au-delà de laquelle la demande est rejetée
+MAX_PROPERTY_VALUE = 100_000_000.0
+
+
+def _expected_rate(ltv, optimal):
+    """Taux espéré sachant l'accord (risque uniforme sur [0, RISK_MAX[)."""
+    share_optimal = RISK_OPTIMAL_MAX / RISK_MAX
+    rate_optimal = RATE_OPTIMAL[0] + RATE_OPTIMAL[1] * ltv + RATE_OPTIMAL[2] * RISK_OPTIMAL_MAX / 2
+    rate_high_risk = RATE_CONDITIONAL[0] + RATE_CONDITIONAL[1] * ltv + RATE_CONDITIONAL[2] * (RISK_OPTIMAL_MAX + RISK_MAX) / 2
+    rate_conditional = RATE_CONDITIONAL[0] + RATE_CONDITIONAL[1] * ltv + RATE_CONDITIONAL[2] * RISK_MAX / 2
+    return np.where(optimal, share_optimal * rate_optimal + (1 - share_optimal) * rate_high_risk, rate_conditional)
+
+
+def monthly_payment(amount, years, annual_rate):
+    """Mensualité d'un prêt amortissable (taux annuel en %)."""
+    r = np.asarray(annual_rate, dtype=float) / 1200.0
+    n = np.asarray(years, dtype=float) * 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = amount * r / (1 - (1 + r) ** -n)
+    return np.where(r > 0, payment, amount / n)
+
+
+def evaluate_grid(amounts, durations, credit_score, monthly_income, monthly_expenses, property_value,
+                  property_ok=True):
+    """
+    Évalue la grille `amounts` (lignes) × `durations` (colonnes).
+    Retourne un dict de tableaux 2D : feasible, ltv, optimal, rate, payment, debt_ratio.
+    """
+    A = np.asarray(amounts, dtype=float)[:, None]
+    D = np.asarray(durations, dtype=float)[None, :]
+
+    ltv = A / property_value if property_value > 0 else np.full_like(A, np.inf)
+    property_pass = (bool(property_ok) & (property_value >= A * MIN_VALUE_MARGIN)
+                     & (D >= MIN_DURATION_YEARS) & (D <= MAX_DURATION_YEARS))
+    optimal = (ltv <= LTV_OPTIMAL) & (D <= OPTIMAL_MAX_DURATION_YEARS)
+    approval_pass = ltv <= LTV_MAX
+
+    rate = _expected_rate(ltv, optimal)
+    payment = monthly_payment(A, D, rate)
+    # même formule que debt_ratio : charges annuelles / 12 rapportées au revenu
+    if monthly_income > 0:
+        debt_ratio = (monthly_expenses / 12.0 + payment) / monthly_income * 100
+    else:
+        debt_ratio = np.zeros_like(payment)
+    decision_pass = (credit_score >= MIN_CREDIT_SCORE) & (debt_ratio <= MAX_DEBT_RATIO)
+
+    shape = np.broadcast_shapes(A.shape, D.shape)
+    return {
+        "feasible": np.broadcast_to(property_pass & approval_pass & decision_pass, shape),
+        "ltv": np.broadcast_to(ltv, shape),
+        "optimal": np.broadcast_to(optimal, shape),
+        "rate": rate,
+        "payment": payment,
+        "debt_ratio": np.broadcast_to(debt_ratio, shape),
+    }
+
+
+def default_grid(property_value, step=DEFAULT_AMOUNT_STEP, max_amounts=MAX_GRID_AMOUNTS):
+    """Montants jusqu'à la LTV maximale (au plus `max_amounts`, le pas est
+    élargi au besoin), durées autorisées par l'évaluation du bien."""
+    ceiling = property_value * LTV_MAX
+    if max_amounts and ceiling / step > max_amounts:
+        step = np.ceil(ceiling / (step * max_amounts)) * step
+    top = max(step, np.floor(ceiling / step) * step)
+    return np.arange(step, top + step / 2, step), np.arange(MIN_DURATION_YEARS, MAX_DURATION_YEARS + 1)
+
+
+def _offer(grid, amounts, durations, i, j):
+    return {
+        "amount": float(amounts[i]),
+        "durationYears": int(durations[j]),
+        "ltv": round(float(grid["ltv"][i, j]), 4),
+        "interestRate": round(float(grid["rate"][i, j]), 3),
+        "monthlyPayment": round(float(grid["payment"][i, j]), 2),
+        "debtRatio": round(float(grid["debt_ratio"][i, j]), 2),
+        "approvalProbability": RISK_MAX,
+        "tier": "optimal" if grid["optimal"][i, j] else "conditions",
+    }
+
+
+def optimize_offers(credit_score, monthly_income, monthly_expenses, property_value,
+                    requested_amount=None, requested_duration=None, property_ok=True,
+                    amounts=None, durations=None):
+    """
+    Frontière des offres accordables : pour chaque durée, le plus grand
+    montant admissible. `best` est l'offre admissible la plus proche de la
+    demande (plus grand montant ≤ montant demandé, puis durée la plus proche).
+    """
+    if amounts is None or durations is None:
+        grid_amounts, grid_durations = default_grid(property_value)
+        amounts = grid_amounts if amounts is None else amounts
+        durations = grid_durations if durations is None else durations
+    amounts = np.asarray(amounts, dtype=float)
+    durations = np.asarray(durations, dtype=int)
+    grid = evaluate_grid(amounts, durations, credit_score, monthly_income, monthly_expenses,
+                         property_value, property_ok)
+    feasible = grid["feasible"]
+
+    # dernier montant admissible de chaque colonne
+    any_feasible = feasible.any(axis=0)
+    last = amounts.size - 1 - feasible[::-1].argmax(axis=0)
+    frontier = [_offer(grid, amounts, durations, last[j], j) for j in np.flatnonzero(any_feasible)]
+
+    best = None
+    if feasible.any():
+        cap = requested_amount if requested_amount else amounts.max()
+        candidates = feasible & (amounts[:, None] <= cap + 1e-9)
+        if not candidates.any():
+            candidates = feasible
+        target = requested_duration if requested_duration else durations.min()
+        # plus grand montant d'abord, puis durée la plus proche de la demande
+        key = np.where(candidates, amounts[:, None] * 1000 - np.abs(durations[None, :] - target), -np.inf)
+        i, j = np.unravel_index(np.argmax(key), key.shape)
+        best = _offer(grid, amounts, durations, i, j)
+
+    requested = None
+    if requested_amount and requested_duration:
+        requested = offer_for(requested_amount, requested_duration, credit_score, monthly_income,
+                              monthly_expenses, property_value, property_ok)
+
+    return {
+        "frontier": frontier,
+        "best": best,
+        "requested": requested,
+        "evaluated": int(feasible.size),
+        "feasibleCount": int(feasible.sum()),
+    }
+
+
+def offer_for(amount, duration, credit_score, monthly_income, monthly_expenses, property_value, property_ok=True):
+    """Une seule combinaison (la demande initiale), avec son admissibilité."""
+    grid = evaluate_grid([amount], [duration], credit_score, monthly_income, monthly_expenses,
+                         property_value, property_ok)
+    result = _offer(grid, [float(amount)], [int(duration)], 0, 0)
+    result["feasible"] = bool(grid["feasible"][0, 0])
+    if not result["feasible"]:
+        result["approvalProbability"] = 0.0
+    return result
@@ -0,0 +1,242 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qs
+
+# -------------------------------------------------------
+# 🔬 Profilage à la demande des services
+# -------------------------------------------------------
+# Par requête : en-tête `X-Profile: <SERVICE_PROFILE_TOKEN>` → la requête
+# est exécutée sous cProfile. Les stats sont enregistrées dans
+# SERVICE_PROFILE_DIR (en-tête de réponse X-Profile-File), ou renvoyées à la
+# place de la réponse avec `X-Profile-Output: inline`.
+#
+# Échantillonnage : GET /debug/sample?seconds=10&interval=0.005 relève la pile
+# de tous les threads du processus et renvoie des piles repliées
+# ("a;b;c 42", format flamegraph.pl / speedscope). Serveur mono-thread : la
+# collecte tourne en arrière-plan, le résultat est servi par
+# GET /debug/sample/<id> (202 tant qu'il n'est pas prêt).
+# Les piles exposent le code : la route n'existe que si SERVICE_PROFILE_TOKEN
+# est défini, exige le jeton (X-Profile), et un seul échantillonnage à la
+# fois par processus (409 sinon).
+SAMPLE_PATH = "/debug/sample"
+MAX_SAMPLE_SECONDS = 60.0
+PSTATS_LINES = 40
+
+# feuilles de pile d'un thread inactif (attente de requête, de travail…)
+IDLE_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"), ("socket.py", "accept"), ("queue.py", "get"),
+    ("socketserver.py", "serve_forever"), ("launcher.py", "run"),
+}
+
+
+def _frame_label(code):
+    path = code.co_filename
+    parts = path.replace("\\", "/").rsplit("/", 2)
+    return f"{'/'.join(parts[-2:])}:{code.co_name}"
+
+
+def collapse(frame):
+    """Pile d'un thread, de la racine à la feuille : "a.py:f;b.py:g"."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _idle(frame):
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+
+
+class StackSampler:
+    """Relève les piles de tous les threads (hors lui-même et `exclude`)
+    toutes les `interval` secondes pendant `seconds` secondes."""
+
+    def __init__(self, seconds, interval=0.005, exclude=(), include_idle=False):
+        self.seconds = min(max(seconds, 0.0), MAX_SAMPLE_SECONDS)
+        self.interval = max(interval, 0.001)
+        self.exclude = set(exclude)
+        self.include_idle = include_idle
+        self.stacks = Counter()
+        self.samples = 0
+        self.done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def run(self):
+        me = threading.get_ident()
+        deadline = time.perf_counter() + self.seconds
+        try:
+            while time.perf_counter() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == me or ident in self.exclude:
+                        continue
+                    if not self.include_idle and _idle(frame):
+                        continue
+                    self.stacks[collapse(frame)] += 1
+                self.samples += 1
+                time.sleep(self.interval)
+        finally:
+            self.done.set()
+
+    def collapsed(self):
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, token=None, directory=None, sampling=True):
+        self.app = app
+        self.token = token
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "soap-profiles")
+        # pas de jeton : pas d'échantillonnage (piles du code exposées)
+        self.sampling = sampling and bool(token)
+        # un seul cProfile et un seul échantillonneur actifs à la fois par processus
+        self._profile_lock = threading.Lock()
+        self._sample_lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _authorized(self, environ):
+        if not self.token:
+            return False
+        given = environ.get("HTTP_X_PROFILE", "")
+        return hmac.compare_digest(given.encode("utf-8"), self.token.encode("utf-8"))
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if self.sampling and environ.get("REQUEST_METHOD") == "GET" and path.startswith(SAMPLE_PATH):
+            if not self._authorized(environ):
+                return _text(start_response, "403 Forbidden", "Jeton de profilage invalide.\n")
+            return self.sample(environ, start_response, path[len(SAMPLE_PATH):].strip("/"))
+        if environ.get("HTTP_X_PROFILE") and self._authorized(environ):
+            return self.profile_request(environ, start_response)
+        return self.app(environ, start_response)
+
+    # -------------------------------------------------------
+    # ⏱️ cProfile sur une requête
+    # -------------------------------------------------------
+    def profile_request(self, environ, start_response):
+        if not self._profile_lock.acquire(blocking=False):
+            return _text(start_response, "409 Conflict", "Profilage déjà en cours dans ce processus.\n")
+        captured = {}
+
+        def capturing_start_response(status, headers, exc_info=None):
+            captured["status"], captured["headers"] = status, list(headers)
+            return lambda data: captured.setdefault("written", []).append(data)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                result = self.app(environ, capturing_start_response)
+                try:
+                    body = b"".join(captured.get("written", [])) + b"".join(result)
+                finally:
+                    if hasattr(result, "close"):
+                        result.close()
+            finally:
+                profiler.disable()
+        finally:
+            self._profile_lock.release()
+
+        if environ.get("HTTP_X_PROFILE_OUTPUT", "").lower() == "inline":
+            out = io.StringIO()
+            stats = pstats.Stats(profiler, stream=out)
+            stats.sort_stats("cumulative").print_stats(PSTATS_LINES)
+            return _text(start_response, "200 OK", f"{captured.get('status')}\n\n{out.getvalue()}")
+
+        name = f"request-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:6]}.prof"
+        profiler.dump_stats(os.path.join(self.directory, name))
+        headers = [(k, v) for k, v in captured["headers"] if k.lower() != "content-length"]
+        headers += [("Content-Length", str(len(body))), ("X-Profile-File", name)]
+        start_response(captured["status"], headers)
+        return [body]
+
+    # -------------------------------------------------------
+    # 📈 Échantillonnage des piles
+    # -------------------------------------------------------
+    def sample(self, environ, start_response, sample_id):
+        if sample_id:
+            return self._sample_result(start_response, sample_id)
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        try:
+            seconds = float(query.get("seconds", ["10"])[0])
+            interval = float(query.get("interval", ["0.005"])[0])
+        except ValueError:
+            return _text(start_response, "400 Bad Request", "seconds/interval invalides.\n")
+        include_idle = query.get("idle", ["0"])[0] == "1"
+        if not self._sample_lock.acquire(blocking=False):
+            return _text(start_response, "409 Conflict", "Échantillonnage déjà en cours dans ce processus.\n")
+        sampler = StackSampler(seconds, interval, exclude={threading.get_ident()}, include_idle=include_idle)
+
+        if environ.get("wsgi.multithread"):
+            try:
+                sampler.start().done.wait()
+            finally:
+                self._sample_lock.release()
+            return _text(start_response, "200 OK", sampler.collapsed(), _sample_headers(sampler))
+
+        # serveur mono-thread : ne pas bloquer la boucle de requêtes pendant la collecte
+        sample_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        target = os.path.join(self.directory, f"sample-{sample_id}.txt")
+
+        def collect():
+            try:
+                sampler.run()
+                with open(target + ".tmp", "w", encoding="utf-8") as f:
+                    f.write(sampler.collapsed())
+                os.replace(target + ".tmp", target)
+            finally:
+                self._sample_lock.release()
+
+        threading.Thread(target=collect, name="stack-sampler", daemon=True).start()
+        location = f"{SAMPLE_PATH}/{sample_id}"
+        return _text(start_response, "202 Accepted", f"Échantillonnage pendant {sampler.seconds:g} s : GET {location}\n",
+                     [("Location", location)])
+
+    def _sample_result(self, start_response, sample_id):
+        if not all(c.isalnum() or c == "-" for c in sample_id):
+            return _text(start_response, "404 Not Found", "Échantillon inconnu.\n")
+        target = os.path.join(self.directory, f"sample-{sample_id}.txt")
+        if not os.path.exists(target):
+            return _text(start_response, "202 Accepted", "Échantillonnage en cours ou inconnu.\n")
+        with open(target, encoding="utf-8") as f:
+            return _text(start_response, "200 OK", f.read())
+
+
+def _sample_headers(sampler):
+    return [("X-Profile-Samples", str(sampler.samples))]
+
+
+def _text(start_response, status, text, extra_headers=()):
+    body = text.encode("utf-8")
+    start_response(status, [("Content-Type", "text/plain; charset=utf-8"),
+                            ("Content-Length", str(len(body)))] + list(extra_headers))
+    return [body]
+
+
+def profiling_from_env(app):
+    """SERVICE_PROFILE_TOKEN (profil par requête et /debug/sample, désactivés
+    si absent), SERVICE_PROFILE_DIR, SERVICE_PROFILE_SAMPLING=0 pour retirer
+    /debug/sample même avec un jeton."""
+    return ProfilingMiddleware(
+        app,
+        token=os.environ.get("SERVICE_PROFILE_TOKEN") or None,
+        directory=os.environ.get("SERVICE_PROFILE_DIR"),
+        sampling=os.environ.get("SERVICE_PROFILE_SAMPLING", "1") == "1",
+    )
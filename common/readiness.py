@@ -0,0 +1,163 @@
+import io
+import json
+import logging
+import os
+import threading
+import time
+
+from common.validation import internal_headers
+
+# -------------------------------------------------------
+# 🌡️ Préchauffage et disponibilité (/health, /ready)
+# -------------------------------------------------------
+# GET /health : le processus répond (vivacité), dès le démarrage.
+# GET /ready  : 200 une fois le préchauffage terminé, 503 avant. Un
+# répartiteur n'envoie du trafic qu'aux instances prêtes : la construction
+# de l'interface spyne, la compilation du schéma lxml, le chargement des
+# modèles et données et le premier contact avec les services en aval ne
+# tombent plus sur la première requête réelle.
+#
+# Le préchauffage est une suite d'étapes (nom, fonction) exécutées une fois
+# par processus (après le fork de chaque worker), dans un thread : /health
+# répond pendant ce temps. Une étape en échec est journalisée et signalée
+# dans /ready, sans bloquer la disponibilité (un service en aval absent au
+# démarrage ne doit pas empêcher de servir).
+HEALTH_PATH = "/health"
+READY_PATH = "/ready"
+
+_ENVELOPE = (
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="{tns}">'
+    "<soapenv:Body>{body}</soapenv:Body></soapenv:Envelope>"
+)
+
+
+def warmup_envelope(tns, body):
+    return _ENVELOPE.format(tns=tns, body=body).encode("utf-8")
+
+
+def self_call(app, body=None, method="POST", query="", headers=None):
+    """Requête WSGI en mémoire (sans réseau) ; retourne le statut HTTP."""
+    body = body or b""
+    environ = {f"HTTP_{k.upper().replace('-', '_')}": v for k, v in (headers or {}).items()}
+    environ.update({
+        "REQUEST_METHOD": method, "PATH_INFO": "/", "QUERY_STRING": query, "CONTENT_TYPE": "text/xml",
+        "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body), "SERVER_NAME": "localhost",
+        "SERVER_PORT": "0", "SERVER_PROTOCOL": "HTTP/1.1", "wsgi.url_scheme": "http", "wsgi.errors": io.StringIO(),
+        "wsgi.version": (1, 0), "wsgi.multithread": True, "wsgi.multiprocess": False, "wsgi.run_once": False,
+    })
+    status = []
+    result = app(environ, lambda s, h, exc_info=None: status.append(s))
+    try:
+        b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return status[0] if status else "500 Internal Server Error"
+
+
+def soap_self_calls(app, envelopes, rounds=None):
+    """Étape : WSDL puis chaque enveloppe `rounds` fois (SERVICE_WARMUP_ROUNDS,
+    défaut 3), en mémoire, en trafic externe puis interne (SOAP_INTERNAL_TOKEN)
+    pour préparer les deux niveaux de validation. Les réponses doivent être
+    des succès : un échantillon devenu invalide se voit dans /ready."""
+    def step():
+        count = rounds if rounds is not None else int(os.environ.get("SERVICE_WARMUP_ROUNDS", "3"))
+        calls = [("GET", "wsdl", None, None)]
+        for headers in [None] + ([internal_headers()] if internal_headers() else []):
+            calls += [("POST", "", envelope, headers) for envelope in envelopes] * count
+        for method, query, body, headers in calls:
+            status = self_call(app, body, method, query, headers)
+            if not status.startswith("200"):
+                raise RuntimeError(f"auto-appel {method} {query or 'SOAP'} : {status}")
+    return step
+
+
+class Readiness:
+    """État de préchauffage d'un processus : `warm_up` exécute les étapes,
+    `start` le fait dans un thread."""
+
+    def __init__(self, steps=(), enabled=True):
+        self.steps = list(steps)
+        self.enabled = enabled
+        self.report = []  # {"step", "ms", "error"}
+        self.elapsed_ms = 0.0
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self.warm_up, name="warmup", daemon=True).start()
+
+    def warm_up(self):
+        started = time.perf_counter()
+        if self.enabled:
+            for name, fn in self.steps:
+                step_start = time.perf_counter()
+                error = None
+                try:
+                    fn()
+                except Exception as e:
+                    error = str(e)
+                    logging.warning(f"🌡️ Préchauffage « {name} » en échec : {e}")
+                self.report.append({"step": name, "ms": round((time.perf_counter() - step_start) * 1000, 1),
+                                    "error": error})
+        self.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        self._ready.set()
+        if self.enabled:
+            logging.info(f"🌡️ Prêt après {self.elapsed_ms} ms de préchauffage "
+                         f"({', '.join(r['step'] for r in self.report)})")
+
+    def status(self):
+        return {"status": "ready" if self.ready else "warming", "pid": os.getpid(),
+                "warmupMs": self.elapsed_ms if self.ready else None, "steps": list(self.report)}
+
+
+class ReadinessMiddleware:
+    def __init__(self, app, readiness):
+        self.app = app
+        self.readiness = readiness
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") in ("GET", "HEAD"):
+            path = environ.get("PATH_INFO")
+            if path == HEALTH_PATH:
+                return self._json(start_response, "200 OK", {"status": "alive", "pid": os.getpid()})
+            if path == READY_PATH:
+                status = "200 OK" if self.readiness.ready else "503 Service Unavailable"
+                return self._json(start_response, status, self.readiness.status())
+        return self.app(environ, start_response)
+
+    @staticmethod
+    def _json(start_response, status, data):
+        body = json.dumps(data).encode("utf-8")
+        start_response(status, [("Content-Type", "application/json"), ("Content-Length", str(len(body))),
+                                ("Cache-Control", "no-store")])
+        return [body]
+
+
+def readiness_from_env(app, steps):
+    """SERVICE_WARMUP=0 : prêt dès le démarrage, sans préchauffage.
+    Le préchauffage démarre avec `wsgi_app.readiness.start` (on_start de serve)."""
+    enabled = os.environ.get("SERVICE_WARMUP", "1") == "1"
+    return ReadinessMiddleware(app, Readiness(steps, enabled=enabled))
+
+
+def downstream_step(registry):
+    """Étape : premier contact avec les services en aval (ServiceRegistry.warm_up)."""
+    def step():
+        reachable = registry.warm_up()
+        missing = [name for name, count in reachable.items() if not count]
+        if missing:
+            raise RuntimeError(f"injoignable(s) : {', '.join(missing)}")
+    return step
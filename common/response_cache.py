@@ -0,0 +1,241 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------------------------------------------
+# 🗃️ Cache des réponses SOAP sérialisées
+# -------------------------------------------------------
+# Une requête identique (chemin, SOAPAction, corps) à une requête déjà
+# servie reçoit directement les octets de l'enveloppe de réponse, sans
+# exécution de la méthode ni re-sérialisation de l'arbre ComplexModel.
+# Seules les réponses explicitement autorisées par la méthode RPC
+# (`mark_cacheable`) sont conservées, avec des étiquettes (clientId,
+# jobId…) qui permettent de les invalider.
+#
+# Chaque réponse autorisée porte un ETag (faible : la compression est
+# appliquée en aval) ; `If-None-Match` correspondant → 304 sans corps.
+ENVIRON_KEY = "response_cache"
+
+
+def etag_of(body):
+    return f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Comparaison faible (RFC 9110) : W/ ignoré, liste ou `*` acceptés."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def mark_cacheable(ctx, *tags, client_id=None):
+    """
+    Appelé par une méthode RPC juste avant de retourner : la réponse peut
+    être mise en cache, invalidée par `tags`. `client_id` : client dont le
+    débit est vérifié avant chaque succès de cache (`allow` du middleware).
+    Sans effet hors du middleware (ctx None, cache désactivé).
+    """
+    environ = getattr(getattr(ctx, "transport", None), "req_env", None)
+    marker = environ.get(ENVIRON_KEY) if environ else None
+    if marker is not None:
+        marker["cacheable"] = True
+        marker["tags"].update(t for t in tags if t)
+        marker["client_id"] = client_id
+        # la suite, jusqu'au dernier octet de la réponse, est la sérialisation
+        marker["rpc_done"] = time.perf_counter()
+
+
+class CachedResponse:
+    __slots__ = ("body", "headers", "etag", "serialize_seconds", "expires", "tags", "client_id")
+
+    def __init__(self, body, headers, etag, serialize_seconds, expires, tags, client_id=None):
+        self.body = body
+        self.headers = headers
+        self.etag = etag
+        self.serialize_seconds = serialize_seconds
+        self.expires = expires
+        self.tags = tags
+        self.client_id = client_id
+
+
+class ResponseCache:
+    """LRU borné à `max_entries` réponses, chacune valable `ttl` secondes."""
+
+    def __init__(self, ttl=60.0, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._by_tag = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= now:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry.serialize_seconds
+            return entry
+
+    def put(self, key, body, headers, serialize_seconds, tags=(), client_id=None):
+        entry = CachedResponse(body, headers, etag_of(body), serialize_seconds,
+                               time.monotonic() + self.ttl, frozenset(tags), client_id)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            self.stores += 1
+            self.serialize_seconds += serialize_seconds
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, tag):
+        """Retire toutes les réponses étiquetées `tag` (ex. un clientId modifié)."""
+        with self._lock:
+            keys = self._by_tag.pop(tag, ())
+            for key in list(keys):
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(len(e.body) for e in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations,
+                "saved_ms": self.saved_seconds * 1000,
+                "avg_serialize_ms": self.serialize_seconds / self.stores * 1000 if self.stores else 0.0,
+            }
+
+
+class ResponseCacheMiddleware:
+    """
+    `allow(client_id)` est appelé avant de servir un succès de cache marqué
+    avec un client : s'il refuse (débit épuisé), la requête est transmise à
+    l'application, qui répond elle-même (Fault).
+    """
+
+    def __init__(self, app, cache, allow=None):
+        self.app = app
+        self.cache = cache
+        self.allow = allow
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "POST":
+            return self.app(environ, start_response)
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        if length <= 0:
+            return self.app(environ, start_response)
+        body = environ["wsgi.input"].read(length)
+        environ["wsgi.input"] = io.BytesIO(body)
+        key = hashlib.sha256(b"\0".join((
+            environ.get("PATH_INFO", "/").encode("utf-8"),
+            environ.get("QUERY_STRING", "").encode("utf-8"),
+            environ.get("HTTP_SOAPACTION", "").encode("utf-8"),
+            body,
+        ))).digest()
+
+        entry = self.cache.get(key)
+        if entry is not None and (entry.client_id is None or self.allow is None or self.allow(entry.client_id)):
+            return self._send(entry, environ, start_response, "hit")
+
+        marker = {"cacheable": False, "tags": set(), "rpc_done": None, "client_id": None}
+        environ[ENVIRON_KEY] = marker
+        captured = {}
+
+        def capturing_start_response(status, headers, exc_info=None):
+            captured["status"], captured["headers"], captured["exc_info"] = status, list(headers), exc_info
+            return lambda data: captured.setdefault("written", []).append(data)
+
+        result = self.app(environ, capturing_start_response)
+        try:
+            payload = b"".join(captured.get("written", [])) + b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        done = time.perf_counter()
+
+        status, headers = captured["status"], captured["headers"]
+        if not (marker["cacheable"] and status.startswith("200")):
+            start_response(status, headers, captured["exc_info"])
+            return [payload]
+        headers = [(n, v) for n, v in headers if n.lower() not in ("content-length", "etag")]
+        serialize_seconds = done - marker["rpc_done"] if marker["rpc_done"] else 0.0
+        entry = self.cache.put(key, payload, headers, serialize_seconds, marker["tags"], marker["client_id"])
+        return self._send(entry, environ, start_response, "miss")
+
+    def _send(self, entry, environ, start_response, outcome):
+        headers = entry.headers + [("ETag", entry.etag), ("X-Response-Cache", outcome)]
+        if etag_matches(environ.get("HTTP_IF_NONE_MATCH"), entry.etag):
+            self.cache.record_not_modified()
+            start_response("304 Not Modified", [(n, v) for n, v in headers if n.lower() != "content-type"])
+            return [b""]
+        start_response("200 OK", headers + [("Content-Length", str(len(entry.body)))])
+        return [entry.body]
+
+
+def response_cache_from_env():
+    """Un ResponseCache si SOAP_RESPONSE_CACHE_TTL > 0 (secondes), sinon None.
+    SOAP_RESPONSE_CACHE_MAX_ENTRIES borne le nombre de réponses conservées."""
+    ttl = float(os.environ.get("SOAP_RESPONSE_CACHE_TTL", "0"))
+    if ttl <= 0:
+        return None
+    return ResponseCache(ttl, int(os.environ.get("SOAP_RESPONSE_CACHE_MAX_ENTRIES", "10000")))
@@ -0,0 +1,188 @@
+from common.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# -------------------------------------------------------
+# 📐 Règles métier (fonctions pures)
+# -------------------------------------------------------
+# Utilisées par les services SOAP et par le traitement par lots hors ligne,
+# pour que les deux chemins donnent exactement les mêmes résultats.
+
+# Seuils partagés (décision, évaluation du bien, approbation, optimiseur d'offre)
+MIN_CREDIT_SCORE = 700          # DecisionService
+MAX_DEBT_RATIO = 40.0           # DecisionService, en %
+MIN_DURATION_YEARS = 10         # PropertyEvaluationService
+MAX_DURATION_YEARS = 30
+MIN_VALUE_MARGIN = 1.1          # valeur estimée ≥ montant × 1.1
+LTV_OPTIMAL = 0.8               # ApprovalService : conditions optimales
+LTV_MAX = 0.9                   # ApprovalService : au-delà, refus
+OPTIMAL_MAX_DURATION_YEARS = 25
+RISK_OPTIMAL_MAX = 0.3          # score de risque prédictif (tirage uniforme sur [0, 1])
+RISK_MAX = 0.6
+# Taux d'intérêt : base + coef_ltv × LTV + coef_risque × risque
+RATE_OPTIMAL = (1.8, 2.0, 3.0)
+RATE_CONDITIONAL = (2.5, 3.0, 4.0)
+
+
+def credit_score(debt, latePayments, hasBankruptcy):
+    """Score de crédit (CreditScoringService)."""
+    return 1000 - 0.1 * debt - 50 * latePayments - (200 if hasBankruptcy else 0)
+
+
+def debt_ratio(monthlyIncome, monthlyDebtPayments):
+    """Ratio d'endettement en pourcentage (DebtRatioService)."""
+    if monthlyIncome <= 0:
+        return 0.0  # éviter division par zéro
+    return ((monthlyDebtPayments / 12.0) / monthlyIncome) * 100
+
+
+def solvency_decision(creditScore, debtRatio):
+    """Décision de solvabilité (DecisionService)."""
+    if creditScore >= MIN_CREDIT_SCORE and debtRatio <= MAX_DEBT_RATIO:
+        return "solvent"
+    return "not_solvent"
+
+
+def explain(score, monthlyIncome, monthlyExpenses, debt, latePayments, hasBankruptcy):
+    """Explications (ExplainService) : (score, revenus/dépenses, historique)."""
+    # --- 1️⃣ Analyse du score
+    if score >= 800:
+        score_exp = f"Excellent score ({score:.2f}). Risque de défaut très faible."
+    elif score >= 600:
+        score_exp = f"Score moyen ({score:.2f}). Profil modérément risqué."
+    else:
+        score_exp = f"Score faible ({score:.2f}). Risque de non-remboursement élevé."
+
+    # --- 2️⃣ Revenu vs Dépenses
+    disposable_income = monthlyIncome - monthlyExpenses
+    if disposable_income > 1000:
+        income_exp = (
+            f"Les revenus mensuels ({monthlyIncome:.2f} €) "
+            f"dépassent largement les dépenses ({monthlyExpenses:.2f} €). "
+            "Bonne capacité de remboursement."
+        )
+    elif disposable_income > 0:
+        income_exp = (
+            f"Les revenus ({monthlyIncome:.2f} €) couvrent juste les dépenses "
+            f"({monthlyExpenses:.2f} €). Marges financières limitées."
+        )
+    else:
+        income_exp = (
+            f"Les dépenses ({monthlyExpenses:.2f} €) dépassent les revenus ({monthlyIncome:.2f} €). "
+            "Risque financier important."
+        )
+
+    # --- 3️⃣ Historique de crédit
+    history_parts = []
+    if debt > 5000:
+        history_parts.append(f"Dette importante ({debt:.2f} €).")
+    if latePayments > 0:
+        history_parts.append(f"{latePayments} paiement(s) en retard.")
+    if hasBankruptcy:
+        history_parts.append("Antécédent de faillite enregistré.")
+    if not history_parts:
+        history_parts.append("Aucun incident majeur dans l’historique de crédit.")
+    credit_exp = " ".join(history_parts)
+
+    return score_exp, income_exp, credit_exp
+
+
+# -------------------------------------------------------
+# 📦 Versions par lot (ExplainBatch, ComputeDebtRatioBatch)
+# -------------------------------------------------------
+# Mêmes résultats, au caractère et au bit près, que `explain` et
+# `debt_ratio` appelées élément par élément.
+
+# Gabarits précompilés : le texte fixe de chaque tranche est préparé une
+# fois, seul le nombre est formaté ("%.2f" == f"{x:.2f}").
+# index : (score >= 600) + (score >= 800)
+_SCORE_TEMPLATES = (
+    "Score faible (%.2f). Risque de non-remboursement élevé.",
+    "Score moyen (%.2f). Profil modérément risqué.",
+    "Excellent score (%.2f). Risque de défaut très faible.",
+)
+# index : (reste > 0) + (reste > 1000) ; la tranche 0 cite d'abord les dépenses
+_INCOME_TEMPLATES = (
+    "Les dépenses (%.2f €) dépassent les revenus (%.2f €). Risque financier important.",
+    "Les revenus (%.2f €) couvrent juste les dépenses (%.2f €). Marges financières limitées.",
+    "Les revenus mensuels (%.2f €) dépassent largement les dépenses (%.2f €). Bonne capacité de remboursement.",
+)
+_DEBT_TEMPLATE = "Dette importante (%.2f €)."
+_NO_INCIDENT = "Aucun incident majeur dans l’historique de crédit."
+
+# Phrases déjà rendues, par valeurs d'entrée : les mêmes clients (revenus,
+# dépenses, dette) et les mêmes scores reviennent d'un lot à l'autre.
+# Chaque cache est vidé quand il atteint _RENDERED_MAX entrées. Zéro n'est
+# jamais mis en cache : -0.0 == 0.0 mais s'écrit "-0.00".
+_RENDERED_MAX = 4096
+_score_texts = {}
+_income_texts = {}
+_history_texts = {}
+# (type, retards, faillite) → (suite après « Dette importante », phrase seule)
+_history_tails = {}
+
+
+def _history_tail(latePayments, hasBankruptcy):
+    key = (type(latePayments), latePayments, bool(hasBankruptcy))  # 2 et 2.0 s'écrivent différemment
+    tail = _history_tails.get(key)
+    if tail is None:
+        parts = []
+        if latePayments > 0:
+            parts.append(f"{latePayments} paiement(s) en retard.")
+        if hasBankruptcy:
+            parts.append("Antécédent de faillite enregistré.")
+        text = " ".join(parts)
+        tail = (" " + text if text else "", text or _NO_INCIDENT)
+        if len(_history_tails) >= _RENDERED_MAX:
+            _history_tails.clear()
+        _history_tails[key] = tail
+    return tail
+
+
+def explain_batch(items):
+    """Explications d'un lot de tuples (score, monthlyIncome, monthlyExpenses,
+    debt, latePayments, hasBankruptcy), dans l'ordre des entrées."""
+    results = []
+    append = results.append
+    score_texts, income_texts, history_texts = _score_texts, _income_texts, _history_texts
+    for score, income, expenses, debt, late, bankrupt in items:
+        score_exp = score_texts.get(score)
+        if score_exp is None:
+            score_exp = _SCORE_TEMPLATES[(score >= 600) + (score >= 800)] % score
+            if score:
+                if len(score_texts) >= _RENDERED_MAX:
+                    score_texts.clear()
+                score_texts[score] = score_exp
+
+        key = (income, expenses)
+        income_exp = income_texts.get(key)
+        if income_exp is None:
+            disposable = income - expenses
+            band = (disposable > 0) + (disposable > 1000)
+            income_exp = _INCOME_TEMPLATES[band] % ((expenses, income) if band == 0 else (income, expenses))
+            if income and expenses:
+                if len(income_texts) >= _RENDERED_MAX:
+                    income_texts.clear()
+                income_texts[key] = income_exp
+
+        if debt > 5000:
+            key = (debt, type(late), late, bool(bankrupt))
+            credit_exp = history_texts.get(key)
+            if credit_exp is None:
+                credit_exp = _DEBT_TEMPLATE % debt + _history_tail(late, bankrupt)[0]
+                if len(history_texts) >= _RENDERED_MAX:
+                    history_texts.clear()
+                history_texts[key] = credit_exp
+        else:
+            credit_exp = _history_tail(late, bankrupt)[1]
+        append((score_exp, income_exp, credit_exp))
+    return results
+
+
+def debt_ratio_batch(monthlyIncomes, monthlyDebtPayments):
+    """Ratios d'endettement d'un lot, calculés en vecteurs (liste de floats)."""
+    income = np.asarray(monthlyIncomes, dtype=float)
+    payments = np.asarray(monthlyDebtPayments, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = ((payments / 12.0) / income) * 100
+        return np.where(income <= 0, 0.0, ratio).tolist()
@@ -0,0 +1,35 @@
+import threading
+
+from common.lazy import lazy_import
+from common.validation import internal_headers
+
+# requests n'est chargé qu'au premier appel sortant
+requests = lazy_import("requests")
+
+# -------------------------------------------------------
+# 🔹 Client SOAP sortant partagé
+# -------------------------------------------------------
+# Une session requests par thread : connexions keep-alive réutilisées
+# entre appels, et réponses gzip/deflate décompressées automatiquement.
+SOAP_HEADERS = {
+    "Content-Type": "text/xml;charset=UTF-8",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_local = threading.local()
+
+
+def get_session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(SOAP_HEADERS)
+        _local.session = session
+    return session
+
+
+def post_soap(url, envelope, timeout=10):
+    """Envoie une enveloppe SOAP (str ou bytes) et retourne la réponse requests."""
+    if isinstance(envelope, str):
+        envelope = envelope.encode("utf-8")
+    return get_session().post(url, data=envelope, headers=internal_headers(), timeout=timeout)
@@ -0,0 +1,145 @@
+import hmac
+import ipaddress
+import logging
+import os
+
+from spyne import Application
+from spyne.protocol.soap import Soap11
+from spyne.server.wsgi import WsgiApplication
+
+# -------------------------------------------------------
+# 🔹 Niveaux de validation des messages entrants
+# -------------------------------------------------------
+# full : validation XSD complète par lxml (bord public)
+# soft : contrôles spyne pendant la désérialisation (pas de XSD)
+# off  : aucune validation (trafic interne de confiance)
+VALIDATION_MODES = {
+    "full": "lxml",
+    "soft": "soft",
+    "off": None,
+}
+
+INTERNAL_TOKEN_HEADER = "X-Internal-Token"
+
+# Schémas XSD compilés, partagés par toutes les applications du processus.
+# Ils sont construits à l'import (donc avant un éventuel fork des workers).
+_SCHEMA_CACHE = {}
+
+
+def _schema_key(app):
+    return (app.tns,) + tuple(sorted(s.__name__ for s in app.services))
+
+
+class CachedSchemaSoap11(Soap11):
+    """Soap11 qui réutilise le schéma de validation déjà compilé pour le même
+    ensemble de services au lieu de le reconstruire."""
+
+    def set_app(self, value):
+        if self.validator is not self.SCHEMA_VALIDATION or value is None:
+            return super().set_app(value)
+
+        key = _schema_key(value)
+        schema = _SCHEMA_CACHE.get(key)
+        if schema is None:
+            super().set_app(value)
+            _SCHEMA_CACHE[key] = self.validation_schema
+            return
+
+        # Schéma déjà compilé : on évite build_validation_schema()
+        validator, self.validator = self.validator, None
+        try:
+            super().set_app(value)
+        finally:
+            self.validator = validator
+        self.validation_schema = schema
+
+
+def validation_mode(env_var, default):
+    mode = os.environ.get(env_var, default).strip().lower()
+    if mode not in VALIDATION_MODES:
+        logging.warning(f"⚠️ {env_var}={mode!r} inconnu, utilisation de {default!r}")
+        mode = default
+    return mode
+
+
+def soap_in_protocol(mode="full"):
+    """Protocole d'entrée Soap11 pour un niveau de validation donné."""
+    return CachedSchemaSoap11(validator=VALIDATION_MODES[mode])
+
+
+def internal_headers():
+    """En-têtes à joindre aux appels sortants entre nos propres services."""
+    token = os.environ.get("SOAP_INTERNAL_TOKEN")
+    return {INTERNAL_TOKEN_HEADER: token} if token else {}
+
+
+class TrustPolicy:
+    """Décide si une requête provient du trafic interne de confiance
+    (réseau listé dans SOAP_TRUSTED_NETWORKS ou jeton interne valide)."""
+
+    def __init__(self, networks=None, token=None):
+        if networks is None:
+            networks = os.environ.get("SOAP_TRUSTED_NETWORKS", "")
+        if token is None:
+            token = os.environ.get("SOAP_INTERNAL_TOKEN")
+        self.networks = [
+            ipaddress.ip_network(n.strip(), strict=False)
+            for n in networks.split(",") if n.strip()
+        ]
+        self.token = token or None
+
+    def is_trusted(self, environ):
+        given = environ.get("HTTP_X_INTERNAL_TOKEN", "")
+        if self.token and hmac.compare_digest(given.encode("utf-8"), self.token.encode("utf-8")):
+            return True
+        addr = environ.get("REMOTE_ADDR")
+        if not addr or not self.networks:
+            return False
+        try:
+            ip = ipaddress.ip_address(addr)
+        except ValueError:
+            return False
+        return any(ip in net for net in self.networks)
+
+
+# -------------------------------------------------------
+# 🌐 Aiguillage WSGI selon la provenance
+# -------------------------------------------------------
+class ValidationRouter:
+    """
+    Expose une Application spyne avec deux niveaux de validation :
+    celui de l'application fournie pour le trafic externe, et
+    `trusted_validation` (surchargeable par SOAP_TRUSTED_VALIDATION)
+    pour le trafic interne identifié par TrustPolicy.
+    """
+
+    def __init__(self, app, trusted_validation="soft", policy=None):
+        self.app = app
+        self.strict = WsgiApplication(app)
+        self.policy = policy or TrustPolicy()
+        self.trusted_validation = validation_mode("SOAP_TRUSTED_VALIDATION", trusted_validation)
+
+        if self.trusted_validation == _mode_of(app):
+            self.trusted = self.strict
+        else:
+            trusted_app = Application(
+                list(app.services),
+                tns=app.tns,
+                name=app.name,
+                in_protocol=soap_in_protocol(self.trusted_validation),
+                out_protocol=Soap11(),
+            )
+            self.trusted = WsgiApplication(trusted_app)
+
+    def __call__(self, environ, start_response):
+        target = self.trusted if self.policy.is_trusted(environ) else self.strict
+        return target(environ, start_response)
+
+
+def _mode_of(app):
+    validator = app.in_protocol.validator
+    if validator is app.in_protocol.SCHEMA_VALIDATION:
+        return "full"
+    if validator is app.in_protocol.SOFT_VALIDATION:
+        return "soft"
+    return "off"
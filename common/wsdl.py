@@ -0,0 +1,93 @@
+"""
+WSDL pré-calculés.
+
+Le document WSDL de chaque service est généré au build de l'image
+(`python -m common.wsdl main:app service.wsdl`) avec une adresse fictive,
+puis servi tel quel par PrecomputedWsdlMiddleware en remplaçant l'adresse
+par l'URL de la requête. spyne n'a plus à construire l'interface au
+premier `?wsdl`.
+"""
+import importlib
+import logging
+import os
+import sys
+import threading
+from wsgiref.util import request_uri
+
+from spyne.interface.wsdl import Wsdl11
+
+PLACEHOLDER_URL = "http://wsdl.placeholder.invalid/"
+DEFAULT_PATH = os.environ.get("WSDL_CACHE_PATH", "service.wsdl")
+
+
+def build_wsdl(app, url=PLACEHOLDER_URL):
+    """Construit le WSDL d'une Application spyne sans toucher au document
+    mis en cache par ses WsgiApplication."""
+    wsdl = Wsdl11(app.interface)
+    wsdl.build_interface_document(url)
+    return wsdl.get_interface_document()
+
+
+def is_wsdl_request(environ):
+    return environ.get("REQUEST_METHOD", "").upper() == "GET" and (
+        environ.get("QUERY_STRING", "").split("=")[0].lower() == "wsdl"
+        or environ.get("PATH_INFO", "").endswith(".wsdl")
+    )
+
+
+class PrecomputedWsdlMiddleware:
+    """Sert le WSDL depuis le fichier généré au build (ou, à défaut, depuis
+    un document construit une fois en mémoire au premier appel)."""
+
+    def __init__(self, app, soap_app, path=DEFAULT_PATH):
+        self.app = app
+        self.soap_app = soap_app
+        self.path = path
+        self._document = None
+        self._lock = threading.Lock()
+
+    def document(self):
+        if self._document is None:
+            with self._lock:
+                if self._document is None:
+                    if os.path.exists(self.path):
+                        with open(self.path, "rb") as f:
+                            self._document = f.read()
+                    else:
+                        logging.info(f"WSDL pré-calculé absent ({self.path}), génération en mémoire")
+                        self._document = build_wsdl(self.soap_app)
+        return self._document
+
+    def __call__(self, environ, start_response):
+        if not is_wsdl_request(environ):
+            return self.app(environ, start_response)
+
+        url = request_uri(environ, include_query=False).split(".wsdl")[0]
+        body = self.document().replace(PLACEHOLDER_URL.encode(), url.encode())
+        start_response("200 OK", [
+            ("Content-Type", "text/xml; charset=utf-8"),
+            ("Content-Length", str(len(body))),
+        ])
+        return [body]
+
+
+def main(argv=None):
+    """python -m common.wsdl <module:attribut> [fichier de sortie]"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(main.__doc__)
+        return 2
+    target = argv[0]
+    output = argv[1] if len(argv) > 1 else DEFAULT_PATH
+    module_name, _, attr = target.partition(":")
+    sys.path.insert(0, os.getcwd())
+    soap_app = getattr(importlib.import_module(module_name), attr or "app")
+    document = build_wsdl(soap_app)
+    with open(output, "wb") as f:
+        f.write(document)
+    print(f"WSDL écrit dans {output} ({len(document)} octets)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+# dense_host/main.py : plusieurs services SOAP dans un seul processus (common/host.py)
+import logging
+import os
+
+from common.host import host_from_env
+from common.launcher import serve
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+PORT = int(os.environ.get("PORT", 8000))
+wsgi_app, on_start, on_stop = host_from_env(PORT)
+
+if __name__ == '__main__':
+    logging.info(f"🏘️ Hôte multi-services sur http://0.0.0.0:{PORT}/<service>/")
+    serve(wsgi_app, PORT, threaded=True, on_start=on_start, on_stop=on_stop)
@@ -0,0 +1,234 @@
+import logging
+import os
+import threading
+
+from common.lazy import lazy_import
+from utils import (
+    clean_text,
+    extract_bounded,
+    extract_fields,
+    extract_property_description,
+)
+
+spacy = lazy_import("spacy")
+
+# Champs pris en compte pour la confiance d'une extraction
+KEY_FIELDS = ("amount", "duration_years", "property_type", "location")
+
+PROPERTY_TYPES = ("maison", "appartement", "villa", "studio", "immeuble", "terrain")
+CURRENCY_WORDS = ("€", "euro", "euros", "eur")
+THOUSAND_WORDS = ("k€", "k")
+DURATION_WORDS = ("an", "ans", "année", "années", "annee", "annees")
+LOCATION_CUES = ("à", "a", "en", "sur", "dans", "de", "près", "proche")
+
+
+def confidence(fields):
+    """Part des champs clés effectivement détectés (0.0 à 1.0)."""
+    return sum(fields.get(k) is not None for k in KEY_FIELDS) / len(KEY_FIELDS)
+
+
+# -------------------------------------------------------------------
+# ⚡ Backend regex (chemin rapide, sans dépendance)
+# -------------------------------------------------------------------
+class RegexBackend:
+    """
+    `window` > 0 : texte parcouru par fenêtres bornées (utils.extract_bounded),
+    arrêt dès que tous les champs sont trouvés ou après `max_chars`
+    caractères. `window` = 0 : texte entier nettoyé puis analysé.
+    """
+    name = "regex"
+    window = 4096
+    max_chars = 65536
+
+    def __init__(self, window=4096, max_chars=65536):
+        self.window = window
+        self.max_chars = max_chars
+
+    @property
+    def identity(self):
+        """Paramètres qui changent le résultat (clé du cache d'extraction)."""
+        return f"{self.name}:window={self.window}:max={self.max_chars}"
+
+    def extract(self, text):
+        if self.window > 0:
+            return extract_bounded(text, window=self.window, max_chars=self.max_chars)
+        return extract_fields(clean_text(text))
+
+    def extract_batch(self, texts):
+        return [self.extract(t) for t in texts]
+
+
+# -------------------------------------------------------------------
+# 🧠 Backend spaCy (NER française)
+# -------------------------------------------------------------------
+# Un modèle par processus (worker) : chargé une fois, partagé entre threads.
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
+# Seuls le tokenizer, tok2vec et la NER sont utiles à l'extraction
+SPACY_COMPONENTS = ("tok2vec", "ner")
+
+
+def load_model(name):
+    with _MODELS_LOCK:
+        nlp = _MODELS.get(name)
+        if nlp is None:
+            logging.info(f"🧠 Chargement du modèle spaCy {name}...")
+            nlp = spacy.load(name)
+            disabled = [p for p in nlp.pipe_names if p not in SPACY_COMPONENTS]
+            nlp.select_pipes(disable=disabled)
+            _MODELS[name] = nlp
+        return nlp
+
+
+def _number(tokens):
+    """Convertit une suite de tokens numériques ("250", "000", "1,5") en float."""
+    raw = "".join(t.text for t in tokens).replace("\u00a0", "").replace("\u202f", "")
+    if raw.count(",") == 1:
+        raw = raw.replace(".", "").replace(",", ".")
+    elif "." in raw and all(len(part) == 3 for part in raw.split(".")[1:]):
+        raw = raw.replace(".", "")
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+class SpacyBackend:
+    """
+    Extraction par NER spaCy (entités LOC) et motifs de tokens pour les
+    montants et durées. Les textes sont traités par lots via nlp.pipe.
+    Si la confiance d'un document est sous `threshold`, le résultat du
+    backend regex prime et spaCy ne complète que les champs manquants.
+    Seuls les `max_chars` premiers caractères bruts d'un texte sont nettoyés
+    et analysés (0 : texte entier).
+    """
+    name = "spacy"
+
+    def __init__(self, model="fr_core_news_md", threshold=0.5, batch_size=64, fallback=None, max_chars=65536):
+        self.model = model
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.fallback = fallback or RegexBackend()
+        self.max_chars = max_chars
+
+    @property
+    def nlp(self):
+        return load_model(self.model)
+
+    @property
+    def identity(self):
+        return (f"{self.name}:{self.model}:threshold={self.threshold}:max={self.max_chars}"
+                f"|{self.fallback.identity}")
+
+    def extract(self, text):
+        return self.extract_batch([text])[0]
+
+    def extract_batch(self, texts):
+        cleaned = [clean_text(t[:self.max_chars] if self.max_chars else t) for t in texts]
+        results = []
+        for clean, doc in zip(cleaned, self.nlp.pipe(cleaned, batch_size=self.batch_size)):
+            fields = self._extract_doc(clean, doc)
+            fallback = self.fallback.extract(clean)
+            if confidence(fields) >= self.threshold:
+                primary, secondary = fields, fallback
+            else:
+                primary, secondary = fallback, fields
+            results.append({k: primary[k] if primary[k] is not None else secondary[k] for k in fields})
+        return results
+
+    def _extract_doc(self, clean, doc):
+        return {
+            "amount": self._amount(doc),
+            "duration_years": self._duration(doc),
+            "property_type": self._property_type(doc),
+            "property_description": extract_property_description(clean),
+            "location": self._location(doc),
+        }
+
+    @staticmethod
+    def _numbers_before(doc, words):
+        """Valeurs numériques immédiatement suivies d'un des mots donnés."""
+        i = 0
+        while i < len(doc):
+            if doc[i].like_num:
+                j = i
+                while j + 1 < len(doc) and doc[j + 1].like_num:
+                    j += 1
+                nxt = doc[j + 1] if j + 1 < len(doc) else None
+                if nxt is not None and nxt.lower_ in words:
+                    yield _number(doc[i:j + 1]), nxt
+                i = j + 1
+            else:
+                i += 1
+
+    def _amount(self, doc):
+        for value, unit in self._numbers_before(doc, CURRENCY_WORDS + THOUSAND_WORDS):
+            if value is not None:
+                return value * 1000 if unit.lower_ in THOUSAND_WORDS else value
+        return None
+
+    def _duration(self, doc):
+        for value, _ in self._numbers_before(doc, DURATION_WORDS):
+            if value is not None:
+                return int(value)
+        return None
+
+    @staticmethod
+    def _property_type(doc):
+        for token in doc:
+            word = token.lower_.rstrip("s")
+            if word in PROPERTY_TYPES:
+                return word.capitalize()
+        return None
+
+    @staticmethod
+    def _location(doc):
+        locations = [ent for ent in doc.ents if ent.label_ == "LOC"]
+        for ent in locations:
+            if ent.start > 0 and doc[ent.start - 1].lower_ in LOCATION_CUES:
+                return ent.text
+        return locations[0].text if locations else None
+
+
+# -------------------------------------------------------------------
+# 🔌 Sélection du backend (IE_BACKEND=regex|spacy)
+# -------------------------------------------------------------------
+_backend = None
+
+
+def regex_backend_from_env():
+    """IE_SCAN_WINDOW (caractères, 0 : texte entier) et IE_SCAN_MAX_CHARS."""
+    return RegexBackend(
+        window=int(os.environ.get("IE_SCAN_WINDOW", "4096")),
+        max_chars=int(os.environ.get("IE_SCAN_MAX_CHARS", "65536")),
+    )
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        name = os.environ.get("IE_BACKEND", "regex").lower()
+        if name == "spacy":
+            _backend = SpacyBackend(
+                model=os.environ.get("IE_SPACY_MODEL", "fr_core_news_md"),
+                threshold=float(os.environ.get("IE_CONFIDENCE_THRESHOLD", "0.5")),
+                batch_size=int(os.environ.get("IE_BATCH_SIZE", "64")),
+                fallback=regex_backend_from_env(),
+                max_chars=int(os.environ.get("IE_SCAN_MAX_CHARS", "65536")),
+            )
+            if os.environ.get("IE_SPACY_PRELOAD", "1") == "1":
+                load_model(_backend.model)
+        else:
+            _backend = regex_backend_from_env()
+        logging.info(f"🔌 Backend d'extraction : {_backend.name}")
+
+        # Cache des extractions (IE_CACHE_SIZE=0 pour le désactiver)
+        cache_size = int(os.environ.get("IE_CACHE_SIZE", "10000"))
+        if cache_size > 0:
+            from cache import CachedBackend, ExtractionCache
+            _backend = CachedBackend(_backend, ExtractionCache(
+                cache_size, os.environ.get("IE_CACHE_PATH"),
+                max_disk_entries=int(os.environ.get("IE_CACHE_DISK_MAX_ENTRIES", "100000")),
+            ))
+    return _backend
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# À incrémenter quand les règles d'extraction changent : les entrées du
+# niveau disque calculées par l'ancienne version ne sont plus relues.
+CACHE_VERSION = 3
+
+
+def text_key(backend_identity, text):
+    """Clé de cache : empreinte du texte brut (sans nettoyage préalable, qui
+    copierait tout le texte) et de l'identité du backend (nom, modèle spaCy,
+    seuil, paramètres de la regex)."""
+    digest = hashlib.sha256(f"v{CACHE_VERSION}\0{backend_identity}\0".encode("utf-8"))
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Cache des extractions, adressé par le contenu.
+    - niveau mémoire : LRU borné à `max_entries` entrées ;
+    - niveau disque optionnel : table SQLite `path` partagée entre workers,
+      consultée à la demande quand le niveau mémoire échoue. Bornée à
+      `max_disk_entries` lignes : au-delà, les plus anciennes sont supprimées
+      (vérifié toutes les `max_disk_entries // 100` écritures au moins).
+    Les statistiques (succès, échecs, temps d'extraction économisé) sont
+    exposées par `stats()`.
+    """
+
+    def __init__(self, max_entries=10000, path=None, max_disk_entries=100000):
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self._prune_every = max(1, max_disk_entries // 100)
+        self._disk_writes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        if path:
+            self._db  # création de la table dès le démarrage
+
+    @property
+    def _db(self):
+        """Connexion SQLite propre au processus (les workers sont forkés)."""
+        if not self.path:
+            return None
+        if self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn_pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_cache ("
+                " key TEXT PRIMARY KEY, fields TEXT NOT NULL,"
+                " cost REAL NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS extraction_cache_created ON extraction_cache (created)")
+            self._conn.commit()
+        return self._conn
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits_memory += 1
+                self.saved_seconds += entry[1]
+                return dict(entry[0])
+
+            db = self._db
+            if db is not None:
+                row = db.execute(
+                    "SELECT fields, cost FROM extraction_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1])
+                    self._remember(key, entry)
+                    self.hits_disk += 1
+                    self.saved_seconds += entry[1]
+                    return dict(entry[0])
+
+            self.misses += 1
+            return None
+
+    def put(self, key, fields, cost):
+        with self._lock:
+            self._remember(key, (dict(fields), cost))
+            db = self._db
+            if db is not None:
+                try:
+                    db.execute(
+                        "INSERT OR REPLACE INTO extraction_cache VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(fields, ensure_ascii=False), cost, time.time()),
+                    )
+                    self._disk_writes += 1
+                    if self.max_disk_entries and self._disk_writes % self._prune_every == 0:
+                        self._prune(db)
+                    db.commit()
+                except sqlite3.Error as e:
+                    logging.error(f"Erreur cache disque IE: {e}")
+
+    def _prune(self, db):
+        """Supprime les lignes les plus anciennes au-delà de `max_disk_entries`."""
+        db.execute(
+            "DELETE FROM extraction_cache WHERE key IN (SELECT key FROM extraction_cache"
+            " ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.max_disk_entries,)
+        )
+
+    def disk_entries(self):
+        with self._lock:
+            db = self._db
+            return db.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0] if db is not None else 0
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            hits = self.hits_memory + self.hits_disk
+            total = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_ratio": hits / total if total else 0.0,
+                "saved_ms": self.saved_seconds * 1000,
+            }
+
+    def reset_stats(self):
+        """Remet les compteurs à zéro (entrées conservées), après le préchauffage."""
+        with self._lock:
+            self.hits_memory = self.hits_disk = self.misses = 0
+            self.saved_seconds = 0.0
+
+
+class CachedBackend:
+    """Enveloppe un backend d'extraction : seuls les textes absents du cache
+    sont extraits (en un seul lot), puis mémorisés avec leur coût moyen."""
+
+    def __init__(self, backend, cache):
+        self.backend = backend
+        self.cache = cache
+        self.name = backend.name
+        self.identity = getattr(backend, "identity", backend.name)
+
+    def extract(self, text):
+        return self.extract_batch([text])[0]
+
+    def extract_batch(self, texts):
+        keys = [text_key(self.identity, t) for t in texts]
+        results = [self.cache.get(k) for k in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            start = time.perf_counter()
+            extracted = self.backend.extract_batch([texts[i] for i in missing])
+            cost = (time.perf_counter() - start) / len(missing)
+            for i, fields in zip(missing, extracted):
+                self.cache.put(keys[i], fields, cost)
+                results[i] = fields
+        return results
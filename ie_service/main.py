@@ -1,10 +1,15 @@
-from spyne import Application, rpc, ServiceBase, Unicode, Float, Integer, ComplexModel
+from spyne import Application, rpc, ServiceBase, Unicode, Float, Integer, ComplexModel, Array
 from spyne.protocol.soap import Soap11
-from spyne.server.wsgi import WsgiApplication
+from common.compression import CompressionMiddleware
+from common.limits import limits_from_env
+from common.readiness import readiness_from_env, soap_self_calls, warmup_envelope
+from common.validation import ValidationRouter, soap_in_protocol, validation_mode
+from common.wsdl import PrecomputedWsdlMiddleware
 import logging
+import os
 
-#importation des fonctions d'extraction
-from utils import clean_text,extract_amount,extract_duration,extract_location,extract_property_description,extract_property_type
+#importation du backend d'extraction (regex ou spaCy, cf. IE_BACKEND)
+from backends import get_backend
 
 # -------------------------------------------------------------------
 # 🔹 Configuration du journal de logs
@@ -16,6 +21,7 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 # 🧱 Modèle de données de sortie
 # -------------------------------------------------------------------
 class ExtractionResult(ComplexModel):
+    __namespace__ = "urn:ie.service:v7"
     amount = Float
     duration_years = Integer
     property_type = Unicode
@@ -23,52 +29,85 @@ class ExtractionResult(ComplexModel):
     location = Unicode
 
 
+class CacheStats(ComplexModel):
+    __namespace__ = "urn:ie.service:v7"
+    entries = Integer
+    hits = Integer
+    misses = Integer
+    hitRatio = Float
+    savedMs = Float
+
+
 
 # -------------------------------------------------------------------
 # 🚀 Service principal IE
 # -------------------------------------------------------------------
+def build_result(fields):
+    """Convertit les champs extraits en ExtractionResult, avec avertissements."""
+    amount = fields["amount"]
+    duration = fields["duration_years"]
+    property_type = fields["property_type"]
+    property_description = fields["property_description"]
+    location = fields["location"]
+
+    # Gestion des erreurs et avertissements
+    warnings = []
+    if amount is None:
+        warnings.append("Montant du prêt non détecté.")
+    if duration is None:
+        warnings.append("Durée du prêt non détectée.")
+    if property_type is None:
+        warnings.append("Type de propriété non identifié.")
+    if location is None:
+        warnings.append("Localisation non détectée.")
+
+    warning_message = " | ".join(warnings) if warnings else "Aucun problème détecté."
+
+    # Logs détaillés
+    logging.info(f"Montant détecté : {amount}")
+    logging.info(f"Durée détectée : {duration}")
+    logging.info(f"Type : {property_type}")
+    logging.info(f"Localisation : {location}")
+    if warnings:
+        logging.warning(f"Avertissements : {warning_message}")
+
+    return ExtractionResult(
+        amount=amount or 0.0,
+        duration_years=duration or 0,
+        property_type=property_type or "Inconnu",
+        property_description=property_description or "non détectée",
+        location=location or "inconnue",
+    )
+
+
 class IE_Service(ServiceBase):
 
     @rpc(Unicode, _returns=ExtractionResult)
     def extractInformation(ctx, text):
         """Analyse du texte et extraction des informations clés avec gestion des erreurs."""
         logging.info("🧠 Début du traitement du texte de la demande...")
-        clean = clean_text(text)
-
-        # Extraction des éléments
-        amount = extract_amount(clean)
-        duration = extract_duration(clean)
-        property_type = extract_property_type(clean)
-        property_description = extract_property_description(clean)
-        location = extract_location(clean)
-
-        # Gestion des erreurs et avertissements
-        warnings = []
-        if amount is None:
-            warnings.append("Montant du prêt non détecté.")
-        if duration is None:
-            warnings.append("Durée du prêt non détectée.")
-        if property_type is None:
-            warnings.append("Type de propriété non identifié.")
-        if location is None:
-            warnings.append("Localisation non détectée.")
-
-        warning_message = " | ".join(warnings) if warnings else "Aucun problème détecté."
-
-        # Logs détaillés
-        logging.info(f"Montant détecté : {amount}")
-        logging.info(f"Durée détectée : {duration}")
-        logging.info(f"Type : {property_type}")
-        logging.info(f"Localisation : {location}")
-        if warnings:
-            logging.warning(f"Avertissements : {warning_message}")
-
-        return ExtractionResult(
-            amount=amount or 0.0,
-            duration_years=duration or 0,
-            property_type=property_type or "Inconnu",
-            property_description=property_description or "non détectée",
-            location=location or "inconnue",
+        return build_result(get_backend().extract(text))
+
+    @rpc(Array(Unicode), _returns=Array(ExtractionResult))
+    def extractInformationBatch(ctx, texts):
+        """Extraction sur un lot de textes (traité en une passe par le backend)."""
+        texts = list(texts or [])
+        logging.info(f"🧠 Traitement d'un lot de {len(texts)} demande(s)...")
+        return [build_result(fields) for fields in get_backend().extract_batch(texts)]
+
+    @rpc(_returns=CacheStats)
+    def getCacheStats(ctx):
+        """Taux de succès du cache d'extraction et temps d'extraction économisé."""
+        cache = getattr(get_backend(), "cache", None)
+        if cache is None:
+            return CacheStats(entries=0, hits=0, misses=0, hitRatio=0.0, savedMs=0.0)
+        stats = cache.stats()
+        return CacheStats(
+            entries=stats["entries"],
+            hits=stats["hits_memory"] + stats["hits_disk"],
+            misses=stats["misses"],
+            hitRatio=round(stats["hit_ratio"], 4),
+            savedMs=round(stats["saved_ms"], 3),
         )
 
 
@@ -78,15 +117,45 @@ class IE_Service(ServiceBase):
 app = Application(
     [IE_Service],
     tns="urn:ie.service:v7",
-    in_protocol=Soap11(validator="lxml"),
+    in_protocol=soap_in_protocol(validation_mode("SOAP_VALIDATION", "full")),
     out_protocol=Soap11(),
 )
 
-wsgi_app = WsgiApplication(app)
+wsgi_app = limits_from_env(CompressionMiddleware(PrecomputedWsdlMiddleware(ValidationRouter(app), app)))
+
+# Backend (et modèle spaCy éventuel) chargé une fois au démarrage du worker
+get_backend()
+
+# 🌡️ Préchauffage avant /ready (SERVICE_WARMUP) : première inférence du
+# backend (hors cache d'extraction) puis requêtes types en mémoire, dont les
+# succès et échecs de cache sont ensuite effacés de getCacheStats
+WARMUP_TEXT = "Je souhaite emprunter 250000 euros sur 20 ans pour acheter une maison neuve avec jardin à Paris."
+WARMUP_REQUESTS = [
+    warmup_envelope(app.tns, f"<tns:extractInformation><tns:text>{WARMUP_TEXT}</tns:text></tns:extractInformation>"),
+    warmup_envelope(app.tns, f"<tns:extractInformationBatch><tns:texts><tns:string>{WARMUP_TEXT}</tns:string>"
+                             "</tns:texts></tns:extractInformationBatch>"),
+]
+
+
+def warm_backend():
+    backend = get_backend()
+    getattr(backend, "backend", backend).extract_batch([WARMUP_TEXT])
+
+
+def reset_cache_stats():
+    cache = getattr(get_backend(), "cache", None)
+    if cache is not None:
+        cache.reset_stats()
+
+
+wsgi_app = readiness_from_env(wsgi_app, [
+    ("backend d'extraction", warm_backend),
+    ("auto-appels SOAP", soap_self_calls(wsgi_app, WARMUP_REQUESTS)),
+    ("statistiques du cache", reset_cache_stats),
+])
 
 
 if __name__ == "__main__":
-    from wsgiref.simple_server import make_server
+    from common.launcher import serve
     logging.info("🚀 Service IE (v7) prêt sur http://0.0.0.0:8001/?wsdl")
-    server = make_server("0.0.0.0", 8001, wsgi_app)
-    server.serve_forever()
\ No newline at end of file
+    serve(wsgi_app, int(os.environ.get("PORT", 8001)), on_start=wsgi_app.readiness.start)
\ No newline at end of file
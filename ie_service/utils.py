@@ -5,44 +5,169 @@ import logging
 # -------------------------------------------------------------------
 # 🧠 Fonctions d’extraction
 # -------------------------------------------------------------------
+PROPERTY_KEYWORDS = ["maison", "appartement", "villa", "studio", "immeuble", "terrain"]
+
+# (?<!\d) : une tentative ne commence qu'en tête d'une suite de chiffres.
+# Même premier résultat que sans (une suite qui échoue depuis sa tête échoue
+# aussi depuis l'intérieur), mais temps linéaire sur une longue suite de
+# chiffres au lieu de quadratique.
+AMOUNT_PATTERN = re.compile(r"(?<!\d)(\d+(?:[.,]\d+)?)\s*(€|euros?)", re.IGNORECASE)
+DURATION_PATTERN = re.compile(r"(?<!\d)(\d+)\s*(ans?|années?)", re.IGNORECASE)
+PROPERTY_TYPE_PATTERNS = [(kw, re.compile(rf"\b{kw}\b")) for kw in PROPERTY_KEYWORDS]
+LOCATION_PATTERN = re.compile(r"à\s+([A-Z][a-zéèêëàâäïîôöûüç\-]+)")
+DESCRIPTION_LENGTH = 120
+
+
 def clean_text(text: str) -> str:
     """Nettoie et normalise le texte."""
     text = text.replace("\n", " ").strip()
     return " ".join(text.split())
 
 
-def extract_amount(text: str):
-    match = re.search(r"(\d+(?:[.,]\d+)?)\s*(€|euros?)", text, re.IGNORECASE)
+# Recherches élémentaires : (position, valeur) ou None. `lower` est le texte
+# en minuscules, calculé une fois pour toutes les recherches.
+def _find_amount(text, lower):
+    match = AMOUNT_PATTERN.search(text)
     if match:
         try:
-            return float(match.group(1).replace(",", "."))
+            return match.start(), float(match.group(1).replace(",", "."))
         except ValueError:
             logging.error("⚠️ Erreur lors de la conversion du montant.")
     return None
 
 
+def _find_duration(text, lower):
+    match = DURATION_PATTERN.search(text)
+    return (match.start(), int(match.group(1))) if match else None
+
+
+def _find_property_type(text, lower):
+    for kw, pattern in PROPERTY_TYPE_PATTERNS:
+        match = pattern.search(lower)
+        if match:
+            return match.start(), kw.capitalize()
+    return None
+
+
+def _find_property_description(text, lower):
+    for kw in PROPERTY_KEYWORDS:
+        start = lower.find(kw)
+        if start >= 0:
+            return start, text[start:start + DESCRIPTION_LENGTH].split(".")[0]
+    return None
+
+
+def _find_location(text, lower):
+    match = LOCATION_PATTERN.search(text)
+    return (match.start(), match.group(1)) if match else None
+
+
+FINDERS = (
+    ("amount", _find_amount),
+    ("duration_years", _find_duration),
+    ("property_type", _find_property_type),
+    ("property_description", _find_property_description),
+    ("location", _find_location),
+)
+
+
+def _value(hit):
+    return hit[1] if hit else None
+
+
+def extract_amount(text: str):
+    return _value(_find_amount(text, None))
+
+
 def extract_duration(text: str):
-    match = re.search(r"(\d+)\s*(ans?|années?)", text, re.IGNORECASE)
-    return int(match.group(1)) if match else None
+    return _value(_find_duration(text, None))
 
 
 def extract_property_type(text: str):
-    types = ["maison", "appartement", "villa", "studio", "immeuble", "terrain"]
-    for t in types:
-        if re.search(rf"\b{t}\b", text.lower()):
-            return t.capitalize()
-    return None
+    return _value(_find_property_type(text, text.lower()))
 
 
 def extract_property_description(text: str):
-    keywords = ["maison", "appartement", "villa", "studio", "immeuble", "terrain"]
-    for kw in keywords:
-        if kw in text.lower():
-            start = text.lower().find(kw)
-            return text[start:start+120].split(".")[0]
-    return None
+    return _value(_find_property_description(text, text.lower()))
 
 
 def extract_location(text: str):
-    match = re.search(r"à\s+([A-Z][a-zéèêëàâäïîôöûüç\-]+)", text)
-    return match.group(1) if match else None
\ No newline at end of file
+    return _value(_find_location(text, None))
+
+
+def extract_fields(clean: str):
+    """Tous les champs d'un texte déjà nettoyé."""
+    lower = clean.lower()
+    return {name: _value(find(clean, lower)) for name, find in FINDERS}
+
+
+# -------------------------------------------------------------------
+# 🪟 Extraction par fenêtres bornées (textes très longs)
+# -------------------------------------------------------------------
+_BLANK = re.compile(r"\s")
+
+
+def clean_chunks(text, size, lookahead=256):
+    """
+    Nettoie `text` morceau par morceau, sans le copier en entier : couples
+    (morceau nettoyé, séparateur qui le précède, caractères bruts lus).
+    La coupe se fait sur un blanc trouvé dans les `lookahead` caractères
+    suivants, sinon en plein mot (séparateur vide). Les morceaux non vides
+    recollés avec leurs séparateurs donnent exactement clean_text(text).
+    """
+    pos, n = 0, len(text)
+    pending_blank = False
+    while pos < n:
+        end = min(pos + size, n)
+        if end < n:
+            blank = _BLANK.search(text, end, min(n, end + lookahead))
+            end = blank.start() if blank else end
+        raw = text[pos:end]
+        piece = " ".join(raw.split())
+        if piece:
+            glue = " " if pending_blank or raw[0].isspace() else ""
+            yield piece, glue, end - pos
+            pending_blank = raw[-1].isspace()
+        else:
+            pending_blank = pending_blank or bool(raw)
+            yield "", "", end - pos
+        pos = end
+
+
+def extract_bounded(text, window=4096, overlap=256, max_chars=65536):
+    """
+    Extraction incrémentale : le texte est nettoyé et parcouru par fenêtres
+    de `window` caractères qui se chevauchent de `overlap` caractères (assez
+    pour une description de 120 caractères). Le parcours s'arrête dès que
+    tous les champs sont trouvés, et au plus tard après `max_chars`
+    caractères bruts. Temps et mémoire bornés quelle que soit la taille du
+    texte.
+
+    Un champ est pris dans la première fenêtre où il apparaît, hors de la
+    zone de chevauchement (reprise par la fenêtre suivante). Un texte qui
+    tient dans une fenêtre donne exactement le résultat d'extract_fields.
+    """
+    found = {}
+    carry = ""
+    scanned = 0
+    chunks = clean_chunks(text, window)
+    current = next(chunks, None)
+    while current is not None:
+        piece, glue, raw_len = current
+        scanned += raw_len
+        following = next(chunks, None) if scanned < max_chars else None
+        last = following is None
+        if piece or last:  # fin du texte : la zone de chevauchement est traitée aussi
+            buf = carry + glue + piece if carry else piece
+            lower = buf.lower()
+            safe = len(buf) if last else max(0, len(buf) - overlap)
+            for name, find in FINDERS:
+                if name not in found:
+                    hit = find(buf, lower)
+                    if hit is not None and hit[0] < safe:
+                        found[name] = hit[1]
+            if len(found) == len(FINDERS):
+                break
+            carry = buf[safe:]
+        current = following
+    return {name: found.get(name) for name, _ in FINDERS}
@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from spyne.model.fault import Fault
+
+
+# -------------------------------------------------------
+# 🚦 Contrôle d'admission de l'orchestrateur
+# -------------------------------------------------------
+class AdaptiveLimiter:
+    """
+    Limite de concurrence AIMD : chaque vérification plus rapide que
+    `target_latency` augmente la limite de 1/limite (≈ +1 par fenêtre),
+    une vérification lente ou en erreur la multiplie par `backoff`.
+    Une seule baisse par fenêtre : les vérifications admises avant la
+    dernière baisse ne la répètent pas.
+    """
+
+    def __init__(self, initial=16, min_limit=1, max_limit=64, target_latency=2.0, backoff=0.9):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self._last_drop = float("-inf")
+
+    def update(self, latency, ok=True, started=None):
+        if not ok or latency > self.target_latency:
+            if started is None or started >= self._last_drop:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_drop = time.monotonic()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    @property
+    def current(self):
+        return int(self.limit)
+
+
+class TokenBucket:
+    """Seau à jetons par clientId : `rate` demandes/s, rafales jusqu'à `burst`."""
+
+    def __init__(self, rate=5.0, burst=10, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._prune(now)
+        return allowed
+
+    def _prune(self, now):
+        # un seau de nouveau plein équivaut à un seau absent
+        full = [k for k, (tokens, last) in self._buckets.items()
+                if tokens + (now - last) * self.rate >= self.burst]
+        for k in full:
+            del self._buckets[k]
+
+
+class AdmissionController:
+    """
+    Admet une vérification si la limite adaptative le permet ; sinon la met
+    en attente dans une file bornée (`max_queue`) au plus `queue_timeout`
+    secondes. File pleine, attente expirée ou client trop insistant :
+    Fault SOAP immédiate plutôt qu'une surcharge des services métier.
+    """
+
+    def __init__(self, limiter, max_queue=32, queue_timeout=2.0, rate_limiter=None):
+        self.limiter = limiter
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate_limiter = rate_limiter
+        self.inflight = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.rate_limited = 0
+        self._cond = threading.Condition()
+
+    def check_rate(self, client_id):
+        if self.rate_limiter is not None and not self.rate_limiter.allow(client_id or ""):
+            with self._cond:
+                self.rate_limited += 1
+            raise Fault("Client.RateLimited", f"Trop de demandes pour le client {client_id}, réessayez plus tard.")
+
+    def allow_rate(self, client_id):
+        """Comme check_rate, sans Fault ni compteur : False si le client a
+        épuisé son débit (succès du cache de réponses)."""
+        return self.rate_limiter is None or self.rate_limiter.allow(client_id or "")
+
+    @contextmanager
+    def admit(self, client_id=None):
+        self.check_rate(client_id)
+        self._acquire()
+        start = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self._release(start, ok)
+
+    def _acquire(self):
+        with self._cond:
+            if self.inflight < self.limiter.current:
+                self.inflight += 1
+                return
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise Fault("Server.Overloaded", "Service surchargé, réessayez plus tard.")
+
+            self.queued += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.inflight >= self.limiter.current:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise Fault("Server.Overloaded", "Délai d'attente dépassé, service surchargé.")
+                    self._cond.wait(remaining)
+            finally:
+                self.queued -= 1
+            self.inflight += 1
+
+    def _release(self, start, ok):
+        with self._cond:
+            self.inflight -= 1
+            self.limiter.update(time.monotonic() - start, ok, started=start)
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limit": self.limiter.current,
+                "inflight": self.inflight,
+                "queued": self.queued,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "rate_limited": self.rate_limited,
+            }
+
+
+def admission_from_env():
+    rate = float(os.environ.get("SOLVENCY_CLIENT_RATE", "5"))
+    controller = AdmissionController(
+        AdaptiveLimiter(
+            initial=int(os.environ.get("SOLVENCY_INITIAL_CONCURRENCY", "16")),
+            max_limit=int(os.environ.get("SOLVENCY_MAX_CONCURRENCY", "64")),
+            target_latency=float(os.environ.get("SOLVENCY_TARGET_LATENCY", "2.0")),
+        ),
+        max_queue=int(os.environ.get("SOLVENCY_QUEUE_SIZE", "32")),
+        queue_timeout=float(os.environ.get("SOLVENCY_QUEUE_TIMEOUT", "2.0")),
+        rate_limiter=TokenBucket(rate, int(os.environ.get("SOLVENCY_CLIENT_BURST", "10"))) if rate > 0 else None,
+    )
+    logging.info(f"🚦 Contrôle d'admission : limite initiale {controller.limiter.current}, "
+                 f"file {controller.max_queue}, attente max {controller.queue_timeout}s")
+    return controller
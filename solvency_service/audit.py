@@ -0,0 +1,392 @@
+"""
+Journal d'audit des décisions de solvabilité : segments JSONL en ajout seul,
+écrits par un thread dédié qui regroupe les enregistrements en file (une
+écriture et un fsync par lot), et index SQLite par client et par jour.
+
+    python audit.py find --client client-001 [--since 2026-10-01] [--until 2026-10-31]
+    python audit.py reindex                   # reconstruit l'index depuis les segments
+    python audit.py stats
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+INDEX_NAME = "index.sqlite"
+_STOP = object()
+
+
+class AuditUnavailable(RuntimeError):
+    """File pleine au-delà du délai d'attente, ou enregistrement non écrit à temps."""
+
+
+def day_of(ts):
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def _fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _open_index(directory):
+    db = sqlite3.connect(os.path.join(directory, INDEX_NAME), isolation_level=None, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    # l'index se reconstruit depuis les segments (reindex) : pas de fsync par transaction
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS records ("
+        " client_id TEXT NOT NULL, day TEXT NOT NULL, ts REAL NOT NULL,"
+        " segment TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL,"
+        " PRIMARY KEY (segment, offset))"
+    )
+    db.execute("CREATE INDEX IF NOT EXISTS records_client ON records (client_id, day, ts)")
+    db.execute("CREATE INDEX IF NOT EXISTS records_day ON records (day, ts)")
+    return db
+
+
+# -------------------------------------------------------
+# 🔎 Lecture : recherche par client / jour, reconstruction de l'index
+# -------------------------------------------------------
+class AuditReader:
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        _open_index(directory).close()
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.startswith("audit-") and name.endswith(".jsonl"))
+
+    def find(self, client_id=None, since=None, until=None, limit=None):
+        """Enregistrements d'un client (ou de tous) entre deux jours inclus
+        (`YYYY-MM-DD`, UTC), dans l'ordre chronologique."""
+        clauses, params = [], []
+        if client_id:
+            clauses.append("client_id = ?")
+            params.append(client_id)
+        if since:
+            clauses.append("day >= ?")
+            params.append(since)
+        if until:
+            clauses.append("day <= ?")
+            params.append(until)
+        sql = "SELECT segment, offset, length FROM records"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        db = _open_index(self.directory)
+        try:
+            rows = db.execute(sql, params).fetchall()
+        finally:
+            db.close()
+
+        records, files = [], {}
+        try:
+            for segment, offset, length in rows:
+                f = files.get(segment)
+                if f is None:
+                    f = files[segment] = open(os.path.join(self.directory, segment), "rb")
+                records.append(json.loads(os.pread(f.fileno(), length, offset)))
+        finally:
+            for f in files.values():
+                f.close()
+        return records
+
+    def reindex(self):
+        """Reconstruit l'index en relisant tous les segments (après un arrêt
+        brutal entre l'écriture d'un lot et celle de son index). Une dernière
+        ligne incomplète (écriture interrompue) est ignorée."""
+        rows = []
+        for segment in self.segments():
+            offset = 0
+            with open(os.path.join(self.directory, segment), "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        logging.warning(f"📒 Ligne incomplète ignorée : {segment} @ {offset}")
+                        break
+                    try:
+                        record = json.loads(line)
+                        rows.append((record.get("clientId") or "", day_of(record["ts"]), record["ts"],
+                                     segment, offset, len(line)))
+                    except (ValueError, KeyError) as e:
+                        logging.warning(f"📒 Enregistrement illisible {segment} @ {offset} : {e}")
+                    offset += len(line)
+        db = _open_index(self.directory)
+        try:
+            db.execute("BEGIN")
+            db.execute("DELETE FROM records")
+            db.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?)", rows)
+            db.execute("COMMIT")
+        finally:
+            db.close()
+        return len(rows)
+
+
+# -------------------------------------------------------
+# ✍️ Écriture : file bornée + validation groupée
+# -------------------------------------------------------
+class AuditLog(AuditReader):
+    """
+    `record()` sérialise l'enregistrement dans le thread appelant et le met
+    en file ; le thread d'écriture prend tout ce qui s'est accumulé (au plus
+    `batch_size`, en attendant au plus `linger` secondes de plus), l'écrit
+    d'un bloc à la fin du segment courant, fait un seul fsync, puis indexe
+    le lot dans une transaction. File pleine : l'appelant attend au plus
+    `timeout` secondes puis reçoit AuditUnavailable (aucune décision sans
+    trace). Un segment change à chaque jour (UTC) ou au-delà de
+    `segment_bytes` ; son nom porte le pid, chaque processus a les siens.
+    """
+
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, queue_size=10000, batch_size=1000,
+                 linger=0.0, timeout=5.0, fsync=True):
+        super().__init__(directory)
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        self.linger = linger
+        self.timeout = timeout
+        self.fsync = fsync
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._segment = None
+        self._segment_day = None
+        self._size = 0
+        self._done = threading.Condition()
+        self._enqueued = 0
+        self._committed = 0
+        self.blocked = 0
+        self.rejected = 0
+        self.batches = 0
+        self.bytes = 0
+        self.max_batch = 0
+        self.commit_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name="solvency-audit", daemon=True)
+        self._thread.start()
+
+    def record(self, entry, wait=False):
+        """Met `entry` (dict JSON) en file. `wait` : rend la main une fois le
+        lot qui le contient écrit et synchronisé sur disque."""
+        entry.setdefault("ts", time.time())
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+        durable = threading.Event() if wait else None
+        item = (line, entry.get("clientId") or "", day_of(entry["ts"]), entry["ts"], durable)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._done:
+                self.blocked += 1
+            try:
+                self._queue.put(item, timeout=self.timeout)
+            except queue.Full:
+                with self._done:
+                    self.rejected += 1
+                raise AuditUnavailable(f"file d'audit pleine depuis {self.timeout:.1f} s") from None
+        with self._done:
+            self._enqueued += 1
+        if durable is not None and not durable.wait(self.timeout):
+            raise AuditUnavailable(f"enregistrement d'audit non écrit après {self.timeout:.1f} s")
+
+    def flush(self, timeout=None):
+        """Attend l'écriture de tout ce qui a été mis en file jusqu'ici."""
+        with self._done:
+            target = self._enqueued
+            return self._done.wait_for(lambda: self._committed >= target, timeout)
+
+    def close(self, timeout=10.0):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def stats(self):
+        with self._done:
+            return {
+                "records": self._committed,
+                "pending": self._enqueued - self._committed,
+                "batches": self.batches,
+                "avg_batch": self._committed / self.batches if self.batches else 0.0,
+                "max_batch": self.max_batch,
+                "bytes": self.bytes,
+                "blocked": self.blocked,
+                "rejected": self.rejected,
+                "avg_commit_ms": self.commit_seconds / self.batches * 1000 if self.batches else 0.0,
+                "segment": self._segment,
+            }
+
+    def _run(self):
+        index = _open_index(self.directory)
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            while True:
+                try:
+                    self._commit(batch, index)
+                    break
+                except (OSError, sqlite3.Error) as e:
+                    # lot conservé : la file se remplit et les appelants finissent en AuditUnavailable
+                    logging.error(f"📒 Écriture du journal d'audit impossible : {e}")
+                    time.sleep(1.0)
+        if self._file is not None:
+            self._file.close()
+        index.close()
+
+    def _commit(self, batch, index):
+        started = time.perf_counter()
+        rows, pending = [], []
+        # segments touchés par le lot et leur taille avant écriture
+        touched = [(self._segment, self._size)] if self._file is not None else []
+        try:
+            for line, client_id, day, ts, _ in batch:
+                if self._file is None or day != self._segment_day or (
+                        self._size and self._size + len(line) > self.segment_bytes):
+                    self._write(pending)
+                    pending = []
+                    self._rotate(day)
+                    touched.append((self._segment, self._size))
+                rows.append((client_id, day, ts, self._segment, self._size, len(line)))
+                pending.append(line)
+                self._size += len(line)
+            self._write(pending)
+
+            index.execute("BEGIN")
+            index.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)", rows)
+            index.execute("COMMIT")
+        except BaseException:
+            if index.in_transaction:
+                index.execute("ROLLBACK")
+            self._roll_back(touched)
+            raise
+
+        for item in batch:
+            if item[4] is not None:
+                item[4].set()
+        with self._done:
+            self._committed += len(batch)
+            self.batches += 1
+            self.bytes += sum(len(item[0]) for item in batch)
+            self.max_batch = max(self.max_batch, len(batch))
+            self.commit_seconds += time.perf_counter() - started
+            self._done.notify_all()
+
+    def _roll_back(self, touched):
+        """Échec d'un lot : les segments reviennent à leur taille d'avant le
+        lot (lignes partielles ou non indexées retirées), pour que la reprise
+        réécrive le lot aux bons offsets. Le fichier est fermé d'abord (son
+        tampon ne doit pas être vidé après la troncature) puis rouvert ; si
+        c'est impossible, la reprise ouvre un nouveau segment."""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        try:
+            for segment, size in touched:
+                os.truncate(os.path.join(self.directory, segment), size)
+            if touched and touched[-1][0] == self._segment:
+                self._file = open(os.path.join(self.directory, self._segment), "ab")
+                self._size = self._file.tell()
+        except OSError as e:
+            logging.error(f"📒 Segment d'audit non restauré après échec : {e}")
+            self._file = None
+
+    def _write(self, lines):
+        if not lines:
+            return
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _rotate(self, day):
+        if self._file is not None:
+            self._file.close()
+        prefix = f"audit-{day.replace('-', '')}-{os.getpid()}-"
+        seq = 1 + max((int(name[len(prefix):-6]) for name in os.listdir(self.directory)
+                       if name.startswith(prefix) and name.endswith(".jsonl")), default=0)
+        self._segment = f"{prefix}{seq:04d}.jsonl"
+        self._segment_day = day
+        self._file = open(os.path.join(self.directory, self._segment), "ab")
+        self._size = self._file.tell()
+        if self.fsync:
+            _fsync_dir(self.directory)  # entrée de répertoire du nouveau segment durable
+
+
+def audit_log_from_env():
+    """SOLVENCY_AUDIT_DIR (vide : désactivé), SOLVENCY_AUDIT_SEGMENT_MB,
+    SOLVENCY_AUDIT_QUEUE, SOLVENCY_AUDIT_BATCH, SOLVENCY_AUDIT_LINGER_MS et
+    SOLVENCY_AUDIT_TIMEOUT (secondes)."""
+    directory = os.environ.get("SOLVENCY_AUDIT_DIR", "audit")
+    if not directory:
+        return None
+    return AuditLog(
+        directory,
+        segment_bytes=int(float(os.environ.get("SOLVENCY_AUDIT_SEGMENT_MB", "64")) * 1024 * 1024),
+        queue_size=int(os.environ.get("SOLVENCY_AUDIT_QUEUE", "10000")),
+        batch_size=int(os.environ.get("SOLVENCY_AUDIT_BATCH", "1000")),
+        linger=float(os.environ.get("SOLVENCY_AUDIT_LINGER_MS", "0")) / 1000,
+        timeout=float(os.environ.get("SOLVENCY_AUDIT_TIMEOUT", "5")),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Journal d'audit des décisions de solvabilité.")
+    parser.add_argument("--dir", default=os.environ.get("SOLVENCY_AUDIT_DIR") or "audit")
+    sub = parser.add_subparsers(dest="command", required=True)
+    find = sub.add_parser("find", help="enregistrements par client et par jour (JSONL sur la sortie)")
+    find.add_argument("--client")
+    find.add_argument("--since", help="premier jour inclus (YYYY-MM-DD, UTC)")
+    find.add_argument("--until", help="dernier jour inclus (YYYY-MM-DD, UTC)")
+    find.add_argument("--limit", type=int)
+    sub.add_parser("reindex", help="reconstruction de l'index depuis les segments")
+    sub.add_parser("stats", help="segments et nombre d'enregistrements indexés")
+    args = parser.parse_args(argv)
+
+    reader = AuditReader(args.dir)
+    if args.command == "find":
+        for record in reader.find(args.client, args.since, args.until, args.limit):
+            print(json.dumps(record, ensure_ascii=False))
+    elif args.command == "reindex":
+        print(f"{reader.reindex()} enregistrement(s) indexé(s)")
+    else:
+        db = _open_index(args.dir)
+        try:
+            count, first, last = db.execute("SELECT COUNT(*), MIN(day), MAX(day) FROM records").fetchone()
+        finally:
+            db.close()
+        segments = reader.segments()
+        size = sum(os.path.getsize(os.path.join(args.dir, name)) for name in segments)
+        print(f"{len(segments)} segment(s), {size / 1e6:.1f} Mo, {count} enregistrement(s) ({first} → {last})")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    main()
@@ -0,0 +1,272 @@
+"""
+Vérification de solvabilité hors ligne sur tout le portefeuille (stress tests).
+
+Les clients sont lus en flux (données internes ou fichier CSV/JSONL), passent
+par la même chaîne que VerifySolvency (score → ratio d'endettement →
+décision → explication) sous forme d'étapes génératrices, par paquets
+répartis sur un pool de processus. Le résultat est écrit au fil de l'eau
+(CSV, ou Parquet si pyarrow est installé) avec un point de reprise après
+chaque paquet.
+
+    python batch.py --output resultats.csv [--input clients.csv] [--chunk-size 1000] [--workers 4]
+    python batch.py --output resultats.csv --resume      # reprise après interruption
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from common.lazy import lazy_import
+from common.rules import credit_score, debt_ratio, explain, solvency_decision
+from data.client_directory_data import ClientData
+from data.columnar import client_dataset
+from data.credit_data import CreditData
+from data.finance_data import FinancialData
+
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+COLUMNS = [
+    "clientId", "name", "MonthlyIncome", "Expenses", "debt", "late", "hasBankruptcy",
+    "creditScore", "debtRatio", "solvencyStatus",
+    "creditScoreExplanation", "incomeVsExpensesExplanation", "creditHistoryExplanation",
+]
+
+
+# -------------------------------------------------------
+# 📥 Sources (générateurs)
+# -------------------------------------------------------
+def clients_from_data():
+    """Portefeuille des données internes (ClientData/FinancialData/CreditData),
+    jeu de données projeté SOLVENCY_CLIENT_DATASET compris."""
+    ids = set(ClientData.clients)
+    dataset = client_dataset()
+    if dataset is not None:
+        ids.update(dataset.ids())
+    for client_id in sorted(ids):
+        financial = FinancialData.get_client_financials(client_id)
+        credit = CreditData.get_credit_history(client_id)
+        yield {
+            "clientId": client_id,
+            "name": ClientData.get_client_identity(client_id)["name"],
+            "MonthlyIncome": financial["MonthlyIncome"],
+            "Expenses": financial["Expenses"],
+            "debt": credit["debt"],
+            "late": credit["late"],
+            "hasBankruptcy": credit["hasBankruptcy"],
+        }
+
+
+def _as_bool(value):
+    return value if isinstance(value, bool) else str(value).strip().lower() in ("1", "true", "yes", "oui")
+
+
+def clients_from_file(path):
+    """Export en masse : CSV (en-tête) ou JSONL, mêmes colonnes que clients_from_data."""
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = (json.loads(line) for line in f if line.strip()) if path.endswith(".jsonl") else csv.DictReader(f)
+        for row in rows:
+            yield {
+                "clientId": row["clientId"],
+                "name": row.get("name", ""),
+                "MonthlyIncome": float(row["MonthlyIncome"]),
+                "Expenses": float(row["Expenses"]),
+                "debt": float(row["debt"]),
+                "late": int(row["late"]),
+                "hasBankruptcy": _as_bool(row["hasBankruptcy"]),
+            }
+
+
+# -------------------------------------------------------
+# ⚙️ Étapes de la chaîne (générateurs)
+# -------------------------------------------------------
+def score_stage(rows):
+    for row in rows:
+        row["creditScore"] = int(credit_score(row["debt"], row["late"], row["hasBankruptcy"]))
+        yield row
+
+
+def ratio_stage(rows):
+    for row in rows:
+        # même appel que DecisionService : dépenses mensuelles comme remboursements
+        row["debtRatio"] = debt_ratio(row["MonthlyIncome"], row["Expenses"])
+        yield row
+
+
+def decision_stage(rows):
+    for row in rows:
+        row["solvencyStatus"] = solvency_decision(row["creditScore"], row["debtRatio"])
+        yield row
+
+
+def explain_stage(rows):
+    for row in rows:
+        (row["creditScoreExplanation"],
+         row["incomeVsExpensesExplanation"],
+         row["creditHistoryExplanation"]) = explain(
+            row["creditScore"], row["MonthlyIncome"], row["Expenses"],
+            row["debt"], row["late"], row["hasBankruptcy"],
+        )
+        yield row
+
+
+def process_chunk(rows):
+    """Traitement d'un paquet dans un processus du pool."""
+    return list(explain_stage(decision_stage(ratio_stage(score_stage(iter(rows))))))
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# -------------------------------------------------------
+# 📤 Écriture incrémentale
+# -------------------------------------------------------
+class CsvSink:
+    """Ajoute chaque paquet au CSV ; la position après le dernier paquet
+    validé sert de point de reprise (les lignes au-delà sont tronquées)."""
+
+    def __init__(self, path, resume_at=None):
+        self.path = path
+        exists = resume_at is not None and os.path.exists(path)
+        self._file = open(path, "r+" if exists else "w", encoding="utf-8", newline="")
+        if exists:
+            self._file.seek(resume_at)
+            self._file.truncate()
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        if not exists:
+            self._writer.writeheader()
+
+    def write(self, index, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """Un fichier `part-NNNNN.parquet` par paquet dans le dossier de sortie."""
+
+    def __init__(self, path, resume_at=None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, index, rows):
+        table = pa.Table.from_pylist(rows)
+        part = os.path.join(self.path, f"part-{index:05d}.parquet")
+        pq.write_table(table, part + ".tmp")
+        os.replace(part + ".tmp", part)
+        return None
+
+    def close(self):
+        pass
+
+
+def open_sink(path, resume_at=None):
+    if path.endswith(".parquet"):
+        return ParquetSink(path, resume_at)
+    return CsvSink(path, resume_at)
+
+
+# -------------------------------------------------------
+# 📍 Point de reprise
+# -------------------------------------------------------
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+# -------------------------------------------------------
+# 🏭 Exécution
+# -------------------------------------------------------
+def run(source, output, chunk_size=1000, workers=None, checkpoint=None, resume=False, window=None):
+    """
+    Traite `source` (itérable de clients) par paquets de `chunk_size`.
+    Au plus `window` paquets sont en vol (mémoire bornée) ; les résultats
+    sont écrits dans l'ordre, puis le point de reprise est mis à jour.
+    Retourne le nombre de clients traités (reprise comprise).
+    """
+    checkpoint = checkpoint or output + ".checkpoint.json"
+    workers = workers or os.cpu_count() or 1
+    window = window or 2 * workers
+
+    state = load_checkpoint(checkpoint) if resume else None
+    if state is not None and state["chunk_size"] != chunk_size:
+        raise ValueError(f"Point de reprise créé avec --chunk-size {state['chunk_size']}")
+    state = state or {"chunk_size": chunk_size, "chunks": 0, "rows": 0, "offset": None}
+    if state["chunks"]:
+        logging.info(f"📍 Reprise après {state['chunks']} paquet(s) ({state['rows']} clients)")
+
+    chunks = enumerate(chunked(source, chunk_size))
+    # paquets déjà écrits : la source est relue dans le même ordre et sautée
+    for _ in islice(chunks, state["chunks"]):
+        pass
+
+    sink = open_sink(output, state["offset"] if state["chunks"] else None)
+    start = time.perf_counter()
+    done_now = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            for index, chunk in chunks:
+                pending.append((index, pool.submit(process_chunk, chunk)))
+                if len(pending) >= window:
+                    done_now += _write_next(pending, sink, state, checkpoint)
+            while pending:
+                done_now += _write_next(pending, sink, state, checkpoint)
+    finally:
+        sink.close()
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"✅ {done_now} clients traités en {elapsed:.1f} s "
+                 f"({done_now / elapsed if elapsed else 0:.0f}/s), total {state['rows']}")
+    return state["rows"]
+
+
+def _write_next(pending, sink, state, checkpoint):
+    index, future = pending.pop(0)
+    rows = future.result()
+    state["offset"] = sink.write(index, rows)
+    state["chunks"] = index + 1
+    state["rows"] += len(rows)
+    save_checkpoint(checkpoint, state)
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vérification de solvabilité hors ligne du portefeuille.")
+    parser.add_argument("--output", required=True, help="fichier .csv ou dossier .parquet")
+    parser.add_argument("--input", help="export clients CSV/JSONL (défaut : données internes)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    source = clients_from_file(args.input) if args.input else clients_from_data()
+    run(source, args.output, args.chunk_size, args.workers, args.checkpoint, args.resume)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# -------------------------------------------------------
+# 📝 Journal des modifications des données clients
+# -------------------------------------------------------
+# Chaque mise à jour (ClientData, FinancialData, CreditData) est ajoutée au
+# journal SQLite SOLVENCY_CHANGELOG_DB (vide : pas de journal) puis transmise
+# aux abonnés du processus. Les consommateurs d'un autre processus lisent le
+# journal depuis leur dernière position (ChangeFeed).
+IDENTITY = "identity"
+FINANCIALS = "financials"
+CREDIT = "credit"
+
+
+class Change:
+    __slots__ = ("seq", "source", "client_id", "fields", "ts")
+
+    def __init__(self, seq, source, client_id, fields, ts):
+        self.seq = seq
+        self.source = source
+        self.client_id = client_id
+        self.fields = fields
+        self.ts = ts
+
+    def __repr__(self):
+        return f"Change({self.seq}, {self.source!r}, {self.client_id!r}, {self.fields!r})"
+
+
+class ChangeLog:
+    """Journal en ajout seul : `seq` croissant, jamais réécrit."""
+
+    def __init__(self, path="changes.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS changes ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL,"
+            " client_id TEXT NOT NULL, fields TEXT NOT NULL, ts REAL NOT NULL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS cursors (name TEXT PRIMARY KEY, seq INTEGER NOT NULL)")
+        self._db.commit()
+
+    def append(self, source, client_id, fields):
+        ts = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO changes (source, client_id, fields, ts) VALUES (?, ?, ?, ?)",
+                (source, client_id, json.dumps(fields), ts),
+            )
+            self._db.commit()
+        return Change(cur.lastrowid, source, client_id, fields, ts)
+
+    def since(self, seq, limit=1000):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, source, client_id, fields, ts FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit),
+            ).fetchall()
+        return [Change(s, src, cid, json.loads(f), ts) for s, src, cid, f, ts in rows]
+
+    def last_seq(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def cursor(self, name):
+        with self._lock:
+            row = self._db.execute("SELECT seq FROM cursors WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def save_cursor(self, name, seq):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO cursors VALUES (?, ?)", (name, seq))
+            self._db.commit()
+
+
+class ChangeFeed:
+    """
+    Lecture du journal par un consommateur nommé : `poll(handler)` passe à
+    `handler` les identifiants clients modifiés (dédoublonnés) depuis la
+    dernière position, puis enregistre la nouvelle position. Sans nom, la
+    position est gardée en mémoire et part de la fin du journal (état du
+    processus reconstruit à chaque démarrage, ex. un cache).
+    """
+
+    def __init__(self, log, name=None, batch_size=1000):
+        self.log = log
+        self.name = name
+        self.batch_size = batch_size
+        self.position = log.last_seq() if name is None else None
+
+    def poll(self, handler):
+        """Traite toutes les modifications en attente ; retourne leur nombre."""
+        processed = 0
+        position = self.log.cursor(self.name) if self.name is not None else self.position
+        while True:
+            changes = self.log.since(position, self.batch_size)
+            if not changes:
+                return processed
+            handler(list(dict.fromkeys(c.client_id for c in changes)), changes)
+            position = changes[-1].seq
+            if self.name is not None:
+                self.log.save_cursor(self.name, position)
+            else:
+                self.position = position
+            processed += len(changes)
+
+    def follow(self, handler, interval=1.0, stop=None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.poll(handler)
+            stop.wait(interval)
+
+
+# -------------------------------------------------------
+# 📣 Abonnés du processus
+# -------------------------------------------------------
+_subscribers = []
+_log = None
+_log_lock = threading.Lock()
+
+
+def subscribe(handler):
+    """`handler(change)` est appelé après chaque mise à jour du processus."""
+    _subscribers.append(handler)
+    return handler
+
+
+def unsubscribe(handler):
+    if handler in _subscribers:
+        _subscribers.remove(handler)
+
+
+def change_log():
+    """Journal SOLVENCY_CHANGELOG_DB, ou None si vide (défaut : pas de journal)."""
+    global _log
+    path = os.environ.get("SOLVENCY_CHANGELOG_DB", "")
+    if not path:
+        return None
+    with _log_lock:
+        if _log is None or _log.path != path:
+            _log = ChangeLog(path)
+        return _log
+
+
+def record_change(source, client_id, fields):
+    """Journalise une mise à jour puis prévient les abonnés."""
+    log = change_log()
+    if log is not None:
+        change = log.append(source, client_id, fields)
+    else:
+        change = Change(None, source, client_id, fields, time.time())
+    for handler in list(_subscribers):
+        try:
+            handler(change)
+        except Exception as e:
+            logging.error(f"Erreur abonné aux modifications ({client_id}): {e}")
+    return change
@@ -1,3 +1,9 @@
+from data.changes import IDENTITY, record_change
+from data.columnar import client_dataset
+
+FIELDS = {"name", "address"}
+
+
 class ClientData:
    
 
@@ -9,5 +15,26 @@ class ClientData:
 
     @classmethod
     def get_client_identity(cls, client_id: str):
-        """Retourne le nom et l’adresse du client."""
-        return cls.clients.get(client_id, {"name": "Inconnu", "address": "Non trouvé"})
+        """Retourne le nom et l’adresse du client (dictionnaire du processus, puis jeu projeté)."""
+        record = cls.clients.get(client_id)
+        if record is None:
+            dataset = client_dataset()
+            record = dataset.identity(client_id) if dataset is not None else None
+        return record if record is not None else {"name": "Inconnu", "address": "Non trouvé"}
+
+    @classmethod
+    def update_client_identity(cls, client_id: str, **fields):
+        """Crée ou met à jour le nom/l’adresse du client et journalise la modification."""
+        unknown = set(fields) - FIELDS
+        if unknown:
+            raise ValueError(f"Champs d’identité inconnus : {', '.join(sorted(unknown))}")
+        cls.apply_fields(client_id, fields)
+        return record_change(IDENTITY, client_id, fields)
+
+    @classmethod
+    def apply_fields(cls, client_id: str, fields: dict):
+        """Applique des champs sans journaliser (mise à jour locale, ou rejouée
+        depuis le journal par un autre processus)."""
+        current = dict(cls.get_client_identity(client_id))
+        current.update({k: v for k, v in fields.items() if k in FIELDS})
+        cls.clients[client_id] = current
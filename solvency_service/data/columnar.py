@@ -0,0 +1,332 @@
+"""
+Jeu de données clients en colonnes, projeté en mémoire (mmap) en lecture
+seule : construit une fois, partagé par tous les workers via le cache de
+pages du système au lieu d'une copie des dictionnaires par processus.
+
+    python -m data.columnar build clients.cds                    # données internes
+    python -m data.columnar build clients.cds --input clients.csv
+    python -m data.columnar build clients.cds --json-dir data    # clients/financials/credit_history.json
+    python -m data.columnar info clients.cds
+
+Format (ordre d'octets natif, sections alignées sur 8 octets) :
+  en-tête          magic "CLDS", version, nombre de clients, taille des chaînes
+  hash      u32[n] empreinte crc32 de l'identifiant, triée
+  buckets   u32[2^b+1] début de chaque paquet de `hash` (b bits de poids fort,
+                   2^b ≥ n) : une recherche ne parcourt que ~1 entrée ; les
+                   collisions sont départagées en comparant les identifiants
+  offsets   u32[3n+1] bornes de (identifiant, nom, adresse) dans la table de chaînes
+  flags     u8[n]  sources présentes (identité, finances, crédit)
+  MonthlyIncome, Expenses, debt f64[n] ; late i32[n] ; hasBankruptcy u8[n]
+  strings   table de chaînes UTF-8
+Les lignes sont rangées dans l'ordre des empreintes : la position trouvée
+dans `hash` est l'indice de ligne de toutes les colonnes.
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+
+MAGIC = b"CLDS"
+VERSION = 1
+HEADER = struct.Struct("=4sIQQ")
+
+HAS_IDENTITY = 1
+HAS_FINANCIALS = 2
+HAS_CREDIT = 4
+
+NUMERIC_COLUMNS = (("MonthlyIncome", "d"), ("Expenses", "d"), ("debt", "d"), ("late", "i"), ("hasBankruptcy", "B"))
+
+
+def _hash(key):
+    return zlib.crc32(key)
+
+
+def _bucket_bits(count):
+    return max(count - 1, 1).bit_length()
+
+
+def _layout(count, strings_size):
+    """Position (octets), format et longueur de chaque section."""
+    sections = {}
+    offset = HEADER.size
+    specs = [("hash", "I", count), ("buckets", "I", (1 << _bucket_bits(count)) + 1),
+             ("offsets", "I", 3 * count + 1), ("flags", "B", count)]
+    specs += [(name, fmt, count) for name, fmt in NUMERIC_COLUMNS]
+    specs.append(("strings", "B", strings_size))
+    for name, fmt, length in specs:
+        offset = (offset + 7) & ~7
+        sections[name] = (offset, fmt, length)
+        offset += struct.calcsize(fmt) * length
+    return sections, offset
+
+
+# -------------------------------------------------------
+# 🏗️ Construction (écriture dans un fichier temporaire puis remplacement atomique)
+# -------------------------------------------------------
+def build_dataset(rows, path):
+    """
+    `rows` : dicts {clientId, name?, address?, MonthlyIncome?, Expenses?,
+    debt?, late?, hasBankruptcy?} (une clé absente : source absente pour ce
+    client). Le fichier `path` est remplacé d'un coup : les workers qui
+    l'ont déjà projeté gardent l'ancienne version jusqu'à leur rechargement.
+    """
+    records = {}
+    for row in rows:
+        records[row["clientId"]] = row
+    entries = sorted((_hash(client_id.encode("utf-8")), client_id) for client_id in records)
+    count = len(entries)
+
+    hashes = array("I")
+    offsets = array("I", [0])
+    flags = bytearray()
+    columns = {name: array(fmt) for name, fmt in NUMERIC_COLUMNS}
+    strings = bytearray()
+    for key, client_id in entries:
+        row = records[client_id]
+        hashes.append(key)
+        for text in (client_id, row.get("name") or "", row.get("address") or ""):
+            strings += text.encode("utf-8")
+            offsets.append(len(strings))
+        flags.append((HAS_IDENTITY if row.get("name") is not None else 0)
+                     | (HAS_FINANCIALS if row.get("MonthlyIncome") is not None else 0)
+                     | (HAS_CREDIT if row.get("debt") is not None else 0))
+        columns["MonthlyIncome"].append(float(row.get("MonthlyIncome") or 0.0))
+        columns["Expenses"].append(float(row.get("Expenses") or 0.0))
+        columns["debt"].append(float(row.get("debt") or 0.0))
+        columns["late"].append(int(row.get("late") or 0))
+        columns["hasBankruptcy"].append(1 if row.get("hasBankruptcy") else 0)
+    if len(strings) >= 2 ** 32:
+        raise ValueError("Table de chaînes > 4 Go : format non supporté")
+
+    shift = 32 - _bucket_bits(count)
+    buckets = array("I", [0]) * ((1 << _bucket_bits(count)) + 1)
+    for key in hashes:
+        buckets[(key >> shift) + 1] += 1
+    for b in range(1, len(buckets)):
+        buckets[b] += buckets[b - 1]
+
+    sections, size = _layout(count, len(strings))
+    data = {"hash": hashes, "buckets": buckets, "offsets": offsets, "flags": flags, "strings": strings, **columns}
+
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, len(strings)))
+        for name, (offset, _, _) in sections.items():
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(data[name])
+        f.write(b"\0" * (size - f.tell()))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return count
+
+
+# -------------------------------------------------------
+# 📖 Lecture (projection mmap, colonnes sans copie)
+# -------------------------------------------------------
+class ClientDataset:
+    """Vue en lecture seule d'un fichier construit par `build_dataset`."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.file_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        magic, version, count, strings_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} : jeu de données clients invalide ({magic!r} v{version})")
+        self.count = count
+        view = memoryview(self._mm)
+        sections, size = _layout(count, strings_size)
+        if len(self._mm) < size:
+            raise ValueError(f"{path} : fichier tronqué ({len(self._mm)} < {size} octets)")
+        self._columns = {
+            name: view[offset:offset + struct.calcsize(fmt) * length].cast(fmt)
+            for name, (offset, fmt, length) in sections.items()
+        }
+        self._hashes = self._columns["hash"]
+        self._buckets = self._columns["buckets"]
+        self._shift = 32 - _bucket_bits(count)
+        self._offsets = self._columns["offsets"]
+        self._strings_base = sections["strings"][0]
+        # (identifiant, ligne) de la dernière recherche : identité, finances et
+        # crédit d'un même client sont lus l'un après l'autre
+        self._last = (None, None)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, client_id):
+        return self.row(client_id) is not None
+
+    def _text(self, i, k):
+        base, offsets = self._strings_base, self._offsets
+        return self._mm[base + offsets[3 * i + k]:base + offsets[3 * i + k + 1]]
+
+    def row(self, client_id):
+        """Indice de ligne du client, ou None."""
+        last = self._last
+        if last[0] == client_id:
+            return last[1]
+        key = client_id.encode("utf-8")
+        h = _hash(key)
+        b = h >> self._shift
+        hashes = self._hashes
+        for i in range(self._buckets[b], self._buckets[b + 1]):
+            if hashes[i] == h and self._text(i, 0) == key:
+                self._last = (client_id, i)
+                return i
+        self._last = (client_id, None)
+        return None
+
+    def column(self, name):
+        """Colonne entière, sans copie (memoryview typée en lecture seule)."""
+        return self._columns[name]
+
+    def ids(self):
+        for i in range(self.count):
+            yield self._text(i, 0).decode("utf-8")
+
+    def identity(self, client_id):
+        i = self.row(client_id)
+        if i is None or not self._columns["flags"][i] & HAS_IDENTITY:
+            return None
+        return {"name": self._text(i, 1).decode("utf-8"), "address": self._text(i, 2).decode("utf-8")}
+
+    def financials(self, client_id):
+        i = self.row(client_id)
+        if i is None or not self._columns["flags"][i] & HAS_FINANCIALS:
+            return None
+        return {"MonthlyIncome": self._columns["MonthlyIncome"][i], "Expenses": self._columns["Expenses"][i]}
+
+    def credit(self, client_id):
+        i = self.row(client_id)
+        if i is None or not self._columns["flags"][i] & HAS_CREDIT:
+            return None
+        return {"debt": self._columns["debt"][i], "late": self._columns["late"][i],
+                "hasBankruptcy": bool(self._columns["hasBankruptcy"][i])}
+
+
+# -------------------------------------------------------
+# 🔁 Jeu de données du processus (rechargé après remplacement du fichier)
+# -------------------------------------------------------
+_dataset = None
+_checked = 0.0
+_dataset_lock = threading.Lock()
+
+
+def client_dataset():
+    """
+    Jeu de données SOLVENCY_CLIENT_DATASET (vide, défaut : désactivé).
+    Le fichier est vérifié toutes les SOLVENCY_CLIENT_DATASET_CHECK secondes
+    et reprojeté s'il a été remplacé ; l'ancienne projection est libérée
+    quand plus personne ne la référence.
+    """
+    global _dataset, _checked
+    path = os.environ.get("SOLVENCY_CLIENT_DATASET", "")
+    if not path:
+        return None
+    now = time.monotonic()
+    with _dataset_lock:
+        interval = float(os.environ.get("SOLVENCY_CLIENT_DATASET_CHECK", "1.0"))
+        if _dataset is not None and _dataset.path == path and now - _checked < interval:
+            return _dataset
+        _checked = now
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if _dataset is None or _dataset.path != path:
+                logging.warning(f"Jeu de données clients introuvable : {path}")
+                _dataset = None
+            return _dataset
+        if _dataset is None or _dataset.path != path or _dataset.file_key != (st.st_ino, st.st_mtime_ns, st.st_size):
+            _dataset = ClientDataset(path)
+            logging.info(f"🗂️ Jeu de données clients projeté : {path} ({_dataset.count} clients)")
+        return _dataset
+
+
+# -------------------------------------------------------
+# 📥 Sources de construction
+# -------------------------------------------------------
+def rows_from_data():
+    """Données internes (ClientData/FinancialData/CreditData), sources absentes comprises."""
+    from data.client_directory_data import ClientData
+    from data.credit_data import CreditData
+    from data.finance_data import FinancialData
+
+    ids = set(ClientData.clients) | set(FinancialData.financials) | set(CreditData.credit_history)
+    dataset = client_dataset()
+    if dataset is not None:
+        ids.update(dataset.ids())
+    for client_id in sorted(ids):
+        row = {"clientId": client_id}
+        identity = ClientData.clients.get(client_id) or (dataset.identity(client_id) if dataset else None)
+        financial = FinancialData.financials.get(client_id) or (dataset.financials(client_id) if dataset else None)
+        credit = CreditData.credit_history.get(client_id) or (dataset.credit(client_id) if dataset else None)
+        for record in (identity, financial, credit):
+            row.update(record or {})
+        yield row
+
+
+def rows_from_json(directory):
+    """Fichiers clients.json, financials.json et credit_history.json d'un dossier."""
+    def load(name):
+        target = os.path.join(directory, name)
+        if not os.path.exists(target):
+            return {}
+        with open(target, encoding="utf-8") as f:
+            return json.load(f)
+
+    clients, financials, credit = load("clients.json"), load("financials.json"), load("credit_history.json")
+    for client_id in sorted(set(clients) | set(financials) | set(credit)):
+        row = {"clientId": client_id}
+        if client_id in clients:
+            row.update(name=clients[client_id].get("name", ""), address=clients[client_id].get("address", ""))
+        if client_id in financials:
+            row.update(MonthlyIncome=financials[client_id].get("monthlyIncome", 0.0),
+                       Expenses=financials[client_id].get("monthlyExpenses", 0.0))
+        if client_id in credit:
+            row.update(debt=credit[client_id].get("debt", 0.0), late=credit[client_id].get("latePayments", 0),
+                       hasBankruptcy=credit[client_id].get("hasBankruptcy", False))
+        yield row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jeu de données clients projeté en mémoire.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="construction (remplacement atomique du fichier)")
+    build.add_argument("path")
+    source = build.add_mutually_exclusive_group()
+    source.add_argument("--input", help="export clients CSV/JSONL (colonnes de batch.py)")
+    source.add_argument("--json-dir", help="dossier contenant clients.json, financials.json, credit_history.json")
+    info = sub.add_parser("info", help="résumé d'un fichier")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.command == "build":
+        if args.input:
+            from batch import clients_from_file
+            rows = clients_from_file(args.input)
+        elif args.json_dir:
+            rows = rows_from_json(args.json_dir)
+        else:
+            rows = rows_from_data()
+        start = time.perf_counter()
+        count = build_dataset(rows, args.path)
+        logging.info(f"🗂️ {count} clients écrits dans {args.path} en {time.perf_counter() - start:.1f} s "
+                     f"({os.path.getsize(args.path) / 1e6:.1f} Mo)")
+    else:
+        dataset = ClientDataset(args.path)
+        print(f"{args.path} : {dataset.count} clients, {os.path.getsize(args.path) / 1e6:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+from data.changes import CREDIT, record_change
+from data.columnar import client_dataset
+
+FIELDS = {"debt", "late", "hasBankruptcy"}
+
+
 class CreditData:
     """Simule l’historique de crédit d’un client."""
 
@@ -9,8 +15,26 @@ class CreditData:
 
     @classmethod
     def get_credit_history(cls, client_id: str):
-        """Retourne l’historique de crédit du client."""
-        return cls.credit_history.get(
-            client_id,
-            {"debt": 0.0, "late": 0, "hasBankruptcy": False}  # valeurs par défaut
-        )
+        """Retourne l’historique de crédit du client (dictionnaire du processus, puis jeu projeté)."""
+        record = cls.credit_history.get(client_id)
+        if record is None:
+            dataset = client_dataset()
+            record = dataset.credit(client_id) if dataset is not None else None
+        return record if record is not None else {"debt": 0.0, "late": 0, "hasBankruptcy": False}  # valeurs par défaut
+
+    @classmethod
+    def update_credit_history(cls, client_id: str, **fields):
+        """Met à jour l’historique de crédit du client et journalise la modification."""
+        unknown = set(fields) - FIELDS
+        if unknown:
+            raise ValueError(f"Champs de crédit inconnus : {', '.join(sorted(unknown))}")
+        cls.apply_fields(client_id, fields)
+        return record_change(CREDIT, client_id, fields)
+
+    @classmethod
+    def apply_fields(cls, client_id: str, fields: dict):
+        """Applique des champs sans journaliser (mise à jour locale, ou rejouée
+        depuis le journal par un autre processus)."""
+        current = dict(cls.get_credit_history(client_id))
+        current.update({k: v for k, v in fields.items() if k in FIELDS})
+        cls.credit_history[client_id] = current
@@ -1,3 +1,9 @@
+from data.changes import FINANCIALS, record_change
+from data.columnar import client_dataset
+
+FIELDS = {"MonthlyIncome", "Expenses"}
+
+
 class FinancialData:
     """Simule une source de données financière in-memory."""
 
@@ -9,8 +15,26 @@ class FinancialData:
 
     @classmethod
     def get_client_financials(cls, client_id: str):
-        """Retourne les données financières d’un client."""
-        return cls.financials.get(
-            client_id,
-            {"MonthlyIncome": 0.0, "Expenses": 0.0}  # valeurs par défaut
-        )
+        """Retourne les données financières d’un client (dictionnaire du processus, puis jeu projeté)."""
+        record = cls.financials.get(client_id)
+        if record is None:
+            dataset = client_dataset()
+            record = dataset.financials(client_id) if dataset is not None else None
+        return record if record is not None else {"MonthlyIncome": 0.0, "Expenses": 0.0}  # valeurs par défaut
+
+    @classmethod
+    def update_client_financials(cls, client_id: str, **fields):
+        """Met à jour revenus/dépenses du client et journalise la modification."""
+        unknown = set(fields) - FIELDS
+        if unknown:
+            raise ValueError(f"Champs financiers inconnus : {', '.join(sorted(unknown))}")
+        cls.apply_fields(client_id, fields)
+        return record_change(FINANCIALS, client_id, fields)
+
+    @classmethod
+    def apply_fields(cls, client_id: str, fields: dict):
+        """Applique des champs sans journaliser (mise à jour locale, ou rejouée
+        depuis le journal par un autre processus)."""
+        current = dict(cls.get_client_financials(client_id))
+        current.update({k: float(v) for k, v in fields.items() if k in FIELDS})
+        cls.financials[client_id] = current
@@ -1,4 +1,4 @@
-from spyne import ComplexModel, Unicode, Float, Integer, Boolean
+from spyne import ComplexModel, Unicode, Float, Integer, Boolean, Array
 
 class ClientIdentity(ComplexModel):
     __namespace__ = "urn:solvency.verification.service:v1"
@@ -49,3 +49,93 @@ class SolvencyResponse(ComplexModel):
     explanations = Explanations
     propertyEvaluation = PropertyEvaluationResponse
     approvalResponse =ApprovalResponse
+    responseProfile = Unicode  # "full", "decisionOnly" ou "explainAsync"
+    sections = Array(Unicode)  # parties effectivement calculées
+    explanationJobId = Unicode  # explainAsync : travail à interroger
+
+
+class JobTicket(ComplexModel):
+    """Accusé de soumission d'une vérification asynchrone"""
+    __namespace__ = "urn:solvency.verification.service:v1"
+
+    jobId = Unicode
+    status = Unicode  # "queued"
+
+
+class JobResult(ComplexModel):
+    """État d'un travail : queued, running, done, failed ou not_found"""
+    __namespace__ = "urn:solvency.verification.service:v1"
+
+    jobId = Unicode
+    status = Unicode
+    attempts = Integer
+    error = Unicode
+    result = SolvencyResponse
+
+
+class LoanOffer(ComplexModel):
+    """Combinaison montant × durée accordable (taux et mensualité espérés)"""
+    __namespace__ = "urn:solvency.verification.service:v1"
+
+    amount = Float
+    durationYears = Integer
+    ltv = Float
+    interestRate = Float
+    monthlyPayment = Float
+    debtRatio = Float
+    approvalProbability = Float
+    tier = Unicode  # "optimal" ou "conditions"
+
+
+class LoanOfferResponse(ComplexModel):
+    """Frontière des offres accordables pour un client et un bien"""
+    __namespace__ = "urn:solvency.verification.service:v1"
+
+    clientId = Unicode
+    eligible = Boolean
+    reason = Unicode
+    requestedFeasible = Boolean
+    requestedOffer = LoanOffer
+    bestOffer = LoanOffer
+    frontier = Array(LoanOffer)  # plus grand montant accordable par durée
+    evaluated = Integer  # combinaisons évaluées
+    elapsedMs = Float
+
+
+class ResponseCacheStats(ComplexModel):
+    """Statistiques du cache de réponses sérialisées (SOAP_RESPONSE_CACHE_TTL)"""
+    __namespace__ = "urn:solvency.verification.service:v1"
+
+    entries = Integer
+    hits = Integer
+    misses = Integer
+    notModified = Integer  # réponses 304 (If-None-Match)
+    hitRatio = Float
+    savedMs = Float  # temps de sérialisation économisé
+    avgSerializeMs = Float
+
+
+class Borrower(ComplexModel):
+    """Co-emprunteur d'une demande commune : données et score individuels"""
+    __namespace__ = "urn:solvency.verification.service:v1"
+
+    clientId = Unicode
+    clientIdentity = ClientIdentity
+    financials = Financials
+    creditHistory = CreditHistory
+    creditScore = Integer
+
+
+class HouseholdSolvencyResponse(ComplexModel):
+    """Réponse de VerifyHouseholdSolvency : décision sur revenus et dettes cumulés"""
+    __namespace__ = "urn:solvency.verification.service:v1"
+
+    borrowers = Array(Borrower)
+    combinedFinancials = Financials  # revenus et dépenses cumulés
+    combinedCreditHistory = CreditHistory  # dettes et retards cumulés, faillite d'un seul
+    creditScore = Integer  # score retenu : le plus faible des co-emprunteurs
+    solvencyStatus = Unicode
+    explanations = Explanations
+    propertyEvaluation = PropertyEvaluationResponse
+    approvalResponse = ApprovalResponse
+    sections = Array(Unicode)
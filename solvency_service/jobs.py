@@ -0,0 +1,227 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+# -------------------------------------------------------
+# 🗂️ File de travaux persistante (SQLite)
+# -------------------------------------------------------
+# statuts : queued → running → done | failed
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+# -------------------------------------------------------
+# 📨 URL de rappel (callbackUrl)
+# -------------------------------------------------------
+# Fournie par un appelant non authentifié : sans contrôle, le worker
+# posterait vers n'importe quelle adresse du réseau interne (SSRF). Seuls
+# http/https vers un hôte de SOLVENCY_CALLBACK_HOSTS ("hote" ou
+# "hote:port", séparés par des virgules) sont acceptés ; liste vide (défaut) :
+# aucun rappel.
+def callback_hosts_from_env():
+    return {h.strip().lower() for h in os.environ.get("SOLVENCY_CALLBACK_HOSTS", "").split(",") if h.strip()}
+
+
+def callback_allowed(url, allowed_hosts):
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return False
+    if parts.scheme not in ("http", "https") or not parts.hostname or parts.username or parts.password:
+        return False
+    host = parts.hostname.lower()
+    return host in allowed_hosts or (port is not None and f"{host}:{port}" in allowed_hosts)
+
+
+class JobStore:
+    """
+    File de travaux sur disque, partagée entre workers et conservée entre
+    redémarrages. Un travail pris par un worker porte un bail (`lease`) :
+    s'il n'est pas terminé avant son expiration (worker arrêté, crash),
+    il repasse dans la file. Un travail en échec n'est repris qu'après
+    `retry_delay` secondes, doublées à chaque tentative (`not_before`).
+    """
+
+    def __init__(self, path="jobs.sqlite", lease=300.0, max_attempts=3, retry_delay=5.0):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,"
+            " payload TEXT NOT NULL, callback_url TEXT, result TEXT, error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " created REAL NOT NULL, updated REAL NOT NULL, not_before REAL NOT NULL DEFAULT 0)"
+        )
+        # file créée avant l'ajout des reprises différées
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "not_before" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN not_before REAL NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+
+    def submit(self, kind, payload, callback_url=None):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, payload, callback_url, created, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, payload, callback_url, now, now),
+            )
+        return job_id
+
+    def claim(self):
+        """Prend le plus ancien travail en attente (ou au bail expiré) dont
+        la reprise n'est plus différée."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, updated = ? WHERE status = ? AND updated < ?",
+                    (QUEUED, now, RUNNING, now - self.lease),
+                )
+                row = self._db.execute(
+                    "SELECT * FROM jobs WHERE status = ? AND not_before <= ? ORDER BY created LIMIT 1",
+                    (QUEUED, now),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, updated = ? WHERE id = ?",
+                        (RUNNING, now, row["id"]),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return dict(row) if row is not None else None
+
+    def complete(self, job_id, result):
+        self._finish(job_id, DONE, result=result)
+
+    def fail(self, job_id, error, attempts):
+        if attempts >= self.max_attempts:
+            self._finish(job_id, FAILED, error=error)
+        else:
+            self._finish(job_id, QUEUED, error=error, delay=self.retry_delay * 2 ** (attempts - 1))
+
+    def _finish(self, job_id, status, result=None, error=None, delay=0.0):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated = ?, not_before = ? WHERE id = ?",
+                (status, result, error, now, now + delay, job_id),
+            )
+
+    def purge(self, older_than):
+        """Supprime les travaux terminés (done, failed) depuis plus de
+        `older_than` secondes ; retourne leur nombre."""
+        with self._lock:
+            cur = self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?",
+                (DONE, FAILED, time.time() - older_than),
+            )
+        return cur.rowcount
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+
+class JobWorkerPool:
+    """
+    Pool de threads qui consomme la file : `handlers[kind](payload)` calcule
+    le résultat (texte), `on_done(job)` est appelé une fois le travail terminé
+    ou définitivement en échec (notification de callback par exemple).
+    `retention` > 0 : les travaux terminés depuis plus de `retention`
+    secondes sont supprimés (au plus une fois par `purge_interval`).
+    """
+
+    def __init__(self, store, handlers, concurrency=4, poll_interval=0.5, on_done=None,
+                 retention=0.0, purge_interval=3600.0):
+        self.store = store
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.on_done = on_done
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._purge_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._run, name=f"solvency-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logging.info(f"🧵 {self.concurrency} worker(s) de travaux démarrés ({self.store.path})")
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wakeup.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def notify(self):
+        """Réveille les workers après une soumission."""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._purge_if_due()
+            job = self.store.claim()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._execute(job)
+
+    def _purge_if_due(self):
+        if self.retention <= 0:
+            return
+        with self._purge_lock:
+            now = time.monotonic()
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.purge_interval
+        try:
+            purged = self.store.purge(self.retention)
+        except sqlite3.Error as e:
+            logging.error(f"Erreur purge des travaux: {e}")
+            return
+        if purged:
+            logging.info(f"🧹 {purged} travail(aux) terminé(s) supprimé(s) de la file")
+
+    def _execute(self, job):
+        try:
+            result = self.handlers[job["kind"]](job["payload"])
+        except Exception as e:
+            logging.error(f"Erreur travail {job['id']}: {e}")
+            self.store.fail(job["id"], str(e), job["attempts"] + 1)
+        else:
+            self.store.complete(job["id"], result)
+
+        finished = self.store.get(job["id"])
+        if self.on_done is not None and finished["status"] in (DONE, FAILED):
+            try:
+                self.on_done(finished)
+            except Exception as e:
+                logging.error(f"Erreur notification travail {job['id']}: {e}")
@@ -1,23 +1,55 @@
-from spyne import Application, rpc, ServiceBase, Unicode, Float
+from spyne import Application, rpc, ServiceBase, Unicode, Float, Integer, Fault, Array
+from concurrent.futures import ThreadPoolExecutor
 from spyne.protocol.soap import Soap11
-from spyne.server.wsgi import WsgiApplication
-import requests
+from spyne.util.xml import get_object_as_xml, get_xml_as_object
+from lxml import etree
+from common.capture import capture_from_env
+from common.compression import CompressionMiddleware
+from common.discovery import ServiceRegistry
+from common.limits import limits_from_env
+from common.microbatch import batcher_from_env
+from common.offers import MAX_PROPERTY_VALUE, optimize_offers
+from common.readiness import downstream_step, readiness_from_env, soap_self_calls, warmup_envelope
+from common.response_cache import ResponseCacheMiddleware, mark_cacheable, response_cache_from_env
+from common.rules import MIN_CREDIT_SCORE, credit_score as compute_credit_score
+from common.soap_client import get_session
+from common.validation import ValidationRouter, soap_in_protocol, validation_mode
+from common.wsdl import PrecomputedWsdlMiddleware
+import atexit
+import json
 import logging
+import os
+import threading
+import time
 import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
 
 # Imports internes
+from data.changes import ChangeFeed, change_log, subscribe
+from data.columnar import client_dataset
 from data.client_directory_data import ClientData
 from data.credit_data import CreditData
 from data.finance_data import FinancialData
 from data.models import (
     SolvencyResponse,
+    JobTicket,
+    JobResult,
     ClientIdentity,
     Financials,
     CreditHistory,
     Explanations,
     PropertyEvaluationResponse,
-    ApprovalResponse
+    ApprovalResponse,
+    Borrower,
+    HouseholdSolvencyResponse,
+    LoanOffer,
+    LoanOfferResponse,
+    ResponseCacheStats
 )
+from admission import admission_from_env
+from audit import AuditUnavailable, audit_log_from_env
+from jobs import DONE, FAILED, JobStore, JobWorkerPool, callback_allowed, callback_hosts_from_env
+from snapshot import client_row, snapshot_store_from_env
 
 # -------------------------------------------------------
 # 🔹 Configuration des logs
@@ -36,20 +68,34 @@ class CORSMiddleware:
         def cors_start_response(status, headers, exc_info=None):
             headers.append(('Access-Control-Allow-Origin', '*'))
             headers.append(('Access-Control-Allow-Methods', 'POST, GET, OPTIONS'))
-            headers.append(('Access-Control-Allow-Headers', 'Content-Type, SOAPAction'))
+            headers.append(('Access-Control-Allow-Headers', 'Content-Type, SOAPAction, If-None-Match'))
+            headers.append(('Access-Control-Expose-Headers', 'ETag, X-Response-Cache'))
             return start_response(status, headers, exc_info)
 
         if environ['REQUEST_METHOD'] == 'OPTIONS':
             start_response('200 OK', [
                 ('Access-Control-Allow-Origin', '*'),
                 ('Access-Control-Allow-Methods', 'POST, GET, OPTIONS'),
-                ('Access-Control-Allow-Headers', 'Content-Type, SOAPAction'),
+                ('Access-Control-Allow-Headers', 'Content-Type, SOAPAction, If-None-Match'),
                 ('Content-Length', '0'),
             ])
             return [b'']
         return self.app(environ, cors_start_response)
 
 
+# -------------------------------------------------------
+# 🧭 Services appelés (URL par défaut, réplicas via SOAP_ENDPOINTS)
+# -------------------------------------------------------
+registry = ServiceRegistry({
+    "ie_service": "http://ie_service:8001/",
+    "credit_scoring_service": "http://credit_scoring_service:8002/",
+    "decision_solvability_service": "http://decision_solvability_service:8003/",
+    "explain_service": "http://explain_service:8005/",
+    "property_evaluation_service": "http://property_evaluation_service:8006/",
+    "approbation_service": "http://approbation_service:8007/",
+})
+
+
 # ---------- Fonctions utilitaires de parsing (robustes) ----------
 def find_with_ns_or_local(root, name, ns=None):
     """
@@ -76,303 +122,928 @@ def text_of(elem):
 
 
 # -------------------------------------------------------
-# 🧠 Service principal d’orchestration
+# 📊 Étapes score et décision (CreditScoringService, DecisionService)
 # -------------------------------------------------------
-class SolvencyService(ServiceBase):
+def credit_score_step(credit):
+    """Retourne le score de crédit, ou None si le service n'a pas répondu."""
+    try:
+        if credit_score_batcher is not None:
+            return credit_score_batcher.call(credit, timeout=10)
+        soap_request = f"""
+        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+                          xmlns:urn="urn:creditscore.service:v1">
+           <soapenv:Body>
+              <urn:ComputeCreditScore>
+                 <urn:debt>{credit['debt']}</urn:debt>
+                 <urn:latePayments>{credit['late']}</urn:latePayments>
+                 <urn:hasBankruptcy>{str(credit['hasBankruptcy']).lower()}</urn:hasBankruptcy>
+              </urn:ComputeCreditScore>
+           </soapenv:Body>
+        </soapenv:Envelope>
+        """
+        resp = registry.post("credit_scoring_service", soap_request)
+        root = ET.fromstring(resp.content)
+        ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:creditscore.service:v1"}
+        score_elem = find_with_ns_or_local(root, "score", ns)
+        return int(float(text_of(score_elem) or 0))
+    except Exception as e:
+        logging.error(f"Erreur CreditScoreService: {e}")
+        return None
 
-    @rpc(Unicode, Unicode, _returns=SolvencyResponse)
-    def VerifySolvency(ctx, clientId, demandeTexte):
-        logging.info(f"🧩 Vérification de solvabilité pour {clientId}")
-
-        # 1️⃣ Récupération des données internes
-        client = ClientData.get_client_identity(clientId)
-        financial = FinancialData.get_client_financials(clientId)
-        credit = CreditData.get_credit_history(clientId)
-
-        if not client or client.get("name") == "Inconnu":
-            return SolvencyResponse(
-                solvencyStatus="error",
-                creditScore=0,
-                explanations=Explanations(
-                    creditScoreExplanation="Client introuvable dans la base interne.",
-                    incomeVsExpensesExplanation="",
-                    creditHistoryExplanation=""
-                )
-            )
 
-        # 2️⃣ Appel du service IE (Extraction des infos)
-        extraction = {
-            "amount": 0.0,
-            "duration_years": 0,
-            "property_type": "Inconnu",
-            "property_description": "",
-            "location": "Inconnue"
-        }
-        try:
-            soap_request = f"""<?xml version="1.0" encoding="utf-8"?>
+def decision_step(credit_score, financial):
+    """Retourne le statut de solvabilité, ou None si le service n'a pas répondu."""
+    try:
+        soap_request = f"""
+        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+                          xmlns:urn="urn:solvency.decision:v1">
+           <soapenv:Body>
+              <urn:MakeDecision>
+                 <urn:creditScore>{credit_score}</urn:creditScore>
+                 <urn:monthlyIncome>{financial['MonthlyIncome']}</urn:monthlyIncome>
+                 <urn:monthlyDebtPayments>{financial['Expenses']}</urn:monthlyDebtPayments>
+              </urn:MakeDecision>
+           </soapenv:Body>
+        </soapenv:Envelope>
+        """
+        resp = registry.post("decision_solvability_service", soap_request)
+        root = ET.fromstring(resp.content)
+        ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:solvency.decision:v1"}
+        return text_of(find_with_ns_or_local(root, "solvencyStatus", ns)) or "unknown"
+    except Exception as e:
+        logging.error(f"Erreur DecisionService: {e}")
+        return None
+
+
+# -------------------------------------------------------
+# 💬 Étape optionnelle : explications (ExplanationService)
+# -------------------------------------------------------
+def explain_step(credit_score, financial, credit):
+    """Retourne les Explanations, ou None si le service n'a pas répondu."""
+    explanations = Explanations()
+    try:
+        if explain_batcher is not None:
+            return explain_batcher.call((credit_score, financial, credit), timeout=10)
+        soap_request = f"""
+        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+                          xmlns:urn="urn:explain.service:v1">
+           <soapenv:Body>
+              <urn:Explain>
+                 <urn:score>{credit_score}</urn:score>
+                 <urn:monthlyIncome>{financial['MonthlyIncome']}</urn:monthlyIncome>
+                 <urn:monthlyExpenses>{financial['Expenses']}</urn:monthlyExpenses>
+                 <urn:debt>{credit['debt']}</urn:debt>
+                 <urn:latePayments>{credit['late']}</urn:latePayments>
+                 <urn:hasBankruptcy>{str(credit['hasBankruptcy']).lower()}</urn:hasBankruptcy>
+              </urn:Explain>
+           </soapenv:Body>
+        </soapenv:Envelope>
+        """
+        resp = registry.post("explain_service", soap_request)
+        root = ET.fromstring(resp.content)
+        ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:explain.service:v1"}
+        explanations.creditScoreExplanation = text_of(find_with_ns_or_local(root, "creditScoreExplanation", ns)) or ""
+        explanations.incomeVsExpensesExplanation = text_of(find_with_ns_or_local(root, "incomeVsExpensesExplanation", ns)) or ""
+        explanations.creditHistoryExplanation = text_of(find_with_ns_or_local(root, "creditHistoryExplanation", ns)) or ""
+    except Exception as e:
+        logging.error(f"Erreur ExplanationService: {e}")
+        return None
+    return explanations
+
+
+# -------------------------------------------------------
+# 📦 Regroupement des appels concurrents (SOAP_BATCH_WINDOW_MS > 0)
+# -------------------------------------------------------
+def iter_local(root, name):
+    return [e for e in root.iter() if e.tag.rsplit("}", 1)[-1] == name]
+
+
+def send_credit_score_batch(credits):
+    items = "".join(
+        f"<urn:CreditScoreInput><urn:debt>{c['debt']}</urn:debt><urn:latePayments>{c['late']}</urn:latePayments>"
+        f"<urn:hasBankruptcy>{str(c['hasBankruptcy']).lower()}</urn:hasBankruptcy></urn:CreditScoreInput>"
+        for c in credits
+    )
+    soap_request = f"""
+        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+                          xmlns:urn="urn:creditscore.service:v1">
+           <soapenv:Body>
+              <urn:ComputeCreditScoreBatch><urn:items>{items}</urn:items></urn:ComputeCreditScoreBatch>
+           </soapenv:Body>
+        </soapenv:Envelope>
+        """
+    resp = registry.post("credit_scoring_service", soap_request)
+    root = ET.fromstring(resp.content)
+    ns = {"tns": "urn:creditscore.service:v1"}
+    return [int(float(text_of(r.find("tns:score", ns)) or 0)) for r in iter_local(root, "CreditScoreResult")]
+
+
+def send_explain_batch(requests):
+    items = "".join(
+        f"<urn:ExplainInput><urn:score>{score}</urn:score>"
+        f"<urn:monthlyIncome>{financial['MonthlyIncome']}</urn:monthlyIncome>"
+        f"<urn:monthlyExpenses>{financial['Expenses']}</urn:monthlyExpenses>"
+        f"<urn:debt>{credit['debt']}</urn:debt><urn:latePayments>{credit['late']}</urn:latePayments>"
+        f"<urn:hasBankruptcy>{str(credit['hasBankruptcy']).lower()}</urn:hasBankruptcy></urn:ExplainInput>"
+        for score, financial, credit in requests
+    )
+    soap_request = f"""
+        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+                          xmlns:urn="urn:explain.service:v1">
+           <soapenv:Body>
+              <urn:ExplainBatch><urn:items>{items}</urn:items></urn:ExplainBatch>
+           </soapenv:Body>
+        </soapenv:Envelope>
+        """
+    resp = registry.post("explain_service", soap_request)
+    root = ET.fromstring(resp.content)
+    ns = {"tns": "urn:explain.service:v1"}
+    return [
+        Explanations(
+            creditScoreExplanation=text_of(r.find("tns:creditScoreExplanation", ns)) or "",
+            incomeVsExpensesExplanation=text_of(r.find("tns:incomeVsExpensesExplanation", ns)) or "",
+            creditHistoryExplanation=text_of(r.find("tns:creditHistoryExplanation", ns)) or "",
+        )
+        for r in iter_local(root, "ExplanationResponse")
+    ]
+
+
+credit_score_batcher = batcher_from_env("ComputeCreditScore", send_credit_score_batch)
+explain_batcher = batcher_from_env("Explain", send_explain_batch)
+
+
+# -------------------------------------------------------
+# 🏠 Étapes demande et bien (IE_Service, PropertyEvaluation, Approbation)
+# -------------------------------------------------------
+def extraction_step(demandeTexte):
+    """Champs extraits de la demande par IE_Service (valeurs par défaut si le
+    service n'a pas répondu)."""
+    extraction = {
+        "amount": 0.0,
+        "duration_years": 0,
+        "property_type": "Inconnu",
+        "property_description": "",
+        "location": "Inconnue"
+    }
+    try:
+        soap_request = f"""<?xml version="1.0" encoding="utf-8"?>
 <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                  xmlns:tns="urn:ie.service:v7">
+              xmlns:tns="urn:ie.service:v7">
    <soapenv:Body>
-      <tns:extractInformation>
-         <tns:text>{demandeTexte}</tns:text>
-      </tns:extractInformation>
+  <tns:extractInformation>
+     <tns:text>{escape(demandeTexte or '')}</tns:text>
+  </tns:extractInformation>
    </soapenv:Body>
 </soapenv:Envelope>"""
 
-            resp = requests.post(
-                "http://ie_service:8001/",
-                data=soap_request.encode("utf-8"),
-                headers={"Content-Type": "text/xml;charset=UTF-8"},
-                timeout=10
-            )
-            logging.info(f"IE service status: {resp.status_code}")
-            logging.debug(f"IE raw response: {resp.content.decode('utf-8', errors='ignore')}")
-
-            root = ET.fromstring(resp.content)
-            ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:ie.service:v7"}
-
-            # Spyne renvoie souvent <extractInformationResponse> (pas necessarily a "Result" wrapper)
-            resp_elem = find_with_ns_or_local(root, "extractInformationResponse", ns)
-            if resp_elem is None:
-                # fallback : chercher les champs directement
-                resp_elem = root
-
-            # Lecture robuste des champs
-            amount_txt = text_of(find_with_ns_or_local(resp_elem, "amount", ns))
-            dur_txt = text_of(find_with_ns_or_local(resp_elem, "duration_years", ns))
-            ptype_txt = text_of(find_with_ns_or_local(resp_elem, "property_type", ns))
-            pdesc_txt = text_of(find_with_ns_or_local(resp_elem, "property_description", ns))
-            loc_txt = text_of(find_with_ns_or_local(resp_elem, "location", ns))
-
-            extraction["amount"] = float(amount_txt) if amount_txt else 0.0
-            extraction["duration_years"] = int(dur_txt) if dur_txt else 0
-            extraction["property_type"] = ptype_txt or "Inconnu"
-            extraction["property_description"] = pdesc_txt or ""
-            extraction["location"] = loc_txt or "Inconnue"
-
-            logging.info(f"🏠 Extraction réussie : {extraction}")
-        except Exception as e:
-            logging.error(f"Erreur IE_Service: {e}")
-            logging.debug("IE raw content (on exception): %s", resp.content.decode('utf-8', errors='ignore') if 'resp' in locals() else 'n/a')
-
-        # 3️⃣ Appel du service PropertyEvaluation (envoi correct du bon élément racine)
-        property_eval = PropertyEvaluationResponse(
-            estimatedValue=0.0,
-            legalCompliance=False,
-            evaluationReport="Aucune évaluation disponible.",
-            canProceed=False
-        )
-        try:
-            # Construire le SOAP correctement : utiliser le préfixe tns défini dans xmlns:tns
-            soap_request = f"""
-                <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                                xmlns:tns="urn:property.evaluation:v1">
-                <soapenv:Body>
-                        <tns:EvaluateProperty>
-                            <tns:data>
-                                <tns:amount>{extraction['amount']}</tns:amount>
-                                <tns:duration_years>{extraction['duration_years']}</tns:duration_years>
-                                <tns:property_type>{extraction['property_type']}</tns:property_type>
-                                <tns:property_description>{extraction['property_description']}</tns:property_description>
-                                <tns:location>{extraction['location']}</tns:location>
-                            </tns:data>
-                        </tns:EvaluateProperty>
-                </soapenv:Body>
-                </soapenv:Envelope>
-                """
-
-            resp = requests.post(
-                "http://property_evaluation_service:8006/",
-                data=soap_request.encode("utf-8"),
-                headers={"Content-Type": "text/xml;charset=UTF-8"},
-                timeout=10
-            )
+        resp = registry.post("ie_service", soap_request)
+        logging.info(f"IE service status: {resp.status_code}")
+        logging.debug(f"IE raw response: {resp.content.decode('utf-8', errors='ignore')}")
 
-            logging.info(f"PropertyEvaluation status: {resp.status_code}")
+        root = ET.fromstring(resp.content)
+        ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:ie.service:v7"}
 
-            root = ET.fromstring(resp.content)
-            ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:property.evaluation:v1"}
+        # Spyne renvoie souvent <extractInformationResponse> (pas necessarily a "Result" wrapper)
+        resp_elem = find_with_ns_or_local(root, "extractInformationResponse", ns)
+        if resp_elem is None:
+            # fallback : chercher les champs directement
+            resp_elem = root
 
-           
-            result = find_with_ns_or_local(root, "EvaluatePropertyResponse", ns)
-            if result is None:
-               
-                result = find_with_ns_or_local(root, "EvaluatePropertyResult", ns) or root
-
-            if result is not None:
-                est_txt = text_of(find_with_ns_or_local(result, "estimatedValue", ns))
-                legal_txt = text_of(find_with_ns_or_local(result, "legalCompliance", ns))
-                report_txt = text_of(find_with_ns_or_local(result, "evaluationReport", ns))
-                canproceed_txt = text_of(find_with_ns_or_local(result, "canProceed", ns))
-
-                property_eval = PropertyEvaluationResponse(
-                    estimatedValue=float(est_txt) if est_txt else 0.0,
-                    legalCompliance=(legal_txt == "true"),
-                    evaluationReport=report_txt or "",
-                    canProceed=(canproceed_txt == "true")
-                )
-                logging.info(f"🏡 Évaluation immobilière : {property_eval.evaluationReport}")
-            else:
-                logging.error("❌ Impossible de trouver EvaluatePropertyResponse/Result dans la réponse SOAP.")
-        except Exception as e:
-            logging.error(f"Erreur PropertyEvaluationService: {e}")
-            logging.debug("Property raw content on exception: %s", resp.content.decode('utf-8', errors='ignore') if 'resp' in locals() else 'n/a')
+        # Lecture robuste des champs
+        amount_txt = text_of(find_with_ns_or_local(resp_elem, "amount", ns))
+        dur_txt = text_of(find_with_ns_or_local(resp_elem, "duration_years", ns))
+        ptype_txt = text_of(find_with_ns_or_local(resp_elem, "property_type", ns))
+        pdesc_txt = text_of(find_with_ns_or_local(resp_elem, "property_description", ns))
+        loc_txt = text_of(find_with_ns_or_local(resp_elem, "location", ns))
 
+        extraction["amount"] = float(amount_txt) if amount_txt else 0.0
+        extraction["duration_years"] = int(dur_txt) if dur_txt else 0
+        extraction["property_type"] = ptype_txt or "Inconnu"
+        extraction["property_description"] = pdesc_txt or ""
+        extraction["location"] = loc_txt or "Inconnue"
 
-        
+        logging.info(f"🏠 Extraction réussie : {extraction}")
+    except Exception as e:
+        logging.error(f"Erreur IE_Service: {e}")
+        logging.debug("IE raw content (on exception): %s", resp.content.decode('utf-8', errors='ignore') if 'resp' in locals() else 'n/a')
+    return extraction
 
-        # 4️⃣ Appel du service CreditScore
-        credit_score = 0
-        try:
-            soap_request = f"""
+
+def property_evaluation_step(extraction):
+    """(évaluation du bien, évaluation obtenue ?) pour les champs extraits."""
+    property_eval = PropertyEvaluationResponse(
+        estimatedValue=0.0,
+        legalCompliance=False,
+        evaluationReport="Aucune évaluation disponible.",
+        canProceed=False
+    )
+    evaluated = False
+    try:
+        # Construire le SOAP correctement : utiliser le préfixe tns défini dans xmlns:tns
+        soap_request = f"""
             <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                              xmlns:urn="urn:creditscore.service:v1">
-               <soapenv:Body>
-                  <urn:ComputeCreditScore>
-                     <urn:debt>{credit['debt']}</urn:debt>
-                     <urn:latePayments>{credit['late']}</urn:latePayments>
-                     <urn:hasBankruptcy>{str(credit['hasBankruptcy']).lower()}</urn:hasBankruptcy>
-                  </urn:ComputeCreditScore>
-               </soapenv:Body>
+                            xmlns:tns="urn:property.evaluation:v1">
+            <soapenv:Body>
+                    <tns:EvaluateProperty>
+                        <tns:data>
+                            <tns:amount>{extraction['amount']}</tns:amount>
+                            <tns:duration_years>{extraction['duration_years']}</tns:duration_years>
+                            <tns:property_type>{escape(extraction['property_type'])}</tns:property_type>
+                            <tns:property_description>{escape(extraction['property_description'])}</tns:property_description>
+                            <tns:location>{escape(extraction['location'])}</tns:location>
+                        </tns:data>
+                    </tns:EvaluateProperty>
+            </soapenv:Body>
             </soapenv:Envelope>
             """
-            resp = requests.post(
-                "http://credit_scoring_service:8002/",
-                data=soap_request.encode("utf-8"),
-                headers={"Content-Type": "text/xml;charset=UTF-8"},
-                timeout=10
+
+        resp = registry.post("property_evaluation_service", soap_request)
+
+        logging.info(f"PropertyEvaluation status: {resp.status_code}")
+
+        root = ET.fromstring(resp.content)
+        ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:property.evaluation:v1"}
+
+       
+        result = find_with_ns_or_local(root, "EvaluatePropertyResponse", ns)
+        if result is None:
+           
+            result = find_with_ns_or_local(root, "EvaluatePropertyResult", ns) or root
+
+        if result is not None:
+            est_txt = text_of(find_with_ns_or_local(result, "estimatedValue", ns))
+            legal_txt = text_of(find_with_ns_or_local(result, "legalCompliance", ns))
+            report_txt = text_of(find_with_ns_or_local(result, "evaluationReport", ns))
+            canproceed_txt = text_of(find_with_ns_or_local(result, "canProceed", ns))
+
+            property_eval = PropertyEvaluationResponse(
+                estimatedValue=float(est_txt) if est_txt else 0.0,
+                legalCompliance=(legal_txt == "true"),
+                evaluationReport=report_txt or "",
+                canProceed=(canproceed_txt == "true")
             )
-            root = ET.fromstring(resp.content)
-            ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:creditscore.service:v1"}
-            score_elem = find_with_ns_or_local(root, "score", ns)
-            credit_score = int(float(text_of(score_elem) or 0))
-        except Exception as e:
-            logging.error(f"Erreur CreditScoreService: {e}")
+            logging.info(f"🏡 Évaluation immobilière : {property_eval.evaluationReport}")
+            evaluated = True
+        else:
+            logging.error("❌ Impossible de trouver EvaluatePropertyResponse/Result dans la réponse SOAP.")
+    except Exception as e:
+        logging.error(f"Erreur PropertyEvaluationService: {e}")
+        logging.debug("Property raw content on exception: %s", resp.content.decode('utf-8', errors='ignore') if 'resp' in locals() else 'n/a')
+    return property_eval, evaluated
 
-        # 5️⃣ Appel du service DecisionService
-        solvency_status = "unknown"
-        try:
-            soap_request = f"""
-            <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                              xmlns:urn="urn:solvency.decision:v1">
-               <soapenv:Body>
-                  <urn:MakeDecision>
-                     <urn:creditScore>{credit_score}</urn:creditScore>
-                     <urn:monthlyIncome>{financial['MonthlyIncome']}</urn:monthlyIncome>
-                     <urn:monthlyDebtPayments>{financial['Expenses']}</urn:monthlyDebtPayments>
-                  </urn:MakeDecision>
-               </soapenv:Body>
-            </soapenv:Envelope>
-            """
-            resp = requests.post(
-                "http://decision_solvability_service:8003/",
-                data=soap_request.encode("utf-8"),
-                headers={"Content-Type": "text/xml;charset=UTF-8"},
-                timeout=10
+
+def approval_step(extraction, solvency_status, property_eval):
+    """(réponse d'approbation, décision obtenue ?) ; jamais doublé."""
+    try:
+        soap_request = f"""
+        <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+                          xmlns:urn="urn:approval.decision:v1">
+           <soapenv:Body>
+              <urn:MakeApprovalDecision>
+                 <urn:amount>{extraction['amount']}</urn:amount>
+                 <urn:duration>{extraction['duration_years']}</urn:duration>
+                 <urn:solvency>{solvency_status}</urn:solvency>
+                 <urn:prop_value>{property_eval.estimatedValue}</urn:prop_value>
+                 <urn:prop_ok>{str(property_eval.canProceed).lower()}</urn:prop_ok>
+              </urn:MakeApprovalDecision>
+           </soapenv:Body>
+        </soapenv:Envelope>
+        """
+        
+        # score aléatoire côté approbation : appel non idempotent, jamais doublé
+        resp = registry.post("approbation_service", soap_request, idempotent=False)
+
+        root = ET.fromstring(resp.content)
+        ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/",
+              "tns": "urn:approval.decision:v1"}
+
+        result = find_with_ns_or_local(root, "MakeApprovalDecisionResult", ns) or root
+
+        approval_response = ApprovalResponse(
+            approved=(text_of(find_with_ns_or_local(result, "approved", ns)) == "true"),
+            interestRate=float(text_of(find_with_ns_or_local(result, "interestRate", ns)) or 0.0),
+            maxLoanAmount=float(text_of(find_with_ns_or_local(result, "maxLoanAmount", ns)) or 0.0),
+            decisionReport=text_of(find_with_ns_or_local(result, "decisionReport", ns)) or ""
+        )
+        logging.info(f" sortie : {approval_response}")
+        logging.info(f"✅ Décision finale : {approval_response.decisionReport}")
+        return approval_response, True
+
+    except Exception as e:
+        logging.error(f"Erreur ApprovalService: {e}")
+        approval_response = ApprovalResponse(
+            approved=False,
+            interestRate=0.0,
+            maxLoanAmount=0.0,
+            decisionReport="Erreur de communication avec le service d'approbation."
+        )
+        return approval_response, False
+
+
+# -------------------------------------------------------
+# 🧠 Service principal d’orchestration
+# -------------------------------------------------------
+# Profils de réponse :
+#   full         : toutes les étapes (Explain en parallèle de la décision)
+#   decisionOnly : sans explications
+#   explainAsync : explications calculées après coup (travail à interroger)
+RESPONSE_PROFILES = ("full", "decisionOnly", "explainAsync")
+
+# sections d'une réponse complète : seule une réponse complète est mise en
+# cache (explainAsync renvoie un nouveau travail à chaque appel)
+COMPLETE_SECTIONS = {
+    "full": {"clientIdentity", "financials", "creditHistory", "propertyEvaluation",
+             "creditScore", "solvencyStatus", "approvalResponse", "explanations"},
+    "decisionOnly": {"clientIdentity", "financials", "creditHistory", "propertyEvaluation",
+                     "creditScore", "solvencyStatus", "approvalResponse"},
+}
+
+# Threads des étapes optionnelles lancées en parallèle de la chaîne principale
+_optional_steps = ThreadPoolExecutor(max_workers=16, thread_name_prefix="solvency-optional")
+
+
+def verify_solvency(clientId, demandeTexte, responseProfile="full"):
+    """Chaîne complète de vérification (IE → évaluation → score → décision →
+    approbation, explication selon `responseProfile`) ; utilisée en synchrone
+    et par les workers. `sections` liste les parties effectivement calculées."""
+    logging.info(f"🧩 Vérification de solvabilité pour {clientId}")
+
+    # 1️⃣ Récupération des données internes
+    client = ClientData.get_client_identity(clientId)
+    financial = FinancialData.get_client_financials(clientId)
+    credit = CreditData.get_credit_history(clientId)
+
+    if not client or client.get("name") == "Inconnu":
+        audit_decision({"clientId": clientId, "demandeTexte": demandeTexte, "responseProfile": responseProfile,
+                        "solvencyStatus": "error", "creditScore": 0, "reason": "Client introuvable"})
+        return SolvencyResponse(
+            solvencyStatus="error",
+            creditScore=0,
+            explanations=Explanations(
+                creditScoreExplanation="Client introuvable dans la base interne.",
+                incomeVsExpensesExplanation="",
+                creditHistoryExplanation=""
             )
-            root = ET.fromstring(resp.content)
-            ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:solvency.decision:v1"}
-            solvency_status = text_of(find_with_ns_or_local(root, "solvencyStatus", ns)) or "unknown"
-        except Exception as e:
-            logging.error(f"Erreur DecisionService: {e}")
+        )
 
-        # 6️⃣ Appel du service ExplanationService
-        explanations = Explanations()
-        try:
-            soap_request = f"""
-            <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                              xmlns:urn="urn:explain.service:v1">
-               <soapenv:Body>
-                  <urn:Explain>
-                     <urn:score>{credit_score}</urn:score>
-                     <urn:monthlyIncome>{financial['MonthlyIncome']}</urn:monthlyIncome>
-                     <urn:monthlyExpenses>{financial['Expenses']}</urn:monthlyExpenses>
-                     <urn:debt>{credit['debt']}</urn:debt>
-                     <urn:latePayments>{credit['late']}</urn:latePayments>
-                     <urn:hasBankruptcy>{str(credit['hasBankruptcy']).lower()}</urn:hasBankruptcy>
-                  </urn:Explain>
-               </soapenv:Body>
-            </soapenv:Envelope>
-            """
-            resp = requests.post(
-                "http://explain_service:8005/",
-                data=soap_request.encode("utf-8"),
-                headers={"Content-Type": "text/xml;charset=UTF-8"},
-                timeout=10
+    sections = ["clientIdentity", "financials", "creditHistory"]
+
+    # 2️⃣ Appel du service IE (Extraction des infos)
+    extraction = extraction_step(demandeTexte)
+
+    # 3️⃣ Appel du service PropertyEvaluation
+    property_eval, evaluated = property_evaluation_step(extraction)
+    if evaluated:
+        sections.append("propertyEvaluation")
+
+    # 📸 Instantané de risque frais : score, décision et explications sans appel
+    snapshots = get_snapshot_store()
+    row = client_row(clientId, financial, credit)
+    snapshot = snapshots.get(row) if snapshots is not None else None
+
+    explain_future = None
+    explanation_job_id = None
+    explanations = None
+    if snapshot is not None:
+        logging.info(f"📸 Instantané de risque utilisé pour {clientId}")
+        credit_score = snapshot["creditScore"]
+        solvency_status = snapshot["solvencyStatus"]
+        sections += ["creditScore", "solvencyStatus"]
+        # explainAsync garde son contrat : explications par travail, pas en ligne
+        if responseProfile == "explainAsync":
+            explanation_job_id = submit_explain_job(credit_score, financial, credit)
+        elif responseProfile == "full":
+            explanations = Explanations(
+                creditScoreExplanation=snapshot["creditScoreExplanation"],
+                incomeVsExpensesExplanation=snapshot["incomeVsExpensesExplanation"],
+                creditHistoryExplanation=snapshot["creditHistoryExplanation"],
             )
-            root = ET.fromstring(resp.content)
-            ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "tns": "urn:explain.service:v1"}
-            explanations.creditScoreExplanation = text_of(find_with_ns_or_local(root, "creditScoreExplanation", ns)) or ""
-            explanations.incomeVsExpensesExplanation = text_of(find_with_ns_or_local(root, "incomeVsExpensesExplanation", ns)) or ""
-            explanations.creditHistoryExplanation = text_of(find_with_ns_or_local(root, "creditHistoryExplanation", ns)) or ""
-        except Exception as e:
-            logging.error(f"Erreur ExplanationService: {e}")
+    else:
+        # 4️⃣ Appel du service CreditScore
+        credit_score = credit_score_step(credit)
+        if credit_score is not None:
+            sections.append("creditScore")
+        credit_score = credit_score or 0
 
+        # 6️⃣ ExplanationService : en parallèle, différé ou ignoré selon le profil
+        if responseProfile == "full":
+            explain_future = _optional_steps.submit(explain_step, credit_score, financial, credit)
+        elif responseProfile == "explainAsync":
+            explanation_job_id = submit_explain_job(credit_score, financial, credit)
 
-# appel du service approbation
-        
-        approval_response = None
-        try:
-            soap_request = f"""
-            <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                              xmlns:urn="urn:approval.decision:v1">
-               <soapenv:Body>
-                  <urn:MakeApprovalDecision>
-                     <urn:amount>{extraction['amount']}</urn:amount>
-                     <urn:duration>{extraction['duration_years']}</urn:duration>
-                     <urn:solvency>{solvency_status}</urn:solvency>
-                     <urn:prop_value>{property_eval.estimatedValue}</urn:prop_value>
-                     <urn:prop_ok>{str(property_eval.canProceed).lower()}</urn:prop_ok>
-                  </urn:MakeApprovalDecision>
-               </soapenv:Body>
-            </soapenv:Envelope>
-            """
-            
-            resp = requests.post(
-                "http://approbation_service:8007/",
-                data=soap_request.encode("utf-8"),
-                headers={"Content-Type": "text/xml;charset=UTF-8"},
-                timeout=10
+        # 5️⃣ Appel du service DecisionService
+        solvency_status = decision_step(credit_score, financial)
+        if solvency_status is not None:
+            sections.append("solvencyStatus")
+        solvency_status = solvency_status or "unknown"
+
+        # instantané recalculé localement (mêmes règles) pour les prochains appels
+        if snapshots is not None and "creditScore" in sections and "solvencyStatus" in sections:
+            try:
+                snapshots.refresh([row])
+            except Exception as e:
+                logging.error(f"Erreur instantané de risque: {e}")
+
+    # appel du service approbation
+    approval_response, approved = approval_step(extraction, solvency_status, property_eval)
+    if approved:
+        sections.append("approvalResponse")
+
+    if explain_future is not None:
+        explanations = explain_future.result()
+        if explanations is not None:
+            sections.append("explanations")
+    elif explanations is not None:
+        sections.append("explanations")
+
+    # 📒 Trace d'audit de la décision (avant la réponse : aucune décision sans trace)
+    audit_decision({
+        "clientId": clientId,
+        "demandeTexte": demandeTexte,
+        "responseProfile": responseProfile,
+        "inputs": {"identity": client, "financials": financial, "credit": credit},
+        "extraction": extraction,
+        "propertyEvaluation": {
+            "estimatedValue": property_eval.estimatedValue,
+            "legalCompliance": property_eval.legalCompliance,
+            "evaluationReport": property_eval.evaluationReport,
+            "canProceed": property_eval.canProceed,
+        },
+        "source": "snapshot" if snapshot is not None else "services",
+        "creditScore": credit_score,
+        "solvencyStatus": solvency_status,
+        "approval": {
+            "approved": approval_response.approved,
+            "interestRate": approval_response.interestRate,
+            "maxLoanAmount": approval_response.maxLoanAmount,
+            "decisionReport": approval_response.decisionReport,
+        },
+        "sections": sections,
+    })
+
+    # 7️⃣ Construction du retour structuré
+   
+    return SolvencyResponse(
+        clientIdentity=ClientIdentity(name=client["name"], address=client["address"]),
+        financials=Financials(MonthlyIncome=financial["MonthlyIncome"], Expenses=financial["Expenses"]),
+        creditHistory=CreditHistory(
+            debt=credit["debt"], late=credit["late"], hasBankruptcy=credit["hasBankruptcy"]
+        ),
+        creditScore=credit_score,
+        solvencyStatus=solvency_status,
+        explanations=explanations,
+        propertyEvaluation=property_eval,
+        approvalResponse=approval_response,
+        responseProfile=responseProfile,
+        sections=sections,
+        explanationJobId=explanation_job_id
+    )
+
+
+# -------------------------------------------------------
+# 👥 Demande commune : une chaîne pour tout le foyer
+# -------------------------------------------------------
+# Extraction et évaluation du bien faites une fois pour la demande, puis un
+# score par co-emprunteur (en parallèle, regroupés si SOAP_BATCH_WINDOW_MS > 0)
+# et une seule décision sur les revenus et dettes cumulés.
+MAX_HOUSEHOLD_BORROWERS = 8
+
+
+def load_borrowers(client_ids):
+    """Données internes de tous les co-emprunteurs, en une passe :
+    {identifiant: (identité, finances, crédit)}, None si le client est inconnu."""
+    borrowers = {}
+    for client_id in client_ids:
+        identity = ClientData.get_client_identity(client_id)
+        if not identity or identity.get("name") == "Inconnu":
+            borrowers[client_id] = None
+            continue
+        borrowers[client_id] = (identity, FinancialData.get_client_financials(client_id),
+                                CreditData.get_credit_history(client_id))
+    return borrowers
+
+
+def borrower_score(client_id, financial, credit, snapshots):
+    """Score d'un co-emprunteur : instantané frais s'il existe, sinon CreditScoreService."""
+    if snapshots is not None:
+        snapshot = snapshots.get(client_row(client_id, financial, credit))
+        if snapshot is not None:
+            return snapshot["creditScore"]
+    return credit_score_step(credit)
+
+
+def combine_borrowers(members):
+    """(finances, crédit) du foyer : revenus, dépenses, dettes et retards
+    cumulés ; une faillite de l'un vaut pour le foyer."""
+    financial = {"MonthlyIncome": sum(f["MonthlyIncome"] for _, f, _ in members),
+                 "Expenses": sum(f["Expenses"] for _, f, _ in members)}
+    credit = {"debt": sum(c["debt"] for _, _, c in members),
+              "late": sum(c["late"] for _, _, c in members),
+              "hasBankruptcy": any(c["hasBankruptcy"] for _, _, c in members)}
+    return financial, credit
+
+
+def household_ids(clientIds):
+    """Identifiants des co-emprunteurs, vérifiés (au moins un, sans doublon)."""
+    client_ids = [c for c in (clientIds or []) if c]
+    if not client_ids:
+        raise Fault("Client.InvalidArgument", "clientIds doit contenir au moins un client.")
+    if len(set(client_ids)) != len(client_ids):
+        raise Fault("Client.InvalidArgument", "clientIds contient des doublons.")
+    if len(client_ids) > MAX_HOUSEHOLD_BORROWERS:
+        raise Fault("Client.InvalidArgument", f"Au plus {MAX_HOUSEHOLD_BORROWERS} co-emprunteurs par demande.")
+    return client_ids
+
+
+def verify_household_solvency(clientIds, demandeTexte):
+    """Chaîne de vérification d'une demande commune. Le score retenu pour le
+    foyer est le plus faible des co-emprunteurs ; la décision porte sur les
+    revenus et dépenses cumulés."""
+    client_ids = household_ids(clientIds)
+    logging.info(f"👥 Vérification de solvabilité du foyer {', '.join(client_ids)}")
+
+    # 1️⃣ Données internes de tous les co-emprunteurs
+    borrowers = load_borrowers(client_ids)
+    missing = [c for c in client_ids if borrowers[c] is None]
+    if missing:
+        for client_id in client_ids:
+            audit_decision({"clientId": client_id, "household": client_ids, "demandeTexte": demandeTexte,
+                            "solvencyStatus": "error", "creditScore": 0,
+                            "reason": f"Client introuvable : {', '.join(missing)}"})
+        return HouseholdSolvencyResponse(
+            solvencyStatus="error",
+            creditScore=0,
+            explanations=Explanations(
+                creditScoreExplanation=f"Client introuvable dans la base interne : {', '.join(missing)}.",
+                incomeVsExpensesExplanation="",
+                creditHistoryExplanation=""
             )
+        )
+    members = [borrowers[c] for c in client_ids]
+    sections = ["borrowers"]
 
-            root = ET.fromstring(resp.content)
-            ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/",
-                  "tns": "urn:approval.decision:v1"}
+    # 2️⃣ Scores individuels en parallèle de l'extraction et de l'évaluation du bien
+    snapshots = get_snapshot_store()
+    score_futures = [_optional_steps.submit(borrower_score, c, financial, credit, snapshots)
+                     for c, (_, financial, credit) in zip(client_ids, members)]
+    extraction = extraction_step(demandeTexte)
+    property_eval, evaluated = property_evaluation_step(extraction)
+    if evaluated:
+        sections.append("propertyEvaluation")
+    scores = [f.result() for f in score_futures]
+    if all(score is not None for score in scores):
+        sections.append("creditScore")
+    household_score = min(score or 0 for score in scores)
 
-            result = find_with_ns_or_local(root, "MakeApprovalDecisionResult", ns) or root
+    # 3️⃣ Décision sur les revenus et dettes cumulés, explications en parallèle
+    financial, credit = combine_borrowers(members)
+    explain_future = _optional_steps.submit(explain_step, household_score, financial, credit)
+    solvency_status = decision_step(household_score, financial)
+    if solvency_status is not None:
+        sections.append("solvencyStatus")
+    solvency_status = solvency_status or "unknown"
 
-            approval_response = ApprovalResponse(
-                approved=(text_of(find_with_ns_or_local(result, "approved", ns)) == "true"),
-                interestRate=float(text_of(find_with_ns_or_local(result, "interestRate", ns)) or 0.0),
-                maxLoanAmount=float(text_of(find_with_ns_or_local(result, "maxLoanAmount", ns)) or 0.0),
-                decisionReport=text_of(find_with_ns_or_local(result, "decisionReport", ns)) or ""
+    # 4️⃣ Approbation unique pour la demande
+    approval_response, approved = approval_step(extraction, solvency_status, property_eval)
+    if approved:
+        sections.append("approvalResponse")
+    explanations = explain_future.result()
+    if explanations is not None:
+        sections.append("explanations")
+
+    # 📒 Une trace par co-emprunteur (index par client), décision du foyer dans chacune
+    decision = {
+        "household": client_ids,
+        "demandeTexte": demandeTexte,
+        "scores": dict(zip(client_ids, scores)),
+        "combined": {"financials": financial, "credit": credit},
+        "extraction": extraction,
+        "propertyEvaluation": {
+            "estimatedValue": property_eval.estimatedValue,
+            "legalCompliance": property_eval.legalCompliance,
+            "evaluationReport": property_eval.evaluationReport,
+            "canProceed": property_eval.canProceed,
+        },
+        "creditScore": household_score,
+        "solvencyStatus": solvency_status,
+        "approval": {
+            "approved": approval_response.approved,
+            "interestRate": approval_response.interestRate,
+            "maxLoanAmount": approval_response.maxLoanAmount,
+            "decisionReport": approval_response.decisionReport,
+        },
+        "sections": sections,
+    }
+    for client_id, (identity, member_financial, member_credit) in zip(client_ids, members):
+        audit_decision({"clientId": client_id, **decision,
+                        "inputs": {"identity": identity, "financials": member_financial, "credit": member_credit}})
+
+    return HouseholdSolvencyResponse(
+        borrowers=[
+            Borrower(
+                clientId=c,
+                clientIdentity=ClientIdentity(name=i["name"], address=i["address"]),
+                financials=Financials(MonthlyIncome=f["MonthlyIncome"], Expenses=f["Expenses"]),
+                creditHistory=CreditHistory(debt=cr["debt"], late=cr["late"], hasBankruptcy=cr["hasBankruptcy"]),
+                creditScore=score,
             )
-            logging.info(f" sortie : {approval_response}")
-            logging.info(f"✅ Décision finale : {approval_response.decisionReport}")
+            for c, (i, f, cr), score in zip(client_ids, members, scores)
+        ],
+        combinedFinancials=Financials(MonthlyIncome=financial["MonthlyIncome"], Expenses=financial["Expenses"]),
+        combinedCreditHistory=CreditHistory(debt=credit["debt"], late=credit["late"],
+                                            hasBankruptcy=credit["hasBankruptcy"]),
+        creditScore=household_score,
+        solvencyStatus=solvency_status,
+        explanations=explanations,
+        propertyEvaluation=property_eval,
+        approvalResponse=approval_response,
+        sections=sections,
+    )
 
-        except Exception as e:
-            logging.error(f"Erreur ApprovalService: {e}")
-            approval_response = ApprovalResponse(
-                approved=False,
-                interestRate=0.0,
-                maxLoanAmount=0.0,
-                decisionReport="Erreur de communication avec le service d'approbation."
+
+# -------------------------------------------------------
+# ⏳ Mode asynchrone : file de travaux + workers
+# -------------------------------------------------------
+SOLVENCY_JOB_KIND = "verify_solvency"
+EXPLAIN_JOB_KIND = "explain"
+
+
+def to_xml(obj, cls):
+    return etree.tostring(get_object_as_xml(obj, cls), encoding="unicode")
+
+
+def from_xml(text, cls):
+    return get_xml_as_object(etree.fromstring(text), cls)
+
+
+def run_solvency_job(payload):
+    data = json.loads(payload)
+    response = verify_solvency(data["clientId"], data["demandeTexte"], data.get("responseProfile", "full"))
+    return to_xml(response, SolvencyResponse)
+
+
+def run_explain_job(payload):
+    data = json.loads(payload)
+    explanations = explain_step(data["creditScore"], data["financial"], data["credit"])
+    if explanations is None:
+        raise RuntimeError("ExplanationService indisponible")
+    return to_xml(
+        SolvencyResponse(explanations=explanations, responseProfile="explainAsync", sections=["explanations"]),
+        SolvencyResponse,
+    )
+
+
+def submit_explain_job(credit_score, financial, credit):
+    """Met les explications en file ; le résultat s'obtient avec GetSolvencyJobResult."""
+    queue = get_job_queue()
+    payload = json.dumps({"creditScore": credit_score, "financial": financial, "credit": credit})
+    job_id = queue.store.submit(EXPLAIN_JOB_KIND, payload)
+    queue.notify()
+    return job_id
+
+
+def job_result(job_id, job):
+    if job is None:
+        return JobResult(jobId=job_id, status="not_found")
+    return JobResult(
+        jobId=job["id"],
+        status=job["status"],
+        attempts=job["attempts"],
+        error=job["error"],
+        result=from_xml(job["result"], SolvencyResponse) if job["status"] == DONE else None,
+    )
+
+
+def callback_url(url):
+    """callbackUrl validée à la soumission (SOLVENCY_CALLBACK_HOSTS)."""
+    if not url:
+        return None
+    if not callback_allowed(url, callback_hosts_from_env()):
+        raise Fault("Client.InvalidArgument",
+                    "callbackUrl refusée : http(s) vers un hôte autorisé (SOLVENCY_CALLBACK_HOSTS) uniquement.")
+    return url
+
+
+def notify_callback(job):
+    """Envoie le JobResult (XML) à l'URL de rappel fournie à la soumission.
+    L'URL est revérifiée (liste modifiée depuis la soumission) et les
+    redirections ne sont pas suivies."""
+    if not job["callback_url"]:
+        return
+    if not callback_allowed(job["callback_url"], callback_hosts_from_env()):
+        logging.warning(f"📨 Rappel ignoré pour {job['id']} : hôte non autorisé")
+        return
+    body = to_xml(job_result(job["id"], job), JobResult)
+    resp = get_session().post(job["callback_url"], data=body.encode("utf-8"), timeout=10, allow_redirects=False)
+    logging.info(f"📨 Rappel {job['callback_url']} pour {job['id']} : {resp.status_code}")
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """File de travaux (SOLVENCY_JOBS_DB) et ses workers (SOLVENCY_JOB_WORKERS),
+    démarrés au premier usage. Les travaux non terminés sont repris, les
+    échecs après SOLVENCY_JOB_RETRY_DELAY secondes (doublées à chaque
+    tentative) ; les travaux terminés sont gardés SOLVENCY_JOB_RETENTION secondes."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            store = JobStore(os.environ.get("SOLVENCY_JOBS_DB", "jobs.sqlite"),
+                             retry_delay=float(os.environ.get("SOLVENCY_JOB_RETRY_DELAY", "5")))
+            _job_queue = JobWorkerPool(
+                store,
+                {SOLVENCY_JOB_KIND: run_solvency_job, EXPLAIN_JOB_KIND: run_explain_job},
+                concurrency=int(os.environ.get("SOLVENCY_JOB_WORKERS", "4")),
+                on_done=notify_callback,
+                retention=float(os.environ.get("SOLVENCY_JOB_RETENTION", "604800")),
             )
-        # 7️⃣ Construction du retour structuré
-       
-        return SolvencyResponse(
-            clientIdentity=ClientIdentity(name=client["name"], address=client["address"]),
-            financials=Financials(MonthlyIncome=financial["MonthlyIncome"], Expenses=financial["Expenses"]),
-            creditHistory=CreditHistory(
-                debt=credit["debt"], late=credit["late"], hasBankruptcy=credit["hasBankruptcy"]
-            ),
-            creditScore=credit_score,
-            solvencyStatus=solvency_status,
-            explanations=explanations,
-            propertyEvaluation=property_eval,
-            approvalResponse=approval_response
+            _job_queue.start()
+        return _job_queue
+
+
+_snapshot_store = None
+_snapshot_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """Instantanés de risque (SOLVENCY_SNAPSHOT_DB, vide pour désactiver),
+    ouverts au premier usage et recalculés à chaque mise à jour des données
+    clients faite dans ce processus."""
+    global _snapshot_store
+    with _snapshot_store_lock:
+        if _snapshot_store is None:
+            _snapshot_store = snapshot_store_from_env()
+            if _snapshot_store is not None:
+                subscribe(_snapshot_store.on_change)
+        return _snapshot_store
+
+
+# -------------------------------------------------------
+# 📒 Journal d'audit des décisions
+# -------------------------------------------------------
+_audit_log = None
+_audit_log_lock = threading.Lock()
+
+
+def get_audit_log():
+    """Journal d'audit (SOLVENCY_AUDIT_DIR, vide pour désactiver), ouvert au
+    premier usage dans chaque processus ; vidé à l'arrêt."""
+    global _audit_log
+    with _audit_log_lock:
+        if _audit_log is None:
+            _audit_log = audit_log_from_env()
+            if _audit_log is not None:
+                atexit.register(_audit_log.close)
+        return _audit_log
+
+
+def audit_decision(record):
+    """Met la décision en file d'audit ; SOLVENCY_AUDIT_SYNC=1 attend en plus
+    son écriture sur disque (validation groupée avec les requêtes concurrentes)."""
+    log = get_audit_log()
+    if log is None:
+        return
+    try:
+        log.record(record, wait=os.environ.get("SOLVENCY_AUDIT_SYNC", "0") == "1")
+    except AuditUnavailable as e:
+        logging.error(f"📒 Décision non tracée pour {record.get('clientId')} : {e}")
+        raise Fault("Server.AuditUnavailable", "Journal d'audit indisponible, réessayer plus tard.")
+
+
+# -------------------------------------------------------
+# 🏦 Optimisation d'offre de prêt (sans appel aux services)
+# -------------------------------------------------------
+def optimize_loan_offer(clientId, requestedAmount, durationYears, propertyValue):
+    """Évalue d'un coup la grille montant × durée avec les règles des services
+    de décision, d'évaluation du bien et d'approbation (common/offers.py).
+    Le bien est supposé conforme : seule la marge de valeur est vérifiée."""
+    if not propertyValue or propertyValue <= 0:
+        raise Fault("Client.InvalidArgument", "propertyValue doit être strictement positif.")
+    if not propertyValue <= MAX_PROPERTY_VALUE:
+        raise Fault("Client.InvalidArgument", f"propertyValue ne peut pas dépasser {MAX_PROPERTY_VALUE:.0f}.")
+    if requestedAmount is not None and requestedAmount < 0:
+        raise Fault("Client.InvalidArgument", "requestedAmount ne peut pas être négatif.")
+    if requestedAmount is not None and not requestedAmount <= MAX_PROPERTY_VALUE:
+        raise Fault("Client.InvalidArgument", f"requestedAmount ne peut pas dépasser {MAX_PROPERTY_VALUE:.0f}.")
+
+    started = time.perf_counter()
+    client = ClientData.get_client_identity(clientId)
+    if not client or client.get("name") == "Inconnu":
+        return LoanOfferResponse(clientId=clientId, eligible=False, reason="Client introuvable dans la base interne.",
+                                 requestedFeasible=False, frontier=[], evaluated=0, elapsedMs=0.0)
+    financial = FinancialData.get_client_financials(clientId)
+    credit = CreditData.get_credit_history(clientId)
+    score = compute_credit_score(credit["debt"], credit["late"], credit["hasBankruptcy"])
+
+    result = optimize_offers(score, financial["MonthlyIncome"], financial["Expenses"], propertyValue,
+                             requested_amount=requestedAmount or None, requested_duration=durationYears or None)
+    requested = result["requested"]
+    if score < MIN_CREDIT_SCORE:
+        reason = f"Score de crédit insuffisant ({score:.0f} < {MIN_CREDIT_SCORE})."
+    elif not result["frontier"]:
+        reason = "Aucune combinaison montant × durée accordable pour ce bien et ces revenus."
+    elif requested is not None and requested["feasible"]:
+        reason = "Demande accordable telle quelle."
+    else:
+        reason = "Demande non accordable : voir la meilleure offre et la frontière."
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logging.info(f"🏦 {result['evaluated']} offres évaluées pour {clientId} en {elapsed_ms:.2f} ms")
+    return LoanOfferResponse(
+        clientId=clientId,
+        eligible=bool(result["frontier"]),
+        reason=reason,
+        requestedFeasible=bool(requested and requested["feasible"]),
+        requestedOffer=LoanOffer(**{k: v for k, v in requested.items() if k != "feasible"}) if requested else None,
+        bestOffer=LoanOffer(**result["best"]) if result["best"] else None,
+        frontier=[LoanOffer(**offer) for offer in result["frontier"]],
+        evaluated=result["evaluated"],
+        elapsedMs=round(elapsed_ms, 3),
+    )
+
+
+# -------------------------------------------------------
+# 🚦 Contrôle d'admission (limite adaptative, file bornée, débit par client)
+# -------------------------------------------------------
+admission = admission_from_env()
+
+
+def response_profile(value):
+    profile = value or "full"
+    if profile not in RESPONSE_PROFILES:
+        raise Fault("Client.InvalidProfile", f"Profil de réponse inconnu : {profile} ({', '.join(RESPONSE_PROFILES)})")
+    return profile
+
+
+class SolvencyService(ServiceBase):
+
+    @rpc(Unicode, Unicode, Unicode, _returns=SolvencyResponse)
+    def VerifySolvency(ctx, clientId, demandeTexte, responseProfile):
+        profile = response_profile(responseProfile)
+        with admission.admit(clientId):
+            response = verify_solvency(clientId, demandeTexte, profile)
+        complete = COMPLETE_SECTIONS.get(profile)
+        # journal d'audit actif : chaque décision doit passer par spyne (trace
+        # d'audit et contrôle d'admission), donc pas de réponse en cache
+        if complete is not None and complete <= set(response.sections or ()) and get_audit_log() is None:
+            mark_cacheable(ctx, clientId, client_id=clientId)
+        return response
+
+    @rpc(Array(Unicode), Unicode, _returns=HouseholdSolvencyResponse)
+    def VerifyHouseholdSolvency(ctx, clientIds, demandeTexte):
+        """Demande commune : une extraction et une évaluation du bien, un score
+        par co-emprunteur, une décision sur les revenus et dettes cumulés."""
+        client_ids = household_ids(clientIds)
+        for client_id in client_ids[1:]:
+            admission.check_rate(client_id)
+        with admission.admit(client_ids[0]):
+            return verify_household_solvency(client_ids, demandeTexte)
+
+    @rpc(Unicode, Unicode, Unicode, Unicode, _returns=JobTicket)
+    def SubmitSolvencyJob(ctx, clientId, demandeTexte, callbackUrl, responseProfile):
+        profile = response_profile(responseProfile)
+        callback = callback_url(callbackUrl)
+        admission.check_rate(clientId)
+        queue = get_job_queue()
+        payload = json.dumps({"clientId": clientId, "demandeTexte": demandeTexte, "responseProfile": profile},
+                             ensure_ascii=False)
+        job_id = queue.store.submit(SOLVENCY_JOB_KIND, payload, callback)
+        queue.notify()
+        logging.info(f"📥 Travail {job_id} en file pour {clientId}")
+        return JobTicket(jobId=job_id, status="queued")
+
+    @rpc(Unicode, _returns=JobResult)
+    def GetSolvencyJobResult(ctx, jobId):
+        result = job_result(jobId, get_job_queue().store.get(jobId))
+        if result.status in (DONE, FAILED):  # état final : la réponse ne changera plus
+            mark_cacheable(ctx, jobId)
+        return result
+
+    @rpc(_returns=ResponseCacheStats)
+    def GetResponseCacheStats(ctx):
+        """Succès du cache de réponses sérialisées et temps de sérialisation économisé."""
+        if response_cache is None:
+            return ResponseCacheStats(entries=0, hits=0, misses=0, notModified=0, hitRatio=0.0,
+                                      savedMs=0.0, avgSerializeMs=0.0)
+        stats = response_cache.stats()
+        return ResponseCacheStats(
+            entries=stats["entries"],
+            hits=stats["hits"],
+            misses=stats["misses"],
+            notModified=stats["not_modified"],
+            hitRatio=round(stats["hit_ratio"], 4),
+            savedMs=round(stats["saved_ms"], 3),
+            avgSerializeMs=round(stats["avg_serialize_ms"], 3),
         )
 
+    @rpc(Unicode, Float, Integer, Float, _returns=LoanOfferResponse)
+    def OptimizeLoanOffer(ctx, clientId, requestedAmount, durationYears, propertyValue):
+        if clientId != WARMUP_CLIENT_ID:
+            admission.check_rate(clientId)
+        return optimize_loan_offer(clientId, requestedAmount, durationYears, propertyValue)
+
 
 # -------------------------------------------------------
 # 🌐 Application SOAP + CORS
@@ -380,14 +1051,133 @@ class SolvencyService(ServiceBase):
 app = Application(
     [SolvencyService],
     tns="urn:solvency.verification.service:v1",
-    in_protocol=Soap11(validator="lxml"),
+    in_protocol=soap_in_protocol(validation_mode("SOAP_VALIDATION", "full")),
     out_protocol=Soap11(),
 )
 
-wsgi_app = CORSMiddleware(WsgiApplication(app))
+# 🗃️ Réponses sérialisées en cache (SOAP_RESPONSE_CACHE_TTL > 0), invalidées
+# à chaque mise à jour des données d'un client : dans ce processus (abonné)
+# et ailleurs (autres workers, snapshot.py follow, autres hôtes) par le
+# journal SOLVENCY_CHANGELOG_DB que chaque worker suit. Sans journal, le
+# cache n'est gardé qu'avec un seul worker. Un succès consomme le débit du
+# client (SOLVENCY_CLIENT_RATE) comme une vérification.
+response_cache = response_cache_from_env()
+if (response_cache is not None and not os.environ.get("SOLVENCY_CHANGELOG_DB")
+        and int(os.environ.get("SERVICE_WORKERS", "1")) > 1):
+    logging.warning("🗃️ Cache de réponses désactivé : SERVICE_WORKERS > 1 sans SOLVENCY_CHANGELOG_DB, "
+                    "les modifications des autres workers ne l'invalideraient pas")
+    response_cache = None
+soap_app = PrecomputedWsdlMiddleware(ValidationRouter(app, trusted_validation="full"), app)
+if response_cache is not None:
+    subscribe(lambda change: response_cache.invalidate(change.client_id))
+    soap_app = ResponseCacheMiddleware(soap_app, response_cache, allow=admission.allow_rate)
+
+
+def invalidate_cached_clients(client_ids, changes=None):
+    for client_id in client_ids:
+        response_cache.invalidate(client_id)
+
+
+def cache_invalidation_feed():
+    """Position en mémoire dans le journal des modifications (None sans cache
+    ou sans journal) : chaque worker part de la fin, son cache étant vide."""
+    log = change_log()
+    if response_cache is None or log is None:
+        return None
+    return ChangeFeed(log)
+
+
+def follow_cache_invalidations(feed, interval):
+    while True:
+        try:
+            feed.poll(invalidate_cached_clients)
+        except Exception as e:
+            logging.error(f"Erreur suivi du journal (cache de réponses): {e}")
+        time.sleep(interval)
+
+# 📏 Corps et textes bornés (SOAP_MAX_BODY_BYTES, SOAP_MAX_TEXT_CHARS) avant toute analyse
+wsgi_app = CORSMiddleware(limits_from_env(capture_from_env(CompressionMiddleware(soap_app))))
+
+
+# -------------------------------------------------------
+# 🌡️ Préchauffage avant /ready (SERVICE_WARMUP)
+# -------------------------------------------------------
+# Données et journaux ouverts, services en aval contactés, règles
+# vectorielles importées, puis requêtes types en mémoire (sans appel sortant
+# ni trace d'audit : ni VerifySolvency ni VerifyHouseholdSolvency).
+# OptimizeLoanOffer vise un client fictif, absent des données et hors débit
+# par client (SOLVENCY_CLIENT_RATE) : aucun jeton d'un vrai client consommé.
+WARMUP_CLIENT_ID = "warmup-client"
+WARMUP_REQUESTS = [
+    warmup_envelope(app.tns, f"<tns:OptimizeLoanOffer><tns:clientId>{WARMUP_CLIENT_ID}</tns:clientId>"
+                             "<tns:requestedAmount>200000</tns:requestedAmount>"
+                             "<tns:durationYears>20</tns:durationYears>"
+                             "<tns:propertyValue>300000</tns:propertyValue></tns:OptimizeLoanOffer>"),
+    warmup_envelope(app.tns, "<tns:GetResponseCacheStats/>"),
+]
+
+
+def warm_data():
+    client_dataset()
+    get_snapshot_store()
+    get_audit_log()
+
+
+def warm_models():
+    """Sérialiseurs des réponses de vérification (jamais auto-appelées) et des
+    offres de prêt (le client fictif du préchauffage n'en reçoit aucune)."""
+    identity = ClientIdentity(name="", address="")
+    financials = Financials(MonthlyIncome=0.0, Expenses=0.0)
+    history = CreditHistory(debt=0.0, late=0, hasBankruptcy=False)
+    property_eval = PropertyEvaluationResponse(estimatedValue=0.0, legalCompliance=False, evaluationReport="",
+                                               canProceed=False)
+    approval = ApprovalResponse(approved=False, interestRate=0.0, maxLoanAmount=0.0, decisionReport="")
+    explanations = Explanations(creditScoreExplanation="", incomeVsExpensesExplanation="",
+                                creditHistoryExplanation="")
+    to_xml(SolvencyResponse(clientIdentity=identity, financials=financials, creditHistory=history, creditScore=0,
+                            solvencyStatus="", explanations=explanations, propertyEvaluation=property_eval,
+                            approvalResponse=approval, responseProfile="full", sections=[]), SolvencyResponse)
+    to_xml(HouseholdSolvencyResponse(
+        borrowers=[Borrower(clientId="", clientIdentity=identity, financials=financials, creditHistory=history,
+                            creditScore=0)],
+        combinedFinancials=financials, combinedCreditHistory=history, creditScore=0, solvencyStatus="",
+        explanations=explanations, propertyEvaluation=property_eval, approvalResponse=approval, sections=[],
+    ), HouseholdSolvencyResponse)
+    offer = LoanOffer(amount=0.0, durationYears=0, ltv=0.0, interestRate=0.0, monthlyPayment=0.0, debtRatio=0.0,
+                      approvalProbability=0.0, tier="")
+    to_xml(LoanOfferResponse(clientId="", eligible=False, reason="", requestedFeasible=False, requestedOffer=offer,
+                             bestOffer=offer, frontier=[offer], evaluated=0, elapsedMs=0.0), LoanOfferResponse)
+
+
+wsgi_app = readiness_from_env(wsgi_app, [
+    ("données", warm_data),
+    ("services en aval", downstream_step(registry)),
+    ("règles vectorielles", lambda: optimize_offers(MIN_CREDIT_SCORE, 4000.0, 1500.0, 300000.0)),
+    ("modèles de réponse", warm_models),
+    ("auto-appels SOAP", soap_self_calls(soap_app, WARMUP_REQUESTS)),
+])
+
+
+def on_worker_start():
+    get_job_queue()
+    feed = cache_invalidation_feed()
+    if feed is not None:
+        interval = float(os.environ.get("SOAP_RESPONSE_CACHE_FEED_INTERVAL", "0.5"))
+        threading.Thread(target=follow_cache_invalidations, args=(feed, interval),
+                         name="solvency-cache-feed", daemon=True).start()
+    wsgi_app.readiness.start()
+
+
+def on_worker_stop():
+    """Les workers sortent par os._exit (pas d'atexit) : les décisions encore
+    en file d'audit sont écrites avant la sortie."""
+    if _audit_log is not None:
+        _audit_log.close()
+
 
 if __name__ == "__main__":
-    from wsgiref.simple_server import make_server
+    from common.launcher import serve
     logging.info("🚀 Solvency Orchestrator prêt sur http://0.0.0.0:8000/?wsdl")
-    server = make_server("0.0.0.0", 8000, wsgi_app)
-    server.serve_forever()
+    # workers de la file démarrés dans chaque processus (après le fork)
+    serve(wsgi_app, int(os.environ.get("PORT", 8000)), threaded=True, on_start=on_worker_start,
+          on_stop=on_worker_stop)
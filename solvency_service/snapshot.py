@@ -0,0 +1,227 @@
+"""
+Instantané de risque par client : score, ratio d'endettement, décision et
+explications, calculés par les mêmes règles que les services métier
+(`common/rules.py`) et matérialisés dans SQLite.
+
+    python snapshot.py build                  # construction en masse (données internes)
+    python snapshot.py build --input clients.csv
+    python snapshot.py refresh client-001 client-002
+    python snapshot.py follow                 # recalcul au fil du journal des modifications
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from batch import chunked, clients_from_data, clients_from_file, process_chunk
+from data.changes import CREDIT, FINANCIALS, IDENTITY, ChangeFeed, change_log
+from data.client_directory_data import ClientData
+from data.credit_data import CreditData
+from data.finance_data import FinancialData
+
+INPUT_FIELDS = ("MonthlyIncome", "Expenses", "debt", "late", "hasBankruptcy")
+
+
+def input_hash(row):
+    """Empreinte des données sources : un instantané dont l'empreinte diffère est périmé."""
+    values = [row[k] for k in INPUT_FIELDS]
+    values[:3] = [float(v) for v in values[:3]]
+    values[3:] = [int(values[3]), bool(values[4])]
+    return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()[:16]
+
+
+def client_row(client_id, financial=None, credit=None):
+    financial = financial or FinancialData.get_client_financials(client_id)
+    credit = credit or CreditData.get_credit_history(client_id)
+    return {
+        "clientId": client_id,
+        "name": ClientData.get_client_identity(client_id)["name"],
+        "MonthlyIncome": financial["MonthlyIncome"],
+        "Expenses": financial["Expenses"],
+        "debt": credit["debt"],
+        "late": credit["late"],
+        "hasBankruptcy": credit["hasBankruptcy"],
+    }
+
+
+# source du journal -> application des champs aux données du processus
+_APPLY = {
+    IDENTITY: ClientData.apply_fields,
+    FINANCIALS: FinancialData.apply_fields,
+    CREDIT: CreditData.apply_fields,
+}
+
+
+def replay_changes(changes):
+    """Rejoue les champs modifiés dans les données du processus. Un processus
+    qui suit le journal n'a pas vu les mises à jour faites ailleurs : sans
+    cela, `client_row` relirait ses propres valeurs, périmées. Idempotent
+    (rejouer une mise à jour locale redonne les mêmes valeurs)."""
+    for change in changes:
+        apply = _APPLY.get(change.source)
+        if apply is not None:
+            apply(change.client_id, change.fields)
+
+
+def catch_up(log, name, batch_size=1000):
+    """Rejoue le journal jusqu'à la position du consommateur `name` : un
+    nouveau processus qui reprend le suivi part de l'état des données à
+    cette position, pas des valeurs initiales."""
+    until = log.cursor(name)
+    position = 0
+    while position < until:
+        changes = [c for c in log.since(position, batch_size) if c.seq <= until]
+        if not changes:
+            break
+        replay_changes(changes)
+        position = changes[-1].seq
+    return position
+
+
+class SnapshotStore:
+    """
+    Table `risk_snapshot` : une ligne par client. `get` ne retourne un
+    instantané que s'il a moins de `max_age` secondes et correspond aux
+    données sources actuelles.
+    """
+
+    def __init__(self, path="risk_snapshot.sqlite", max_age=86400.0):
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # simple cache recalculable : pas de fsync à chaque écriture
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS risk_snapshot ("
+            " client_id TEXT PRIMARY KEY, input_hash TEXT NOT NULL,"
+            " credit_score INTEGER NOT NULL, debt_ratio REAL NOT NULL, solvency_status TEXT NOT NULL,"
+            " credit_score_explanation TEXT, income_explanation TEXT, history_explanation TEXT,"
+            " computed REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def put_many(self, rows):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO risk_snapshot VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(r["clientId"], input_hash(r), r["creditScore"], r["debtRatio"], r["solvencyStatus"],
+                  r["creditScoreExplanation"], r["incomeVsExpensesExplanation"],
+                  r["creditHistoryExplanation"], now) for r in rows],
+            )
+            self._db.commit()
+        return len(rows)
+
+    def get(self, row):
+        with self._lock:
+            found = self._db.execute(
+                "SELECT input_hash, credit_score, debt_ratio, solvency_status, credit_score_explanation,"
+                " income_explanation, history_explanation, computed FROM risk_snapshot WHERE client_id = ?",
+                (row["clientId"],),
+            ).fetchone()
+            fresh = (
+                found is not None
+                and found[0] == input_hash(row)
+                and time.time() - found[7] <= self.max_age
+            )
+            if not fresh:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return {
+            "creditScore": found[1],
+            "debtRatio": found[2],
+            "solvencyStatus": found[3],
+            "creditScoreExplanation": found[4],
+            "incomeVsExpensesExplanation": found[5],
+            "creditHistoryExplanation": found[6],
+            "computed": found[7],
+        }
+
+    def refresh(self, rows):
+        """Recalcule et enregistre les instantanés des clients donnés."""
+        return self.put_many(process_chunk([dict(r) for r in rows]))
+
+    def apply_changes(self, client_ids, changes=None):
+        """
+        Recalcul incrémental : seuls les clients dont les données financières
+        ou de crédit ont changé sont recalculés (l'identité n'entre pas dans
+        l'instantané). Utilisable comme abonné ou avec un ChangeFeed : les
+        champs des modifications sont d'abord rejoués dans les données du
+        processus.
+        """
+        if changes is not None:
+            replay_changes(changes)
+            touched = {c.client_id for c in changes if c.source != IDENTITY}
+            client_ids = [c for c in client_ids if c in touched]
+        if not client_ids:
+            return 0
+        return self.refresh(client_row(c) for c in client_ids)
+
+    def on_change(self, change):
+        """Abonné du processus (`data.changes.subscribe`)."""
+        self.apply_changes([change.client_id], [change])
+
+    def build(self, source, chunk_size=1000):
+        """Construction en masse depuis une source de clients (générateur)."""
+        total = 0
+        for chunk in chunked(source, chunk_size):
+            total += self.refresh(chunk)
+        return total
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM risk_snapshot").fetchone()[0]
+
+
+def snapshot_store_from_env():
+    """SOLVENCY_SNAPSHOT_DB (défaut vide : désactivé) et SOLVENCY_SNAPSHOT_MAX_AGE (secondes)."""
+    path = os.environ.get("SOLVENCY_SNAPSHOT_DB", "")
+    if not path:
+        return None
+    return SnapshotStore(path, float(os.environ.get("SOLVENCY_SNAPSHOT_MAX_AGE", "86400")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Instantanés de risque par client.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="construction en masse")
+    build.add_argument("--input", help="export clients CSV/JSONL (défaut : données internes)")
+    build.add_argument("--chunk-size", type=int, default=1000)
+    refresh = sub.add_parser("refresh", help="recalcul de clients donnés")
+    refresh.add_argument("client_ids", nargs="+")
+    follow = sub.add_parser("follow", help="recalcul des clients modifiés (journal SOLVENCY_CHANGELOG_DB)")
+    follow.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    store = snapshot_store_from_env()
+    if store is None:
+        parser.error("SOLVENCY_SNAPSHOT_DB est vide : instantanés désactivés")
+    if args.command == "build":
+        source = clients_from_file(args.input) if args.input else clients_from_data()
+        start = time.perf_counter()
+        total = store.build(source, args.chunk_size)
+        logging.info(f"📸 {total} instantanés construits en {time.perf_counter() - start:.1f} s ({store.path})")
+    elif args.command == "refresh":
+        store.refresh(client_row(c) for c in args.client_ids)
+        logging.info(f"📸 {len(args.client_ids)} instantané(s) recalculé(s)")
+    else:
+        log = change_log()
+        if log is None:
+            parser.error("SOLVENCY_CHANGELOG_DB est vide : pas de journal à suivre")
+        logging.info(f"📸 Suivi du journal {log.path} (position {log.cursor('risk_snapshot')})")
+        catch_up(log, "risk_snapshot")
+        ChangeFeed(log, "risk_snapshot").follow(store.apply_changes, args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import sys, os, threading, time
+
+import pytest
+
+SOLVENCY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'solvency_service'))
+if SOLVENCY_DIR not in sys.path:
+    sys.path.insert(0, SOLVENCY_DIR)
+
+from spyne import Fault
+
+from admission import AdaptiveLimiter, AdmissionController, TokenBucket
+
+
+# === AIMD : hausse additive, baisse multiplicative (une par fenêtre) ===
+def test_limiter_aimd():
+    limiter = AdaptiveLimiter(initial=10, target_latency=1.0, backoff=0.5)
+    limiter.update(0.1)
+    assert limiter.limit == pytest.approx(10.1)
+
+    t0 = time.monotonic()
+    limiter.update(5.0, started=t0)
+    assert limiter.current == 5
+    # vérification admise avant la baisse : pas de seconde baisse
+    limiter.update(5.0, started=t0)
+    assert limiter.current == 5
+    limiter.update(0.1, ok=False)
+    assert limiter.current == 2
+
+
+# === Seau à jetons par client ===
+def test_token_bucket_per_client():
+    bucket = TokenBucket(rate=0.001, burst=2)
+    assert bucket.allow("a") and bucket.allow("a")
+    assert not bucket.allow("a")
+    assert bucket.allow("b")
+
+
+def test_rate_limited_fault():
+    controller = AdmissionController(AdaptiveLimiter(initial=4), rate_limiter=TokenBucket(rate=0.001, burst=1))
+    with controller.admit("client-001"):
+        pass
+    with pytest.raises(Fault) as exc:
+        with controller.admit("client-001"):
+            pass
+    assert exc.value.faultcode == "Client.RateLimited"
+
+
+# === File pleine : rejet immédiat ; attente expirée : Fault ===
+def test_overload_rejects_fast():
+    controller = AdmissionController(AdaptiveLimiter(initial=1, min_limit=1), max_queue=1, queue_timeout=0.2)
+    release = threading.Event()
+    admitted = threading.Event()
+
+    def busy():
+        with controller.admit():
+            admitted.set()
+            release.wait(2)
+
+    def waiting():
+        try:
+            with controller.admit():
+                pass
+        except Fault:
+            pass
+
+    t1 = threading.Thread(target=busy)
+    t1.start()
+    assert admitted.wait(2)
+    t2 = threading.Thread(target=waiting)
+    t2.start()
+    while controller.stats()["queued"] == 0:
+        time.sleep(0.01)
+
+    start = time.monotonic()
+    with pytest.raises(Fault) as exc:
+        with controller.admit():
+            pass
+    assert exc.value.faultcode == "Server.Overloaded"
+    assert time.monotonic() - start < 0.1
+
+    t2.join()
+    release.set()
+    t1.join()
+    stats = controller.stats()
+    assert stats["rejected"] == 1 and stats["timeouts"] == 1 and stats["inflight"] == 0
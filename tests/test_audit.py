@@ -0,0 +1,179 @@
+import json, os, sys, threading, time
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOLVENCY_DIR = os.path.join(ROOT_DIR, 'solvency_service')
+for path in (ROOT_DIR, SOLVENCY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from spyne import Fault
+
+from audit import AuditLog, AuditReader, AuditUnavailable, day_of
+from test_solvency_profiles import FakeResponse, load_solvency_main, soap_response
+
+DAY = 86400.0
+
+
+@pytest.fixture
+def log(tmp_path):
+    audit = AuditLog(str(tmp_path / "audit"))
+    yield audit
+    audit.close()
+
+
+def test_records_are_indexed_by_client_and_day(log):
+    base = 1760000000.0
+    for i in range(6):
+        log.record({"clientId": f"client-00{i % 2}", "ts": base + i * DAY, "n": i})
+    assert log.flush(timeout=5)
+
+    assert [r["n"] for r in log.find("client-001")] == [1, 3, 5]
+    since, until = day_of(base + DAY), day_of(base + 3 * DAY)
+    assert [r["n"] for r in log.find(since=since, until=until)] == [1, 2, 3]
+    assert [r["n"] for r in log.find("client-000", since=since)] == [2, 4]
+    assert log.find("client-999") == []
+    # un segment par jour
+    assert len(log.segments()) == 6
+
+
+def test_waiting_caller_returns_once_durable(log):
+    log.record({"clientId": "client-001", "decision": "solvent"}, wait=True)
+    assert log.stats()["pending"] == 0
+    assert AuditReader(log.directory).find("client-001")[0]["decision"] == "solvent"
+
+
+def test_segments_rotate_by_size(tmp_path):
+    log = AuditLog(str(tmp_path / "audit"), segment_bytes=300)
+    try:
+        for i in range(20):
+            log.record({"clientId": "client-001", "ts": 1760000000.0 + i, "payload": "x" * 50})
+        log.flush(timeout=5)
+    finally:
+        log.close()
+    segments = log.segments()
+    assert len(segments) > 3
+    assert all(os.path.getsize(os.path.join(log.directory, s)) <= 300 for s in segments)
+    assert [r["ts"] for r in log.find("client-001")] == [1760000000.0 + i for i in range(20)]
+
+
+def test_writer_commits_accumulated_records_together(log, monkeypatch):
+    release = threading.Event()
+    commit = log._commit
+
+    def slow_commit(batch, index):
+        release.wait(5)
+        commit(batch, index)
+
+    monkeypatch.setattr(log, "_commit", slow_commit)
+    log.record({"clientId": "client-001"})  # pris seul, bloqué dans le fsync simulé
+    time.sleep(0.05)
+    for i in range(50):
+        log.record({"clientId": "client-002", "n": i})
+    release.set()
+    assert log.flush(timeout=5)
+    stats = log.stats()
+    assert stats["records"] == 51 and stats["batches"] == 2 and stats["max_batch"] == 50
+
+
+def test_full_queue_applies_backpressure(tmp_path, monkeypatch):
+    log = AuditLog(str(tmp_path / "audit"), queue_size=2, timeout=0.05)
+    release = threading.Event()
+    commit = log._commit
+    monkeypatch.setattr(log, "_commit", lambda batch, index: (release.wait(5), commit(batch, index)))
+    try:
+        log.record({"clientId": "a"})
+        time.sleep(0.05)  # le premier est chez le writer, la file (2) se remplit
+        log.record({"clientId": "b"})
+        log.record({"clientId": "c"})
+        with pytest.raises(AuditUnavailable):
+            log.record({"clientId": "d"})
+        assert log.stats()["blocked"] == 1 and log.stats()["rejected"] == 1
+        release.set()
+        assert log.flush(timeout=5)
+        assert sorted(r["clientId"] for r in log.find()) == ["a", "b", "c"]
+    finally:
+        release.set()
+        log.close()
+
+
+def test_failed_write_is_rolled_back_before_retry(log, monkeypatch):
+    log.record({"clientId": "client-001", "n": 0}, wait=True)
+    write = log._write
+    failures = []
+
+    def failing_once(lines):
+        if lines and not failures:
+            failures.append(1)
+            log._file.write(b"".join(lines)[:10])  # ligne partielle sur disque
+            log._file.flush()
+            raise OSError("disque plein")
+        write(lines)
+
+    monkeypatch.setattr(log, "_write", failing_once)
+    log.record({"clientId": "client-001", "n": 1})
+    log.record({"clientId": "client-001", "n": 2})
+    assert log.flush(timeout=5) and failures == [1]
+
+    reader = AuditReader(log.directory)
+    assert [r["n"] for r in reader.find("client-001")] == [0, 1, 2]
+    segment = os.path.join(log.directory, log.segments()[0])
+    with open(segment, "rb") as f:
+        assert [json.loads(line)["n"] for line in f] == [0, 1, 2]
+
+
+def test_reindex_recovers_lost_index_and_skips_torn_line(log):
+    for i in range(3):
+        log.record({"clientId": "client-001", "n": i})
+    log.flush(timeout=5)
+    log.close()
+    segment = os.path.join(log.directory, log.segments()[0])
+    with open(segment, "ab") as f:
+        f.write(b'{"clientId":"client-001","n":3,"ts":1')  # arrêt brutal en pleine écriture
+    os.remove(os.path.join(log.directory, "index.sqlite"))
+
+    reader = AuditReader(log.directory)
+    assert reader.find("client-001") == []
+    assert reader.reindex() == 3
+    assert [r["n"] for r in reader.find("client-001")] == [0, 1, 2]
+
+
+# === Orchestrateur : chaque décision est tracée ===
+
+@pytest.fixture
+def solvency(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", "")
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", str(tmp_path / "audit"))
+    monkeypatch.setenv("SOLVENCY_AUDIT_SYNC", "1")
+    module = load_solvency_main()
+    monkeypatch.setattr("common.discovery.post_soap",
+                        lambda url, envelope, timeout=10: FakeResponse(soap_response(url.split("//")[1].split(":")[0])))
+    yield module
+    if module._audit_log is not None:
+        module._audit_log.close()
+
+
+def test_verify_solvency_decisions_are_audited(solvency):
+    solvency.SolvencyService.VerifySolvency(None, "client-001", "maison à Paris", "decisionOnly")
+    solvency.SolvencyService.VerifySolvency(None, "client-inconnu", "texte", None)
+
+    record, = solvency.get_audit_log().find("client-001")
+    assert record["demandeTexte"] == "maison à Paris" and record["responseProfile"] == "decisionOnly"
+    assert record["inputs"]["financials"]["MonthlyIncome"] > 0
+    assert record["extraction"]["location"] == "Paris" and record["extraction"]["amount"] == 200000.0
+    assert record["creditScore"] == 850 and record["solvencyStatus"] == "solvent"
+    assert record["approval"] == {"approved": True, "interestRate": 3.5, "maxLoanAmount": 250000.0,
+                                  "decisionReport": "accordé"}
+    assert solvency.get_audit_log().find("client-inconnu")[0]["solvencyStatus"] == "error"
+
+
+def test_unavailable_audit_log_fails_the_request(solvency, monkeypatch):
+    def unavailable(record, wait=False):
+        raise AuditUnavailable("file pleine")
+
+    monkeypatch.setattr(solvency.get_audit_log(), "record", unavailable)
+    with pytest.raises(Fault) as excinfo:
+        solvency.SolvencyService.VerifySolvency(None, "client-001", "texte", "decisionOnly")
+    assert excinfo.value.faultcode == "Server.AuditUnavailable"
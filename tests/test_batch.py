@@ -0,0 +1,69 @@
+import csv, os, sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOLVENCY_DIR = os.path.join(ROOT_DIR, 'solvency_service')
+for path in (ROOT_DIR, SOLVENCY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import batch
+from common.rules import credit_score, debt_ratio, solvency_decision
+
+
+def portfolio(n):
+    for i in range(n):
+        yield {"clientId": f"client-{i:05d}", "name": f"Client {i}", "MonthlyIncome": 2000.0 + i,
+               "Expenses": 1500.0, "debt": float(i * 10), "late": i % 4, "hasBankruptcy": i % 7 == 0}
+
+
+def read_ids(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return [row["clientId"] for row in csv.DictReader(f)]
+
+
+# === Même chaîne que les services ===
+def test_chain_matches_business_rules():
+    row = batch.process_chunk(list(batch.clients_from_data()))[0]
+    assert row["clientId"] == "client-001"
+    assert row["creditScore"] == int(credit_score(5000.0, 2, False))
+    assert row["debtRatio"] == pytest.approx(debt_ratio(4000.0, 2500.0))
+    assert row["solvencyStatus"] == solvency_decision(row["creditScore"], row["debtRatio"])
+    assert row["creditHistoryExplanation"] == "2 paiement(s) en retard."
+
+
+def test_run_writes_csv(tmp_path):
+    out = str(tmp_path / "out.csv")
+    assert batch.run(portfolio(25), out, chunk_size=10, workers=2) == 25
+    assert read_ids(out) == [f"client-{i:05d}" for i in range(25)]
+
+
+# === Interruption puis reprise : ni perte ni doublon ===
+def test_resume_after_interruption(tmp_path):
+    out = str(tmp_path / "out.csv")
+
+    def interrupted():
+        for i, row in enumerate(portfolio(50)):
+            if i == 33:
+                raise KeyboardInterrupt
+            yield row
+
+    with pytest.raises(KeyboardInterrupt):
+        batch.run(interrupted(), out, chunk_size=10, workers=1, window=1)
+    state = batch.load_checkpoint(out + ".checkpoint.json")
+    assert 0 < state["chunks"] < 5
+    # lignes écrites après le dernier point de reprise (crash en cours d'écriture)
+    with open(out, "a", encoding="utf-8") as f:
+        f.write("client-partial,,,,,,,,,,,,\n")
+
+    assert batch.run(portfolio(50), out, chunk_size=10, workers=1, resume=True) == 50
+    assert read_ids(out) == [f"client-{i:05d}" for i in range(50)]
+
+
+def test_clients_from_file(tmp_path):
+    path = tmp_path / "clients.csv"
+    path.write_text("clientId,MonthlyIncome,Expenses,debt,late,hasBankruptcy\n"
+                    "c1,4000,2500,5000,2,false\nc2,1000,900,0,0,true\n", encoding="utf-8")
+    rows = list(batch.clients_from_file(str(path)))
+    assert rows[1]["hasBankruptcy"] is True and rows[0]["late"] == 2
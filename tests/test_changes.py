@@ -0,0 +1,139 @@
+import os, subprocess, sys, textwrap
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOLVENCY_DIR = os.path.join(ROOT_DIR, 'solvency_service')
+for path in (ROOT_DIR, SOLVENCY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from batch import clients_from_data
+from common.rules import credit_score
+from data import changes
+from data.changes import ChangeFeed, ChangeLog, subscribe, unsubscribe
+from data.client_directory_data import ClientData
+from data.credit_data import CreditData
+from data.finance_data import FinancialData
+from snapshot import SnapshotStore, catch_up, client_row
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    # copies des données en mémoire : les mises à jour ne fuient pas entre tests
+    monkeypatch.setattr(ClientData, "clients", dict(ClientData.clients))
+    monkeypatch.setattr(FinancialData, "financials", dict(FinancialData.financials))
+    monkeypatch.setattr(CreditData, "credit_history", dict(CreditData.credit_history))
+    monkeypatch.setenv("SOLVENCY_CHANGELOG_DB", str(tmp_path / "changes.sqlite"))
+    return changes.change_log()
+
+
+# === Mises à jour journalisées ===
+def test_updates_are_appended_to_the_log(log):
+    FinancialData.update_client_financials("client-001", MonthlyIncome=4500)
+    CreditData.update_credit_history("client-002", late=1)
+    ClientData.update_client_identity("client-004", name="Eve", address="1 rue Neuve")
+    assert FinancialData.get_client_financials("client-001") == {"MonthlyIncome": 4500.0, "Expenses": 2500.0}
+    assert ClientData.get_client_identity("client-004")["name"] == "Eve"
+    entries = log.since(0)
+    assert [(c.source, c.client_id) for c in entries] == [
+        ("financials", "client-001"), ("credit", "client-002"), ("identity", "client-004")]
+    assert entries[1].fields == {"late": 1}
+    assert log.last_seq() == entries[-1].seq
+
+
+def test_unknown_field_is_rejected(log):
+    with pytest.raises(ValueError):
+        CreditData.update_credit_history("client-001", score=900)
+    assert log.last_seq() == 0
+
+
+def test_subscribers_are_notified(log):
+    seen = []
+    handler = subscribe(seen.append)
+    try:
+        CreditData.update_credit_history("client-003", debt=0.0)
+    finally:
+        unsubscribe(handler)
+    assert [(c.client_id, c.fields) for c in seen] == [("client-003", {"debt": 0.0})]
+
+
+# === Lecture du journal par position ===
+def test_feed_deduplicates_and_keeps_its_cursor(log, tmp_path):
+    for late in (1, 2, 3):
+        CreditData.update_credit_history("client-001", late=late)
+    FinancialData.update_client_financials("client-002", Expenses=100)
+    batches = []
+    feed = ChangeFeed(log, "test")
+    assert feed.poll(lambda ids, changes: batches.append(ids)) == 4
+    assert batches == [["client-001", "client-002"]]
+    # nouvelle instance (autre processus) : reprise à la position enregistrée
+    assert ChangeFeed(ChangeLog(log.path), "test").poll(lambda ids, changes: batches.append(ids)) == 0
+
+
+# === Recalcul incrémental des instantanés ===
+def test_snapshot_recomputes_only_changed_clients(log, tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshot.sqlite"))
+    store.build(clients_from_data())
+    CreditData.update_credit_history("client-002", late=4)
+    ClientData.update_client_identity("client-003", name="Robert Johnson")
+    recomputed = []
+    feed = ChangeFeed(log, "risk_snapshot")
+    feed.poll(lambda ids, changes: recomputed.append(store.apply_changes(ids, changes)))
+    assert recomputed == [1]
+    assert store.get(client_row("client-002"))["creditScore"] == int(credit_score(2000.0, 4, False))
+
+
+def test_snapshot_subscriber_refreshes_in_process(log, tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshot.sqlite"))
+    store.build(clients_from_data())
+    subscribe(store.on_change)
+    try:
+        FinancialData.update_client_financials("client-001", Expenses=3900)
+    finally:
+        unsubscribe(store.on_change)
+    assert store.get(client_row("client-001")) is not None
+
+
+# === Suivi depuis un autre processus ===
+def update_in_other_process(log, code):
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path[:0] = [{ROOT_DIR!r}, {SOLVENCY_DIR!r}]
+        from data.client_directory_data import ClientData
+        from data.credit_data import CreditData
+        from data.finance_data import FinancialData
+    """) + textwrap.dedent(code)
+    subprocess.run([sys.executable, "-c", script], check=True,
+                   env=dict(os.environ, SOLVENCY_CHANGELOG_DB=log.path))
+
+
+def test_follower_in_another_process_applies_changed_fields(log, tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshot.sqlite"))
+    store.build(clients_from_data())
+    update_in_other_process(log, 'CreditData.update_credit_history("client-002", late=4)')
+    assert CreditData.get_credit_history("client-002")["late"] == 0  # ce processus ne l'a pas vu
+
+    ChangeFeed(log, "risk_snapshot").poll(store.apply_changes)
+    expected = int(credit_score(2000.0, 4, False))
+    assert CreditData.get_credit_history("client-002")["late"] == 4
+    assert store.get(client_row("client-002"))["creditScore"] == expected
+
+
+def test_restarted_follower_catches_up_before_new_changes(log, tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshot.sqlite"))
+    store.build(clients_from_data())
+    update_in_other_process(log, 'CreditData.update_credit_history("client-002", late=4)')
+    log.save_cursor("risk_snapshot", log.last_seq())  # déjà traité par un suivi précédent
+    update_in_other_process(log, 'FinancialData.update_client_financials("client-002", Expenses=100)')
+
+    catch_up(log, "risk_snapshot")
+    ChangeFeed(log, "risk_snapshot").poll(store.apply_changes)
+    row = client_row("client-002")
+    assert (row["late"], row["Expenses"]) == (4, 100.0)
+    assert store.get(row)["creditScore"] == int(credit_score(2000.0, 4, False))
+
+
+def test_log_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("SOLVENCY_CHANGELOG_DB", raising=False)
+    assert changes.change_log() is None
@@ -0,0 +1,114 @@
+import os, sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOLVENCY_DIR = os.path.join(ROOT_DIR, 'solvency_service')
+for path in (ROOT_DIR, SOLVENCY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from batch import clients_from_data
+from data import columnar
+from data.client_directory_data import ClientData
+from data.columnar import ClientDataset, build_dataset, client_dataset, rows_from_data, rows_from_json
+from data.credit_data import CreditData
+from data.finance_data import FinancialData
+
+ROWS = [
+    {"clientId": "client-100", "name": "Zoé Martin", "address": "1 rue de la Paix", "MonthlyIncome": 4200.0,
+     "Expenses": 1800.0, "debt": 1500.0, "late": 1, "hasBankruptcy": False},
+    {"clientId": "client-101", "name": "Paul Durand", "address": "", "MonthlyIncome": 2500.0,
+     "Expenses": 2600.0, "debt": 9000.0, "late": 4, "hasBankruptcy": True},
+    # identité seule : finances et crédit absents
+    {"clientId": "client-102", "name": "Inès", "address": "Lyon"},
+]
+
+
+@pytest.fixture
+def dataset_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(ClientData, "clients", dict(ClientData.clients))
+    monkeypatch.setattr(FinancialData, "financials", dict(FinancialData.financials))
+    monkeypatch.setattr(CreditData, "credit_history", dict(CreditData.credit_history))
+    monkeypatch.setenv("SOLVENCY_CHANGELOG_DB", "")
+    path = str(tmp_path / "clients.cds")
+    build_dataset(ROWS, path)
+    monkeypatch.setenv("SOLVENCY_CLIENT_DATASET", path)
+    return path
+
+
+def test_lookups_match_source_rows(dataset_path):
+    dataset = ClientDataset(dataset_path)
+    assert len(dataset) == 3
+    assert dataset.identity("client-100") == {"name": "Zoé Martin", "address": "1 rue de la Paix"}
+    assert dataset.financials("client-101") == {"MonthlyIncome": 2500.0, "Expenses": 2600.0}
+    assert dataset.credit("client-101") == {"debt": 9000.0, "late": 4, "hasBankruptcy": True}
+    assert dataset.identity("client-102")["name"] == "Inès"
+    assert dataset.financials("client-102") is None and dataset.credit("client-102") is None
+    assert dataset.row("client-999") is None and "client-999" not in dataset
+    assert sorted(dataset.ids()) == ["client-100", "client-101", "client-102"]
+
+
+def test_columns_are_read_only_views_of_the_mapping(dataset_path):
+    dataset = ClientDataset(dataset_path)
+    income = dataset.column("MonthlyIncome")
+    assert income.readonly and income.format == "d" and len(income) == 3
+    assert income[dataset.row("client-100")] == 4200.0
+
+
+def test_hash_collisions_fall_back_to_id_comparison(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar, "_hash", lambda key: 7)
+    path = str(tmp_path / "collisions.cds")
+    build_dataset(ROWS, path)
+    dataset = ClientDataset(path)
+    assert [dataset.identity(r["clientId"])["name"] for r in ROWS] == ["Zoé Martin", "Paul Durand", "Inès"]
+    assert dataset.row("client-999") is None
+
+
+def test_data_classes_read_the_mapped_dataset(dataset_path):
+    assert ClientData.get_client_identity("client-100")["name"] == "Zoé Martin"
+    assert FinancialData.get_client_financials("client-100") == {"MonthlyIncome": 4200.0, "Expenses": 1800.0}
+    assert CreditData.get_credit_history("client-102") == {"debt": 0.0, "late": 0, "hasBankruptcy": False}
+    assert ClientData.get_client_identity("client-999")["name"] == "Inconnu"
+    # les mises à jour du processus priment sur le jeu projeté
+    FinancialData.update_client_financials("client-100", Expenses=2000)
+    assert FinancialData.get_client_financials("client-100") == {"MonthlyIncome": 4200.0, "Expenses": 2000.0}
+    assert {"client-001", "client-100", "client-102"} <= {row["clientId"] for row in clients_from_data()}
+
+
+def test_partial_identity_update_keeps_dataset_fields(dataset_path):
+    ClientData.update_client_identity("client-100", address="Paris")
+    assert ClientData.get_client_identity("client-100") == {"name": "Zoé Martin", "address": "Paris"}
+
+
+def test_rebuild_is_swapped_in_atomically(dataset_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_CLIENT_DATASET_CHECK", "0")
+    before = client_dataset()
+    assert before.financials("client-100")["MonthlyIncome"] == 4200.0
+
+    build_dataset([dict(ROWS[0], MonthlyIncome=5100.0)], dataset_path)
+    after = client_dataset()
+    assert after is not before and len(after) == 1
+    assert after.financials("client-100")["MonthlyIncome"] == 5100.0
+    # l'ancienne projection reste lisible par les requêtes en cours
+    assert before.financials("client-100")["MonthlyIncome"] == 4200.0
+    assert not [name for name in os.listdir(os.path.dirname(dataset_path)) if ".tmp." in name]
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        ClientDataset(str(path))
+
+
+def test_build_sources_cover_internal_data_and_json_files(tmp_path, dataset_path):
+    rows = {row["clientId"]: row for row in rows_from_data()}
+    assert rows["client-001"]["address"] == "123 Main St" and rows["client-100"]["late"] == 1
+
+    json_rows = list(rows_from_json(os.path.join(SOLVENCY_DIR, "data")))
+    path = str(tmp_path / "json.cds")
+    build_dataset(json_rows, path)
+    dataset = ClientDataset(path)
+    assert dataset.financials("client-003") == {"MonthlyIncome": 6000.0, "Expenses": 5500.0}
+    assert dataset.credit("client-001")["late"] == 2
@@ -0,0 +1,94 @@
+import zlib
+
+import pytest
+
+from common.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = b"<soap11env:Envelope>" + b"<tns:evaluationReport>Valeur estimee</tns:evaluationReport>" * 200 + b"</soap11env:Envelope>"
+
+
+def make_app(body, content_type="text/xml; charset=utf-8", status="200 OK"):
+    def app(environ, start_response):
+        start_response(status, [("Content-Type", content_type), ("Content-Length", str(len(body)))])
+        return [body[i:i + 1024] for i in range(0, len(body), 1024)]
+    return app
+
+
+def call(app, accept_encoding=None):
+    environ = {"REQUEST_METHOD": "POST"}
+    if accept_encoding:
+        environ["HTTP_ACCEPT_ENCODING"] = accept_encoding
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured["status"] = status
+        captured["headers"] = dict(headers)
+
+    body = b"".join(app(environ, start_response))
+    return captured["status"], captured["headers"], body
+
+
+# === Négociation Accept-Encoding ===
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("deflate", "deflate"),
+    ("gzip;q=0, deflate", "deflate"),
+    ("gzip;q=0.2, deflate;q=0.8", "deflate"),
+    ("*", "gzip"),
+    ("identity", None),
+    (None, None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+# === Grande réponse : compressée en gzip ===
+def test_large_response_gzip():
+    status, headers, body = call(CompressionMiddleware(make_app(BODY), min_size=1024), "gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in headers
+    assert zlib.decompress(body, 31) == BODY
+    assert len(body) < len(BODY)
+
+
+# === Grande réponse : compressée en deflate ===
+def test_large_response_deflate():
+    status, headers, body = call(CompressionMiddleware(make_app(BODY), min_size=1024), "deflate")
+    assert headers["Content-Encoding"] == "deflate"
+    assert zlib.decompress(body) == BODY
+
+
+# === Petite réponse sous le seuil : non compressée ===
+def test_small_response_untouched():
+    small = b"<ok/>"
+    status, headers, body = call(CompressionMiddleware(make_app(small), min_size=1024), "gzip")
+    assert "Content-Encoding" not in headers
+    assert headers["Content-Length"] == str(len(small))
+    assert headers["Vary"] == "Accept-Encoding"
+    assert body == small
+
+
+# === Client sans Accept-Encoding ===
+def test_no_accept_encoding():
+    status, headers, body = call(CompressionMiddleware(make_app(BODY), min_size=1024))
+    assert "Content-Encoding" not in headers
+    assert headers["Vary"] == "Accept-Encoding"  # la version identité dépend aussi de l'en-tête
+    assert body == BODY
+
+
+# === Vary existant : fusionné, sans doublon ===
+def test_vary_merged_with_existing_header():
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/xml"), ("Vary", "Origin")])
+        return [BODY]
+
+    for accept_encoding in (None, "gzip"):
+        status, headers, body = call(CompressionMiddleware(app, min_size=1024), accept_encoding)
+        assert headers["Vary"] == "Origin, Accept-Encoding"
+
+
+# === Type non compressible ===
+def test_binary_content_untouched():
+    status, headers, body = call(CompressionMiddleware(make_app(BODY, content_type="image/png"), min_size=1024), "gzip")
+    assert "Content-Encoding" not in headers and "Vary" not in headers
+    assert body == BODY
@@ -5,7 +5,7 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-from business_services.credit_scoring_service import CreditScoringService, CreditScoreResult
+from business_services.credit_scoring_service import CreditScoringService, CreditScoreResult, CreditScoreInput
 
 class DummyContext:
     pass
@@ -29,5 +29,11 @@ class TestCreditScoringService(unittest.TestCase):
         expected = 1000 - 0.1*100000 - 50*10
         self.assertAlmostEqual(result.score, expected, places=2)
 
+    def test_batch_keeps_input_order(self):
+        items = [CreditScoreInput(debt=1000.0, latePayments=0, hasBankruptcy=False),
+                 CreditScoreInput(debt=5000.0, latePayments=2, hasBankruptcy=True)]
+        results = CreditScoringService.ComputeCreditScoreBatch(self.ctx, items)
+        self.assertEqual([r.score for r in results], [900.0, 1000 - 500 - 100 - 200])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
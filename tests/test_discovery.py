@@ -0,0 +1,98 @@
+import threading, time
+
+import pytest
+
+from common import discovery
+from common.discovery import ServiceRegistry, parse_endpoints
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, url):
+        self.content = url.encode("utf-8")
+
+
+def fake_transport(monkeypatch, delays=None, down=()):
+    calls = []
+    lock = threading.Lock()
+
+    def post_soap(url, envelope, timeout=10):
+        with lock:
+            calls.append(url)
+        if url in down:
+            raise ConnectionError(url)
+        time.sleep((delays or {}).get(url, 0))
+        return FakeResponse(url)
+
+    monkeypatch.setattr(discovery, "post_soap", post_soap)
+    return calls
+
+
+def make_registry(urls, hedge=False):
+    return ServiceRegistry({"svc": urls[0]}, endpoints={"svc": urls}, hedge=hedge, health_interval=0)
+
+
+def test_parse_endpoints():
+    spec = "ie_service=http://ie1:8001/, http://ie2:8001/;explain_service=http://explain:8005/"
+    assert parse_endpoints(spec) == {
+        "ie_service": ["http://ie1:8001/", "http://ie2:8001/"],
+        "explain_service": ["http://explain:8005/"],
+    }
+
+
+def test_default_url_when_not_configured():
+    registry = ServiceRegistry({"svc": "http://svc:1/"}, endpoints={}, health_interval=0)
+    assert [e.url for e in registry.pool("svc").endpoints] == ["http://svc:1/"]
+
+
+# === Moins de requêtes en cours ===
+def test_least_outstanding():
+    pool = make_registry(["http://a/", "http://b/"]).pool("svc")
+    first = pool.choose()
+    second = pool.choose()
+    assert {first.url, second.url} == {"http://a/", "http://b/"}
+    pool.release(first, 0.01)
+    assert pool.choose() is first
+
+
+# === Réplica en panne : bascule puis exclusion ===
+def test_failover_on_network_error(monkeypatch):
+    calls = fake_transport(monkeypatch, down={"http://a/"})
+    registry = make_registry(["http://a/", "http://b/"])
+    assert registry.post("svc", "<x/>").content == b"http://b/"
+    assert registry.post("svc", "<x/>").content == b"http://b/"
+    assert calls.count("http://a/") == 1
+
+
+def test_non_idempotent_call_is_sent_once(monkeypatch):
+    calls = fake_transport(monkeypatch, down={"http://a/"})
+    registry = make_registry(["http://a/", "http://b/"])
+    with pytest.raises(ConnectionError):
+        registry.post("svc", "<x/>", idempotent=False)
+    assert calls == ["http://a/"]
+
+
+# === Hedging au-delà du p95 ===
+def test_hedged_request_beats_slow_replica(monkeypatch):
+    calls = fake_transport(monkeypatch, delays={"http://a/": 0.5})
+    registry = make_registry(["http://a/", "http://b/"], hedge=True)
+    pool = registry.pool("svc")
+    pool.latencies.extend([0.01] * discovery.HEDGE_MIN_SAMPLES)
+    pool.endpoints[1].outstanding = 1  # le réplica lent est choisi en premier
+
+    start = time.perf_counter()
+    resp = registry.post("svc", "<x/>")
+    assert time.perf_counter() - start < 0.3
+    assert resp.content == b"http://b/"
+    assert pool.hedged == 1 and calls == ["http://a/", "http://b/"]
+
+
+def test_no_hedge_for_non_idempotent(monkeypatch):
+    calls = fake_transport(monkeypatch, delays={"http://a/": 0.05})
+    registry = make_registry(["http://a/", "http://b/"], hedge=True)
+    pool = registry.pool("svc")
+    pool.latencies.extend([0.001] * discovery.HEDGE_MIN_SAMPLES)
+    pool.endpoints[1].outstanding = 1
+    registry.post("svc", "<x/>", idempotent=False)
+    assert calls == ["http://a/"] and pool.hedged == 0
@@ -0,0 +1,99 @@
+import io, json, os, sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.discovery import parse_endpoints
+from common.host import PrefixDispatcher, build_host, loopback_endpoints, use_service_wsdl
+from common.wsdl import PrecomputedWsdlMiddleware
+
+CREDIT_REQUEST = b"""<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+    xmlns:tns="urn:creditscore.service:v1"><soapenv:Body><tns:ComputeCreditScore><tns:debt>5000.0</tns:debt>
+    <tns:latePayments>2</tns:latePayments><tns:hasBankruptcy>false</tns:hasBankruptcy></tns:ComputeCreditScore>
+    </soapenv:Body></soapenv:Envelope>"""
+
+
+def call(app, path, body=None, query=""):
+    environ = {"REQUEST_METHOD": "POST" if body else "GET", "PATH_INFO": path, "QUERY_STRING": query,
+               "SCRIPT_NAME": "", "CONTENT_TYPE": "text/xml", "CONTENT_LENGTH": str(len(body or b"")),
+               "wsgi.input": io.BytesIO(body or b""), "SERVER_NAME": "hote", "SERVER_PORT": "8000",
+               "wsgi.url_scheme": "http"}
+    captured = {}
+    payload = b"".join(app(environ, lambda s, h, e=None: captured.update(status=s)))
+    return captured["status"], payload
+
+
+def recording(environ, start_response):
+    start_response("200 OK", [])
+    return [json.dumps([environ["SCRIPT_NAME"], environ["PATH_INFO"]]).encode()]
+
+
+def test_dispatcher_strips_prefix_into_script_name():
+    dispatcher = PrefixDispatcher({"explain_service": recording})
+    assert json.loads(call(dispatcher, "/explain_service/")[1]) == ["/explain_service", "/"]
+    assert json.loads(call(dispatcher, "/explain_service")[1]) == ["/explain_service", "/"]
+    assert json.loads(call(dispatcher, "/explain_service/ready")[1]) == ["/explain_service", "/ready"]
+    status, body = call(dispatcher, "/autre/")
+    assert status.startswith("404") and json.loads(body)["services"] == ["explain_service"]
+
+
+def test_root_ready_waits_for_every_mounted_service():
+    class Warming:
+        status_value = "warming"
+
+        def status(self):
+            return {"status": self.status_value}
+
+    pending = Warming()
+    slow = lambda environ, start_response: None
+    slow.readiness = pending
+    dispatcher = PrefixDispatcher({"a": recording, "b": slow})
+    assert call(dispatcher, "/health")[0].startswith("200")
+    status, body = call(dispatcher, "/ready")
+    assert status.startswith("503") and json.loads(body)["services"]["b"]["status"] == "warming"
+    pending.status_value = "ready"
+    assert call(dispatcher, "/ready")[0].startswith("200")
+
+
+def test_loopback_endpoints_keep_explicit_configuration(monkeypatch):
+    monkeypatch.delenv("SOAP_ENDPOINTS_FILE", raising=False)
+    monkeypatch.setenv("SOAP_ENDPOINTS", "ie_service=http://ie1:8001/")
+    loopback_endpoints(["ie_service", "explain_service"], 9000)
+    assert parse_endpoints(os.environ["SOAP_ENDPOINTS"]) == {
+        "ie_service": ["http://ie1:8001/"], "explain_service": ["http://127.0.0.1:9000/explain_service/"],
+    }
+
+
+def test_wsdl_file_is_read_from_the_service_directory(tmp_path):
+    wsdl = PrecomputedWsdlMiddleware(recording, None, path="service.wsdl")
+    outer = type("Outer", (), {"app": wsdl})()
+    use_service_wsdl(outer, str(tmp_path))
+    assert wsdl.path == str(tmp_path / "service.wsdl")
+
+
+def test_hosted_services_keep_their_own_wsdl_and_operations(monkeypatch):
+    monkeypatch.delenv("SOAP_ENDPOINTS_FILE", raising=False)
+    monkeypatch.setenv("SOAP_ENDPOINTS", "")
+    monkeypatch.setenv("SERVICE_WARMUP", "0")
+    dispatcher, on_start, on_stop = build_host(["credit_scoring_service", "ratio_endettement_service"], 9000)
+    on_start()
+
+    status, credit_wsdl = call(dispatcher, "/credit_scoring_service/", query="wsdl")
+    assert status.startswith("200") and b'targetNamespace="urn:creditscore.service:v1"' in credit_wsdl
+    assert b'location="http://hote:8000/credit_scoring_service/"' in credit_wsdl
+    ratio_wsdl = call(dispatcher, "/ratio_endettement_service/", query="wsdl")[1]
+    assert b"urn:debtratio.service:v1" in ratio_wsdl and b"creditscore" not in ratio_wsdl
+
+    status, body = call(dispatcher, "/credit_scoring_service/", CREDIT_REQUEST)
+    assert status.startswith("200") and b"<tns:score>" in body
+    assert call(dispatcher, "/ready")[0].startswith("200")
+    assert "credit_scoring_service=http://127.0.0.1:9000/credit_scoring_service/" in os.environ["SOAP_ENDPOINTS"]
+    on_stop()
+
+
+def test_unknown_service_is_rejected():
+    with pytest.raises(ValueError):
+        build_host(["inconnu_service"], 9000)
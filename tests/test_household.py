@@ -0,0 +1,99 @@
+import os, sys
+from collections import Counter
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOLVENCY_DIR = os.path.join(ROOT_DIR, 'solvency_service')
+for path in (ROOT_DIR, SOLVENCY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from spyne import Fault
+
+from test_solvency_profiles import FakeResponse, load_solvency_main, soap_response
+
+TEXT = "Je souhaite emprunter 200000 euros sur 20 ans pour une maison à Paris."
+
+
+@pytest.fixture
+def solvency(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", "")
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", "")
+    module = load_solvency_main()
+    calls, envelopes = [], []
+
+    def fake_post_soap(url, envelope, timeout=10):
+        service = url.split("//")[1].split(":")[0]
+        calls.append(service)
+        envelopes.append((service, envelope))
+        if service == "credit_scoring_service":
+            debt = envelope.split("<urn:debt>")[1].split("<")[0]
+            return FakeResponse(soap_response(service).replace(">850<", ">700<" if debt == "10000.0" else ">850<"))
+        return FakeResponse(soap_response(service))
+
+    monkeypatch.setattr("common.discovery.post_soap", fake_post_soap)
+    module.calls, module.envelopes = calls, envelopes
+    return module
+
+
+def test_household_runs_one_chain_and_one_score_per_borrower(solvency):
+    ids = ["client-001", "client-002", "client-003"]
+    response = solvency.SolvencyService.VerifyHouseholdSolvency(None, ids, TEXT)
+
+    assert Counter(solvency.calls) == {
+        "ie_service": 1, "property_evaluation_service": 1, "credit_scoring_service": 3,
+        "decision_solvability_service": 1, "explain_service": 1, "approbation_service": 1,
+    }
+    assert [b.clientId for b in response.borrowers] == ids
+    assert [b.creditScore for b in response.borrowers] == [850, 850, 700]
+    assert response.creditScore == 700  # le plus faible des co-emprunteurs
+    assert response.combinedFinancials.MonthlyIncome == 13000.0
+    assert response.combinedFinancials.Expenses == 9300.0
+    assert response.combinedCreditHistory.debt == 17000.0
+    assert response.combinedCreditHistory.late == 7 and response.combinedCreditHistory.hasBankruptcy
+    assert response.solvencyStatus == "solvent" and response.approvalResponse.approved
+    assert set(response.sections) == {"borrowers", "propertyEvaluation", "creditScore", "solvencyStatus",
+                                      "approvalResponse", "explanations"}
+
+    decision = next(e for s, e in solvency.envelopes if s == "decision_solvability_service")
+    assert "<urn:creditScore>700</urn:creditScore>" in decision
+    assert "<urn:monthlyIncome>13000.0</urn:monthlyIncome>" in decision
+    assert "<urn:monthlyDebtPayments>9300.0</urn:monthlyDebtPayments>" in decision
+
+
+def test_single_borrower_household_matches_verify_solvency(solvency):
+    household = solvency.SolvencyService.VerifyHouseholdSolvency(None, ["client-001"], TEXT)
+    single = solvency.SolvencyService.VerifySolvency(None, "client-001", TEXT, "full")
+    assert household.creditScore == single.creditScore
+    assert household.solvencyStatus == single.solvencyStatus
+    assert household.combinedFinancials.MonthlyIncome == single.financials.MonthlyIncome
+    assert household.propertyEvaluation.estimatedValue == single.propertyEvaluation.estimatedValue
+
+
+def test_unknown_borrower_returns_error_without_calls(solvency):
+    response = solvency.SolvencyService.VerifyHouseholdSolvency(None, ["client-001", "client-999"], TEXT)
+    assert response.solvencyStatus == "error" and response.creditScore == 0
+    assert "client-999" in response.explanations.creditScoreExplanation
+    assert solvency.calls == []
+
+
+@pytest.mark.parametrize("ids", [[], None, ["client-001", "client-001"], [f"client-{i:03d}" for i in range(9)]])
+def test_invalid_borrower_lists_are_rejected(solvency, ids):
+    with pytest.raises(Fault) as err:
+        solvency.SolvencyService.VerifyHouseholdSolvency(None, ids, TEXT)
+    assert err.value.faultcode == "Client.InvalidArgument"
+
+
+def test_household_decision_is_audited_for_each_borrower(solvency, tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", str(tmp_path / "audit"))
+    ids = ["client-001", "client-002"]
+    solvency.SolvencyService.VerifyHouseholdSolvency(None, ids, TEXT)
+    log = solvency.get_audit_log()
+    assert log.flush(timeout=5)
+    for client_id in ids:
+        [record] = log.find(client_id)
+        assert record["household"] == ids and record["creditScore"] == 850
+        assert record["combined"]["financials"]["MonthlyIncome"] == 7000.0
+    log.close()
@@ -0,0 +1,92 @@
+import sys, os
+
+IE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ie_service'))
+if IE_DIR not in sys.path:
+    sys.path.insert(0, IE_DIR)
+
+from backends import RegexBackend, SpacyBackend
+from cache import CachedBackend, ExtractionCache, text_key
+
+
+class CountingBackend(RegexBackend):
+    def __init__(self):
+        self.calls = 0
+
+    def extract_batch(self, texts):
+        self.calls += len(texts)
+        return super().extract_batch(texts)
+
+
+TEXT = "Prêt de 180000 € sur 25 ans pour un appartement à Lyon."
+
+
+# === Même texte : une seule extraction (clé sur le texte brut, sans le nettoyer) ===
+def test_same_text_hits_cache():
+    backend = CountingBackend()
+    cached = CachedBackend(backend, ExtractionCache(max_entries=10))
+    first = cached.extract(TEXT)
+    second = cached.extract(TEXT)
+    assert first == second
+    assert backend.calls == 1
+    stats = cached.cache.stats()
+    assert stats["hits_memory"] == 1 and stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+# === Éviction LRU ===
+def test_lru_eviction():
+    cache = ExtractionCache(max_entries=2)
+    cache.put("a", {"x": 1}, 0.1)
+    cache.put("b", {"x": 2}, 0.1)
+    assert cache.get("a") == {"x": 1}      # "a" devient le plus récent
+    cache.put("c", {"x": 3}, 0.1)          # "b" est évincé
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert len(cache) == 2
+
+
+# === Niveau disque partagé entre workers ===
+def test_disk_tier(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    CachedBackend(CountingBackend(), ExtractionCache(10, path)).extract(TEXT)
+
+    backend = CountingBackend()
+    other_worker = CachedBackend(backend, ExtractionCache(10, path))
+    fields = other_worker.extract(TEXT)
+    assert fields["location"] == "Lyon"
+    assert backend.calls == 0
+    assert other_worker.cache.stats()["hits_disk"] == 1
+
+
+# === La clé dépend du backend ===
+def test_key_includes_backend():
+    assert text_key("regex", "abc") != text_key("spacy", "abc")
+    assert text_key("regex", "abc") != text_key("regex", " abc")
+
+
+# === Changer de backend ou de paramètres ne relit pas les anciennes extractions ===
+def test_disk_tier_is_keyed_by_backend_identity(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    CachedBackend(CountingBackend(), ExtractionCache(10, path)).extract(TEXT)
+
+    spacy = SpacyBackend(model="fr_core_news_md", threshold=0.5)
+    assert CachedBackend(spacy, ExtractionCache(10, path)).identity != CachedBackend(RegexBackend(), None).identity
+    assert SpacyBackend(threshold=0.8).identity != spacy.identity
+    assert SpacyBackend(model="fr_core_news_lg").identity != spacy.identity
+    assert SpacyBackend(max_chars=1000).identity != spacy.identity
+
+    backend = CountingBackend()
+    backend.window = 0  # texte entier : autre identité
+    CachedBackend(backend, ExtractionCache(10, path)).extract(TEXT)
+    assert backend.calls == 1
+
+
+# === Niveau disque borné : les plus anciennes lignes sont supprimées ===
+def test_disk_tier_is_bounded(tmp_path):
+    cache = ExtractionCache(max_entries=5, path=str(tmp_path / "cache.sqlite"), max_disk_entries=10)
+    for i in range(25):
+        cache.put(f"k{i}", {"x": i}, 0.1)
+    assert cache.disk_entries() <= 10
+    other_worker = ExtractionCache(max_entries=5, path=str(tmp_path / "cache.sqlite"), max_disk_entries=10)
+    assert other_worker.get("k24") == {"x": 24}
+    assert other_worker.get("k0") is None
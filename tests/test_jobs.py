@@ -0,0 +1,169 @@
+import sqlite3, sys, os, threading, time
+
+SOLVENCY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'solvency_service'))
+if SOLVENCY_DIR not in sys.path:
+    sys.path.insert(0, SOLVENCY_DIR)
+
+import pytest
+
+from jobs import DONE, FAILED, QUEUED, RUNNING, JobStore, JobWorkerPool, callback_allowed
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+# === Soumission puis prise par ordre d'arrivée ===
+def test_submit_and_claim_in_order(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    first = store.submit("verify", "a")
+    second = store.submit("verify", "b")
+    job = store.claim()
+    assert job["id"] == first and job["payload"] == "a"
+    assert store.get(first)["status"] == RUNNING
+    assert store.get(second)["status"] == QUEUED
+    assert store.claim()["id"] == second
+    assert store.claim() is None
+
+
+# === Un travail en cours au bail expiré est repris (redémarrage) ===
+def test_expired_lease_is_requeued(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    job_id = JobStore(path).submit("verify", "a")
+    assert JobStore(path).claim()["id"] == job_id
+
+    restarted = JobStore(path, lease=0.0)
+    time.sleep(0.01)
+    job = restarted.claim()
+    assert job["id"] == job_id
+    assert restarted.get(job_id)["attempts"] == 2
+
+
+# === Les workers traitent la file et notifient la fin ===
+def test_worker_pool_processes_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    notified = []
+    pool = JobWorkerPool(store, {"upper": str.upper}, concurrency=2, on_done=notified.append)
+    pool.start()
+    try:
+        ids = [store.submit("upper", f"demande {i}") for i in range(5)]
+        pool.notify()
+        assert wait_for(lambda: len(notified) == 5)
+    finally:
+        pool.stop(timeout=2)
+    assert {store.get(i)["result"] for i in ids} == {f"DEMANDE {i}" for i in range(5)}
+    assert all(job["status"] == DONE for job in notified)
+
+
+# === Échecs répétés : le travail finit en "failed" ===
+def test_failing_job_is_retried_then_failed(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"), max_attempts=2, retry_delay=0.05)
+    calls = []
+    lock = threading.Lock()
+
+    def boom(payload):
+        with lock:
+            calls.append(payload)
+        raise RuntimeError("service indisponible")
+
+    pool = JobWorkerPool(store, {"boom": boom}, concurrency=1, poll_interval=0.01)
+    pool.start()
+    try:
+        job_id = store.submit("boom", "x")
+        pool.notify()
+        assert wait_for(lambda: store.get(job_id)["status"] == FAILED)
+    finally:
+        pool.stop(timeout=2)
+    job = store.get(job_id)
+    assert len(calls) == 2 and job["attempts"] == 2
+    assert job["error"] == "service indisponible"
+
+
+# === Un échec n'est repris qu'après un délai, doublé à chaque tentative ===
+def test_failed_job_is_retried_after_backoff(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"), max_attempts=3, retry_delay=0.2)
+    job_id = store.submit("verify", "a")
+    store.fail(store.claim()["id"], "service indisponible", 1)
+    assert store.get(job_id)["status"] == QUEUED
+    assert store.claim() is None  # reprise différée
+    assert wait_for(lambda: store.claim() is not None, timeout=2)
+    store.fail(job_id, "service indisponible", 2)
+    assert store.get(job_id)["not_before"] - store.get(job_id)["updated"] == pytest.approx(0.4)
+
+
+# === Les travaux terminés anciens sont purgés, pas ceux en file ===
+def test_purge_removes_only_old_finished_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"), max_attempts=1)
+    done, failed, queued = (store.submit("verify", p) for p in "abc")
+    store.complete(store.claim()["id"], "ok")
+    store.fail(store.claim()["id"], "erreur", 1)
+    assert store.purge(older_than=60) == 0
+    time.sleep(0.01)
+    assert store.purge(older_than=0) == 2
+    assert store.get(done) is None and store.get(failed) is None
+    assert store.get(queued)["status"] == QUEUED
+
+
+def test_worker_pool_purges_finished_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    pool = JobWorkerPool(store, {"upper": str.upper}, concurrency=1, poll_interval=0.01,
+                         retention=0.05, purge_interval=0.05)
+    pool.start()
+    try:
+        job_id = store.submit("upper", "a")
+        pool.notify()
+        assert wait_for(lambda: store.get(job_id) is None)
+    finally:
+        pool.stop(timeout=2)
+
+
+# === File créée avant les reprises différées : colonne ajoutée ===
+def test_existing_queue_is_migrated(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,"
+               " payload TEXT NOT NULL, callback_url TEXT, result TEXT, error TEXT,"
+               " attempts INTEGER NOT NULL DEFAULT 0, created REAL NOT NULL, updated REAL NOT NULL)")
+    db.execute("INSERT INTO jobs (id, kind, status, payload, created, updated) VALUES ('old', 'verify', ?, 'a', 0, 0)",
+               (QUEUED,))
+    db.commit()
+    db.close()
+    assert JobStore(path).claim()["id"] == "old"
+
+
+# === URL de rappel : http(s) vers un hôte autorisé uniquement ===
+@pytest.mark.parametrize("url, allowed", [
+    ("https://hooks.example.com/solvency", True),
+    ("http://partner.example.com:9000/cb", True),
+    ("http://partner.example.com:9001/cb", False),
+    ("http://ie_service:8001/", False),
+    ("http://169.254.169.254/latest/meta-data/", False),
+    ("file:///etc/passwd", False),
+    ("gopher://hooks.example.com/", False),
+    ("http://user@hooks.example.com/", False),
+    ("http://hooks.example.com.evil.net/", False),
+    ("http://[::1/", False),
+])
+def test_callback_allowlist(url, allowed):
+    assert callback_allowed(url, {"hooks.example.com", "partner.example.com:9000"}) is allowed
+
+
+def test_submit_rejects_callback_outside_allowlist(tmp_path, monkeypatch):
+    from spyne import Fault
+    from test_solvency_profiles import load_solvency_main
+
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", "")
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", "")
+    monkeypatch.setenv("SOLVENCY_CALLBACK_HOSTS", "hooks.example.com")
+    solvency = load_solvency_main()
+    with pytest.raises(Fault) as err:
+        solvency.SolvencyService.SubmitSolvencyJob(None, "client-001", "texte", "http://ie_service:8001/", None)
+    assert err.value.faultcode == "Client.InvalidArgument"
+    assert solvency.callback_url("https://hooks.example.com/cb") == "https://hooks.example.com/cb"
+    assert solvency.callback_url("") is None
@@ -0,0 +1,151 @@
+import json, os, signal, socket, subprocess, sys, textwrap, time, urllib.request
+
+import pytest
+
+from common.launcher import MetricsMiddleware, WorkerMetrics, aggregate_metrics
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def hello(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [str(os.getpid()).encode()]
+
+
+def call(app, path="/", method="POST"):
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured["status"] = status
+
+    result = app({"REQUEST_METHOD": method, "PATH_INFO": path, "HTTP_ACCEPT_ENCODING": "gzip"}, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return captured["status"], body
+
+
+# === Statut connu seulement au parcours du corps (réponse compressée) ===
+def test_metrics_record_status_after_body(tmp_path):
+    from common.compression import CompressionMiddleware
+
+    def large(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/xml")])
+        return [b"<x>" + b"a" * 4096 + b"</x>"]
+
+    metrics = WorkerMetrics(str(tmp_path))
+    app = MetricsMiddleware(CompressionMiddleware(large, min_size=1024), metrics)
+    status, _ = call(app)
+    assert status == "200 OK"
+    assert metrics.requests == 1 and metrics.errors == 0
+
+
+# === Métriques par worker et agrégat ===
+def test_metrics_aggregate_across_workers(tmp_path):
+    other = WorkerMetrics(str(tmp_path))
+    other.pid = 999999999  # worker déjà arrêté (recyclé)
+    other.requests = 7
+    other.flush()
+
+    app = MetricsMiddleware(hello, WorkerMetrics(str(tmp_path)))
+    for _ in range(3):
+        call(app)
+    status, body = call(app, "/metrics", "GET")
+    data = json.loads(body)
+    assert status == "200 OK"
+    assert data["requests"] == 10
+    assert data["workers"] == 1 and data["recycled"] == 1
+    assert data["per_worker"][0]["pid"] == os.getpid()
+
+
+def test_aggregate_ignores_partial_files(tmp_path):
+    (tmp_path / "worker-1.json").write_text("{")
+    assert aggregate_metrics(str(tmp_path))["requests"] == 0
+
+
+# === Pré-fork : plusieurs workers, recyclage, arrêt propre ===
+SERVER = textwrap.dedent("""
+    import os, sys
+    sys.path.insert(0, {root!r})
+    from common.launcher import serve
+
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [str(os.getpid()).encode()]
+
+    serve(app, {port})
+""")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url):
+    deadline = time.time() + 10
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as resp:
+                return resp.read()
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pré-fork POSIX uniquement")
+def test_prefork_recycles_workers(tmp_path):
+    port = free_port()
+    env = dict(os.environ, SERVICE_WORKERS="2", SERVICE_MAX_REQUESTS="3",
+               SERVICE_METRICS_DIR=str(tmp_path))
+    proc = subprocess.Popen([sys.executable, "-c", SERVER.format(root=ROOT_DIR, port=port)], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        pids = {get(f"http://127.0.0.1:{port}/") for _ in range(12)}
+        assert len(pids) >= 4  # au moins 12 / 3 processus différents
+        time.sleep(1.2)
+        data = json.loads(get(f"http://127.0.0.1:{port}/metrics"))
+        assert data["requests"] >= 12
+        assert data["recycled"] >= 2
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=15) == 0
+
+
+STOPPING_SERVER = textwrap.dedent("""
+    import os, sys
+    sys.path.insert(0, {root!r})
+    from common.launcher import serve
+
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [str(os.getpid()).encode()]
+
+    def on_stop():
+        open(os.path.join({stopped!r}, str(os.getpid())), "w").close()
+
+    serve(app, {port}, on_stop=on_stop)
+""")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pré-fork POSIX uniquement")
+def test_prefork_workers_run_on_stop_before_exiting(tmp_path):
+    port = free_port()
+    stopped = tmp_path / "stopped"
+    stopped.mkdir()
+    env = dict(os.environ, SERVICE_WORKERS="1", SERVICE_MAX_REQUESTS="2",
+               SERVICE_METRICS_DIR=str(tmp_path / "metrics"))
+    proc = subprocess.Popen([sys.executable, "-c", STOPPING_SERVER.format(root=ROOT_DIR, port=port,
+                                                                          stopped=str(stopped))],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        pids = {get(f"http://127.0.0.1:{port}/").decode() for _ in range(4)}
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=15) == 0
+    # workers recyclés puis arrêtés : tous sont passés par on_stop (os._exit)
+    assert pids <= set(os.listdir(stopped)) and len(pids) >= 2
@@ -0,0 +1,156 @@
+import io, os, sys, time
+import xml.etree.ElementTree as ET
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+IE_DIR = os.path.join(ROOT_DIR, 'ie_service')
+for path in (ROOT_DIR, IE_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from backends import RegexBackend
+from common.limits import RequestLimitMiddleware, oversized_text
+from test_solvency_profiles import FakeResponse, load_solvency_main, soap_response
+from utils import clean_chunks, clean_text, extract_bounded, extract_fields
+
+SAMPLE = "Je souhaite emprunter 250000 euros sur 20 ans pour acheter une maison neuve avec jardin à Paris."
+
+
+# === Middleware ===
+
+def envelope(text):
+    return (
+        '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="urn:ie.service:v7">'
+        f'<soapenv:Body><tns:extractInformation><tns:text>{text}</tns:text></tns:extractInformation>'
+        '</soapenv:Body></soapenv:Envelope>'
+    ).encode("utf-8")
+
+
+def call(app, body, length=None):
+    environ = {"REQUEST_METHOD": "POST", "PATH_INFO": "/", "CONTENT_TYPE": "text/xml",
+               "CONTENT_LENGTH": str(len(body) if length is None else length), "wsgi.input": io.BytesIO(body)}
+    if length == "":
+        del environ["CONTENT_LENGTH"]
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured["status"] = status
+
+    content = b"".join(app(environ, start_response))
+    return captured["status"], content
+
+
+class Echo:
+    def __init__(self):
+        self.bodies = []
+
+    def __call__(self, environ, start_response):
+        self.bodies.append(environ["wsgi.input"].read(int(environ["CONTENT_LENGTH"])))
+        start_response("200 OK", [])
+        return [b"ok"]
+
+
+def test_oversized_body_is_rejected_without_reading_it():
+    inner = Echo()
+    app = RequestLimitMiddleware(inner, max_body_bytes=1000, max_text_chars=0)
+    status, content = call(app, b"", length=10 ** 9)
+    assert status.startswith("413") and b"Client.RequestTooLarge" in content
+    assert inner.bodies == [] and app.rejected == 1
+
+
+@pytest.mark.parametrize("length, status", [("", "411"), ("abc", "400"), ("-5", "400")])
+def test_missing_or_invalid_length_is_rejected(length, status):
+    inner = Echo()
+    app = RequestLimitMiddleware(inner, max_body_bytes=1000, max_text_chars=100)
+    status_line, content = call(app, envelope("x" * 5000), length=length)
+    assert status_line.startswith(status) and b"soap11env:Fault" in content
+    assert inner.bodies == [] and app.rejected == 1
+
+
+def test_oversized_text_is_rejected_before_the_application():
+    inner = Echo()
+    app = RequestLimitMiddleware(inner, max_body_bytes=10 ** 6, max_text_chars=500)
+    status, content = call(app, envelope("a" * 501))
+    assert status.startswith("413") and b"Client.TextTooLong" in content and b"&lt;text&gt;" in content
+    assert inner.bodies == []
+
+    # corps plus long que la limite mais textes courts : transmis intact
+    body = envelope("&lt;b&gt; " * 60)
+    assert call(app, body)[0].startswith("200") and inner.bodies == [body]
+
+
+def test_text_scan_counts_characters_and_ignores_entities():
+    assert oversized_text(envelope("é" * 400), 500) is None  # 800 octets, 400 caractères
+    assert oversized_text(envelope("&amp;" * 501), 500) == "text"
+    doctype = b'<!DOCTYPE x [<!ENTITY big "' + b"x" * 600 + b'">]><x>&big;</x>'
+    assert oversized_text(doctype, 500) is None  # entité non résolue
+    assert oversized_text(b"<pas du xml", 5) is None
+
+
+# === Extraction par fenêtres bornées ===
+
+def test_chunks_reassemble_into_clean_text():
+    text = "  Prêt\n\nde 250 000 €   sur\t20 ans " + "mot" * 50 + "   à Paris  "
+    for size in (1, 3, 7, 16, 64):
+        out = ""
+        for piece, glue, _ in clean_chunks(text, size, lookahead=4):
+            if piece:
+                out += (glue if out else "") + piece
+        assert out == clean_text(text)
+
+
+@pytest.mark.parametrize("text", [SAMPLE, "Appartement à Lyon, 150 000 € sur 25 ans", "", "rien à signaler"])
+def test_short_texts_match_full_extraction(text):
+    assert extract_bounded(text) == extract_fields(clean_text(text))
+
+
+def test_fields_across_window_boundaries():
+    for offset in range(0, 600, 37):
+        text = "x " * offset + SAMPLE + " fin" + " " * 900
+        assert extract_bounded(text, window=128) == extract_fields(clean_text(text))
+
+
+def test_scan_stops_once_all_fields_are_found():
+    text = SAMPLE + " bla" * 2_000_000
+    start = time.perf_counter()
+    fields = extract_bounded(text)
+    assert time.perf_counter() - start < 0.05
+    assert fields["amount"] == 250000.0 and fields["location"] == "Paris"
+
+
+@pytest.mark.parametrize("text", ["1" * 1_000_000, "à " * 500_000, "12345 " * 200_000, " " * 1_000_000])
+def test_adversarial_inputs_are_bounded(text):
+    backend = RegexBackend(window=4096, max_chars=65536)
+    start = time.perf_counter()
+    backend.extract(text)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_fields_beyond_the_scan_limit_are_ignored():
+    fields = extract_bounded("x " * 50_000 + SAMPLE, max_chars=10_000)
+    assert fields == dict.fromkeys(fields)
+    assert RegexBackend(window=0).extract("x " * 50_000 + SAMPLE)["amount"] == 250000.0
+
+
+# === Orchestrateur : texte échappé dans l'enveloppe IE ===
+
+def test_request_text_is_escaped_in_outbound_envelopes(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", "")
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", "")
+    solvency = load_solvency_main()
+    sent = {}
+
+    def fake_post_soap(url, envelope, timeout=10):
+        service = url.split("//")[1].split(":")[0]
+        sent[service] = envelope
+        return FakeResponse(soap_response(service))
+
+    monkeypatch.setattr("common.discovery.post_soap", fake_post_soap)
+    text = "maison <b>neuve</b> & jardin </tns:text><tns:evil/> à Paris"
+    solvency.SolvencyService.VerifySolvency(None, "client-001", text, "decisionOnly")
+    body = sent["ie_service"]
+    root = ET.fromstring(body.encode("utf-8") if isinstance(body, str) else body)
+    texts = [e.text for e in root.iter() if e.tag.endswith("}text")]
+    assert texts == [text]
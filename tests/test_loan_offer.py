@@ -0,0 +1,122 @@
+import importlib.util
+import sys, os
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOLVENCY_DIR = os.path.join(ROOT_DIR, 'solvency_service')
+for path in (ROOT_DIR, SOLVENCY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from spyne import Fault
+
+from common.offers import MAX_GRID_AMOUNTS, default_grid, evaluate_grid, offer_for, optimize_offers
+from common.rules import MAX_DEBT_RATIO, MAX_DURATION_YEARS, MIN_DURATION_YEARS, debt_ratio, solvency_decision
+
+# profil solvable : score 850, revenus 5000 €, charges 6000 €/an
+PROFILE = dict(credit_score=850, monthly_income=5000.0, monthly_expenses=6000.0, property_value=400000.0)
+
+
+def load(relative, name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT_DIR, relative, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_frontier_is_the_edge_of_the_feasible_region():
+    result = optimize_offers(**PROFILE)
+    assert result["frontier"]
+    for offer in result["frontier"]:
+        assert offer_for(offer["amount"], offer["durationYears"], **PROFILE)["feasible"]
+        assert not offer_for(offer["amount"] + 1000, offer["durationYears"], **PROFILE)["feasible"]
+        assert MIN_DURATION_YEARS <= offer["durationYears"] <= MAX_DURATION_YEARS
+        assert offer["ltv"] <= 0.9 and offer["debtRatio"] <= MAX_DEBT_RATIO
+
+
+def test_duration_bounds_exclude_whole_columns():
+    grid = evaluate_grid([100000.0], [5, 10, 30, 35], **PROFILE)
+    assert grid["feasible"][0].tolist() == [False, True, True, False]
+
+
+def test_debt_ratio_includes_existing_charges():
+    # même formule que DebtRatioService quand la mensualité est nulle
+    grid = evaluate_grid([1000.0], [30], **PROFILE)
+    base = debt_ratio(PROFILE["monthly_income"], PROFILE["monthly_expenses"])
+    assert grid["debt_ratio"][0, 0] == pytest.approx(base + grid["payment"][0, 0] / 50, rel=1e-9)
+
+
+def test_low_score_has_no_offer():
+    result = optimize_offers(**dict(PROFILE, credit_score=650))
+    assert result["frontier"] == [] and result["best"] is None
+    assert solvency_decision(650, 0.0) == "not_solvent"
+
+
+def test_feasible_request_is_the_best_offer():
+    result = optimize_offers(**PROFILE, requested_amount=200000, requested_duration=20)
+    assert result["requested"]["feasible"]
+    assert (result["best"]["amount"], result["best"]["durationYears"]) == (200000.0, 20)
+
+
+def test_infeasible_request_falls_back_to_closest_offer():
+    result = optimize_offers(**PROFILE, requested_amount=350000, requested_duration=15)
+    assert not result["requested"]["feasible"]
+    best = result["best"]
+    assert best["amount"] < 350000
+    assert best["amount"] == max(o["amount"] for o in result["frontier"])
+
+
+def test_approval_service_accepts_frontier_offers(monkeypatch):
+    approval = load("business_services/approbation_service", "approval_main_offers")
+    result = optimize_offers(**PROFILE)
+    # tirage de risque favorable : toute offre de la frontière est accordée
+    monkeypatch.setattr(approval.random, "uniform", lambda a, b: 0.1)
+    for offer in result["frontier"]:
+        response = approval.ApprovalService.MakeApprovalDecision(
+            None, offer["amount"], offer["durationYears"], "solvent", PROFILE["property_value"], True)
+        assert response.approved, offer
+
+
+@pytest.fixture
+def solvency(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", "")
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", "")
+    return load("solvency_service", "solvency_main_offers")
+
+
+def test_grid_size_is_capped_for_large_properties():
+    amounts, durations = default_grid(400000.0)
+    assert amounts.size == 360 and amounts[1] - amounts[0] == 1000.0
+    amounts, _ = default_grid(1e9)
+    assert amounts.size <= MAX_GRID_AMOUNTS and (amounts[1] - amounts[0]) % 1000.0 == 0
+    assert amounts[-1] <= 1e9 * 0.9
+    result = optimize_offers(**dict(PROFILE, property_value=1e9))
+    assert result["evaluated"] <= MAX_GRID_AMOUNTS * durations.size
+
+
+def test_rpc_returns_frontier_for_solvent_client(solvency):
+    response = solvency.SolvencyService.OptimizeLoanOffer(None, "client-002", 250000.0, 20, 300000.0)
+    assert response.eligible and not response.requestedFeasible
+    assert response.requestedOffer.amount == 250000.0
+    assert response.bestOffer.amount <= 250000.0
+    assert response.evaluated > len(response.frontier) > 0
+    assert all(o.debtRatio <= MAX_DEBT_RATIO for o in response.frontier)
+
+
+def test_rpc_explains_ineligible_client(solvency):
+    response = solvency.SolvencyService.OptimizeLoanOffer(None, "client-001", 100000.0, 20, 300000.0)
+    assert not response.eligible and "Score" in response.reason
+    assert response.frontier == [] and response.bestOffer is None
+
+
+def test_rpc_rejects_missing_property_value(solvency):
+    with pytest.raises(Fault):
+        solvency.SolvencyService.OptimizeLoanOffer(None, "client-002", 100000.0, 20, 0.0)
+
+
+@pytest.mark.parametrize("amount, value", [(100000.0, 1e10), (1e10, 300000.0), (100000.0, float("nan"))])
+def test_rpc_rejects_absurd_amounts(solvency, amount, value):
+    with pytest.raises(Fault):
+        solvency.SolvencyService.OptimizeLoanOffer(None, "client-002", amount, 20, value)
@@ -0,0 +1,156 @@
+import importlib.util, io, os, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TESTS_DIR = os.path.dirname(__file__)
+for path in (ROOT_DIR, TESTS_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from common.microbatch import MicroBatcher, batcher_from_env
+from test_solvency_profiles import load_solvency_main
+
+
+class Recorder:
+    def __init__(self, delay=0.0):
+        self.sizes = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, items):
+        with self._lock:
+            self.sizes.append(len(items))
+        time.sleep(self.delay)
+        return [item * 2 for item in items]
+
+
+# === Regroupement ===
+def test_concurrent_calls_are_grouped_and_fanned_out():
+    send = Recorder()
+    batcher = MicroBatcher("double", send, window=0.05, max_items=100)
+    with ThreadPoolExecutor(20) as pool:
+        results = list(pool.map(batcher.call, range(20)))
+    assert results == [i * 2 for i in range(20)]
+    assert sum(send.sizes) == 20 and len(send.sizes) < 20
+
+
+def test_full_batch_is_sent_before_the_window():
+    send = Recorder()
+    batcher = MicroBatcher("double", send, window=5.0, max_items=4)
+    start = time.perf_counter()
+    futures = [batcher.submit(i) for i in range(4)]
+    assert [f.result(timeout=1) for f in futures] == [0, 2, 4, 6]
+    assert time.perf_counter() - start < 1
+    assert send.sizes == [4]
+
+
+def test_batch_error_reaches_every_caller():
+    def failing(items):
+        raise ConnectionError("service indisponible")
+
+    batcher = MicroBatcher("ko", failing, window=0.01)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result(timeout=1)
+
+
+def test_result_count_mismatch_is_an_error():
+    batcher = MicroBatcher("court", lambda items: items[:-1], window=0.01)
+    with pytest.raises(ValueError):
+        batcher.call(1, timeout=1)
+
+
+# === Workers forkés après la création (SERVICE_WORKERS > 1) ===
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork indisponible")
+def test_batcher_works_in_forked_child():
+    batcher = MicroBatcher("fork", Recorder(), window=0.005)
+    assert batcher.call(1, timeout=2) == 2  # thread de regroupement démarré dans le parent
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            result = str(batcher.call(21, timeout=2)).encode()
+        except Exception as e:
+            result = type(e).__name__.encode()
+        os.write(write_end, result)
+        os._exit(0)
+    os.close(write_end)
+    os.waitpid(pid, 0)
+    assert os.read(read_end, 100) == b"42"
+    os.close(read_end)
+    assert batcher.call(2, timeout=2) == 4  # le parent n'est pas affecté
+
+
+def test_disabled_by_default():
+    assert batcher_from_env("x", Recorder(), window_ms=0) is None
+    assert isinstance(batcher_from_env("x", Recorder(), window_ms=2, max_items=8), MicroBatcher)
+
+
+# === Enveloppes de lot contre les vrais services ===
+
+def load_main(relative, name):
+    directory = os.path.join(ROOT_DIR, relative)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(directory, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class WsgiResponse:
+    def __init__(self, wsgi_app, envelope):
+        body = envelope.encode("utf-8") if isinstance(envelope, str) else envelope
+        environ = {"REQUEST_METHOD": "POST", "PATH_INFO": "/", "QUERY_STRING": "", "CONTENT_TYPE": "text/xml",
+                   "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body), "SERVER_NAME": "test",
+                   "SERVER_PORT": "80", "wsgi.url_scheme": "http"}
+        status = []
+        self.content = b"".join(wsgi_app(environ, lambda s, h, e=None: status.append(s)))
+        self.status_code = int(status[0].split()[0])
+
+
+@pytest.fixture
+def services(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", "")
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", "")
+    monkeypatch.setattr("common.microbatch.DEFAULT_WINDOW_MS", 20.0)
+    apps = {
+        "credit_scoring_service": load_main("business_services/credit_scoring_service", "cs_main").wsgi_app,
+        "explain_service": load_main("business_services/explain_service", "explain_main").wsgi_app,
+        "ratio_endettement_service": load_main("business_services/ratio_endettement_service", "ratio_main").wsgi_app,
+    }
+    sizes = []
+
+    def fake_post_soap(url, envelope, timeout=10):
+        sizes.append(envelope.count("Input>") // 2)
+        return WsgiResponse(apps[url.split("//")[1].split(":")[0]], envelope)
+
+    monkeypatch.setattr("common.discovery.post_soap", fake_post_soap)
+    return sizes
+
+
+def test_orchestrator_batches_scores_and_explanations(services):
+    solvency = load_solvency_main()
+    credits = [{"debt": 1000.0 * i, "late": i % 3, "hasBankruptcy": i == 4} for i in range(8)]
+    with ThreadPoolExecutor(8) as pool:
+        scores = list(pool.map(solvency.credit_score_step, credits))
+        explanations = list(pool.map(
+            lambda c: solvency.explain_step(900, {"MonthlyIncome": 4000.0, "Expenses": 2500.0}, c), credits))
+    assert scores == [int(1000 - c["debt"] * 0.1 - 50 * c["late"] - (200 if c["hasBankruptcy"] else 0))
+                      for c in credits]
+    assert explanations[4].creditHistoryExplanation.endswith("Antécédent de faillite enregistré.")
+    assert len(services) < 16 and sum(services) == 16
+
+
+def test_decision_service_batches_debt_ratios(services):
+    decision = load_main("business_services/decision_solvability_service", "decision_main")
+    with ThreadPoolExecutor(6) as pool:
+        statuses = list(pool.map(lambda i: decision.DecisionService.MakeDecision(None, 800.0, 4000.0, 1000.0 * i),
+                                 range(6)))
+    assert {s.solvencyStatus for s in statuses} == {"solvent"}
+    assert sum(services) == 6 and len(services) < 6
@@ -0,0 +1,115 @@
+import io, os, sys, threading, time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.profiling import ProfilingMiddleware
+
+
+def business_logic():
+    return sum(i * i for i in range(20000))
+
+
+def app(environ, start_response):
+    body = str(business_logic()).encode("utf-8")
+    start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))])
+    return [body]
+
+
+def call(wsgi, method="POST", path="/", headers=None, multithread=False, query=""):
+    environ = {"REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": query,
+               "wsgi.input": io.BytesIO(b""), "wsgi.multithread": multithread}
+    environ.update(headers or {})
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured["status"], captured["headers"] = status, dict(headers)
+
+    body = b"".join(wsgi(environ, start_response))
+    return captured["status"], captured["headers"], body.decode("utf-8")
+
+
+# === cProfile par requête ===
+def test_profile_header_requires_the_token(tmp_path):
+    wsgi = ProfilingMiddleware(app, token="secret", directory=str(tmp_path))
+    status, headers, body = call(wsgi, headers={"HTTP_X_PROFILE": "wrong"})
+    assert status == "200 OK" and "X-Profile-File" not in headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_inline_profile_returns_stats(tmp_path):
+    wsgi = ProfilingMiddleware(app, token="secret", directory=str(tmp_path))
+    status, headers, body = call(wsgi, headers={"HTTP_X_PROFILE": "secret", "HTTP_X_PROFILE_OUTPUT": "inline"})
+    assert status == "200 OK" and headers["Content-Type"].startswith("text/plain")
+    assert "business_logic" in body and "cumulative" in body
+
+
+def test_profile_is_stored_to_disk(tmp_path):
+    wsgi = ProfilingMiddleware(app, token="secret", directory=str(tmp_path))
+    status, headers, body = call(wsgi, headers={"HTTP_X_PROFILE": "secret"})
+    assert body == str(business_logic())
+    assert headers["Content-Length"] == str(len(body))
+    assert os.path.exists(tmp_path / headers["X-Profile-File"])
+
+
+# === Échantillonnage ===
+def _busy(stop):
+    while not stop.is_set():
+        business_logic()
+
+
+TOKEN = {"HTTP_X_PROFILE": "secret"}
+
+
+def test_sampling_returns_collapsed_stacks(tmp_path):
+    wsgi = ProfilingMiddleware(app, token="secret", directory=str(tmp_path))
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy, args=(stop,))
+    worker.start()
+    try:
+        status, headers, body = call(wsgi, "GET", "/debug/sample", TOKEN, multithread=True,
+                                     query="seconds=0.3&interval=0.002")
+    finally:
+        stop.set()
+        worker.join()
+    assert status == "200 OK" and int(headers["X-Profile-Samples"]) > 10
+    line = next(l for l in body.splitlines() if "business_logic" in l)
+    stack, count = line.rsplit(" ", 1)
+    assert "test_profiling.py:_busy;" in stack and int(count) > 0
+
+
+def test_single_threaded_sampling_runs_in_background(tmp_path):
+    wsgi = ProfilingMiddleware(app, token="secret", directory=str(tmp_path))
+    status, headers, _ = call(wsgi, "GET", "/debug/sample", TOKEN, query="seconds=0.1")
+    assert status == "202 Accepted"
+    assert call(wsgi, "GET", headers["Location"])[0] == "403 Forbidden"
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        status, _, body = call(wsgi, "GET", headers["Location"], TOKEN)
+        if status == "200 OK":
+            break
+        time.sleep(0.05)
+    assert status == "200 OK"
+
+
+def test_sampling_requires_token_when_configured(tmp_path):
+    wsgi = ProfilingMiddleware(app, token="secret", directory=str(tmp_path))
+    assert call(wsgi, "GET", "/debug/sample", query="seconds=0")[0] == "403 Forbidden"
+    assert call(wsgi, "GET", "/debug/sample", {"HTTP_X_PROFILE": "secret"}, True, "seconds=0")[0] == "200 OK"
+
+
+def test_sampling_is_disabled_without_token(tmp_path):
+    wsgi = ProfilingMiddleware(app, directory=str(tmp_path))
+    status, headers, body = call(wsgi, "GET", "/debug/sample", multithread=True, query="seconds=0")
+    assert status == "200 OK" and body == str(business_logic())  # route absente : servie par l'application
+
+
+def test_one_sampler_per_process(tmp_path):
+    wsgi = ProfilingMiddleware(app, token="secret", directory=str(tmp_path))
+    assert call(wsgi, "GET", "/debug/sample", TOKEN, query="seconds=0.3")[0] == "202 Accepted"
+    assert call(wsgi, "GET", "/debug/sample", TOKEN, multithread=True, query="seconds=0")[0] == "409 Conflict"
+    deadline = time.time() + 5
+    while time.time() < deadline and call(wsgi, "GET", "/debug/sample", TOKEN, True, "seconds=0")[0] != "200 OK":
+        time.sleep(0.05)
+    assert call(wsgi, "GET", "/debug/sample", TOKEN, True, "seconds=0")[0] == "200 OK"
@@ -0,0 +1,123 @@
+import io, json, os, sys, threading
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.discovery import ServiceRegistry
+from common.readiness import Readiness, ReadinessMiddleware, readiness_from_env, soap_self_calls, self_call
+from test_microbatch import load_main
+from test_solvency_profiles import load_solvency_main
+
+
+def get(app, path):
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "", "wsgi.input": io.BytesIO()}
+    captured = {}
+    body = b"".join(app(environ, lambda s, h, e=None: captured.update(status=s)))
+    return captured["status"], body
+
+
+def passthrough(environ, start_response):
+    start_response("200 OK", [])
+    return [b"soap"]
+
+
+def test_ready_only_after_warm_up_while_health_always_answers():
+    gate = threading.Event()
+    app = ReadinessMiddleware(passthrough, Readiness([("lent", gate.wait)]))
+    assert get(app, "/health")[0].startswith("200")
+    app.readiness.start()
+    status, body = get(app, "/ready")
+    assert status.startswith("503") and json.loads(body)["status"] == "warming"
+    assert get(app, "/health")[0].startswith("200") and get(app, "/")[1] == b"soap"
+    gate.set()
+    assert app.readiness.wait(timeout=2)
+    status, body = get(app, "/ready")
+    assert status.startswith("200") and json.loads(body)["steps"][0]["step"] == "lent"
+
+
+def test_failed_step_is_reported_without_blocking_readiness():
+    def broken():
+        raise RuntimeError("injoignable")
+
+    calls = []
+    readiness = Readiness([("cassée", broken), ("suivante", lambda: calls.append(1))])
+    readiness.warm_up()
+    assert readiness.ready and calls == [1]
+    assert [r["error"] for r in readiness.report] == ["injoignable", None]
+
+
+def test_warm_up_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("SERVICE_WARMUP", "0")
+    calls = []
+    app = readiness_from_env(passthrough, [("étape", lambda: calls.append(1))])
+    app.readiness.warm_up()
+    assert app.readiness.ready and calls == []
+
+
+def test_self_calls_fail_on_non_success_status():
+    def fault(environ, start_response):
+        start_response("500 Internal Server Error", [])
+        return [b""]
+
+    assert self_call(passthrough, b"<x/>").startswith("200")
+    with pytest.raises(RuntimeError):
+        soap_self_calls(fault, [b"<x/>"], rounds=1)()
+
+
+def test_registry_warm_up_probes_every_endpoint(monkeypatch):
+    probed = []
+
+    class Session:
+        def get(self, url, timeout):
+            probed.append(url)
+            if "down" in url:
+                raise ConnectionError(url)
+            return type("Response", (), {"status_code": 200})()
+
+    monkeypatch.setattr("common.discovery.get_session", lambda: Session())
+    registry = ServiceRegistry({"a": "http://a/", "b": "http://down/"}, endpoints={}, health_interval=0)
+    assert registry.warm_up() == {"a": 1, "b": 0}
+    assert sorted(probed) == ["http://a/?wsdl", "http://down/?wsdl"]
+    assert not registry.pool("b").endpoints[0].healthy
+
+
+@pytest.mark.parametrize("relative", [
+    "business_services/credit_scoring_service", "business_services/explain_service",
+    "business_services/ratio_endettement_service", "business_services/property_evaluation_service",
+    "business_services/approbation_service", "ie_service",
+])
+def test_service_warm_up_requests_succeed(relative):
+    module = load_main(relative, "warmup_" + relative.replace("/", "_"))
+    module.wsgi_app.readiness.warm_up()
+    assert module.wsgi_app.readiness.ready
+    assert all(step["error"] is None for step in module.wsgi_app.readiness.report)
+
+
+def test_ie_warm_up_leaves_cache_stats_at_zero():
+    module = load_main("ie_service", "warmup_ie_cache_stats")
+    module.wsgi_app.readiness.warm_up()
+    stats = module.get_backend().cache.stats()
+    assert stats["entries"] > 0
+    assert (stats["hits_memory"], stats["hits_disk"], stats["misses"], stats["saved_ms"]) == (0, 0, 0, 0.0)
+
+
+def test_solvency_warm_up_makes_no_decision(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", "")
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", str(tmp_path / "audit"))
+    monkeypatch.setattr("common.discovery.ServiceRegistry.warm_up", lambda self, timeout=2: {})
+    solvency = load_solvency_main()
+    readiness = solvency.wsgi_app.readiness
+    readiness.warm_up()
+    assert {r["step"]: r["error"] for r in readiness.report} == {
+        "données": None, "services en aval": None, "règles vectorielles": None,
+        "modèles de réponse": None, "auto-appels SOAP": None,
+    }
+    # Client fictif hors débit : aucun jeton consommé, pour lui ni pour un vrai client
+    assert solvency.admission.rate_limiter._buckets == {}
+    log = solvency.get_audit_log()
+    assert log.flush(timeout=5) and log.stats()["records"] == 0
+    log.close()
@@ -0,0 +1,84 @@
+import io, json, os, sys, threading
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BENCH_DIR = os.path.join(ROOT_DIR, 'benchmarks')
+for path in (ROOT_DIR, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import replay
+from common.capture import CaptureMiddleware
+
+RESPONSE = ('<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="urn:x">'
+            '<soapenv:Body><tns:VerifySolvencyResponse><tns:VerifySolvencyResult>'
+            '<tns:creditScore>{score}</tns:creditScore><tns:sections><tns:string>a</tns:string>'
+            '<tns:string>b</tns:string></tns:sections><tns:approvalResponse><tns:interestRate>{rate}'
+            '</tns:interestRate></tns:approvalResponse></tns:VerifySolvencyResult></tns:VerifySolvencyResponse>'
+            '</soapenv:Body></soapenv:Envelope>')
+
+
+def result(index, score=850, rate=3.1, latency=0.01):
+    return {"index": index, "status": 200, "latency": latency, "offset": index * 0.01, "lag": 0.0,
+            "error": None, "body": RESPONSE.format(score=score, rate=rate)}
+
+
+# === Comparaison fonctionnelle ===
+def test_flatten_numbers_repeated_elements():
+    leaves = replay.flatten(RESPONSE.format(score=850, rate=3.1))
+    prefix = "VerifySolvencyResponse/VerifySolvencyResult/"
+    assert leaves[prefix + "creditScore"] == "850"
+    assert leaves[prefix + "sections/string#2"] == "b"
+
+
+def test_diff_ignores_non_deterministic_fields():
+    golden = [result(0), result(1)]
+    candidate = [result(0, rate=4.2), result(1, score=600)]
+    diffs = replay.diff_runs(golden, candidate)
+    assert [(i, key.rsplit("/", 1)[-1]) for i, key, _, _ in diffs] == [(1, "creditScore")]
+
+
+def test_compare_flags_p99_regression():
+    golden = [result(i, latency=0.010) for i in range(100)]
+    slower = [result(i, latency=0.030) for i in range(100)]
+    assert replay.compare(golden, [dict(r) for r in golden], out=io.StringIO())
+    assert not replay.compare(golden, slower, out=io.StringIO())
+
+
+# === Capture puis rejeu ===
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path):
+    def app(environ, start_response):
+        body = environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0)).decode("utf-8")
+        score = 850 if "client-001" in body else 600
+        payload = RESPONSE.format(score=score, rate=3.1).encode("utf-8")
+        start_response("200 OK", [("Content-Type", "text/xml"), ("Content-Length", str(len(payload)))])
+        return [payload]
+
+    capture_path = str(tmp_path / "capture.jsonl")
+    httpd = make_server("127.0.0.1", 0, CaptureMiddleware(app, capture_path), handler_class=_QuietHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/", capture_path
+    httpd.shutdown()
+
+
+def test_captured_requests_replay_identically(server):
+    url, capture_path = server
+    entries = replay.synth(20, rate=200, clients=["client-001", "client-002"], profiles=["full"])
+    # un seul envoi à la fois : la capture garde l'ordre d'origine
+    first, _ = replay.replay(entries, url, speed=0, concurrency=1)
+    captured = replay.read_jsonl(capture_path)
+    assert len(captured) == 20
+    assert [c["body"] for c in captured] == [e["body"] for e in entries]
+
+    second, _ = replay.replay(captured, url, speed=4, concurrency=4)
+    assert all(r["status"] == 200 for r in second)
+    assert replay.diff_runs(first, second) == []
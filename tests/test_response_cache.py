@@ -0,0 +1,201 @@
+import io, os, sys, time
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOLVENCY_DIR = os.path.join(ROOT_DIR, 'solvency_service')
+for path in (ROOT_DIR, SOLVENCY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from admission import TokenBucket
+from common.response_cache import ResponseCache, etag_matches, etag_of
+from data import changes
+from data.finance_data import FinancialData
+from test_changes import update_in_other_process
+from test_solvency_profiles import FakeResponse, load_solvency_main, soap_response
+
+
+# === Cache ===
+
+def test_entries_expire_and_are_evicted_in_lru_order():
+    cache = ResponseCache(ttl=0.05, max_entries=2)
+    cache.put("a", b"A", [], 0.001)
+    cache.put("b", b"B", [], 0.001)
+    assert cache.get("a").body == b"A"
+    cache.put("c", b"C", [], 0.001)  # "b" est le moins récemment utilisé
+    assert cache.get("b") is None and cache.get("a") is not None
+    time.sleep(0.06)
+    assert cache.get("a") is None and len(cache) == 1
+
+
+def test_invalidation_by_tag():
+    cache = ResponseCache()
+    cache.put("k1", b"1", [], 0.0, tags=["client-001"])
+    cache.put("k2", b"2", [], 0.0, tags=["client-001", "job-9"])
+    cache.put("k3", b"3", [], 0.0, tags=["client-002"])
+    assert cache.invalidate("client-001") == 2
+    assert cache.get("k1") is None and cache.get("k2") is None and cache.get("k3") is not None
+    assert cache.invalidate("job-9") == 0
+
+
+def test_weak_etag_comparison():
+    etag = etag_of(b"<x/>")
+    assert etag.startswith('W/"')
+    assert etag_matches(etag, etag) and etag_matches(etag[2:], etag)
+    assert etag_matches(f'"autre", {etag}', etag) and etag_matches("*", etag)
+    assert not etag_matches('W/"autre"', etag) and not etag_matches(None, etag)
+
+
+# === Orchestrateur complet (appels sortants simulés) ===
+
+def envelope(client_id="client-002", profile="full"):
+    return (
+        '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+        'xmlns:urn="urn:solvency.verification.service:v1"><soapenv:Body><urn:VerifySolvency>'
+        f'<urn:clientId>{client_id}</urn:clientId><urn:demandeTexte>maison à Paris</urn:demandeTexte>'
+        f'<urn:responseProfile>{profile}</urn:responseProfile>'
+        '</urn:VerifySolvency></soapenv:Body></soapenv:Envelope>'
+    ).encode("utf-8")
+
+
+def call(wsgi_app, body, **headers):
+    environ = {"REQUEST_METHOD": "POST", "PATH_INFO": "/", "QUERY_STRING": "", "CONTENT_TYPE": "text/xml",
+               "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body), "SERVER_NAME": "test",
+               "SERVER_PORT": "80", "wsgi.url_scheme": "http"}
+    environ.update({f"HTTP_{k.upper()}": v for k, v in headers.items()})
+    captured = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        captured["status"], captured["headers"] = status, dict(response_headers)
+
+    content = b"".join(wsgi_app(environ, start_response))
+    return captured["status"], captured["headers"], content
+
+
+@pytest.fixture
+def solvency(tmp_path, monkeypatch):
+    monkeypatch.setattr(FinancialData, "financials", dict(FinancialData.financials))
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_JOB_WORKERS", "1")
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", "")
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", "")
+    monkeypatch.setenv("SOLVENCY_CHANGELOG_DB", "")
+    monkeypatch.setenv("SOAP_RESPONSE_CACHE_TTL", "60")
+    module = load_solvency_main()
+    calls = []
+    down = set()
+
+    def fake_post_soap(url, envelope, timeout=10):
+        service = url.split("//")[1].split(":")[0]
+        calls.append(service)
+        if service in down:
+            raise ConnectionError(f"{service} indisponible")
+        return FakeResponse(soap_response(service))
+
+    monkeypatch.setattr("common.discovery.post_soap", fake_post_soap)
+    module.calls, module.down = calls, down
+    yield module
+    if module._job_queue is not None:
+        module._job_queue.stop(timeout=2)
+
+
+def test_repeat_request_is_served_from_cache(solvency):
+    status, headers, first = call(solvency.wsgi_app, envelope())
+    assert status.startswith("200") and headers["X-Response-Cache"] == "miss"
+    upstream = len(solvency.calls)
+
+    status, hit_headers, second = call(solvency.wsgi_app, envelope())
+    assert hit_headers["X-Response-Cache"] == "hit" and second == first
+    assert hit_headers["ETag"] == headers["ETag"]
+    assert len(solvency.calls) == upstream  # ni appel sortant ni sérialisation
+    assert b"approvalResponse" in second
+
+    stats = solvency.SolvencyService.GetResponseCacheStats(None)
+    assert (stats.hits, stats.misses) == (1, 1) and stats.savedMs > 0
+
+
+def test_if_none_match_returns_304(solvency):
+    _, headers, _ = call(solvency.wsgi_app, envelope())
+    status, not_modified, content = call(solvency.wsgi_app, envelope(), if_none_match=headers["ETag"])
+    assert status.startswith("304") and content == b""
+    assert not_modified["ETag"] == headers["ETag"] and "Content-Type" not in not_modified
+
+
+def test_client_update_invalidates_cached_responses(solvency):
+    call(solvency.wsgi_app, envelope())
+    FinancialData.update_client_financials("client-002", MonthlyIncome=3500)
+    _, headers, content = call(solvency.wsgi_app, envelope())
+    assert headers["X-Response-Cache"] == "miss" and b"3500" in content
+
+
+def test_incomplete_or_async_responses_are_not_cached(solvency):
+    solvency.down.add("approbation_service")
+    _, headers, _ = call(solvency.wsgi_app, envelope())
+    assert "X-Response-Cache" not in headers and "ETag" not in headers
+    solvency.down.clear()
+
+    _, headers, _ = call(solvency.wsgi_app, envelope(profile="explainAsync"))
+    assert "X-Response-Cache" not in headers
+    assert len(solvency.response_cache) == 0
+
+
+def test_decisions_are_not_cached_while_auditing(solvency, tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", str(tmp_path / "audit"))
+    for _ in range(2):
+        status, headers, _ = call(solvency.wsgi_app, envelope())
+        assert status.startswith("200") and "X-Response-Cache" not in headers
+    log = solvency.get_audit_log()
+    solvency.on_worker_stop()  # sortie du worker : la file d'audit est écrite
+    assert log.stats()["records"] == 2 and log.stats()["pending"] == 0
+
+
+def test_changes_from_other_processes_invalidate_cached_responses(solvency, tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_CHANGELOG_DB", str(tmp_path / "changes.sqlite"))
+    feed = solvency.cache_invalidation_feed()
+    call(solvency.wsgi_app, envelope())
+    assert call(solvency.wsgi_app, envelope())[1]["X-Response-Cache"] == "hit"
+
+    update_in_other_process(changes.change_log(), 'FinancialData.update_client_financials("client-002", Expenses=1)')
+    assert len(solvency.response_cache) == 1  # aucune notification dans ce processus
+    feed.poll(solvency.invalidate_cached_clients)
+    assert call(solvency.wsgi_app, envelope())[1]["X-Response-Cache"] == "miss"
+
+
+def test_cache_hits_consume_the_client_rate(solvency):
+    solvency.admission.rate_limiter = TokenBucket(0.001, 2)
+    assert call(solvency.wsgi_app, envelope())[1]["X-Response-Cache"] == "miss"
+    assert call(solvency.wsgi_app, envelope())[1]["X-Response-Cache"] == "hit"
+    status, headers, content = call(solvency.wsgi_app, envelope())
+    assert status.startswith("500") and b"Client.RateLimited" in content
+    assert "X-Response-Cache" not in headers and solvency.admission.stats()["rate_limited"] == 1
+
+
+def test_cache_needs_the_change_log_with_several_workers(monkeypatch, tmp_path):
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", "")
+    monkeypatch.setenv("SOAP_RESPONSE_CACHE_TTL", "60")
+    monkeypatch.setenv("SERVICE_WORKERS", "4")
+    monkeypatch.setenv("SOLVENCY_CHANGELOG_DB", "")
+    assert load_solvency_main().response_cache is None
+    monkeypatch.setenv("SOLVENCY_CHANGELOG_DB", str(tmp_path / "changes.sqlite"))
+    assert load_solvency_main().response_cache is not None
+
+
+def test_finished_job_results_are_cached(solvency):
+    ticket = solvency.SolvencyService.SubmitSolvencyJob(None, "client-002", "texte", None, None)
+    poll = (
+        '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+        'xmlns:urn="urn:solvency.verification.service:v1"><soapenv:Body><urn:GetSolvencyJobResult>'
+        f'<urn:jobId>{ticket.jobId}</urn:jobId></urn:GetSolvencyJobResult></soapenv:Body></soapenv:Envelope>'
+    ).encode("utf-8")
+    deadline = time.time() + 5
+    while True:
+        _, headers, content = call(solvency.wsgi_app, poll)
+        if b">done<" in content or time.time() > deadline:
+            break
+        assert "ETag" not in headers  # en file / en cours : pas de cache
+        time.sleep(0.05)
+    assert headers["X-Response-Cache"] == "miss"
+    _, headers, again = call(solvency.wsgi_app, poll)
+    assert headers["X-Response-Cache"] == "hit" and again == content
@@ -0,0 +1,63 @@
+import itertools, os, sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from spyne import Fault
+
+from common.rules import debt_ratio, debt_ratio_batch, explain, explain_batch
+from test_microbatch import load_main
+
+NAN = float("nan")
+
+# bornes de chaque tranche (score 600/800, reste à vivre 0/1000, dette 5000), arrondis et NaN
+SCORES = [-1.0, 0, -0.0, 599.994, 599.995, 600, 799.999, 800.0, 1000.0, NAN]
+INCOMES = [0.0, 1000.0, 2000.0, 4000.5, NAN]
+EXPENSES = [0.0, -0.0, 999.999, 1000.0, 3000.0]
+DEBTS = [0.0, -0.0, 5000.0, 5000.001, 12345.678, NAN]
+LATE = [0, 1, 3, -1, 2.0]
+BANKRUPTCY = [False, True]
+
+
+def test_explain_batch_matches_single_calls():
+    rows = list(itertools.product(SCORES, INCOMES, EXPENSES, DEBTS, LATE, BANKRUPTCY))
+    expected = [explain(*row) for row in rows]
+    assert explain_batch(rows) == expected
+    # second passage : phrases servies par les caches de rendu
+    assert explain_batch(rows) == expected
+    assert explain_batch(reversed(rows)) == expected[::-1]
+
+
+def test_debt_ratio_batch_matches_single_calls_bit_for_bit():
+    incomes = [5000.0, 0.0, -10.0, 3333.33, 1e-9, NAN, 4000.0]
+    payments = [1000.0, 1000.0, 50.0, 1234.56, 1.0, 10.0, 0.0]
+    batch = debt_ratio_batch(incomes, payments)
+    single = [debt_ratio(i, p) for i, p in zip(incomes, payments)]
+    assert [type(r) for r in batch] == [float] * len(incomes)
+    assert [repr(r) for r in batch] == [repr(r) for r in single]
+    assert debt_ratio_batch([], []) == []
+
+
+def test_batch_rpcs_match_single_rpcs():
+    explain_main = load_main("business_services/explain_service", "explain_main")
+    ratio_main = load_main("business_services/ratio_endettement_service", "ratio_main")
+    args = [(900.0, 4000.0, 2500.0, 6000.0, 2, True), (650.0, 2000.0, 1900.0, 0.0, 0, False)]
+    items = [explain_main.ExplainInput(score=a[0], monthlyIncome=a[1], monthlyExpenses=a[2], debt=a[3],
+                                       latePayments=a[4], hasBankruptcy=a[5]) for a in args]
+    batch = explain_main.ExplainService.ExplainBatch(None, items)
+    for result, a in zip(batch, args):
+        single = explain_main.ExplainService.Explain(None, *a)
+        assert result.as_dict() == single.as_dict()
+
+    pairs = [(5000.0, 1000.0), (0.0, 10.0)]
+    inputs = [ratio_main.DebtRatioInput(monthlyIncome=i, monthlyDebtPayments=p) for i, p in pairs]
+    ratios = [r.debtRatio for r in ratio_main.DebtRatioService.ComputeDebtRatioBatch(None, inputs)]
+    assert ratios == [ratio_main.DebtRatioService.ComputeDebtRatio(None, i, p).debtRatio for i, p in pairs]
+
+    with pytest.raises(Fault):
+        ratio_main.DebtRatioService.ComputeDebtRatioBatch(None, [ratio_main.DebtRatioInput(monthlyIncome=1.0)])
+    with pytest.raises(Fault):
+        explain_main.ExplainService.ExplainBatch(None, [explain_main.ExplainInput(score=700.0)])
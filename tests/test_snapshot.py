@@ -0,0 +1,104 @@
+import os, sys, time
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOLVENCY_DIR = os.path.join(ROOT_DIR, 'solvency_service')
+TESTS_DIR = os.path.dirname(__file__)
+for path in (ROOT_DIR, SOLVENCY_DIR, TESTS_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from batch import clients_from_data
+from common.rules import credit_score, solvency_decision
+from data.changes import unsubscribe
+from data.credit_data import CreditData
+from snapshot import SnapshotStore, client_row, snapshot_store_from_env
+from test_solvency_profiles import FakeResponse, load_solvency_main, soap_response
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "snapshot.sqlite"), max_age=3600)
+
+
+# === Construction et lecture ===
+def test_build_materializes_portfolio(store):
+    assert store.build(clients_from_data(), chunk_size=2) == 3
+    snap = store.get(client_row("client-001"))
+    assert snap["creditScore"] == int(credit_score(5000.0, 2, False))
+    assert snap["solvencyStatus"] == solvency_decision(snap["creditScore"], snap["debtRatio"])
+    assert snap["creditHistoryExplanation"]
+
+
+def test_stale_snapshot_is_ignored(store):
+    store.build(clients_from_data())
+    store.max_age = 0
+    time.sleep(0.01)
+    assert store.get(client_row("client-001")) is None
+
+
+def test_changed_client_data_invalidates_snapshot(store, monkeypatch):
+    store.build(clients_from_data())
+    monkeypatch.setitem(CreditData.credit_history, "client-002",
+                        {"debt": 2000.0, "late": 3, "hasBankruptcy": False})
+    row = client_row("client-002")
+    assert store.get(row) is None
+    store.refresh([row])
+    assert store.get(row)["creditScore"] == int(credit_score(2000.0, 3, False))
+
+
+# === Orchestrateur ===
+@pytest.fixture
+def solvency(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", str(tmp_path / "snapshot.sqlite"))
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", "")
+    module = load_solvency_main()
+    calls = []
+
+    def fake_post_soap(url, envelope, timeout=10):
+        service = url.split("//")[1].split(":")[0]
+        calls.append(service)
+        return FakeResponse(soap_response(service))
+
+    monkeypatch.setattr("common.discovery.post_soap", fake_post_soap)
+    module.calls = calls
+    yield module
+    if module._snapshot_store is not None:
+        unsubscribe(module._snapshot_store.on_change)
+    if module._job_queue is not None:
+        module._job_queue.stop(timeout=2)
+
+
+def test_fresh_snapshot_skips_scoring_hops(solvency):
+    solvency.get_snapshot_store().build(clients_from_data())
+    result = solvency.SolvencyService.VerifySolvency(None, "client-002", "texte", None)
+    assert "credit_scoring_service" not in solvency.calls
+    assert "decision_solvability_service" not in solvency.calls
+    assert "explain_service" not in solvency.calls
+    assert "approbation_service" in solvency.calls
+    assert result.creditScore == int(credit_score(2000.0, 0, False))
+    assert {"creditScore", "solvencyStatus", "explanations"} <= set(result.sections)
+
+
+def test_snapshot_miss_calls_services_then_refreshes(solvency):
+    solvency.SolvencyService.VerifySolvency(None, "client-002", "texte", "decisionOnly")
+    assert "credit_scoring_service" in solvency.calls
+    solvency.calls.clear()
+    result = solvency.SolvencyService.VerifySolvency(None, "client-002", "texte", "decisionOnly")
+    assert "credit_scoring_service" not in solvency.calls
+    assert result.explanations is None
+
+
+def test_snapshot_keeps_explain_async_contract(solvency):
+    solvency.get_snapshot_store().build(clients_from_data())
+    result = solvency.SolvencyService.VerifySolvency(None, "client-002", "texte", "explainAsync")
+    assert "credit_scoring_service" not in solvency.calls
+    assert result.explanations is None and result.explanationJobId
+    assert "explanations" not in result.sections
+
+
+def test_snapshots_are_off_by_default(monkeypatch):
+    monkeypatch.delenv("SOLVENCY_SNAPSHOT_DB", raising=False)
+    assert snapshot_store_from_env() is None
@@ -0,0 +1,115 @@
+import importlib.util
+import sys, os, threading, time
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SOLVENCY_DIR = os.path.join(ROOT_DIR, 'solvency_service')
+for path in (ROOT_DIR, SOLVENCY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from spyne import Fault
+
+
+def load_solvency_main():
+    spec = importlib.util.spec_from_file_location("solvency_main", os.path.join(SOLVENCY_DIR, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Réponses de chaque service (nom d'hôte -> namespace, élément englobant, champs)
+RESPONSES = {
+    "ie_service": ("urn:ie.service:v7", "extractInformationResponse",
+                   {"amount": "200000", "duration_years": "20", "property_type": "Maison",
+                    "property_description": "maison", "location": "Paris"}),
+    "property_evaluation_service": ("urn:property.evaluation:v1", "EvaluatePropertyResponse",
+                                    {"estimatedValue": "300000",
+                                     "legalCompliance": "true", "evaluationReport": "ok",
+                                     "canProceed": "true"}),
+    "credit_scoring_service": ("urn:creditscore.service:v1", "ComputeCreditScoreResponse",
+                               {"score": "850"}),
+    "decision_solvability_service": ("urn:solvency.decision:v1", "MakeDecisionResponse",
+                                     {"solvencyStatus": "solvent"}),
+    "explain_service": ("urn:explain.service:v1", "ExplainResponse",
+                        {"creditScoreExplanation": "bon score", "incomeVsExpensesExplanation": "ok",
+                         "creditHistoryExplanation": "ok"}),
+    "approbation_service": ("urn:approval.decision:v1", "MakeApprovalDecisionResult",
+                            {"approved": "true", "interestRate": "3.5", "maxLoanAmount": "250000",
+                             "decisionReport": "accordé"}),
+}
+
+
+def soap_response(service):
+    tns, wrapper, fields = RESPONSES[service]
+    body = "".join(f"<tns:{k}>{v}</tns:{k}>" for k, v in fields.items())
+    return (f'<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+            f'xmlns:tns="{tns}"><soapenv:Body><tns:{wrapper}>{body}</tns:{wrapper}>'
+            f'</soapenv:Body></soapenv:Envelope>')
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content.encode("utf-8")
+
+
+@pytest.fixture
+def solvency(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOLVENCY_JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("SOLVENCY_JOB_WORKERS", "1")
+    monkeypatch.setenv("SOLVENCY_SNAPSHOT_DB", "")
+    monkeypatch.setenv("SOLVENCY_AUDIT_DIR", "")
+    module = load_solvency_main()
+    calls = []
+
+    def fake_post_soap(url, envelope, timeout=10):
+        service = url.split("//")[1].split(":")[0]
+        calls.append(service)
+        if service == "explain_service":
+            time.sleep(0.05)
+        return FakeResponse(soap_response(service))
+
+    monkeypatch.setattr("common.discovery.post_soap", fake_post_soap)
+    module.calls = calls
+    yield module
+    if module._job_queue is not None:
+        module._job_queue.stop(timeout=2)
+
+
+def test_full_profile_includes_explanations(solvency):
+    result = solvency.SolvencyService.VerifySolvency(None, "client-001", "texte", None)
+    assert result.responseProfile == "full"
+    assert result.solvencyStatus == "solvent"
+    assert result.explanations.creditScoreExplanation == "bon score"
+    assert "explanations" in result.sections and "approvalResponse" in result.sections
+
+
+def test_decision_only_skips_explain(solvency):
+    result = solvency.SolvencyService.VerifySolvency(None, "client-001", "texte", "decisionOnly")
+    assert "explain_service" not in solvency.calls
+    assert result.explanations is None
+    assert "explanations" not in result.sections
+    assert result.approvalResponse.approved is True
+
+
+def test_explain_async_returns_job(solvency):
+    result = solvency.SolvencyService.VerifySolvency(None, "client-001", "texte", "explainAsync")
+    assert result.explanations is None and result.explanationJobId
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        job = solvency.SolvencyService.GetSolvencyJobResult(None, result.explanationJobId)
+        if job.status == "done":
+            break
+        time.sleep(0.02)
+    assert job.status == "done"
+    assert job.result.explanations.creditScoreExplanation == "bon score"
+    assert job.result.sections == ["explanations"]
+
+
+def test_unknown_profile_is_rejected(solvency):
+    with pytest.raises(Fault) as exc:
+        solvency.SolvencyService.VerifySolvency(None, "client-001", "texte", "everything")
+    assert exc.value.faultcode == "Client.InvalidProfile"
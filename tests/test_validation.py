@@ -0,0 +1,79 @@
+import io
+
+import pytest
+from spyne import Application
+from spyne.protocol.soap import Soap11
+
+from business_services.credit_scoring_service.main import CreditScoringService
+from common.validation import TrustPolicy, ValidationRouter, soap_in_protocol, _SCHEMA_CACHE
+
+
+def make_app(mode="full"):
+    return Application([CreditScoringService], tns="urn:creditscore.service:v1",
+                       in_protocol=soap_in_protocol(mode), out_protocol=Soap11())
+
+
+# === Provenance : réseau de confiance ===
+def test_trusted_network():
+    policy = TrustPolicy(networks="172.18.0.0/16", token="")
+    assert policy.is_trusted({"REMOTE_ADDR": "172.18.0.5"}) is True
+    assert policy.is_trusted({"REMOTE_ADDR": "8.8.8.8"}) is False
+    assert policy.is_trusted({}) is False
+
+
+# === Provenance : jeton interne ===
+def test_trusted_token():
+    policy = TrustPolicy(networks="", token="secret")
+    assert policy.is_trusted({"HTTP_X_INTERNAL_TOKEN": "secret"}) is True
+    assert policy.is_trusted({"HTTP_X_INTERNAL_TOKEN": "autre"}) is False
+    assert policy.is_trusted({"HTTP_X_INTERNAL_TOKEN": "sécret"}) is False
+
+
+# === Le schéma compilé est partagé entre applications ===
+def test_schema_cache_is_reused():
+    first = make_app()
+    second = make_app()
+    assert first.in_protocol.validation_schema is not None
+    assert first.in_protocol.validation_schema is second.in_protocol.validation_schema
+    assert len([k for k in _SCHEMA_CACHE if k[0] == "urn:creditscore.service:v1"]) == 1
+
+
+# === Aiguillage vers l'application allégée ===
+def test_router_builds_trusted_twin():
+    router = ValidationRouter(make_app(), trusted_validation="off",
+                              policy=TrustPolicy(networks="10.0.0.0/8", token=""))
+    assert router.trusted is not router.strict
+    assert router.trusted.app.in_protocol.validator is None
+
+
+def test_router_same_mode_shares_app():
+    router = ValidationRouter(make_app(), trusted_validation="full", policy=TrustPolicy("", ""))
+    assert router.trusted is router.strict
+
+
+# === Requête complète : corps hors schéma refusé en externe, accepté en interne ===
+UNKNOWN_ELEMENT = b"""<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+    xmlns:tns="urn:creditscore.service:v1"><soapenv:Body><tns:ComputeCreditScore><tns:debt>5000.0</tns:debt>
+    <tns:latePayments>2</tns:latePayments><tns:hasBankruptcy>false</tns:hasBankruptcy><tns:inconnu>x</tns:inconnu>
+    </tns:ComputeCreditScore></soapenv:Body></soapenv:Envelope>"""
+
+
+@pytest.mark.parametrize("origin, accepted", [
+    ({}, False),
+    ({"HTTP_X_INTERNAL_TOKEN": "secrex"}, False),
+    ({"HTTP_X_INTERNAL_TOKEN": "secret"}, True),
+    ({"REMOTE_ADDR": "10.1.2.3"}, True),
+])
+def test_router_validates_external_requests_only(monkeypatch, origin, accepted):
+    monkeypatch.delenv("SOAP_TRUSTED_VALIDATION", raising=False)
+    router = ValidationRouter(make_app(), trusted_validation="off",
+                              policy=TrustPolicy(networks="10.0.0.0/8", token="secret"))
+    environ = {"REQUEST_METHOD": "POST", "PATH_INFO": "/", "QUERY_STRING": "", "CONTENT_TYPE": "text/xml",
+               "CONTENT_LENGTH": str(len(UNKNOWN_ELEMENT)), "wsgi.input": io.BytesIO(UNKNOWN_ELEMENT),
+               "SERVER_NAME": "test", "SERVER_PORT": "80", "wsgi.url_scheme": "http", **origin}
+    status = []
+    body = b"".join(router(environ, lambda s, h, e=None: status.append(s)))
+    if accepted:
+        assert status[0].startswith("200") and b"<tns:score>" in body
+    else:
+        assert status[0].startswith("500") and b"SchemaValidationError" in body